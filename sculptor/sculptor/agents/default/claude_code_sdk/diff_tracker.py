@@ -13,6 +13,8 @@ from sculptor.foundation.constants import ExceptionPriority
 from sculptor.foundation.subprocess_utils import ProcessError
 from sculptor.interfaces.environments.agent_execution_environment import AgentExecutionEnvironment
 from sculptor.services.git_repo_service.git_errors import GitCommandFailure
+from sculptor.services.git_repo_service.git_object_reader import GitObjectReader
+from sculptor.services.git_repo_service.git_object_reader import get_git_object_reader
 from sculptor.state.chat_state import ToolInput
 from sculptor.tasks.handlers.run_agent.git import run_git_command_in_environment
 from sculptor.utils.timeout import log_runtime_decorator
@@ -44,25 +46,8 @@ def _run_git_command_in_environment_and_handle_errors(
         return None
 
 
-def _is_file_present_at_commit_hash(
-    environment: AgentExecutionEnvironment,
-    commit_hash: str,
-    relative_file_path: Path,
-    env: dict[str, str] | None = None,
-) -> bool:
-    result = _run_git_command_in_environment_and_handle_errors(
-        environment=environment,
-        command=["git", "ls-tree", commit_hash, "--", str(relative_file_path)],
-        error_message=f"Failed to check if {relative_file_path} was present at commit hash {commit_hash}",
-        extra=dict(filepath=relative_file_path, initial_tree_sha=commit_hash),
-        env=env,
-    )
-
-    if not result:
-        return False
-
-    returncode, stdout, _ = result
-    return returncode == 0 and stdout.strip() != ""
+def _get_object_reader(environment: AgentExecutionEnvironment, env: dict[str, str] | None) -> GitObjectReader:
+    return get_git_object_reader(environment.to_host_path(environment.get_working_directory()), env)
 
 
 def _get_file_contents_at_commit_hash(
@@ -71,19 +56,21 @@ def _get_file_contents_at_commit_hash(
     relative_file_path: Path,
     env: dict[str, str] | None = None,
 ) -> str | None:
-    result = _run_git_command_in_environment_and_handle_errors(
-        environment=environment,
-        command=["git", "show", f"{commit_hash}:{relative_file_path}"],
-        error_message=f"Failed to get file {relative_file_path} from git tree {commit_hash}",
-        extra=dict(filepath=relative_file_path, initial_tree_sha=commit_hash),
-        env=env,
-    )
-
-    if not result:
+    """The file's contents at `commit_hash`, or None if it is not a file there."""
+    try:
+        git_object = _get_object_reader(environment, env).read(f"{commit_hash}:{relative_file_path}")
+    except Exception as e:
+        log_exception(
+            exc=e,
+            message=f"Failed to get file {relative_file_path} from git tree {commit_hash}",
+            priority=ExceptionPriority.LOW_PRIORITY,
+            extra=dict(filepath=relative_file_path, initial_tree_sha=commit_hash),
+        )
         return None
 
-    _, stdout, _ = result
-    return stdout
+    if git_object is None or git_object.object_type != "blob":
+        return None
+    return git_object.content.decode("utf-8", errors="replace")
 
 
 class DiffTracker:
@@ -126,18 +113,11 @@ class DiffTracker:
             )
             return None
 
-        env = self._get_alternate_objects_env()
-
-        if not _is_file_present_at_commit_hash(
-            environment=self.environment, commit_hash=self.initial_tree_sha, relative_file_path=relative_path, env=env
-        ):
-            return None
-
         return _get_file_contents_at_commit_hash(
             environment=self.environment,
             commit_hash=self.initial_tree_sha,
             relative_file_path=relative_path,
-            env=env,
+            env=self._get_alternate_objects_env(),
         )
 
     def _get_file_snapshot(self, file_path: str) -> str | bytes | None:
@@ -7,7 +7,6 @@ import pytest
 
 from sculptor.agents.default.claude_code_sdk.diff_tracker import DiffTracker
 from sculptor.agents.default.claude_code_sdk.diff_tracker import _get_file_contents_at_commit_hash
-from sculptor.agents.default.claude_code_sdk.diff_tracker import _is_file_present_at_commit_hash
 from sculptor.agents.default.claude_code_sdk.diff_tracker import create_unified_diff
 from sculptor.database.workspace_enums import WorkspaceInitializationStrategy
 from sculptor.foundation.concurrency_group import ConcurrencyGroup
@@ -79,7 +78,7 @@ def _setup_repo_in_environment_with_initial_files_commit(environment: AgentExecu
 
 @pytest.fixture
 def environment_and_initial_repo_commit_hash(
-    tmp_path: Path, test_root_concurrency_group: ConcurrencyGroup
+    tmp_path: Path, test_root_concurrency_group: ConcurrencyGroup, running_git_object_readers: None
 ) -> tuple[AgentExecutionEnvironment, str]:
     environment = _create_agent_execution_environment(tmp_path, test_root_concurrency_group)
     initial_repo_commit_hash = _setup_repo_in_environment_with_initial_files_commit(environment=environment).strip()
@@ -88,26 +87,13 @@ def environment_and_initial_repo_commit_hash(
 
 @pytest.fixture
 def clone_mode_environment_and_initial_repo_commit_hash(
-    tmp_path: Path, test_root_concurrency_group: ConcurrencyGroup
+    tmp_path: Path, test_root_concurrency_group: ConcurrencyGroup, running_git_object_readers: None
 ) -> tuple[AgentExecutionEnvironment, str]:
     environment = _create_clone_mode_agent_execution_environment(tmp_path, test_root_concurrency_group)
     initial_repo_commit_hash = _setup_repo_in_environment_with_initial_files_commit(environment=environment).strip()
     return environment, initial_repo_commit_hash
 
 
-def test_is_file_present_at_commit_hash(
-    environment_and_initial_repo_commit_hash: tuple[AgentExecutionEnvironment, str],
-) -> None:
-    environment, initial_repo_commit_hash = environment_and_initial_repo_commit_hash
-    assert _is_file_present_at_commit_hash(
-        environment=environment, commit_hash=initial_repo_commit_hash, relative_file_path=Path(_FILE_PATH)
-    )
-
-    assert not _is_file_present_at_commit_hash(
-        environment=environment, commit_hash=initial_repo_commit_hash, relative_file_path=Path("does_not_exist.py")
-    )
-
-
 def test_get_file_contents_at_commit_hash(
     environment_and_initial_repo_commit_hash: tuple[AgentExecutionEnvironment, str],
 ) -> None:
@@ -182,7 +168,7 @@ def test_compute_diff_after_edit_to_new_file(
 
 
 def test_get_file_contents_preserves_trailing_newline(
-    tmp_path: Path, test_root_concurrency_group: ConcurrencyGroup
+    tmp_path: Path, test_root_concurrency_group: ConcurrencyGroup, running_git_object_readers: None
 ) -> None:
     """Committed file content with a trailing newline must round-trip exactly.
 
@@ -209,7 +195,7 @@ def test_get_file_contents_preserves_trailing_newline(
 
 
 def test_compute_diff_for_unchanged_file_with_trailing_newline(
-    tmp_path: Path, test_root_concurrency_group: ConcurrencyGroup
+    tmp_path: Path, test_root_concurrency_group: ConcurrencyGroup, running_git_object_readers: None
 ) -> None:
     """An unchanged file that ends in a newline must produce no diff.
 
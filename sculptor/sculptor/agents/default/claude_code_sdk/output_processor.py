@@ -33,6 +33,7 @@ from sculptor.interfaces.agents.agent import BackgroundTaskStartedAgentMessage
 from sculptor.interfaces.agents.agent import ContextSummaryMessage
 from sculptor.interfaces.agents.agent import Message
 from sculptor.interfaces.agents.agent import PartialResponseBlockAgentMessage
+from sculptor.interfaces.agents.agent import PartialResponseTextDeltaAgentMessage
 from sculptor.interfaces.agents.agent import PlanModeAgentMessage
 from sculptor.interfaces.agents.agent import ResponseBlockAgentMessage
 from sculptor.interfaces.agents.agent import StreamingMessageCompleteAgentMessage
@@ -108,6 +109,39 @@ _DEFERRED_COMPLETION_TOOLS: frozenset[str] = frozenset({"Monitor", "Workflow"})
 _WORKFLOW_PROGRESS_MIN_EMIT_INTERVAL_SECONDS: float = 1.0
 _WORKFLOW_PROGRESS_TREE_MIN_EMIT_INTERVAL_SECONDS: float = 0.2
 
+# Minimum interval between streamed text frames. Plain text appended to the
+# trailing text block ships as a PartialResponseTextDeltaAgentMessage instead of
+# a re-materialized snapshot of the whole turn, and consecutive deltas inside
+# this window are coalesced into one frame (~30 frames per second).
+_PARTIAL_TEXT_DELTA_MIN_EMIT_INTERVAL_SECONDS: float = 0.033
+
+
+class _PartialTextDeltaTail:
+    """The trailing text block of the last partial snapshot, as consumers currently have it."""
+
+    def __init__(self, streaming_index: int, block_index: int, text_length: int, held_whitespace: str) -> None:
+        self.streaming_index = streaming_index
+        # Position of the block in the snapshot's content tuple.
+        self.block_index = block_index
+        # Length of the block's text including every delta emitted since the snapshot.
+        self.text_length = text_length
+        # Trailing whitespace not yet emitted: partial text is stripped, so it is
+        # only shipped once non-whitespace text follows it.
+        self.held_whitespace = held_whitespace
+        # Coalesced text waiting for the next frame.
+        self.pending_text = ""
+        self.has_emitted_delta = False
+
+
+class OutputProcessingOutcome(NamedTuple):
+    """How a turn's output loop ended, for deciding whether the CLI can take the next turn."""
+
+    found_final_message: bool
+    # The SCU-1770 idle backstop gave up on a predicted follow-up turn; the CLI may still emit it.
+    did_followup_backstop_expire: bool
+    # Background tasks or a scheduled wakeup the CLI still owes output for.
+    has_pending_background_work: bool
+
 
 class _PendingWorkflowProgress(NamedTuple):
     """Result-scoped fields retained for a deferred workflow progress emission."""
@@ -437,6 +471,8 @@ class ClaudeOutputProcessor:
         # requests) and non-JSON noise do not slide it — the CLI emits control
         # frames at turn boundaries without implying a follow-up turn.
         self._followup_owed_deadline: float | None = None
+        # Set once the backstop above concludes the invocation without the follow-up turn.
+        self._did_followup_backstop_expire: bool = False
         # Grace used at the last arm; deadline refreshes reuse it so a linger
         # keeps its short window and a notification wait keeps its long one.
         self._followup_owed_grace_seconds: float = 30.0
@@ -473,6 +509,13 @@ class ClaudeOutputProcessor:
         # source text — preserving the order the model emitted it — even when a tool
         # block precedes that text in the same message.
         self._extracted_file_blocks: dict[int, list[TextBlock | FileBlock]] = {}
+        # Append-only delta state for the text block that ends the last emitted
+        # partial snapshot. While it is set, plain text deltas for that streaming
+        # index are shipped as PartialResponseTextDeltaAgentMessages (see
+        # _handle_text_delta) instead of re-materializing the whole turn.
+        self._delta_tail: _PartialTextDeltaTail | None = None
+        self._partial_text_delta_min_emit_interval_seconds: float = _PARTIAL_TEXT_DELTA_MIN_EMIT_INTERVAL_SECONDS
+        self._last_partial_emit_time: float = 0.0
         # Persistent message ID for the ChatMessage, generated at the first MessageStartEvent.
         # Used in partials and the first ResponseBlockAgentMessage to ensure stable IDs.
         self._first_response_message_id: AgentMessageID | None = None
@@ -532,7 +575,7 @@ class ClaudeOutputProcessor:
         transcript_collector: TranscriptCollector | None = None,
         mcp_server: SculptorMcpServer | None = None,
         workspace_id: WorkspaceID | None = None,
-    ) -> bool:
+    ) -> OutputProcessingOutcome:
         processor = cls(
             process=process,
             source_command=source_command,
@@ -550,7 +593,12 @@ class ClaudeOutputProcessor:
             mcp_server=mcp_server,
             workspace_id=workspace_id,
         )
-        return processor._process_output()
+        found_final_message = processor._process_output()
+        return OutputProcessingOutcome(
+            found_final_message=found_final_message,
+            did_followup_backstop_expire=processor._did_followup_backstop_expire,
+            has_pending_background_work=bool(processor._pending_background_tasks or processor._pending_wakeup),
+        )
 
     def _process_output(self) -> bool:
         while (not self.found_final_message or self._pending_background_tasks or self._pending_wakeup) and (
@@ -560,6 +608,7 @@ class ClaudeOutputProcessor:
                 line, is_stdout = self.queue.get(timeout=0.1)
             except Empty:
                 self._flush_due_workflow_progress()
+                self._flush_partial_text_delta()
                 now = time.monotonic()
                 if not self.found_final_message:
                     # SCU-1770 idle backstop: found_final_message was knocked
@@ -590,6 +639,7 @@ class ClaudeOutputProcessor:
                             self._awaiting_notification_turn_init,
                         )
                         self.found_final_message = True
+                        self._did_followup_backstop_expire = True
                         self._final_message_time = now
                         self._pending_notification_turn_results = 0
                         self._awaiting_notification_turn_init = False
@@ -797,6 +847,10 @@ class ClaudeOutputProcessor:
                 # No further processing needed for stream events
                 continue
 
+            # Every other frame may emit messages of its own; ship any coalesced
+            # streamed text first so consumers see it in order.
+            self._flush_partial_text_delta()
+
             if isinstance(result, ParsedInitResponse):
                 self._parse_init_response(result)
 
@@ -1604,6 +1658,7 @@ class ClaudeOutputProcessor:
         self._text_accumulators = {}
         self._tool_accumulators = {}
         self._extracted_file_blocks = {}
+        self._delta_tail = None
         self._current_parent_tool_use_id = None
 
     def _maybe_handle_ask_user_question(self, tool_block: ToolUseBlock) -> bool:
@@ -1922,6 +1977,9 @@ class ClaudeOutputProcessor:
         if not self.streaming_enabled:
             return
 
+        if not isinstance(event, TextDeltaEvent):
+            self._flush_partial_text_delta()
+
         if isinstance(event, MessageStartEvent):
             self._is_streaming_turn = True
             self.current_turn_id = AssistantMessageID(event.message_id)
@@ -1962,7 +2020,7 @@ class ClaudeOutputProcessor:
         elif isinstance(event, TextDeltaEvent):
             if event.index in self._text_accumulators:
                 self._text_accumulators[event.index] += event.text
-                self._emit_partial_message()
+                self._handle_text_delta(event.index, event.text)
 
         elif isinstance(event, ToolInputDeltaEvent):
             if event.index in self._tool_accumulators:
@@ -2000,6 +2058,14 @@ class ClaudeOutputProcessor:
     def _finalize_block_from_accumulator(self, index: int) -> None:
         """Finalize a block and optionally emit partial."""
         if index in self._text_accumulators:
+            # Follow a run of deltas with a full snapshot of the finalized block,
+            # so a consumer that dropped a delta converges before the turn ends.
+            tail = self._delta_tail
+            is_delta_tail_finalized = (
+                tail is not None
+                and tail.streaming_index == index
+                and (tail.has_emitted_delta or bool(tail.pending_text))
+            )
             text = self._text_accumulators.pop(index)
             segments = split_text_and_media(text)
             has_files = any(isinstance(s, FileBlock) for s in segments)
@@ -2026,7 +2092,7 @@ class ClaudeOutputProcessor:
             if remaining_segments:
                 self._extracted_file_blocks.setdefault(index, []).extend(remaining_segments)
 
-            if has_files:
+            if has_files or is_delta_tail_finalized:
                 self._emit_partial_message()
         elif index in self._tool_accumulators:
             tool_data = self._tool_accumulators.pop(index)
@@ -2051,7 +2117,11 @@ class ClaudeOutputProcessor:
         self._completed_streaming_blocks[index] = block
 
     def _emit_partial_message(self) -> None:
-        """Emit current turn's partial state."""
+        """Emit current turn's partial state.
+
+        A snapshot supersedes any coalesced text delta, and re-anchors the delta
+        tail on the snapshot's trailing text block.
+        """
         content = self._materialize_content(include_in_progress=True)
         assert self.current_turn_id is not None
         assert self._first_response_message_id is not None
@@ -2064,6 +2134,82 @@ class ClaudeOutputProcessor:
                 parent_tool_use_id=self._current_parent_tool_use_id,
             )
         )
+        self._last_partial_emit_time = time.monotonic()
+        self._delta_tail = self._build_delta_tail(content)
+
+    def _build_delta_tail(self, content: list[ContentBlockTypes]) -> _PartialTextDeltaTail | None:
+        """Return the delta tail for a just-emitted snapshot, or None if deltas cannot extend it.
+
+        Deltas can only extend a snapshot whose last block is the still-open text
+        block with the highest streaming index, and only while that block's raw
+        text has no ``<``: without one, _materialize_content renders the block as
+        exactly its stripped raw text, so appending to it stays append-only.
+        """
+        if not content or not isinstance(content[-1], TextBlock):
+            return None
+        last_index = max(
+            self._completed_streaming_blocks.keys()
+            | self._text_accumulators.keys()
+            | self._extracted_file_blocks.keys()
+        )
+        if last_index not in self._text_accumulators or last_index in self._extracted_file_blocks:
+            return None
+        raw_text = self._text_accumulators[last_index]
+        # A whitespace-only block is not rendered, so content[-1] belongs to an earlier block.
+        if "<" in raw_text or not raw_text.strip():
+            return None
+        visible_text = raw_text.rstrip()
+        return _PartialTextDeltaTail(
+            streaming_index=last_index,
+            block_index=len(content) - 1,
+            text_length=len(content[-1].text),
+            held_whitespace=raw_text[len(visible_text) :],
+        )
+
+    def _handle_text_delta(self, index: int, text: str) -> None:
+        """Ship streamed text as a coalesced delta when possible, otherwise as a full snapshot.
+
+        Re-materializing the whole turn on every token made a long answer
+        quadratic here and in message_conversion; the delta path costs only the
+        appended text. Text for any other block, or text that could start a
+        media tag, falls back to a snapshot.
+        """
+        tail = self._delta_tail
+        if tail is None or tail.streaming_index != index or "<" in text:
+            self._emit_partial_message()
+            return
+        combined_text = tail.held_whitespace + text
+        visible_text = combined_text.rstrip()
+        if visible_text:
+            tail.pending_text += visible_text
+            tail.held_whitespace = combined_text[len(visible_text) :]
+        else:
+            tail.held_whitespace = combined_text
+        if time.monotonic() - self._last_partial_emit_time >= self._partial_text_delta_min_emit_interval_seconds:
+            self._flush_partial_text_delta()
+
+    def _flush_partial_text_delta(self) -> None:
+        """Emit the coalesced text delta, if any."""
+        tail = self._delta_tail
+        if tail is None or not tail.pending_text:
+            return
+        assert self.current_turn_id is not None
+        assert self._first_response_message_id is not None
+        self.output_message_queue.put(
+            PartialResponseTextDeltaAgentMessage(
+                message_id=AgentMessageID(),
+                assistant_message_id=self.current_turn_id,
+                first_response_message_id=self._first_response_message_id,
+                parent_tool_use_id=self._current_parent_tool_use_id,
+                block_index=tail.block_index,
+                offset=tail.text_length,
+                text=tail.pending_text,
+            )
+        )
+        tail.text_length += len(tail.pending_text)
+        tail.pending_text = ""
+        tail.has_emitted_delta = True
+        self._last_partial_emit_time = time.monotonic()
 
     def _materialize_content(self, *, include_in_progress: bool) -> list[ContentBlockTypes]:
         """Render streaming state into an ordered, compacted content list.
@@ -2142,4 +2288,5 @@ class ClaudeOutputProcessor:
         self._text_accumulators = {}
         self._tool_accumulators = {}
         self._extracted_file_blocks = {}
+        self._delta_tail = None
         self._current_parent_tool_use_id = None
@@ -35,6 +35,7 @@ from sculptor.agents.testing.fake_claude_jsonl import make_workflow_agent_entry
 from sculptor.agents.testing.fake_claude_jsonl import make_workflow_phase_entry
 from sculptor.interfaces.agents.agent import BackgroundTaskNotificationAgentMessage
 from sculptor.interfaces.agents.agent import PartialResponseBlockAgentMessage
+from sculptor.interfaces.agents.agent import PartialResponseTextDeltaAgentMessage
 from sculptor.interfaces.agents.agent import RequestStartedAgentMessage
 from sculptor.interfaces.agents.agent import RequestSuccessAgentMessage
 from sculptor.interfaces.agents.agent import WarningAgentMessage
@@ -477,6 +478,122 @@ class TestNotificationDuringStreaming:
         assert len(unique_ids) == 2
 
 
+def _make_chunked_streaming_text_events(message_id: str, chunks: Sequence[str]) -> list[dict]:
+    """Like ``make_streaming_text_events`` but streams the text as one delta per chunk."""
+    events = make_streaming_text_events(message_id=message_id, text="")
+    deltas = [
+        {
+            "type": "stream_event",
+            "event": {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": chunk}},
+        }
+        for chunk in chunks
+    ]
+    # make_streaming_text_events yields message_start, block_start, delta, block_stop, message_stop.
+    return events[:2] + deltas + events[3:]
+
+
+class TestPartialTextDeltas:
+    """Plain streamed text ships as append-only deltas between full snapshots."""
+
+    _CHUNKS = ("Hello", " world", ",", " this", " is", "  ", "streamed", "\n")
+
+    def test_text_after_the_first_snapshot_ships_as_deltas(self) -> None:
+        processor = _make_processor_for_jsonl_test()
+        processor._partial_text_delta_min_emit_interval_seconds = 0.0
+
+        _feed_jsonl(
+            processor,
+            [make_init_message("session_001")] + _make_chunked_streaming_text_events("msg_001", self._CHUNKS),
+        )
+
+        emitted = [
+            m
+            for m in _drain_queue(processor.output_message_queue)
+            if isinstance(m, (PartialResponseBlockAgentMessage, PartialResponseTextDeltaAgentMessage))
+        ]
+        assert isinstance(emitted[0], PartialResponseBlockAgentMessage)
+        assert emitted[0].content == (TextBlock(text="Hello"),)
+        deltas = emitted[1:-1]
+        assert all(isinstance(m, PartialResponseTextDeltaAgentMessage) for m in deltas)
+        # Whitespace is held back until visible text follows it, matching the stripped snapshot text.
+        assert [(m.offset, m.text) for m in deltas] == [
+            (5, " world"),
+            (11, ","),
+            (12, " this"),
+            (17, " is"),
+            (20, "  streamed"),
+        ]
+        # The finalized block is re-sent as a full snapshot so dropped deltas converge.
+        assert isinstance(emitted[-1], PartialResponseBlockAgentMessage)
+        assert emitted[-1].content == (TextBlock(text="Hello world, this is  streamed\n"),)
+
+    def test_deltas_inside_the_emit_interval_are_coalesced(self) -> None:
+        processor = _make_processor_for_jsonl_test()
+        processor._partial_text_delta_min_emit_interval_seconds = 3600.0
+
+        _feed_jsonl(
+            processor,
+            [make_init_message("session_001")] + _make_chunked_streaming_text_events("msg_001", self._CHUNKS),
+        )
+
+        deltas = [
+            m
+            for m in _drain_queue(processor.output_message_queue)
+            if isinstance(m, PartialResponseTextDeltaAgentMessage)
+        ]
+        # Everything after the first snapshot is flushed as one frame before the block stops.
+        assert [(m.offset, m.text) for m in deltas] == [(5, " world, this is  streamed")]
+
+    def test_media_tags_fall_back_to_snapshots(self) -> None:
+        processor = _make_processor_for_jsonl_test()
+        processor._partial_text_delta_min_emit_interval_seconds = 0.0
+
+        chunks = ("Look", " here ", "<img src='/tmp/shot", ".png'>", " done")
+        _feed_jsonl(
+            processor, [make_init_message("session_001")] + _make_chunked_streaming_text_events("msg_001", chunks)
+        )
+
+        emitted = _drain_queue(processor.output_message_queue)
+        deltas = [m for m in emitted if isinstance(m, PartialResponseTextDeltaAgentMessage)]
+        assert [m.text for m in deltas] == [" here"]
+        snapshots = [m for m in emitted if isinstance(m, PartialResponseBlockAgentMessage)]
+        assert any(isinstance(block, FileBlock) for block in snapshots[-1].content)
+
+    def test_converted_deltas_match_the_snapshot_text_after_every_message(self) -> None:
+        processor = _make_processor_for_jsonl_test()
+        processor._partial_text_delta_min_emit_interval_seconds = 0.0
+        _feed_jsonl(
+            processor,
+            [make_init_message("session_001")] + _make_chunked_streaming_text_events("msg_001", self._CHUNKS),
+        )
+        emitted = _drain_queue(processor.output_message_queue)
+
+        request_id = AgentMessageID()
+        state = convert_agent_messages_to_task_update(
+            [
+                ChatInputUserMessage(message_id=request_id, text="/go", files=[]),
+                RequestStartedAgentMessage(request_id=request_id),
+            ],
+            TaskID(),
+            {},
+            CLAUDE_CODE_HARNESS,
+        )
+        expected_text = ""
+        for message in emitted:
+            # One message per batch, so the deltas are applied on top of the carried-over state.
+            state = convert_agent_messages_to_task_update(
+                [message], TaskID(), {}, CLAUDE_CODE_HARNESS, current_state=state
+            )
+            if isinstance(message, PartialResponseBlockAgentMessage):
+                expected_text = message.content[0].text
+            elif isinstance(message, PartialResponseTextDeltaAgentMessage):
+                expected_text += message.text
+            else:
+                continue
+            assert state.in_progress_chat_message is not None
+            assert state.in_progress_chat_message.content == (TextBlock(text=expected_text),)
+
+
 class TestDeferredCompletionCleanup:
     """Tests for deferred cleanup of task_updated{completed} for Monitor.
 
@@ -2169,6 +2286,8 @@ class TestNotificationCoalescingAndIdleBackstop:
         assert completed is True
         assert processor.found_final_message is True
         assert processor._pending_notification_turn_results == 0
+        # The CLI may still emit the follow-up, so the process manager must not reuse it for the next turn.
+        assert processor._did_followup_backstop_expire is True
 
     @pytest.mark.timeout(30)
     def test_non_json_line_during_silence_does_not_defuse_backstop(self) -> None:
@@ -4,9 +4,15 @@ import signal
 import time
 import uuid
 from contextlib import AbstractContextManager
+from dataclasses import dataclass
+from dataclasses import field
+from dataclasses import replace
+from pathlib import Path
+from queue import Empty
 from queue import Queue
 from subprocess import TimeoutExpired
 from threading import Event
+from threading import Lock
 from typing import Any
 from typing import Callable
 from typing import Mapping
@@ -19,6 +25,7 @@ from sculptor.agents.default.claude_code_sdk.harness import ClaudeCodeHarness
 from sculptor.agents.default.claude_code_sdk.mcp_server import SculptorMcpServer
 from sculptor.agents.default.claude_code_sdk.naming_conventions import resolve_naming_conventions
 from sculptor.agents.default.claude_code_sdk.output_processor import ClaudeOutputProcessor
+from sculptor.agents.default.claude_code_sdk.output_processor import OutputProcessingOutcome
 from sculptor.agents.default.claude_code_sdk.output_processor import is_first_user_message_of_conversation
 from sculptor.agents.default.claude_code_sdk.process_manager_utils import get_claude_command
 from sculptor.agents.default.claude_code_sdk.process_manager_utils import get_user_instructions
@@ -66,6 +73,36 @@ from sculptor.state.messages import LLMModel
 from sculptor.state.messages import Message
 
 
+@dataclass(frozen=True)
+class _ClaudeLaunchSettings:
+    """Everything a turn passes to the CLI at launch other than the session to resume."""
+
+    system_prompt: str
+    # None for a turn that carries no model (a question answer or an answer
+    # continuation): it continues with whatever model the CLI is running.
+    model_name: str | None
+    is_fake_claude: bool
+    plugin_dirs: tuple[Path, ...]
+    fast_mode: bool
+    effort: str | None
+    env: Mapping[str, str | Secret]
+
+    def can_continue_in(self, running: "_ClaudeLaunchSettings") -> bool:
+        """Whether a CLI launched with `running` can take this turn as-is."""
+        return replace(self, model_name=self.model_name or running.model_name) == running
+
+
+@dataclass
+class _WarmClaudeProcess:
+    """A CLI process kept running after its turn, waiting for the next compatible turn."""
+
+    process: RunningProcess
+    command: list[str]
+    launch_settings: _ClaudeLaunchSettings
+    # Set once the process is taken for a turn or shut down; wakes the idle reaper.
+    released: Event = field(default_factory=Event)
+
+
 class ClaudeProcessManager:
     def __init__(
         self,
@@ -136,6 +173,13 @@ class ClaudeProcessManager:
         # ``_process_single_message`` after ``_read_output_from_process``
         # returns.
         self._pending_answer_request_ids: list[AgentMessageID] = []
+        # With ``claude_process_keep_alive_seconds`` set, the CLI of a cleanly
+        # finished turn is parked here instead of being shut down, and the next
+        # turn with compatible launch settings writes its prompt to it rather
+        # than relaunching the CLI with ``--resume`` (which pays startup, plugin
+        # and MCP initialization, and a re-read of the session transcript).
+        self._warm_process: _WarmClaudeProcess | None = None
+        self._warm_process_lock: Lock = Lock()
 
     @staticmethod
     def _noop_mcp_respond(control_request_id: str, response_data: dict[str, Any]) -> None:
@@ -482,6 +526,11 @@ class ClaudeProcessManager:
             thread_wait_time = max(timeout - 5.0, timeout / 2.0)
             process_wait_time = timeout - thread_wait_time
             process = self._process
+            # Between turns a kept-warm CLI is still running; it is the same
+            # process as the last turn's unless that turn was cleared.
+            warm_process = self._take_warm_process()
+            if process is None and warm_process is not None:
+                process = warm_process.process
             if process is not None:
                 # Try closing stdin first to let the process exit cleanly from EOF
                 process.close_stdin()
@@ -628,25 +677,6 @@ class ClaudeProcessManager:
             )
             filename = str(self.environment.get_state_path() / f"user_instructions_{message.message_id}.txt")
             self.environment.write_file(filename, user_instructions)
-            session_id_state_file = self._harness.session_id_state_file_name
-            validated_session_id_state_file = self._harness.validated_session_id_state_file_name
-            maybe_session_id = get_state_file_contents(self.environment, session_id_state_file)
-            if maybe_session_id is not None:
-                if is_session_id_valid(maybe_session_id, self.environment, self._harness, is_session_running=False):
-                    # if the session id is valid, we can resume from it and we should save it to the state file
-                    self.environment.write_file(
-                        str(self.environment.get_state_path() / validated_session_id_state_file), maybe_session_id
-                    )
-                else:
-                    self._output_messages.put(
-                        get_warning_message(
-                            "Rolling back to the last valid session id - this means your last user message may not be in the agent context",
-                            None,
-                            self.task_id,
-                        )
-                    )
-                    # otherwise, use the previous validated session id if it exists
-                    maybe_session_id = get_state_file_contents(self.environment, validated_session_id_state_file)
             combined_system_prompt = self._get_combined_system_prompt()
             # A model-less turn (UserQuestionAnswerMessage, or an answer-
             # continuation resume) continues the conversation with its
@@ -666,29 +696,22 @@ class ClaudeProcessManager:
                 if isinstance(message, (ChatInputUserMessage, ResumeAgentResponseRunnerMessage)) and message.model_name
                 else None
             )
-            plugin_dirs = get_plugin_dirs()
-            claude_command = get_claude_command(
+            # Forward CLAUDE_* env vars from the parent process so that
+            # debugging/testing vars like CLAUDE_AUTOCOMPACT_PCT_OVERRIDE
+            # reach the claude child process.  Secrets take the highest
+            # priority in the env merge (see local_environment.py).
+            claude_env_vars = {k: v for k, v in os.environ.items() if k.startswith("CLAUDE_")}
+            launch_settings = _ClaudeLaunchSettings(
                 system_prompt=combined_system_prompt,
-                session_id=maybe_session_id,
                 model_name=maybe_model,
-                enable_streaming=True,
                 is_fake_claude=self._is_fake_claude,
-                plugin_dirs=plugin_dirs,
+                plugin_dirs=tuple(get_plugin_dirs()),
                 fast_mode=self._fast_mode,
                 effort=self._effort,
-                resolve_binary_path=self._resolve_claude_binary_path,
-                harness=self._harness,
+                env={**self._secrets, **claude_env_vars},
             )
-            logger.info("Executing claude command in environment: {}", " ".join(claude_command))
             if self._is_fake_claude:
                 logger.info("FakeClaude prompt (stdin): {}", user_instructions)
-
-            # Forward CLAUDE_* env vars from the parent process so that
-            # debugging/testing vars like CLAUDE_AUTOCOMPACT_PCT_OVERRIDE
-            # reach the claude child process.  Secrets take the highest
-            # priority in the env merge (see local_environment.py).
-            claude_env_vars = {k: v for k, v in os.environ.items() if k.startswith("CLAUDE_")}
-            child_env = {**self._secrets, **claude_env_vars}
             # Re-check before spawning the CLI. The setup work above can take
             # several seconds in slow environments (e.g. cold-starting offload
             # sandboxes), and an interrupt that arrived during that window
@@ -697,22 +720,21 @@ class ClaudeProcessManager:
             if self._is_interrupted.is_set():
                 logger.info("Skipping CLI spawn — interrupted during turn setup")
                 return
-            # SCU-211: spawn the agent CLI in its own process group so that
-            # Stop's SIGTERM/SIGKILL cascades to any foreground subprocesses
-            # the CLI spawned (e.g. the sh process behind a Bash tool call).
-            # Without this, the CLI dies but its children become orphans and
-            # keep running.
-            process = self.environment.run_process_in_background(
-                claude_command, secrets=child_env, open_stdin=True, isolate_process_group=True
-            )
+            warm_process = self._claim_warm_process(launch_settings)
+            if warm_process is not None:
+                # The warm CLI already holds the session in memory and has its
+                # PreCompact hook registered; the turn is just the next prompt.
+                process = warm_process.process
+                claude_command = warm_process.command
+                launch_settings = warm_process.launch_settings
+                logger.info("Sending turn to the warm claude process")
+            else:
+                process, claude_command = self._spawn_claude_process(launch_settings)
             self._process = process
-            # Send an initialize control request (registers a PreCompact hook
-            # callback for auto-compaction detection) followed by the user message.
-            self._record_and_write_stdin(process, self._build_initialize_control_request())
             self._record_and_write_stdin(process, self._build_stdin_user_message(user_instructions))
             cli_succeeded = False
             try:
-                self._read_output_from_process(process, claude_command)
+                self._read_output_from_process(process, claude_command, launch_settings)
                 cli_succeeded = True
             finally:
                 # After the CLI completes, finalize any answers delivered
@@ -736,8 +758,129 @@ class ClaudeProcessManager:
             # reinitialize the diff tracker with the new tree hash - this will clear the in-memory snapshots but that is okay because we have the new tree hash
             self._diff_tracker.update_initial_tree_sha()
 
+    def _resolve_resume_session_id(self) -> str | None:
+        """The session a freshly launched CLI should resume, rolling back to the last validated one if needed."""
+        session_id_state_file = self._harness.session_id_state_file_name
+        validated_session_id_state_file = self._harness.validated_session_id_state_file_name
+        maybe_session_id = get_state_file_contents(self.environment, session_id_state_file)
+        if maybe_session_id is not None:
+            if is_session_id_valid(maybe_session_id, self.environment, self._harness, is_session_running=False):
+                # if the session id is valid, we can resume from it and we should save it to the state file
+                self.environment.write_file(
+                    str(self.environment.get_state_path() / validated_session_id_state_file), maybe_session_id
+                )
+            else:
+                self._output_messages.put(
+                    get_warning_message(
+                        "Rolling back to the last valid session id - this means your last user message may not be in the agent context",
+                        None,
+                        self.task_id,
+                    )
+                )
+                # otherwise, use the previous validated session id if it exists
+                maybe_session_id = get_state_file_contents(self.environment, validated_session_id_state_file)
+        return maybe_session_id
+
+    def _spawn_claude_process(self, launch_settings: _ClaudeLaunchSettings) -> tuple[RunningProcess, list[str]]:
+        claude_command = get_claude_command(
+            system_prompt=launch_settings.system_prompt,
+            session_id=self._resolve_resume_session_id(),
+            model_name=launch_settings.model_name,
+            enable_streaming=True,
+            is_fake_claude=launch_settings.is_fake_claude,
+            plugin_dirs=launch_settings.plugin_dirs,
+            fast_mode=launch_settings.fast_mode,
+            effort=launch_settings.effort,
+            resolve_binary_path=self._resolve_claude_binary_path,
+            harness=self._harness,
+        )
+        logger.info("Executing claude command in environment: {}", " ".join(claude_command))
+        # SCU-211: spawn the agent CLI in its own process group so that
+        # Stop's SIGTERM/SIGKILL cascades to any foreground subprocesses
+        # the CLI spawned (e.g. the sh process behind a Bash tool call).
+        # Without this, the CLI dies but its children become orphans and
+        # keep running.
+        process = self.environment.run_process_in_background(
+            claude_command, secrets=dict(launch_settings.env), open_stdin=True, isolate_process_group=True
+        )
+        # Send an initialize control request (registers a PreCompact hook
+        # callback for auto-compaction detection) ahead of the first user message.
+        self._record_and_write_stdin(process, self._build_initialize_control_request())
+        return process, claude_command
+
+    def _claim_warm_process(self, launch_settings: _ClaudeLaunchSettings) -> _WarmClaudeProcess | None:
+        """Take the warm CLI for this turn if it is still running and was launched compatibly.
+
+        A warm process that cannot take the turn is shut down here, so the turn
+        relaunches the CLI with ``--resume`` exactly as without keep-alive.
+        """
+        warm_process = self._take_warm_process()
+        if warm_process is None:
+            return None
+        if warm_process.process.is_finished():
+            logger.info(
+                "Warm claude process exited while idle (returncode={}); relaunching", warm_process.process.returncode
+            )
+            return None
+        if not launch_settings.can_continue_in(warm_process.launch_settings):
+            logger.info("Launch settings changed since the last turn; relaunching the claude process")
+            self._shutdown_process(warm_process.process)
+            return None
+        # Anything the CLI wrote after the previous turn's output loop returned
+        # (a late control response, stray stderr) belongs to that turn; don't
+        # let the next output processor read it as this turn's output.
+        queue = warm_process.process.get_queue()
+        while True:
+            try:
+                line, is_stdout = queue.get_nowait()
+            except Empty:
+                break
+            logger.debug("Discarding output left over from the previous turn (is_stdout={}): {}", is_stdout, line)
+        return warm_process
+
+    def _take_warm_process(self) -> _WarmClaudeProcess | None:
+        with self._warm_process_lock:
+            warm_process = self._warm_process
+            self._warm_process = None
+        if warm_process is not None:
+            warm_process.released.set()
+        return warm_process
+
+    def _keep_process_warm(
+        self, process: RunningProcess, claude_command: list[str], launch_settings: _ClaudeLaunchSettings
+    ) -> bool:
+        """Park a finished turn's CLI for the next turn; False when keep-alive is off or the CLI has exited."""
+        keep_alive_seconds = get_user_config_instance().claude_process_keep_alive_seconds
+        if keep_alive_seconds <= 0 or process.is_finished():
+            return False
+        warm_process = _WarmClaudeProcess(process=process, command=claude_command, launch_settings=launch_settings)
+        with self._warm_process_lock:
+            self._warm_process = warm_process
+        self.environment.concurrency_group.start_new_thread(
+            target=self._shut_down_warm_process_when_idle,
+            args=(warm_process, keep_alive_seconds),
+            name=f"claude-keep-alive-{self.task_id}",
+        )
+        logger.info("Keeping the claude process running for up to {}s for the next turn", keep_alive_seconds)
+        return True
+
+    def _shut_down_warm_process_when_idle(self, warm_process: _WarmClaudeProcess, keep_alive_seconds: float) -> None:
+        if warm_process.released.wait(timeout=keep_alive_seconds):
+            return
+        with self._warm_process_lock:
+            if self._warm_process is not warm_process:
+                return
+            self._warm_process = None
+        warm_process.released.set()
+        logger.info("Claude process idle for {}s; shutting it down", keep_alive_seconds)
+        self._shutdown_process(warm_process.process)
+
     def _process_clear_context_message(self, message: UserMessageUnion) -> None:
         with self._handle_user_message_callback(message):
+            # A kept-warm CLI still holds the old conversation in memory.
+            warm_process = self._take_warm_process()
+            if warm_process is not None:
+                self._shutdown_process(warm_process.process)
             # Clear context by removing both session ID state files.
             # The next message will start a fresh claude session without --resume.
             session_id_state_file = self._harness.session_id_state_file_name
@@ -801,9 +944,20 @@ class ClaudeProcessManager:
         self,
         process: RunningProcess,
         claude_command: list[str],
+        launch_settings: _ClaudeLaunchSettings | None = None,
     ) -> None:
+        """Process one turn's output, then shut the CLI down or, given `launch_settings`, keep it warm.
+
+        The CLI is only kept for the next turn after a turn that reached its end
+        message without an interrupt and owes no further output; a process that
+        was interrupted, killed, or whose output processing raised is always shut
+        down, as is one whose follow-up backstop expired or that still has
+        background work running, since its late output would land in the next turn.
+        """
+        outcome: OutputProcessingOutcome | None = None
+        is_kept_warm = False
         try:
-            ClaudeOutputProcessor.build_and_process_output(
+            outcome = ClaudeOutputProcessor.build_and_process_output(
                 process=process,
                 source_command=" ".join(claude_command),
                 output_message_queue=self._output_messages,
@@ -827,10 +981,22 @@ class ClaudeProcessManager:
             was_interrupted = self._is_interrupted.is_set()
             self._is_interrupted.clear()
 
-            # Always terminate the process, even when output processing raised
-            # (e.g. AgentClientError from an error end message).  Without this,
-            # the process stays alive waiting on stdin and leaks.
-            was_force_killed = self._shutdown_process(process)
+            if outcome is not None and not was_interrupted and launch_settings is not None:
+                if outcome.did_followup_backstop_expire or outcome.has_pending_background_work:
+                    logger.info(
+                        "Not keeping the claude process warm (follow-up backstop expired={}, pending background work={})",
+                        outcome.did_followup_backstop_expire,
+                        outcome.has_pending_background_work,
+                    )
+                elif outcome.found_final_message:
+                    is_kept_warm = self._keep_process_warm(process, claude_command, launch_settings)
+            # Otherwise always terminate the process, even when output processing
+            # raised (e.g. AgentClientError from an error end message).  Without
+            # this, the process stays alive waiting on stdin and leaks.
+            was_force_killed = False if is_kept_warm else self._shutdown_process(process)
+
+        if is_kept_warm:
+            return
 
         # Exit-code diagnostics — only reachable when output processing succeeded
         # (no exception).  When it raised, the process is already cleaned up above.
@@ -13,7 +13,10 @@ from uuid import uuid4
 import pytest
 
 from sculptor.agents.default.claude_code_sdk.harness import CLAUDE_CODE_HARNESS
+from sculptor.agents.default.claude_code_sdk.output_processor import OutputProcessingOutcome
 from sculptor.agents.default.claude_code_sdk.process_manager import ClaudeProcessManager
+from sculptor.agents.default.claude_code_sdk.process_manager import _ClaudeLaunchSettings
+from sculptor.config.user_config import UserConfig
 from sculptor.foundation.concurrency_group import ConcurrencyGroup
 from sculptor.interfaces.agents.agent import InterruptProcessUserMessage
 from sculptor.interfaces.agents.agent import RequestSkippedAgentMessage
@@ -575,3 +578,181 @@ def test_stale_question_answer_with_no_pending_call_is_discarded_not_wedged(
     assert any(
         isinstance(m, RequestSkippedAgentMessage) and m.request_id == stale_answer.message_id for m in emitted
     ), "stale answer must be discarded via RequestSkippedAgentMessage — not respawned or raised on"
+
+
+def _make_launch_settings(model_name: str | None = "opus", fast_mode: bool = False) -> _ClaudeLaunchSettings:
+    return _ClaudeLaunchSettings(
+        system_prompt="system",
+        model_name=model_name,
+        is_fake_claude=False,
+        plugin_dirs=(),
+        fast_mode=fast_mode,
+        effort="xhigh",
+        env={"ANTHROPIC_API_KEY": "key"},
+    )
+
+
+def test_launch_settings_continue_only_in_a_compatibly_launched_process() -> None:
+    running = _make_launch_settings(model_name="opus")
+    assert _make_launch_settings(model_name="opus").can_continue_in(running)
+    # A model-less turn (a question answer) continues with the running model.
+    assert _make_launch_settings(model_name=None).can_continue_in(running)
+    assert not _make_launch_settings(model_name="sonnet").can_continue_in(running)
+    assert not _make_launch_settings(model_name="opus", fast_mode=True).can_continue_in(running)
+    # The model a model-less launch is running is unknown, so a model-carrying turn relaunches.
+    assert not _make_launch_settings(model_name="opus").can_continue_in(_make_launch_settings(model_name=None))
+
+
+@pytest.fixture
+def keep_alive_config() -> Generator[None, None, None]:
+    with patch(
+        "sculptor.agents.default.claude_code_sdk.process_manager.get_user_config_instance",
+        return_value=UserConfig(
+            user_email="test@example.com",
+            user_id="u",
+            organization_id="o",
+            instance_id="i",
+            claude_process_keep_alive_seconds=300,
+        ),
+    ):
+        yield
+
+
+_COMPLETED_TURN = OutputProcessingOutcome(
+    found_final_message=True, did_followup_backstop_expire=False, has_pending_background_work=False
+)
+
+
+def _make_live_process() -> MagicMock:
+    process = MagicMock()
+    process.is_finished.return_value = False
+    process.get_queue.return_value = Queue()
+    return process
+
+
+def test_completed_turn_keeps_process_warm_for_the_next_compatible_turn(
+    local_environment: AgentExecutionEnvironment, keep_alive_config: None
+) -> None:
+    process_manager = _make_process_manager(local_environment)
+    process = _make_live_process()
+    launch_settings = _make_launch_settings()
+
+    with patch(
+        "sculptor.agents.default.claude_code_sdk.process_manager.ClaudeOutputProcessor.build_and_process_output",
+        return_value=_COMPLETED_TURN,
+    ):
+        process_manager._read_output_from_process(process, ["claude"], launch_settings)
+
+    process.close_stdin.assert_not_called()
+    process.terminate.assert_not_called()
+    # Output the CLI wrote after the turn ended must not leak into the next turn.
+    process.get_queue.return_value.put(("late line", True))
+
+    warm_process = process_manager._claim_warm_process(_make_launch_settings(model_name=None))
+    assert warm_process is not None
+    assert warm_process.process is process
+    assert warm_process.released.is_set()
+    assert process.get_queue.return_value.empty()
+    # The process was claimed, so there is nothing left to shut down when idle.
+    assert process_manager._claim_warm_process(launch_settings) is None
+
+
+def test_warm_process_is_relaunched_when_the_model_changes(
+    local_environment: AgentExecutionEnvironment, keep_alive_config: None
+) -> None:
+    process_manager = _make_process_manager(local_environment)
+    process = _make_live_process()
+    process.wait.return_value = 0
+
+    with patch(
+        "sculptor.agents.default.claude_code_sdk.process_manager.ClaudeOutputProcessor.build_and_process_output",
+        return_value=_COMPLETED_TURN,
+    ):
+        process_manager._read_output_from_process(process, ["claude"], _make_launch_settings(model_name="opus"))
+
+    assert process_manager._claim_warm_process(_make_launch_settings(model_name="sonnet")) is None
+    process.close_stdin.assert_called_once()
+    process.wait.assert_called_once_with(timeout=5.0)
+
+
+def test_interrupted_turn_does_not_keep_process_warm(
+    local_environment: AgentExecutionEnvironment, keep_alive_config: None
+) -> None:
+    process_manager = _make_process_manager(local_environment)
+    process_manager._is_interrupted.set()
+    process = _make_live_process()
+
+    with patch(
+        "sculptor.agents.default.claude_code_sdk.process_manager.ClaudeOutputProcessor.build_and_process_output",
+        return_value=_COMPLETED_TURN,
+    ):
+        process_manager._read_output_from_process(process, ["claude"], _make_launch_settings())
+
+    process.close_stdin.assert_called_once()
+    assert process_manager._warm_process is None
+
+
+@pytest.mark.parametrize(
+    "outcome",
+    (
+        _COMPLETED_TURN._replace(did_followup_backstop_expire=True),
+        _COMPLETED_TURN._replace(has_pending_background_work=True),
+    ),
+)
+def test_turn_that_may_still_emit_output_does_not_keep_process_warm(
+    local_environment: AgentExecutionEnvironment, keep_alive_config: None, outcome: OutputProcessingOutcome
+) -> None:
+    process_manager = _make_process_manager(local_environment)
+    process = _make_live_process()
+    process.returncode = 0
+
+    with patch(
+        "sculptor.agents.default.claude_code_sdk.process_manager.ClaudeOutputProcessor.build_and_process_output",
+        return_value=outcome,
+    ):
+        process_manager._read_output_from_process(process, ["claude"], _make_launch_settings())
+
+    process.close_stdin.assert_called_once()
+    assert process_manager._warm_process is None
+
+
+def test_idle_warm_process_is_shut_down_after_the_keep_alive(
+    local_environment: AgentExecutionEnvironment, keep_alive_config: None
+) -> None:
+    process_manager = _make_process_manager(local_environment)
+    process = _make_live_process()
+
+    with patch(
+        "sculptor.agents.default.claude_code_sdk.process_manager.ClaudeOutputProcessor.build_and_process_output",
+        return_value=_COMPLETED_TURN,
+    ):
+        process_manager._read_output_from_process(process, ["claude"], _make_launch_settings())
+    warm_process = process_manager._warm_process
+    assert warm_process is not None
+
+    # What the keep-alive thread does once the idle timeout passes.
+    process_manager._shut_down_warm_process_when_idle(warm_process, keep_alive_seconds=0.01)
+
+    process.close_stdin.assert_called_once()
+    assert process_manager._warm_process is None
+    assert process_manager._claim_warm_process(_make_launch_settings()) is None
+
+
+def test_stop_shuts_down_warm_process_between_turns(
+    local_environment: AgentExecutionEnvironment, keep_alive_config: None
+) -> None:
+    process_manager = _make_process_manager(local_environment)
+    process = _make_live_process()
+
+    with patch(
+        "sculptor.agents.default.claude_code_sdk.process_manager.ClaudeOutputProcessor.build_and_process_output",
+        return_value=_COMPLETED_TURN,
+    ):
+        process_manager._read_output_from_process(process, ["claude"], _make_launch_settings())
+    process_manager._process = None
+
+    process_manager.stop(timeout=10.0)
+
+    process.close_stdin.assert_called_once()
+    process.terminate.assert_called_once()
+    assert process_manager._warm_process is None
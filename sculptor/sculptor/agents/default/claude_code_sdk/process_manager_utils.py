@@ -1,12 +1,17 @@
 import html
 import json
+import os
 import re
 import shlex
 import sys
 from collections.abc import Callable
 from collections.abc import Sequence
+from dataclasses import dataclass
+from dataclasses import replace
 from pathlib import Path
+from threading import Lock
 from typing import Any
+from typing import BinaryIO
 from typing import cast
 
 from loguru import logger
@@ -463,6 +468,35 @@ def parse_claude_code_json_lines(
         return cast(ParsedAgentResponseType, results_with_simple_tool_calls)
 
 
+# How many bytes before a scan's offset are kept to notice a session file
+# that was rewritten or replaced rather than appended to.
+_SESSION_FILE_TAIL_BYTES = 256
+
+
+@dataclass(frozen=True)
+class _SessionFileScan:
+    """How much of a Claude session file `is_session_id_valid` has already parsed.
+
+    The CLI only appends to a session file, so a later check parses just the
+    complete lines written after `offset`. The file identity and `tail` (the
+    bytes right before `offset`) are re-checked first; a file that was replaced
+    or rewritten is parsed from the start again.
+    """
+
+    device: int
+    inode: int
+    offset: int = 0
+    tail: bytes = b""
+    has_session_message: bool = False
+    # Only malformed lines before the first session message are recorded; the
+    # scan stops at that message.
+    has_malformed_line: bool = False
+
+
+_SESSION_FILE_SCAN_BY_PATH: dict[Path, _SessionFileScan] = {}
+_SESSION_FILE_SCAN_LOCK = Lock()
+
+
 def is_session_id_valid(
     session_id: str, environment: AgentExecutionEnvironment, harness: ClaudeCodeHarness, is_session_running: bool
 ) -> bool:
@@ -472,6 +506,8 @@ def is_session_id_valid(
     And the file contains at least one message that contains the session id.
 
     This is used to determine if we can resume a session after an interruption.
+    The file is read as a stream and only the bytes appended since the last
+    check are parsed, so repeated checks of a long session stay cheap.
     """
     claude_session_file_path = _get_claude_session_file_path(environment, harness, session_id)
     logger.debug(
@@ -482,37 +518,110 @@ def is_session_id_valid(
 
     # Claude session files are on the HOST filesystem (in ~/.claude/...),
     # not inside the sandbox. We need to access them directly.
-    path_exists = claude_session_file_path.exists()
-    logger.debug("Checking path {} exists={}", claude_session_file_path, path_exists)
-    if not path_exists:
+    try:
+        session_file = claude_session_file_path.open("rb")
+    except FileNotFoundError:
         logger.debug(
             "Session id {} is not valid because the file {} does not exist", session_id, claude_session_file_path
         )
         return False
-    file_contents = claude_session_file_path.read_text()
-    for line in file_contents.strip().splitlines():
+    with session_file:
+        scan = _resume_session_file_scan(claude_session_file_path, session_file)
+        scan, trailing_line = _scan_appended_session_lines(
+            session_file, scan, session_id, stop_at_malformed_line=not is_session_running
+        )
+    with _SESSION_FILE_SCAN_LOCK:
+        _SESSION_FILE_SCAN_BY_PATH[claude_session_file_path] = scan
+
+    if scan.has_malformed_line and not is_session_running:
+        return False
+    if scan.has_session_message:
+        return True
+    if not trailing_line.strip():
+        return False
+    # The last line has no newline yet: it may be complete, or the CLI may
+    # still be writing it, so it is checked but never recorded in the scan.
+    try:
+        return _is_session_message_line(trailing_line, session_id)
+    except ValueError:
+        _log_malformed_session_line(trailing_line, is_session_running)
+        return False
+
+
+def _resume_session_file_scan(path: Path, session_file: BinaryIO) -> _SessionFileScan:
+    file_stat = os.fstat(session_file.fileno())
+    with _SESSION_FILE_SCAN_LOCK:
+        previous_scan = _SESSION_FILE_SCAN_BY_PATH.get(path)
+    if (
+        previous_scan is not None
+        and (previous_scan.device, previous_scan.inode) == (file_stat.st_dev, file_stat.st_ino)
+        and previous_scan.offset <= file_stat.st_size
+    ):
+        session_file.seek(previous_scan.offset - len(previous_scan.tail))
+        if session_file.read(len(previous_scan.tail)) == previous_scan.tail:
+            return previous_scan
+        logger.debug("Session file {} was rewritten since it was last checked; re-reading it", path)
+    return _SessionFileScan(device=file_stat.st_dev, inode=file_stat.st_ino)
+
+
+def _scan_appended_session_lines(
+    session_file: BinaryIO, scan: _SessionFileScan, session_id: str, stop_at_malformed_line: bool
+) -> tuple[_SessionFileScan, bytes]:
+    """Parse the complete lines after `scan.offset`, returning the advanced scan and any unterminated last line."""
+    if scan.has_session_message or (scan.has_malformed_line and stop_at_malformed_line):
+        return scan, b""
+    session_file.seek(scan.offset)
+    offset = scan.offset
+    tail = scan.tail
+    has_session_message = False
+    has_malformed_line = scan.has_malformed_line
+    trailing_line = b""
+    for line in session_file:
+        if not line.endswith(b"\n"):
+            trailing_line = line
+            break
+        offset += len(line)
+        tail = (tail + line[-_SESSION_FILE_TAIL_BYTES:])[-_SESSION_FILE_TAIL_BYTES:]
         try:
-            maybe_message = json.loads(line)
-            if not isinstance(maybe_message, dict):
-                continue
-            # Only count conversation messages (user/assistant) as evidence of a valid session.
-            # queue-operation events are written immediately at process start and don't indicate
-            # that the session has any conversation data that can be resumed.
-            if (
-                maybe_message.get("type") in ("user", "assistant")
-                and "sessionId" in maybe_message
-                and maybe_message["sessionId"] == session_id
-            ):
-                return True
-        except json.JSONDecodeError:
-            if is_session_running:
-                logger.debug(
-                    "Skipping malformed history line {} - this may happen if the agent is still working", line
-                )
-            else:
-                logger.debug("Found malformed history line {} - this should not happen", line)
-                return False
-    return False
+            has_session_message = _is_session_message_line(line, session_id)
+        except ValueError:
+            _log_malformed_session_line(line, is_session_running=not stop_at_malformed_line)
+            has_malformed_line = True
+            if stop_at_malformed_line:
+                break
+            continue
+        if has_session_message:
+            break
+    advanced_scan = replace(
+        scan,
+        offset=offset,
+        tail=tail,
+        has_session_message=has_session_message,
+        has_malformed_line=has_malformed_line,
+    )
+    return advanced_scan, trailing_line
+
+
+def _is_session_message_line(line: bytes, session_id: str) -> bool:
+    """Whether a session file line is a conversation message of `session_id`; raises ValueError if malformed."""
+    maybe_message = json.loads(line)
+    if not isinstance(maybe_message, dict):
+        return False
+    # Only count conversation messages (user/assistant) as evidence of a valid session.
+    # queue-operation events are written immediately at process start and don't indicate
+    # that the session has any conversation data that can be resumed.
+    return (
+        maybe_message.get("type") in ("user", "assistant")
+        and "sessionId" in maybe_message
+        and maybe_message["sessionId"] == session_id
+    )
+
+
+def _log_malformed_session_line(line: bytes, is_session_running: bool) -> None:
+    if is_session_running:
+        logger.debug("Skipping malformed history line {} - this may happen if the agent is still working", line)
+    else:
+        logger.debug("Found malformed history line {} - this should not happen", line)
 
 
 def _create_tool_content(
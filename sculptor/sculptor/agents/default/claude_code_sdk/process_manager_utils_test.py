@@ -1,16 +1,20 @@
 import json
 from pathlib import Path
 from unittest.mock import MagicMock
+from unittest.mock import patch
 
 from sculptor.agents.default.claude_code_sdk.diff_tracker import DiffTracker
 from sculptor.agents.default.claude_code_sdk.harness import CLAUDE_CODE_HARNESS
+from sculptor.agents.default.claude_code_sdk.process_manager_utils import _SESSION_FILE_SCAN_BY_PATH
 from sculptor.agents.default.claude_code_sdk.process_manager_utils import _create_synthetic_diff_from_tool_input
 from sculptor.agents.default.claude_code_sdk.process_manager_utils import _create_tool_content
 from sculptor.agents.default.claude_code_sdk.process_manager_utils import _extract_edits
 from sculptor.agents.default.claude_code_sdk.process_manager_utils import get_claude_command
 from sculptor.agents.default.claude_code_sdk.process_manager_utils import get_user_instructions
+from sculptor.agents.default.claude_code_sdk.process_manager_utils import is_session_id_valid
 from sculptor.agents.default.claude_code_sdk.process_manager_utils import parse_claude_code_json_lines
 from sculptor.agents.testing.fake_claude_jsonl import make_assistant_message
+from sculptor.agents.testing.fake_claude_jsonl import make_plain_user_transcript_entry
 from sculptor.agents.testing.fake_claude_jsonl import make_tool_result_message
 from sculptor.agents.testing.fake_claude_jsonl import make_tool_use_block
 from sculptor.foundation.concurrency_group import ConcurrencyGroup
@@ -629,7 +633,7 @@ def _make_repo_with_file_ending_in_newline(
 
 
 def test_failed_edit_on_unchanged_file_preserves_error_text(
-    tmp_path: Path, test_root_concurrency_group: ConcurrencyGroup
+    tmp_path: Path, test_root_concurrency_group: ConcurrencyGroup, running_git_object_readers: None
 ) -> None:
     """When Claude emits an Edit tool_use, gets back is_error=True, and leaves the
     file untouched, the resulting ToolResultBlock must carry the error text as
@@ -827,3 +831,70 @@ def test_parse_lines_tool_result_missing_content_does_not_crash() -> None:
     assert isinstance(parsed, ParsedToolResultResponse)
     (block,) = parsed.content_blocks
     assert block.tool_use_id == tool_use_id
+
+
+_SESSION_ID = "session-1234"
+
+
+def _check_session(session_file_path: Path, is_session_running: bool) -> bool:
+    with patch(
+        "sculptor.agents.default.claude_code_sdk.process_manager_utils._get_claude_session_file_path",
+        return_value=session_file_path,
+    ):
+        return is_session_id_valid(
+            _SESSION_ID, MagicMock(), CLAUDE_CODE_HARNESS, is_session_running=is_session_running
+        )
+
+
+def _session_line(entry: dict) -> str:
+    return json.dumps(entry) + "\n"
+
+
+def test_is_session_id_valid_only_parses_lines_appended_since_the_last_check(tmp_path: Path) -> None:
+    session_file_path = tmp_path / f"{_SESSION_ID}.jsonl"
+    assert not _check_session(session_file_path, is_session_running=True)
+
+    queue_operation_line = _session_line({"type": "queue-operation", "sessionId": _SESSION_ID})
+    session_file_path.write_text(queue_operation_line)
+    assert not _check_session(session_file_path, is_session_running=True)
+    assert _SESSION_FILE_SCAN_BY_PATH[session_file_path].offset == len(queue_operation_line)
+
+    # A line the CLI is still writing is not recorded as parsed.
+    user_line = _session_line(make_plain_user_transcript_entry(_SESSION_ID, "hello"))
+    with session_file_path.open("a") as session_file:
+        session_file.write(user_line[:10])
+    assert not _check_session(session_file_path, is_session_running=True)
+    assert _SESSION_FILE_SCAN_BY_PATH[session_file_path].offset == len(queue_operation_line)
+
+    with session_file_path.open("a") as session_file:
+        session_file.write(user_line[10:])
+    assert _check_session(session_file_path, is_session_running=True)
+    assert _check_session(session_file_path, is_session_running=False)
+    scan = _SESSION_FILE_SCAN_BY_PATH[session_file_path]
+    assert scan.offset == len(queue_operation_line) + len(user_line)
+    assert scan.has_session_message
+
+
+def test_is_session_id_valid_rejects_malformed_lines_only_once_the_session_stopped(tmp_path: Path) -> None:
+    session_file_path = tmp_path / f"{_SESSION_ID}.jsonl"
+    session_file_path.write_text("{not json\n" + _session_line(make_plain_user_transcript_entry(_SESSION_ID, "hello")))
+
+    assert not _check_session(session_file_path, is_session_running=False)
+    assert _check_session(session_file_path, is_session_running=True)
+    assert not _check_session(session_file_path, is_session_running=False)
+
+
+def test_is_session_id_valid_rereads_a_rewritten_session_file(tmp_path: Path) -> None:
+    session_file_path = tmp_path / f"{_SESSION_ID}.jsonl"
+    session_file_path.write_text(_session_line(make_plain_user_transcript_entry(_SESSION_ID, "hello")))
+    assert _check_session(session_file_path, is_session_running=False)
+
+    # Rewritten in place to a longer file whose earlier bytes differ.
+    session_file_path.write_text(
+        _session_line(make_plain_user_transcript_entry("another-session", "hello, again"))
+        + _session_line({"type": "queue-operation", "sessionId": _SESSION_ID})
+    )
+    assert not _check_session(session_file_path, is_session_running=False)
+
+    session_file_path.unlink()
+    assert not _check_session(session_file_path, is_session_running=False)
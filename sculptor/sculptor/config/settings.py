@@ -1,3 +1,4 @@
+from enum import StrEnum
 from pathlib import Path
 from typing import Final
 
@@ -26,6 +27,17 @@ class TestingConfig(BaseModel):
     INTEGRATION_ENABLED: bool = False
 
 
+class LockDiagnosticsMode(StrEnum):
+    """How much each database transaction records for "database is locked" diagnostics."""
+
+    # Record nothing.
+    OFF = "OFF"
+    # Keep the caller's frame and format its stack only if a lock error needs it; count per call site.
+    CALL_SITE = "CALL_SITE"
+    # Format the full stack of every transaction up front; count per call site.
+    FULL_STACK = "FULL_STACK"
+
+
 class SculptorSettings(BaseSettings):
     """
     This class is for *server* settings *that do not change during runtime*.
@@ -43,9 +55,11 @@ class SculptorSettings(BaseSettings):
     LOG_LEVEL: str = "DEBUG"
     TASK_SYNC_DIR: str = str(get_internal_folder() / "artifacts" / "task_sync")
     WORKSPACE_SYNC_DIR: str = str(get_internal_folder() / "artifacts" / "workspace_sync")
+    SETUP_CACHE_DIR: str = str(get_internal_folder() / "setup_cache")
     SERVE_STATIC_FILES_DIR: str | None = None
     TESTING: TestingConfig = TestingConfig()
     LOG_PATH: str = str(DEFAULT_LOG_PATH)
+    DATABASE_LOCK_DIAGNOSTICS: LockDiagnosticsMode = LockDiagnosticsMode.CALL_SITE
 
     # When provided, all requests are expected to have this exact key in the `x-session-token` header (or GET param or cookie).
     # That way, we can prevent unauthorized access to the API (csrf and similar attacks).
@@ -61,6 +75,10 @@ class SculptorSettings(BaseSettings):
     def workspace_sync_path(self) -> Path:
         return Path(self.WORKSPACE_SYNC_DIR)
 
+    @property
+    def setup_cache_path(self) -> Path:
+        return Path(self.SETUP_CACHE_DIR)
+
     @property
     def upload_path(self) -> Path:
         return get_internal_folder() / "uploads"
@@ -268,6 +268,21 @@ class UserConfig(SerializableModel):
         default="delete_if_safe",
         description="What to do with a worktree workspace's auto-generated branch when the workspace is deleted: never (preserve), delete_if_safe (refuses to delete unmerged), always (force-delete).",
     )
+    workspace_pool_size: int = Field(
+        default=0,
+        ge=0,
+        description="How many worktree/clone workspaces to keep pre-created per repository, already checked out at the base branch with the setup command run, so that a new workspace is ready almost instantly. Each one costs a checkout's worth of disk space. 0 disables the pool.",
+    )
+    setup_cache_size_limit_mb: int = Field(
+        default=10240,
+        ge=0,
+        description="Disk budget for cached workspace setup outputs (for repositories that declare cache inputs and outputs in .sculptor/setup_cache.toml). Least recently used entries are evicted beyond it. 0 disables the cache.",
+    )
+    claude_process_keep_alive_seconds: int = Field(
+        default=0,
+        ge=0,
+        description="How long a Claude agent's CLI process is kept running after a turn, so that a follow-up prompt is sent to the warm process instead of relaunching the CLI and resuming the session. The process is relaunched anyway when the model or launch settings change, after an interrupt or crash, or once it has been idle this long. 0 relaunches the CLI for every turn.",
+    )
     enable_entity_mentions: bool = Field(
         default=False,
         description="When enabled, typing % in the chat input opens entity mention completions for repositories, workspaces, and agents",
@@ -17,6 +17,8 @@ from sculptor.services.dependency_management_service import InstallResult
 from sculptor.services.dependency_management_service import VoiceModelsInstaller
 from sculptor.services.git_repo_service.api import GitRepoService
 from sculptor.services.git_repo_service.default_implementation import DefaultGitRepoService
+from sculptor.services.git_repo_service.git_object_reader import start_git_object_readers
+from sculptor.services.git_repo_service.git_object_reader import stop_git_object_readers
 from sculptor.services.pi_login_service import PiLoginService
 from sculptor.services.project_service.api import ProjectService
 from sculptor.services.project_service.default_implementation import DefaultProjectService
@@ -37,6 +39,16 @@ def silly_global_config() -> Generator[UserConfig, None, None]:
     set_user_config_instance(None)
 
 
+@pytest.fixture
+def running_git_object_readers(test_root_concurrency_group: ConcurrencyGroup) -> Generator[None, None, None]:
+    """Start the shared git object readers, which the workspace service starts outside of tests."""
+    start_git_object_readers(test_root_concurrency_group)
+    try:
+        yield
+    finally:
+        stop_git_object_readers()
+
+
 # NOTE: We use the leading underscore notation to highlight the fact that services should not be used on their own outside of this module.
 # (They need to be started and stopped in a controlled manner so always require the whole collection instead of individual services.)
 
@@ -0,0 +1,108 @@
+import json
+
+import sqlalchemy as sa
+
+from sculptor.database.alembic.migration_test_utils import MigrationTestFixture
+
+PROJECT_ID = "proj-test-1"
+TASK_ID = "task-test-1"
+OTHER_TASK_ID = "task-test-2"
+
+
+class TestAddSeqToSavedAgentMessage(MigrationTestFixture):
+    """Test that existing saved_agent_message rows are numbered per task in log order.
+
+    Two of the seeded messages share a created_at; they must be numbered in the
+    order they were inserted.
+    """
+
+    @property
+    def revision(self) -> str:
+        return "3f7a2c9d1e84"
+
+    @property
+    def down_revision(self) -> str:
+        return "6026c03dc852"
+
+    def seed(self, connection: sa.engine.Connection) -> None:
+        connection.execute(
+            sa.text("""
+                INSERT INTO project_latest (
+                    created_at, object_id, organization_reference,
+                    name, user_git_repo_url, is_path_accessible,
+                    is_deleted, default_system_prompt
+                ) VALUES (
+                    '2026-01-01T00:00:00', :project_id, 'org-1',
+                    'Test Project', NULL, 1, 0, NULL
+                )
+            """),
+            {"project_id": PROJECT_ID},
+        )
+
+        input_data = json.dumps(
+            {
+                "object_type": "AgentTaskInputsV2",
+                "agent_config": {"object_type": "HelloAgentConfig"},
+                "git_hash": "abc123",
+                "system_prompt": None,
+            }
+        )
+        connection.execute(
+            sa.text("""
+                INSERT INTO task_latest (
+                    created_at, object_id, organization_reference,
+                    user_reference, project_id, input_data,
+                    max_seconds, current_state, outcome, error,
+                    is_deleted, is_deleting, last_read_at
+                ) VALUES (
+                    '2026-01-01T00:00:00', :task_id, 'org-1',
+                    'user-1', :project_id, :input_data,
+                    NULL, NULL, 'PENDING', NULL,
+                    0, 0, NULL
+                )
+            """),
+            [
+                {"task_id": TASK_ID, "project_id": PROJECT_ID, "input_data": input_data},
+                {"task_id": OTHER_TASK_ID, "project_id": PROJECT_ID, "input_data": input_data},
+            ],
+        )
+
+        rows = (
+            ("msg-3", TASK_ID, "2026-01-01T00:00:03"),
+            ("msg-1", TASK_ID, "2026-01-01T00:00:01"),
+            ("msg-2a", TASK_ID, "2026-01-01T00:00:02"),
+            ("msg-2b", TASK_ID, "2026-01-01T00:00:02"),
+            ("msg-other", OTHER_TASK_ID, "2026-01-01T00:00:05"),
+        )
+        for message_id, task_id, created_at in rows:
+            connection.execute(
+                sa.text("""
+                    INSERT INTO saved_agent_message (
+                        snapshot_id, created_at, object_id, task_id,
+                        message, source, is_partial
+                    ) VALUES (
+                        :snapshot_id, :created_at, :object_id, :task_id,
+                        :message, 'USER', 0
+                    )
+                """),
+                {
+                    "snapshot_id": f"snap-{message_id}",
+                    "created_at": created_at,
+                    "object_id": message_id,
+                    "task_id": task_id,
+                    "message": json.dumps({"object_type": "ChatInputUserMessage", "message_id": message_id}),
+                },
+            )
+
+    def verify(self, connection: sa.engine.Connection) -> None:
+        result = connection.execute(sa.text("SELECT object_id, seq FROM saved_agent_message ORDER BY task_id, seq"))
+        assert [tuple(row) for row in result.fetchall()] == [
+            ("msg-1", 1),
+            ("msg-2a", 2),
+            ("msg-2b", 3),
+            ("msg-3", 4),
+            ("msg-other", 1),
+        ]
+
+        index_names = [row[1] for row in connection.execute(sa.text("PRAGMA index_list('saved_agent_message')"))]
+        assert "ix_saved_agent_message_task_id_seq" in index_names
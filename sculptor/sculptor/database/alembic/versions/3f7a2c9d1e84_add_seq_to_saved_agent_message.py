@@ -0,0 +1,57 @@
+"""add seq to saved_agent_message
+
+Messages were ordered by created_at alone, which is non-deterministic when two
+messages of a task share a timestamp. seq is a per-task, monotonically
+increasing position in the log; it orders the log and is the keyset for paging
+through it. Existing rows are numbered per task by (created_at, rowid) -- rowid
+follows insertion order, so it breaks created_at ties the way the messages were
+actually written.
+
+Revision ID: 3f7a2c9d1e84
+Revises: 6026c03dc852
+Create Date: 2026-10-16 21:30:00.000000
+
+"""
+
+from typing import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3f7a2c9d1e84"
+down_revision: str | None = "6026c03dc852"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("saved_agent_message", sa.Column("seq", sa.Integer(), nullable=True))
+    op.execute(
+        """
+        UPDATE saved_agent_message
+        SET seq = (
+            SELECT numbered.seq
+            FROM (
+                SELECT
+                    rowid AS row_id,
+                    ROW_NUMBER() OVER (PARTITION BY task_id ORDER BY created_at, rowid) AS seq
+                FROM saved_agent_message
+            ) AS numbered
+            WHERE numbered.row_id = saved_agent_message.rowid
+        )
+        """
+    )
+    op.create_index(
+        "ix_saved_agent_message_task_id_seq",
+        "saved_agent_message",
+        ["task_id", "seq"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_saved_agent_message_task_id_seq", table_name="saved_agent_message")
+    op.drop_column("saved_agent_message", "seq")
@@ -297,6 +297,10 @@ class SavedAgentMessage(DatabaseModel):
     # this is basically just true if the message is a `StreamingChatResponseChunkAgentMessage`
     # it's here so that we can not bother to include partial messages in some queries.
     is_partial: bool
+    # Position of this message in its task's log: 1, 2, 3, ... in insertion order.
+    # Assigned by the data model service on insert (None until then); it is the
+    # ordering and pagination key for the log, since `created_at` can tie.
+    seq: int | None = None
 
     def model_post_init(self, context: Any) -> None:
         if self.object_id != self.message.message_id:
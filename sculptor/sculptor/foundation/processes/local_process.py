@@ -33,6 +33,7 @@ from typing import TypeVar
 from loguru import logger
 
 from sculptor.foundation.event_utils import MutableEvent
+from sculptor.foundation.subprocess_utils import DEFAULT_SHUTDOWN_POLL_SECONDS
 from sculptor.foundation.subprocess_utils import FinishedProcess
 from sculptor.foundation.subprocess_utils import ProcessError
 from sculptor.foundation.subprocess_utils import ProcessSetupError
@@ -57,7 +58,7 @@ def run_blocking(
     trace_log_context: Mapping[str, object] | None = None,
     shutdown_event: MutableEvent | None = None,
     shutdown_timeout_sec: float = 30.0,
-    poll_time: float = 0.01,
+    poll_time: float = DEFAULT_SHUTDOWN_POLL_SECONDS,
     env: Mapping[str, str] | None = None,
 ) -> FinishedProcess:
     """
@@ -79,7 +80,8 @@ def run_blocking(
         trace_log_context: Additional context to include in trace logs
         shutdown_event: Event that can be used to interrupt the command execution
         shutdown_timeout_sec: Timeout in seconds when shutting down via shutdown_event
-        poll_time: Time in seconds to wait between polls to check if the process is finished.
+        poll_time: Time in seconds between checks of shutdown_event. Output and process exit are noticed
+                   immediately regardless.
         env: Environment variables to pass to subprocess.Popen
 
     Returns:
@@ -315,6 +317,9 @@ class RunningProcess:
             "on_initialization_complete": on_initialized,
             "isolate_process_group": self._isolate_process_group,
             "on_popen_ready": self._set_popen,
+            # Output is kept line by line in _stdout_lines/_stderr_lines; don't hold a second copy for the
+            # lifetime of (possibly very chatty, long-running) background processes.
+            "max_retained_output_bytes": 0,
         }
         if self._open_stdin:
             extra_kwargs["stdin_mode"] = subprocess.PIPE
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import os
+import selectors
 import shlex
 import signal
 import subprocess
@@ -291,6 +292,10 @@ class FinishedProcess(FrozenModel):
 
 _READ_SIZE: Final[int] = 2**20
 
+# How often a running command re-checks its shutdown event. Output and process exit wake the
+# wait immediately, so this only bounds how long a shutdown request can go unnoticed.
+DEFAULT_SHUTDOWN_POLL_SECONDS: Final[float] = 0.1
+
 
 @attr.s(auto_attribs=True)
 class PartialOutputContainer:
@@ -300,10 +305,13 @@ class PartialOutputContainer:
     # Note: This in-memory line could become huge if no newlines are output
     in_progress_line: bytearray = attr.ib(factory=bytearray)
     on_complete_line: Callable[[str], None] | None = None
+    # When set, only the last `max_retained_bytes` of output are kept (0 keeps nothing), for callers that
+    # consume the output line by line and would otherwise hold a second copy of all of it.
+    max_retained_bytes: int | None = None
 
     def write(self, output: bytes) -> None:
         """`output` is the output of pipe.read(), ie a string that may contain newlines."""
-        self.buffer.write(output)
+        self._retain(output)
         on_complete_line = self.on_complete_line
         if on_complete_line is None:
             # If we don't have a callback, we don't need to do anything else.
@@ -316,8 +324,24 @@ class PartialOutputContainer:
                 on_complete_line(self.in_progress_line.decode("utf-8", errors="replace"))
                 self.in_progress_line.clear()
 
+    def _retain(self, output: bytes) -> None:
+        max_retained_bytes = self.max_retained_bytes
+        if max_retained_bytes is None:
+            self.buffer.write(output)
+            return
+        if max_retained_bytes == 0:
+            return
+        self.buffer.write(output[-max_retained_bytes:])
+        # Compact only once the buffer has doubled, so trimming stays amortized O(1) per byte.
+        if self.buffer.tell() > 2 * max_retained_bytes:
+            self.buffer = BytesIO(self.buffer.getvalue()[-max_retained_bytes:])
+            self.buffer.seek(0, os.SEEK_END)
+
     def get_complete_output(self) -> bytes:
-        return self.buffer.getvalue()
+        output = self.buffer.getvalue()
+        if self.max_retained_bytes:
+            return output[-self.max_retained_bytes :]
+        return output
 
 
 @attr.s(auto_attribs=True)
@@ -327,6 +351,8 @@ class OutputGatherer:
     stdout_container: PartialOutputContainer
     stderr_container: PartialOutputContainer
     shutdown_event: ReadOnlyEvent
+    is_stdout_closed: bool = False
+    is_stderr_closed: bool = False
 
     @classmethod
     def build_from_popen(
@@ -335,6 +361,7 @@ class OutputGatherer:
         on_complete_line_from_stdout: Callable[[str], None] | None,
         on_complete_line_from_stderr: Callable[[str], None] | None,
         shutdown_event: ReadOnlyEvent,
+        max_retained_output_bytes: int | None = None,
     ) -> Self:
         stdout = popen.stdout
         stderr = popen.stderr
@@ -347,29 +374,46 @@ class OutputGatherer:
         return cls(
             stdout=stdout,
             stderr=stderr,
-            stdout_container=PartialOutputContainer(on_complete_line=on_complete_line_from_stdout),
-            stderr_container=PartialOutputContainer(on_complete_line=on_complete_line_from_stderr),
+            stdout_container=PartialOutputContainer(
+                on_complete_line=on_complete_line_from_stdout, max_retained_bytes=max_retained_output_bytes
+            ),
+            stderr_container=PartialOutputContainer(
+                on_complete_line=on_complete_line_from_stderr, max_retained_bytes=max_retained_output_bytes
+            ),
             shutdown_event=shutdown_event,
         )
 
     def gather_output(self) -> None:
-        is_more_from_stdout = True
-        is_more_from_stderr = True
+        is_more_from_stdout = not self.is_stdout_closed
+        is_more_from_stderr = not self.is_stderr_closed
         # We may drop some output if the shutdown event is set, but that's okay.
         while not self.shutdown_event.is_set() and (is_more_from_stdout or is_more_from_stderr):
             # We always attempt to read from both streams to avoid starvation.
-            partial_stdout = self.stdout.read(_READ_SIZE)
-            if partial_stdout is not None:
-                self.stdout_container.write(partial_stdout)
-                is_more_from_stdout = len(partial_stdout) == _READ_SIZE
-            else:
-                is_more_from_stdout = False
-            partial_stderr = self.stderr.read(_READ_SIZE)
-            if partial_stderr is not None:
-                self.stderr_container.write(partial_stderr)
-                is_more_from_stderr = len(partial_stderr) == _READ_SIZE
-            else:
-                is_more_from_stderr = False
+            if is_more_from_stdout:
+                partial_stdout = self.stdout.read(_READ_SIZE)
+                if partial_stdout is not None:
+                    self.stdout_container.write(partial_stdout)
+                    is_more_from_stdout = len(partial_stdout) == _READ_SIZE
+                    # An empty read means every writer has closed the pipe.
+                    self.is_stdout_closed = not partial_stdout
+                else:
+                    is_more_from_stdout = False
+            if is_more_from_stderr:
+                partial_stderr = self.stderr.read(_READ_SIZE)
+                if partial_stderr is not None:
+                    self.stderr_container.write(partial_stderr)
+                    is_more_from_stderr = len(partial_stderr) == _READ_SIZE
+                    self.is_stderr_closed = not partial_stderr
+                else:
+                    is_more_from_stderr = False
+
+    def get_open_streams(self) -> tuple[IO[bytes], ...]:
+        streams: tuple[IO[bytes], ...] = ()
+        if not self.is_stdout_closed:
+            streams += (self.stdout,)
+        if not self.is_stderr_closed:
+            streams += (self.stderr,)
+        return streams
 
     def get_output(self) -> tuple[bytes, bytes]:
         return self.stdout_container.get_complete_output(), self.stderr_container.get_complete_output()
@@ -466,6 +510,66 @@ def _is_timeout(timeout_time: float | None = None) -> bool:
         return time.time() > timeout_time
 
 
+def _open_pidfd(pid: int) -> int | None:
+    """A file descriptor that becomes readable when `pid` exits, where the platform has them (Linux 5.3+)."""
+    pidfd_open = getattr(os, "pidfd_open", None)
+    if pidfd_open is None:
+        return None
+    try:
+        return pidfd_open(pid)
+    except OSError:
+        return None
+
+
+def _gather_output_until_exit(
+    process: subprocess.Popen[bytes],
+    gatherer: OutputGatherer,
+    shutdown_event: ReadOnlyEvent,
+    timeout_time: float | None,
+    shutdown_poll_time: float,
+) -> int | None:
+    """Gather the process's output until it exits, returning its exit code.
+
+    Returns None, leaving the process running, once the shutdown event is set or the timeout is reached.
+
+    The calling thread sleeps in a selector until one of the output pipes is readable or (through a pidfd, where
+    available) the process exits, so an idle or quiet command costs a wakeup per `shutdown_poll_time` rather
+    than a 100 Hz poll loop. The shutdown event has no file descriptor to wait on, hence that residual wakeup.
+    """
+    pidfd = _open_pidfd(process.pid)
+    with selectors.DefaultSelector() as selector:
+        watched_streams = set(gatherer.get_open_streams())
+        for stream in watched_streams:
+            selector.register(stream, selectors.EVENT_READ)
+        if pidfd is not None:
+            selector.register(pidfd, selectors.EVENT_READ)
+        try:
+            while not shutdown_event.is_set() and not _is_timeout(timeout_time):
+                maybe_exit_code = process.poll()
+                gatherer.gather_output()
+                if maybe_exit_code is not None:
+                    return maybe_exit_code
+                # A pipe at EOF stays readable forever, so stop watching it.
+                for stream in watched_streams.difference(gatherer.get_open_streams()):
+                    selector.unregister(stream)
+                    watched_streams.remove(stream)
+                wait_seconds = shutdown_poll_time
+                if timeout_time is not None:
+                    wait_seconds = max(0.0, min(wait_seconds, timeout_time - time.time()))
+                if watched_streams or pidfd is not None:
+                    selector.select(wait_seconds)
+                else:
+                    # Both pipes are closed and nothing else signals the exit, so wait for the process itself.
+                    try:
+                        process.wait(wait_seconds)
+                    except subprocess.TimeoutExpired:
+                        pass
+        finally:
+            if pidfd is not None:
+                os.close(pidfd)
+    return None
+
+
 def _close_popen_output_pipes(process: subprocess.Popen[bytes]) -> None:
     """Close a finished process's stdout/stderr pipe file descriptors.
 
@@ -559,12 +663,11 @@ def run_local_command(
     timeout_time = time.time() + timeout if timeout is not None else None
 
     with logger.contextualize(**trace_log_context):
-        while not shutdown_event.wait(0.001) and not _is_timeout(timeout_time):
-            maybe_exit_code = process.poll()
-            gatherer.gather_output()
-            if maybe_exit_code is not None:
-                exit_code = maybe_exit_code
-                break
+        maybe_exit_code = _gather_output_until_exit(
+            process, gatherer, shutdown_event, timeout_time, DEFAULT_SHUTDOWN_POLL_SECONDS
+        )
+        if maybe_exit_code is not None:
+            exit_code = maybe_exit_code
         else:
             # The shutdown event was set or a timeout limit has been reached,
             # so we should shutdown the process.
@@ -602,7 +705,8 @@ def run_local_command_modern_version(
     trace_log_context: Mapping[str, object] | None = None,
     shutdown_event: MutableEvent | None = None,
     shutdown_timeout_sec: float = 30.0,
-    poll_time: float = 0.01,
+    # How often the shutdown event is checked; output and process exit are handled as soon as they happen.
+    poll_time: float = DEFAULT_SHUTDOWN_POLL_SECONDS,
     env: Mapping[str, str] | None = None,
     # This callback gets called once either the process is running or it failed to start.
     # The argument is None on success, or the Exception on failure.
@@ -627,6 +731,9 @@ def run_local_command_modern_version(
     # This is what makes Stop cascade to subprocesses the child has spawned
     # (e.g. a Bash tool's sh subprocess); see SCU-211.
     isolate_process_group: bool = False,
+    # When set, the returned stdout and stderr are only the last `max_retained_output_bytes` of each (0 returns
+    # nothing), for callers that consume the output through `trace_on_line_callback` as it streams.
+    max_retained_output_bytes: int | None = None,
 ) -> FinishedProcess:
     """
     implementation notes:
@@ -639,6 +746,8 @@ def run_local_command_modern_version(
     to avoid anything blocking.
     - thus we set the pipe to nonblocking mode so that reads are nonblocking, and we also don't use readline()
     as that could potentially block/deadlock if the process prints long lines with no newlines.
+    - the thread sleeps in a selector on the pipes (and a pidfd for the exit, on Linux) between reads, so it only
+    wakes for output, exit, or the `poll_time` shutdown check; see `_gather_output_until_exit`.
     - don't redirect the process output to a file, as then the command may detect an interactive terminal and use
     line buffering.
     - DO NOT CHANGE STDIN TO ANYTHING BESIDES DEV NULL, that'll cause race conditions.
@@ -707,17 +816,15 @@ def run_local_command_modern_version(
         on_complete_line_from_stdout=on_complete_line_from_stdout,
         on_complete_line_from_stderr=on_complete_line_from_stderr,
         shutdown_event=shutdown_event,
+        max_retained_output_bytes=max_retained_output_bytes,
     )
 
     timeout_time = time.time() + timeout if timeout is not None else None
 
     with logger.contextualize(**trace_log_context):
-        while not shutdown_event.wait(poll_time) and not _is_timeout(timeout_time):
-            maybe_exit_code = process.poll()
-            gatherer.gather_output()
-            if maybe_exit_code is not None:
-                exit_code = maybe_exit_code
-                break
+        maybe_exit_code = _gather_output_until_exit(process, gatherer, shutdown_event, timeout_time, poll_time)
+        if maybe_exit_code is not None:
+            exit_code = maybe_exit_code
         else:
             # The shutdown event was set or a timeout limit has been reached,
             # so we should shutdown the process.
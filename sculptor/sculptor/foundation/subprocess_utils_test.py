@@ -129,3 +129,35 @@ def test_run_local_command_timeout_stops_long_running_process() -> None:
     # Verify the process was stopped early (should be ~2 seconds, not 10)
     assert elapsed_time < 5, f"Process took {elapsed_time:.2f}s, expected < 5s"
     assert elapsed_time > 1.5, f"Process took {elapsed_time:.2f}s, expected > 1.5s"
+
+
+def test_run_local_command_modern_version_wakes_for_output_and_exit_not_the_poll_time() -> None:
+    line_times: list[float] = []
+    start_time = time.monotonic()
+
+    result = run_local_command_modern_version(
+        ["sh", "-c", "echo first; sleep 0.5; echo second"],
+        trace_on_line_callback=lambda line, is_stdout: line_times.append(time.monotonic() - start_time),
+        poll_time=30.0,
+    )
+
+    assert result.stdout == "first\nsecond\n"
+    assert line_times[0] < 0.4
+    assert time.monotonic() - start_time < 5
+
+
+def test_run_local_command_modern_version_can_retain_only_the_tail_of_streamed_output() -> None:
+    lines: list[str] = []
+    command = ["sh", "-c", "i=0; while [ $i -lt 2000 ]; do i=$((i+1)); echo line $i; done"]
+
+    tail = run_local_command_modern_version(
+        command, trace_on_line_callback=lambda line, is_stdout: lines.append(line), max_retained_output_bytes=100
+    )
+    streaming_only = run_local_command_modern_version(command, max_retained_output_bytes=0)
+
+    assert len(lines) == 2000
+    assert lines[-1] == "line 2000\n"
+    assert len(tail.stdout) == 100
+    assert tail.stdout.endswith("line 1999\nline 2000\n")
+    assert streaming_only.stdout == ""
+    assert streaming_only.returncode == 0
@@ -335,6 +335,26 @@ class PartialResponseBlockAgentMessage(EphemeralAgentMessage):
     parent_tool_use_id: str | None = None
 
 
+class PartialResponseTextDeltaAgentMessage(EphemeralAgentMessage):
+    """Ephemeral append-only update to the text of the most recent partial.
+
+    Applies to the TextBlock at `block_index` of the last
+    PartialResponseBlockAgentMessage's content, whose text must currently be
+    exactly `offset` characters long; `text` is appended to it. Consumers that
+    cannot verify the offset drop the delta: the producer always follows a run
+    of deltas with a full PartialResponseBlockAgentMessage snapshot, so a
+    dropped delta only delays the text, it never loses it.
+    """
+
+    object_type: str = "PartialResponseTextDeltaAgentMessage"
+    assistant_message_id: AssistantMessageID
+    first_response_message_id: AgentMessageID
+    parent_tool_use_id: str | None = None
+    block_index: int
+    offset: int
+    text: str
+
+
 class StreamingMessageCompleteAgentMessage(EphemeralAgentMessage):
     """Ephemeral marker indicating streaming for one response block is complete.
 
@@ -570,6 +590,7 @@ PersistentAgentMessageUnion = (
 )
 EphemeralAgentMessageUnion = (
     Annotated[PartialResponseBlockAgentMessage, Tag("PartialResponseBlockAgentMessage")]
+    | Annotated[PartialResponseTextDeltaAgentMessage, Tag("PartialResponseTextDeltaAgentMessage")]
     | Annotated[UpdatedArtifactAgentMessage, Tag("UpdatedArtifactAgentMessage")]
     | Annotated[AskUserQuestionAgentMessage, Tag("AskUserQuestionAgentMessage")]
     | Annotated[PlanModeAgentMessage, Tag("PlanModeAgentMessage")]
@@ -151,6 +151,9 @@ class _StubTaskService(TaskService):
     def create_message(self, message: MessageTypes, task_id: TaskID, transaction: DataModelTransaction) -> None:
         _stub(message, task_id, transaction)
 
+    def write_messages(self, task_id: TaskID, entries: Any) -> None:
+        _stub(task_id, entries)
+
     def get_task(self, task_id: TaskID, transaction: DataModelTransaction) -> Task | None:
         return _stub(task_id, transaction)
 
@@ -194,9 +197,17 @@ class _StubTaskService(TaskService):
     def get_saved_messages_for_task(self, task_id: TaskID, transaction: DataModelTransaction) -> Any:
         return _stub(task_id, transaction)
 
+    def get_saved_message_page(
+        self, task_id: TaskID, transaction: DataModelTransaction, after_seq: int | None = None, limit: int = 500
+    ) -> Any:
+        return _stub(task_id, transaction, after_seq, limit)
+
     def get_live_messages_for_task(self, task_id: TaskID) -> Any:
         return _stub(task_id)
 
+    def read_task_update(self, task_id: TaskID, harness: Any, cursor: Any) -> Any:
+        return _stub(task_id, harness, cursor)
+
     @contextmanager
     def subscribe_to_all_tasks_for_user(self, user_reference: Any) -> Generator[Any, None, None]:
         del user_reference
@@ -4,6 +4,7 @@ from abc import abstractmethod
 from typing import Any
 from typing import Callable
 from typing import Collection
+from typing import Sequence
 from typing import TypedDict
 
 from pydantic import PrivateAttr
@@ -251,6 +252,9 @@ class TaskAndDataModelTransaction(DataModelTransaction, ABC):
     @abstractmethod
     def insert_message(self, message: SavedAgentMessage) -> SavedAgentMessage: ...
 
+    @abstractmethod
+    def insert_messages(self, messages: Sequence[SavedAgentMessage]) -> tuple[SavedAgentMessage, ...]: ...
+
     @abstractmethod
     def get_active_tasks(self, input_data_classes: tuple[type, ...] = ()) -> tuple[Task, ...]: ...
 
@@ -261,7 +265,18 @@ class TaskAndDataModelTransaction(DataModelTransaction, ABC):
     def get_stuck_deleting_tasks(self) -> tuple[Task, ...]: ...
 
     @abstractmethod
-    def get_messages_for_task(self, task_id: TaskID) -> tuple[SavedAgentMessage, ...]: ...
+    def get_messages_for_task(
+        self, task_id: TaskID, after_seq: int | None = None, limit: int | None = None
+    ) -> tuple[SavedAgentMessage, ...]: ...
+
+    @abstractmethod
+    def get_latest_messages_for_task(
+        self,
+        task_id: TaskID,
+        limit: int,
+        before_seq: int | None = None,
+        excluded_message_types: Collection[str] = (),
+    ) -> tuple[SavedAgentMessage, ...]: ...
 
     @abstractmethod
     def get_messages_for_tasks(self, task_ids: Collection[TaskID]) -> dict[TaskID, tuple[SavedAgentMessage, ...]]: ...
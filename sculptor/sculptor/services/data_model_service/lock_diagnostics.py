@@ -0,0 +1,108 @@
+"""Cheap per-transaction bookkeeping for diagnosing "database is locked" errors.
+
+`SQLDataModelService.open_transaction` used to run `traceback.format_stack()` for
+every transaction, read-only ones included, only so that the stack would be at
+hand if a lock error ever happened. How much is captured now depends on
+`LockDiagnosticsMode` (see `SculptorSettings.DATABASE_LOCK_DIAGNOSTICS`):
+
+- `CALL_SITE` (default) keeps a reference to the caller's frame and its
+  `file:line` location. The frame is live for as long as the transaction is
+  open, so its stack is formatted lazily, only when a lock error needs it.
+- `FULL_STACK` formats the whole stack up front, as before.
+- `OFF` records nothing.
+
+In the first two modes, `TransactionStatsRecorder` also keeps per-call-site
+counters: transactions, time spent waiting for BEGIN and time spent in the body.
+"""
+
+import sys
+import traceback
+from threading import Lock
+from types import FrameType
+
+from sculptor.config.settings import LockDiagnosticsMode
+from sculptor.foundation.pydantic_serialization import FrozenModel
+
+
+class TransactionCallSite:
+    """Where a transaction was opened from, with its stack available on demand."""
+
+    def __init__(self, location: str, frame: FrameType | None, formatted_stack: str | None) -> None:
+        self.location = location
+        self._frame = frame
+        self._formatted_stack = formatted_stack
+
+    def format_stack(self) -> str:
+        if self._formatted_stack is None:
+            if self._frame is None:
+                return f"{self.location} (stack no longer available)\n"
+            self._formatted_stack = "".join(traceback.format_stack(self._frame))
+        return self._formatted_stack
+
+    def release(self) -> None:
+        """Drop the frame reference once the transaction is over so its locals can be freed."""
+        self._frame = None
+
+
+def capture_call_site(mode: LockDiagnosticsMode, internal_filenames: frozenset[str]) -> TransactionCallSite | None:
+    """Capture the innermost caller frame whose file is not one of `internal_filenames`."""
+    if mode == LockDiagnosticsMode.OFF:
+        return None
+    frame: FrameType | None = sys._getframe(1)
+    while frame is not None and frame.f_code.co_filename in internal_filenames:
+        frame = frame.f_back
+    if frame is None:
+        return TransactionCallSite(location="<unknown>", frame=None, formatted_stack=None)
+    location = f"{frame.f_code.co_filename}:{frame.f_lineno} in {frame.f_code.co_name}"
+    if mode == LockDiagnosticsMode.FULL_STACK:
+        return TransactionCallSite(location=location, frame=None, formatted_stack="".join(traceback.format_stack()))
+    return TransactionCallSite(location=location, frame=frame, formatted_stack=None)
+
+
+class TransactionCallSiteStats(FrozenModel):
+    transaction_count: int = 0
+    # Time from asking for the transaction until its connection was handed out.
+    begin_wait_seconds: float = 0.0
+    # Time spent inside the `with open_transaction(...)` block.
+    body_seconds: float = 0.0
+
+
+class TransactionStatsRecorder:
+    """Thread-safe accumulator of `TransactionCallSiteStats` keyed by call site location."""
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        # [transaction_count, begin_wait_seconds, body_seconds]; plain lists keep `record` cheap.
+        self._totals_by_location: dict[str, list[float]] = {}
+
+    def record(self, location: str, begin_wait_seconds: float, body_seconds: float) -> None:
+        with self._lock:
+            totals = self._totals_by_location.get(location)
+            if totals is None:
+                totals = [0, 0.0, 0.0]
+                self._totals_by_location[location] = totals
+            totals[0] += 1
+            totals[1] += begin_wait_seconds
+            totals[2] += body_seconds
+
+    def snapshot(self) -> dict[str, TransactionCallSiteStats]:
+        with self._lock:
+            return {
+                location: TransactionCallSiteStats(
+                    transaction_count=int(count), begin_wait_seconds=begin_wait, body_seconds=body
+                )
+                for location, (count, begin_wait, body) in self._totals_by_location.items()
+            }
+
+    def format_busiest(self, limit: int) -> str:
+        """The `limit` call sites with the most total time, one per line, for lock-debug summaries."""
+        by_total_time = sorted(
+            self.snapshot().items(),
+            key=lambda item: item[1].begin_wait_seconds + item[1].body_seconds,
+            reverse=True,
+        )
+        return "\n".join(
+            f"{stats.transaction_count} transactions, {stats.begin_wait_seconds:.2f}s waiting for BEGIN, "
+            f"{stats.body_seconds:.2f}s in body: {location}"
+            for location, stats in by_total_time[:limit]
+        )
@@ -0,0 +1,54 @@
+from sculptor.config.settings import LockDiagnosticsMode
+from sculptor.services.data_model_service.lock_diagnostics import TransactionCallSite
+from sculptor.services.data_model_service.lock_diagnostics import TransactionStatsRecorder
+from sculptor.services.data_model_service.lock_diagnostics import capture_call_site
+
+
+def _open_transaction_here(
+    mode: LockDiagnosticsMode, internal_filenames: frozenset[str] = frozenset()
+) -> TransactionCallSite | None:
+    return capture_call_site(mode, internal_filenames)
+
+
+def test_call_site_mode_records_the_caller_and_formats_its_stack_lazily() -> None:
+    call_site = _open_transaction_here(LockDiagnosticsMode.CALL_SITE)
+
+    assert call_site is not None
+    assert call_site.location.startswith(__file__)
+    assert call_site.location.endswith("in _open_transaction_here")
+    assert call_site._formatted_stack is None
+    stack = call_site.format_stack()
+    assert "_open_transaction_here" in stack
+
+    call_site.release()
+    # Already formatted, so still available after the frame is dropped.
+    assert call_site.format_stack() == stack
+
+
+def test_internal_frames_are_skipped() -> None:
+    call_site = _open_transaction_here(LockDiagnosticsMode.CALL_SITE, frozenset((__file__,)))
+
+    assert call_site is not None
+    assert not call_site.location.startswith(__file__)
+
+
+def test_full_stack_mode_formats_up_front_and_off_records_nothing() -> None:
+    call_site = _open_transaction_here(LockDiagnosticsMode.FULL_STACK)
+
+    assert call_site is not None
+    assert call_site._formatted_stack is not None
+    assert _open_transaction_here(LockDiagnosticsMode.OFF) is None
+
+
+def test_stats_recorder_accumulates_per_location() -> None:
+    recorder = TransactionStatsRecorder()
+    recorder.record("a.py:1 in f", begin_wait_seconds=0.5, body_seconds=1.0)
+    recorder.record("a.py:1 in f", begin_wait_seconds=0.25, body_seconds=1.0)
+    recorder.record("b.py:2 in g", begin_wait_seconds=0.0, body_seconds=0.1)
+
+    stats = recorder.snapshot()
+
+    assert stats["a.py:1 in f"].transaction_count == 2
+    assert stats["a.py:1 in f"].begin_wait_seconds == 0.75
+    assert stats["a.py:1 in f"].body_seconds == 2.0
+    assert recorder.format_busiest(limit=1).endswith("a.py:1 in f")
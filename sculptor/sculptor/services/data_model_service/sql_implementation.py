@@ -1,10 +1,10 @@
+import contextlib
 import functools
 import os
 import re
 import shutil
 import sqlite3
 import time
-import traceback
 from contextlib import contextmanager
 from datetime import datetime
 from datetime import timezone
@@ -17,6 +17,7 @@ from typing import Collection
 from typing import Generator
 from typing import Generic
 from typing import ParamSpec
+from typing import Sequence
 from typing import TypeVar
 
 import sqlalchemy
@@ -33,6 +34,7 @@ from sqlalchemy import Engine
 from sqlalchemy import ForeignKeyConstraint
 from sqlalchemy import Index
 from sqlalchemy import UniqueConstraint
+from sqlalchemy import func
 from sqlalchemy import text
 from sqlalchemy.exc import OperationalError
 from sqlalchemy.sql import select
@@ -41,6 +43,7 @@ from sqlalchemy.sql.elements import ColumnElement
 from sqlalchemy.sql.schema import Table
 from typing_extensions import Unpack
 
+from sculptor.config.settings import LockDiagnosticsMode
 from sculptor.config.settings import SculptorSettings
 from sculptor.constants import SCULPTOR_EXIT_CODE_COULD_NOT_ACQUIRE_LOCK
 from sculptor.constants import SCULPTOR_EXIT_CODE_IRRECOVERABLE_ERROR
@@ -79,6 +82,10 @@ from sculptor.services.data_model_service.data_types import BaseDataModelTransac
 from sculptor.services.data_model_service.data_types import ProjectFieldUpdate
 from sculptor.services.data_model_service.data_types import WorkspaceFieldUpdate
 from sculptor.services.data_model_service.data_types import WorkspaceListingRow
+from sculptor.services.data_model_service.lock_diagnostics import TransactionCallSite
+from sculptor.services.data_model_service.lock_diagnostics import TransactionCallSiteStats
+from sculptor.services.data_model_service.lock_diagnostics import TransactionStatsRecorder
+from sculptor.services.data_model_service.lock_diagnostics import capture_call_site
 from sculptor.utils.process_utils import get_original_parent_pid
 from sculptor.utils.type_utils import extract_leaf_types
 
@@ -144,6 +151,12 @@ Index(
     SAVED_AGENT_MESSAGE_TABLE.c.task_id,
     SAVED_AGENT_MESSAGE_TABLE.c.created_at,
 )
+Index(
+    "ix_saved_agent_message_task_id_seq",
+    SAVED_AGENT_MESSAGE_TABLE.c.task_id,
+    SAVED_AGENT_MESSAGE_TABLE.c.seq,
+    unique=True,
+)
 
 NOTIFICATION_TABLE, _ = create_tables(
     to_snake(Notification.__name__),
@@ -161,6 +174,11 @@ T4 = TypeVar("T4", bound=Project | UserSettings | Notification | Task | Workspac
 
 _WAIT_FOR_LOCK_TIMEOUT_SEC = 10.0
 
+# Frames skipped when looking for the code that opened a transaction.
+_TRANSACTION_INTERNAL_FILENAMES = frozenset((__file__, contextlib.__file__))
+# Number of call sites listed in a lock-debug summary.
+_LOCK_DEBUG_SUMMARY_CALL_SITE_COUNT = 10
+
 
 P = ParamSpec("P")
 R = TypeVar("R")
@@ -188,8 +206,9 @@ def overwrite_missing_table_error_for_sentry(
 
 class SQLTransaction(BaseDataModelTransaction):
     connection: Connection
-    # tracks the current stack. Useful for debugging if we get a "database is locked" error.
-    call_stack: str
+    # Where the transaction was opened from. Useful for debugging if we get a "database is locked" error.
+    # None when lock diagnostics are off.
+    call_site: TransactionCallSite | None = None
     _updated_models: list[tuple[str, DatabaseModel]] = PrivateAttr(default_factory=list)
     _start_time: float = PrivateAttr(default_factory=lambda: time.monotonic())
 
@@ -429,27 +448,101 @@ class SQLTransaction(BaseDataModelTransaction):
         return tuple(_row_to_pydantic_model(row, Task) for row in result.all())
 
     def insert_message(self, message: SavedAgentMessage) -> SavedAgentMessage:
+        """Append the message to its task's log, stamping it with the task's next `seq`.
+
+        The MAX lookup and the insert run in this transaction, and SQLite admits a
+        single writer at a time, so two inserts can never claim the same seq.
+        """
+        last_seq = self.connection.execute(
+            select(func.max(SAVED_AGENT_MESSAGE_TABLE.c.seq)).where(
+                SAVED_AGENT_MESSAGE_TABLE.c.task_id == str(message.task_id)
+            )
+        ).scalar()
+        message = message.model_copy(update={"seq": (last_seq or 0) + 1})
         self._insert_model(message, SAVED_AGENT_MESSAGE_TABLE)
         return message
 
-    def get_messages_for_task(self, task_id: TaskID) -> tuple[SavedAgentMessage, ...]:
+    def insert_messages(self, messages: Sequence[SavedAgentMessage]) -> tuple[SavedAgentMessage, ...]:
+        """Append many messages, possibly of several tasks, with a single executemany.
+
+        Messages of the same task get consecutive seqs in the order given; see
+        `insert_message` for why the seqs cannot collide.
+        """
+        if not messages:
+            return ()
+        last_seq_by_task_id: dict[str, int] = {
+            task_id: last_seq
+            for task_id, last_seq in self.connection.execute(
+                select(SAVED_AGENT_MESSAGE_TABLE.c.task_id, func.max(SAVED_AGENT_MESSAGE_TABLE.c.seq))
+                .where(SAVED_AGENT_MESSAGE_TABLE.c.task_id.in_({str(message.task_id) for message in messages}))
+                .group_by(SAVED_AGENT_MESSAGE_TABLE.c.task_id)
+            ).all()
+        }
+        stamped_messages: list[SavedAgentMessage] = []
+        for message in messages:
+            seq = (last_seq_by_task_id.get(str(message.task_id)) or 0) + 1
+            last_seq_by_task_id[str(message.task_id)] = seq
+            stamped_messages.append(message.model_copy(update={"seq": seq}))
+        logger.debug("Inserting {} SavedAgentMessages", len(stamped_messages))
+        self.connection.execute(
+            SAVED_AGENT_MESSAGE_TABLE.insert(),
+            [_pydantic_model_to_row_values(message) for message in stamped_messages],
+        )
+        self._updated_models.extend(("INSERT", message) for message in stamped_messages)
+        return tuple(stamped_messages)
+
+    def get_messages_for_task(
+        self, task_id: TaskID, after_seq: int | None = None, limit: int | None = None
+    ) -> tuple[SavedAgentMessage, ...]:
+        """Return the task's saved messages in log order, optionally one keyset page of them.
+
+        `after_seq` is the `seq` of the last message the caller already has; pass
+        the last returned message's `seq` back in to read the next page.
+        """
         query = (
             select(SAVED_AGENT_MESSAGE_TABLE)
             .where(SAVED_AGENT_MESSAGE_TABLE.c.task_id == str(task_id))
-            # FIXME: ordering by created_at alone is non-deterministic when two messages share a
-            #  timestamp; this log needs a monotonic/auto-incrementing ordering key.
-            .order_by(SAVED_AGENT_MESSAGE_TABLE.c.created_at)
+            .order_by(SAVED_AGENT_MESSAGE_TABLE.c.seq)
+            .limit(limit)
         )
+        if after_seq is not None:
+            query = query.where(SAVED_AGENT_MESSAGE_TABLE.c.seq > after_seq)
         result = self.connection.execute(query)
         return tuple(_row_to_pydantic_model(row, SavedAgentMessage) for row in result.all())
 
+    def get_latest_messages_for_task(
+        self,
+        task_id: TaskID,
+        limit: int,
+        before_seq: int | None = None,
+        excluded_message_types: Collection[str] = (),
+    ) -> tuple[SavedAgentMessage, ...]:
+        """Return the task's last `limit` saved messages with `seq` < `before_seq`, in log order.
+
+        `excluded_message_types` are `object_type` names to skip, so a caller can reach
+        further back for the messages it needs without loading everything in between.
+        """
+        query = (
+            select(SAVED_AGENT_MESSAGE_TABLE)
+            .where(SAVED_AGENT_MESSAGE_TABLE.c.task_id == str(task_id))
+            .order_by(SAVED_AGENT_MESSAGE_TABLE.c.seq.desc())
+            .limit(limit)
+        )
+        if before_seq is not None:
+            query = query.where(SAVED_AGENT_MESSAGE_TABLE.c.seq < before_seq)
+        if excluded_message_types:
+            object_type = SAVED_AGENT_MESSAGE_TABLE.c.message["object_type"].as_string()
+            query = query.where(object_type.not_in(tuple(excluded_message_types)))
+        rows = self.connection.execute(query).all()
+        return tuple(_row_to_pydantic_model(row, SavedAgentMessage) for row in reversed(rows))
+
     def get_messages_for_tasks(self, task_ids: Collection[TaskID]) -> dict[TaskID, tuple[SavedAgentMessage, ...]]:
         if not task_ids:
             return {}
         query = (
             select(SAVED_AGENT_MESSAGE_TABLE)
             .where(SAVED_AGENT_MESSAGE_TABLE.c.task_id.in_([str(tid) for tid in task_ids]))
-            .order_by(SAVED_AGENT_MESSAGE_TABLE.c.task_id, SAVED_AGENT_MESSAGE_TABLE.c.created_at)
+            .order_by(SAVED_AGENT_MESSAGE_TABLE.c.task_id, SAVED_AGENT_MESSAGE_TABLE.c.seq)
         )
         result = self.connection.execute(query)
         messages_by_task: dict[TaskID, list[SavedAgentMessage]] = {}
@@ -670,8 +763,10 @@ class SQLDataModelService(TaskDataModelService, Generic[TQ]):
     _is_started: bool = PrivateAttr(default=False)
     # Use this flag to skip initialization if the service is running in read-only mode.
     _is_read_only: bool = PrivateAttr(default=False)
+    lock_diagnostics_mode: LockDiagnosticsMode = LockDiagnosticsMode.CALL_SITE
     # we track the currently active transactions for debugging -- we want to know what takes a long time when the DB is locked
     _active_transaction_by_id: dict[TransactionID, SQLTransaction] = PrivateAttr(default_factory=dict)
+    _transaction_stats: TransactionStatsRecorder = PrivateAttr(default_factory=TransactionStatsRecorder)
     # ensure that our parent process doesn't disappear. If it does, we must exit
     _parent_watch_shutdown_event: Event = PrivateAttr(default_factory=Event)
 
@@ -687,7 +782,9 @@ class SQLDataModelService(TaskDataModelService, Generic[TQ]):
                 logger.info("Creating database directory: {}", db_dir)
                 db_dir.mkdir(parents=True, exist_ok=True)
         engine = create_new_engine(settings.DATABASE_URL)
-        data_model_service = cls(concurrency_group=concurrency_group)
+        data_model_service = cls(
+            concurrency_group=concurrency_group, lock_diagnostics_mode=settings.DATABASE_LOCK_DIAGNOSTICS
+        )
         data_model_service._engine = engine
         return data_model_service
 
@@ -842,8 +939,9 @@ class SQLDataModelService(TaskDataModelService, Generic[TQ]):
                 "SQLDataModelService must be started before opening transactions."
             )
         transaction_id = TransactionID()
-        call_stack = "".join(traceback.format_stack())
+        call_site = capture_call_site(self.lock_diagnostics_mode, _TRANSACTION_INTERNAL_FILENAMES)
         start_time = time.monotonic()
+        body_start_time: float | None = None
         connection_cm = self._begin_immediate_connection() if immediate else self._engine.begin()
         # Single OperationalError handler covering both connection acquisition
         # (where BEGIN IMMEDIATE may raise "database is locked" before any
@@ -851,11 +949,12 @@ class SQLDataModelService(TaskDataModelService, Generic[TQ]):
         # BEGIN DEFERRED or any other statement may raise the same).
         try:
             with connection_cm as connection:
+                body_start_time = time.monotonic()
                 transaction = SQLTransaction(
                     request_id=request_id,
                     connection=connection,
                     transaction_id=transaction_id,
-                    call_stack=call_stack,
+                    call_site=call_site,
                 )
                 # Track wait-for-BEGIN time too, not just body time.
                 transaction._start_time = start_time
@@ -869,7 +968,7 @@ class SQLDataModelService(TaskDataModelService, Generic[TQ]):
             if "database is locked" in str(e):
                 transaction_summary = self._format_lock_debug_summary(
                     transaction_id=transaction_id,
-                    call_stack=call_stack,
+                    call_site=call_site,
                     start_time=start_time,
                 )
                 log_exception(
@@ -878,6 +977,16 @@ class SQLDataModelService(TaskDataModelService, Generic[TQ]):
                     sentry_extra=dict(transaction_summary=transaction_summary),
                 )
             raise
+        finally:
+            if call_site is not None:
+                end_time = time.monotonic()
+                begin_end_time = body_start_time if body_start_time is not None else end_time
+                self._transaction_stats.record(
+                    call_site.location,
+                    begin_wait_seconds=begin_end_time - start_time,
+                    body_seconds=end_time - begin_end_time,
+                )
+                call_site.release()
 
         transaction.run_post_commit_hooks()
 
@@ -904,27 +1013,31 @@ class SQLDataModelService(TaskDataModelService, Generic[TQ]):
         for observer in observers:
             observer.put(completed_transaction)
 
+    def get_transaction_stats(self) -> dict[str, TransactionCallSiteStats]:
+        """Per-call-site transaction counters since start; empty when lock diagnostics are off."""
+        return self._transaction_stats.snapshot()
+
     def _format_lock_debug_summary(
         self,
         *,
         transaction_id: TransactionID,
-        call_stack: str,
+        call_site: TransactionCallSite | None,
         start_time: float,
     ) -> str:
         """Build the lock-debug summary used when "database is locked" surfaces.
 
         Accepts raw fields rather than an ``SQLTransaction`` so it works for
         BEGIN-IMMEDIATE failures where the connection never opened and no
-        ``SQLTransaction`` exists (SCU-536).
+        ``SQLTransaction`` exists (SCU-536). Stacks are only formatted here.
         """
         now = time.monotonic()
         transaction_summary_entries = [
-            f"Took {now - start_time:.2f}s to run this transaction, which failed:\n{call_stack}\n"
+            f"Took {now - start_time:.2f}s to run this transaction, which failed:\n{_format_call_site(call_site)}\n"
         ]
         other_transactions = sorted(
             [
-                (now - x._start_time, x.call_stack)
-                for x in self._active_transaction_by_id.values()
+                (now - x._start_time, _format_call_site(x.call_site))
+                for x in list(self._active_transaction_by_id.values())
                 if x.transaction_id != transaction_id
             ],
             reverse=True,
@@ -932,6 +1045,9 @@ class SQLDataModelService(TaskDataModelService, Generic[TQ]):
         transaction_summary_entries.append(f"{len(other_transactions)} other active transactions:\n")
         for age, stack in other_transactions:
             transaction_summary_entries.append(f"ACTIVE FOR {age:.2f}s:\n{stack}\n")
+        busiest_call_sites = self._transaction_stats.format_busiest(_LOCK_DEBUG_SUMMARY_CALL_SITE_COUNT)
+        if busiest_call_sites:
+            transaction_summary_entries.append(f"Busiest transaction call sites:\n{busiest_call_sites}\n")
         transaction_summary = "\n".join(transaction_summary_entries)
         return transaction_summary
 
@@ -985,6 +1101,12 @@ class ReadOnlyConnectionStringExpectedError(Exception):
     pass
 
 
+def _format_call_site(call_site: TransactionCallSite | None) -> str:
+    if call_site is None:
+        return "(lock diagnostics are off)\n"
+    return call_site.format_stack()
+
+
 def _get_backup_db_path(db_path: Path) -> Path:
     return db_path.with_suffix(".backup")
 
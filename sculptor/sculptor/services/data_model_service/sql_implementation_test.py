@@ -6,6 +6,7 @@ import typing
 from contextlib import ExitStack
 from contextlib import contextmanager
 from datetime import datetime
+from datetime import timezone
 from pathlib import Path
 from typing import Any
 from typing import Generator
@@ -49,6 +50,7 @@ from sculptor.foundation.concurrency_group import ConcurrencyGroup
 from sculptor.foundation.pydantic_serialization import SerializableModel
 from sculptor.interfaces.agents.agent import HelloAgentConfig
 from sculptor.primitives.ids import AgentMessageID
+from sculptor.primitives.ids import AssistantMessageID
 from sculptor.primitives.ids import ObjectID
 from sculptor.primitives.ids import ObjectSnapshotID
 from sculptor.primitives.ids import OrganizationReference
@@ -69,6 +71,7 @@ from sculptor.services.data_model_service.sql_implementation import WORKSPACE_TA
 from sculptor.services.data_model_service.sql_implementation import _UPDATE_FIELDS_PROTECTED_COLUMNS
 from sculptor.state.messages import ChatInputUserMessage
 from sculptor.state.messages import LLMModel
+from sculptor.state.messages import ResponseBlockAgentMessage
 from sculptor.utils.type_utils import extract_leaf_types
 
 
@@ -255,6 +258,120 @@ def test_foreign_constraints_are_being_enforced(test_db_service: SQLDataModelSer
             transaction.insert_message(saved_agent_message)
 
 
+def test_messages_get_per_task_seqs_and_page_by_seq(
+    test_db_service_with_user_organization_and_project: tuple[
+        SQLDataModelService, UserReference, OrganizationReference, Project
+    ],
+    tmp_path: Path,
+) -> None:
+    service, user_reference, organization_reference, project = test_db_service_with_user_organization_and_project
+    task = get_simple_agent_task(tmp_path, user_reference, organization_reference, project)
+    other_task = get_simple_agent_task(tmp_path, user_reference, organization_reference, project)
+    # Every message shares one created_at, so only seq can order them.
+    created_at = datetime.now(timezone.utc)
+    with service.open_task_transaction() as transaction:
+        transaction.upsert_task(task)
+        transaction.upsert_task(other_task)
+        inserted = [
+            transaction.insert_message(
+                SavedAgentMessage.build(message=ChatInputUserMessage(text=f"message {i}"), task_id=task_id).model_copy(
+                    update={"created_at": created_at}
+                )
+            )
+            for i, task_id in enumerate((task.object_id, other_task.object_id, task.object_id, task.object_id))
+        ]
+
+    assert [message.seq for message in inserted] == [1, 1, 2, 3]
+    with service.open_task_transaction() as transaction:
+        all_messages = transaction.get_messages_for_task(task.object_id)
+        first_page = transaction.get_messages_for_task(task.object_id, limit=2)
+        second_page = transaction.get_messages_for_task(task.object_id, after_seq=first_page[-1].seq, limit=2)
+
+    expected_ids = [inserted[0].object_id, inserted[2].object_id, inserted[3].object_id]
+    assert [message.object_id for message in all_messages] == expected_ids
+    assert [message.object_id for message in first_page + second_page] == expected_ids
+    assert [message.seq for message in second_page] == [3]
+
+
+def test_get_latest_messages_for_task_reads_back_from_the_end_of_the_log(
+    test_db_service_with_user_organization_and_project: tuple[
+        SQLDataModelService, UserReference, OrganizationReference, Project
+    ],
+    tmp_path: Path,
+) -> None:
+    service, user_reference, organization_reference, project = test_db_service_with_user_organization_and_project
+    task = get_simple_agent_task(tmp_path, user_reference, organization_reference, project)
+    with service.open_task_transaction() as transaction:
+        transaction.upsert_task(task)
+        inserted = transaction.insert_messages(
+            [
+                SavedAgentMessage.build(
+                    message=ChatInputUserMessage(text=f"message {i}")
+                    if i % 2
+                    else ResponseBlockAgentMessage(
+                        role="assistant", assistant_message_id=AssistantMessageID(f"assistant-{i}"), content=()
+                    ),
+                    task_id=task.object_id,
+                )
+                for i in range(6)
+            ]
+        )
+
+    with service.open_task_transaction() as transaction:
+        tail = transaction.get_latest_messages_for_task(task.object_id, limit=2)
+        older_user_messages = transaction.get_latest_messages_for_task(
+            task.object_id,
+            limit=5,
+            before_seq=tail[0].seq,
+            excluded_message_types=(ResponseBlockAgentMessage.__name__,),
+        )
+
+    assert [message.seq for message in tail] == [5, 6]
+    assert [message.object_id for message in older_user_messages] == [inserted[1].object_id, inserted[3].object_id]
+
+
+def test_insert_messages_continues_each_tasks_seq_in_one_batch(
+    test_db_service_with_user_organization_and_project: tuple[
+        SQLDataModelService, UserReference, OrganizationReference, Project
+    ],
+    tmp_path: Path,
+) -> None:
+    service, user_reference, organization_reference, project = test_db_service_with_user_organization_and_project
+    task = get_simple_agent_task(tmp_path, user_reference, organization_reference, project)
+    other_task = get_simple_agent_task(tmp_path, user_reference, organization_reference, project)
+    with service.open_task_transaction() as transaction:
+        transaction.upsert_task(task)
+        transaction.upsert_task(other_task)
+        transaction.insert_message(
+            SavedAgentMessage.build(message=ChatInputUserMessage(text="first"), task_id=task.object_id)
+        )
+        inserted = transaction.insert_messages(
+            [
+                SavedAgentMessage.build(message=ChatInputUserMessage(text=f"batched {i}"), task_id=task_id)
+                for i, task_id in enumerate((task.object_id, other_task.object_id, task.object_id))
+            ]
+        )
+
+    assert [message.seq for message in inserted] == [2, 1, 3]
+    with service.open_task_transaction() as transaction:
+        saved = transaction.get_messages_for_task(task.object_id)
+    assert [message.object_id for message in saved][1:] == [inserted[0].object_id, inserted[2].object_id]
+
+
+def test_transactions_are_counted_per_call_site(test_db_service: SQLDataModelService) -> None:
+    for _ in range(3):
+        with test_db_service.open_task_transaction() as transaction:
+            transaction.get_all_tasks()
+
+    stats_for_this_test = [
+        stats
+        for location, stats in test_db_service.get_transaction_stats().items()
+        if location.startswith(__file__) and location.endswith("in test_transactions_are_counted_per_call_site")
+    ]
+    assert len(stats_for_this_test) == 1
+    assert stats_for_this_test[0].transaction_count == 3
+
+
 BUMP_MIGRATIONS_COMMAND = "uv run --project sculptor python sculptor/sculptor/scripts/bump_migrations.py"
 
 
@@ -15,6 +15,7 @@ from pathlib import Path
 from queue import Queue
 from subprocess import TimeoutExpired
 from typing import Any
+from typing import NamedTuple
 from typing import assert_never
 
 import httpx
@@ -68,6 +69,30 @@ class DependencyCheckResult(FrozenModel):
     version: str | None = None
 
 
+class _BinaryFingerprint(NamedTuple):
+    """Identifies the exact file a resolved binary path points at.
+
+    A managed install lands in a new version dir, a config change resolves to a
+    different path, and an in-place upgrade replaces or rewrites the file, so any
+    of them changes the fingerprint and retires a cached ``--version`` probe.
+    """
+
+    path: str
+    inode: int
+    size: int
+    mtime_ns: int
+
+
+def _fingerprint_binary(binary: str) -> _BinaryFingerprint | None:
+    try:
+        stat_result = os.stat(binary)
+    except OSError:
+        return None
+    return _BinaryFingerprint(
+        path=binary, inode=stat_result.st_ino, size=stat_result.st_size, mtime_ns=stat_result.st_mtime_ns
+    )
+
+
 DEPENDENCIES_DIR_NAME = "dependencies"
 _VERSION_DIR_PREFIX = "version-"
 _TEMP_DIR_PREFIX = "tmp-"
@@ -566,6 +591,15 @@ class DependencyManagementService(Service):
     # The voice-models bundle installer (created on first use); see
     # VoiceModelsInstaller for why the bundle lives beside the per-tool dicts.
     _voice_models_installer: VoiceModelsInstaller | None = PrivateAttr(default=None)
+    # Successful `<binary> --version` probes, reused while the binary's fingerprint is unchanged.
+    _version_probe_cache: dict[Dependency, tuple[_BinaryFingerprint, DependencyCheckResult]] = PrivateAttr(
+        default_factory=dict
+    )
+    _version_probe_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    # The most recently computed status, served to new stream connections by get_cached_status().
+    _last_status: DependenciesStatus | None = PrivateAttr(default=None)
+    _status_refresh_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _is_status_refresh_running: bool = PrivateAttr(default=False)
 
     def start(self) -> None:
         self._cleanup_stale_state()
@@ -813,22 +847,42 @@ class DependencyManagementService(Service):
         return str(versions[0][1])
 
     def check_installed(self, tool: Dependency) -> DependencyCheckResult:
-        """Check whether a dependency is installed and get its version."""
+        """Check whether a dependency is installed and get its version.
+
+        The ``--version`` probe forks the binary, so a successful probe is cached
+        and reused for as long as the resolved binary's fingerprint is unchanged.
+        """
         binary = self.resolve_binary_path(tool)
         if binary is None:
             return DependencyCheckResult(installed=False)
 
+        fingerprint = _fingerprint_binary(binary)
+        with self._version_probe_lock:
+            cached = self._version_probe_cache.get(tool)
+        if fingerprint is not None and cached is not None and cached[0] == fingerprint:
+            return cached[1]
+
         try:
             result = self.concurrency_group.run_process_to_completion(
                 [binary, "--version"],
                 timeout=5.0,
             )
-            # WHY: real pi emits --version to stderr, not stdout; feed both channels.
-            version_text = f"{result.stdout}\n{result.stderr}" if tool == Dependency.PI else result.stdout
-            version = _parse_version_for_tool(tool, version_text)
-            return DependencyCheckResult(installed=True, path=binary, version=version)
         except ProcessError:
+            # Not cached: a failed probe is often transient (a timeout, a half-written upgrade).
             return DependencyCheckResult(installed=False, path=binary)
+        # WHY: real pi emits --version to stderr, not stdout; feed both channels.
+        version_text = f"{result.stdout}\n{result.stderr}" if tool == Dependency.PI else result.stdout
+        version = _parse_version_for_tool(tool, version_text)
+        check = DependencyCheckResult(installed=True, path=binary, version=version)
+        if fingerprint is not None:
+            with self._version_probe_lock:
+                self._version_probe_cache[tool] = (fingerprint, check)
+        return check
+
+    def invalidate_version_probes(self) -> None:
+        """Forget all cached ``--version`` probes so the next status check runs them again."""
+        with self._version_probe_lock:
+            self._version_probe_cache.clear()
 
     def _check_installed_concurrently(self, tools: Sequence[Dependency]) -> dict[Dependency, DependencyCheckResult]:
         """Probe several tools' installed version concurrently, returning the result per tool.
@@ -1140,13 +1194,15 @@ class DependencyManagementService(Service):
 
         gh_info = self._get_remote_cli_info(Dependency.GH)
 
-        return DependenciesStatus(
+        status = DependenciesStatus(
             git=git_info,
             claude=claude_info,
             pi=pi_info,
             gh=gh_info,
             voice_models=self._get_voice_models_installer().build_info(),
         )
+        self._last_status = status
+        return status
 
     def _get_remote_cli_info(self, tool: Dependency) -> DependencyInfo:
         """Build a DependencyInfo for the gh remote-host CLI.
@@ -1209,6 +1265,46 @@ class DependencyManagementService(Service):
         self._notify_observers(status)
         return status
 
+    def get_cached_status(self) -> DependenciesStatus:
+        """Get the most recently computed status without probing, and refresh it in the background.
+
+        For the initial dump of every new stream: reconnects are answered from
+        memory instead of waiting on the auth probes (and any ``--version`` probe
+        whose binary changed). The background refresh pushes the fresh status to
+        observers, which is how an already-connected stream learns about a change.
+        Computes the status synchronously if none was computed yet.
+        """
+        status = self._last_status
+        if status is None:
+            return self.get_status()
+        self._start_status_refresh()
+        return status
+
+    def _start_status_refresh(self) -> None:
+        if self._stop_requested.is_set():
+            return
+        with self._status_refresh_lock:
+            if self._is_status_refresh_running:
+                return
+            self._is_status_refresh_running = True
+        try:
+            self._start_unchecked_thread(self._run_status_refresh, "dependency-management-status-refresh")
+        except BaseException:
+            with self._status_refresh_lock:
+                self._is_status_refresh_running = False
+            raise
+
+    def _run_status_refresh(self) -> None:
+        try:
+            self.get_status()
+        except InvalidConcurrencyGroupStateError:
+            logger.debug("Skipping status refresh: concurrency group is exiting")
+        except Exception:
+            logger.opt(exception=True).warning("Background dependency status refresh failed")
+        finally:
+            with self._status_refresh_lock:
+                self._is_status_refresh_running = False
+
     def _get_managed_version(self, tool: Dependency = Dependency.CLAUDE) -> str | None:
         """Get the highest installed managed version for a tool (defaults to Claude)."""
         tool_dir = _get_tool_dir(tool)
@@ -1400,6 +1496,8 @@ class DependencyManagementService(Service):
             error = f"Installation failed: {e}"
             logger.opt(exception=True).warning("Background install failed")
         finally:
+            # The managed binary was replaced (or a failed attempt left things in flux).
+            self.invalidate_version_probes()
             with self._progress_lock:
                 self._installing[tool] = False
                 self._install_progress.pop(tool, None)
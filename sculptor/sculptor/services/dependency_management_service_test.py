@@ -1176,6 +1176,87 @@ class TestCheckInstalled:
 
         assert result.installed is False
 
+    @patch("sculptor.services.dependency_management_service.get_user_config_instance")
+    def test_version_probe_is_reused_until_the_binary_changes(self, mock_config: MagicMock, tmp_path: Path) -> None:
+        mock_config.return_value = _make_user_config()
+        binary = tmp_path / "git"
+        binary.write_text("#!/bin/sh\n")
+
+        mock_cg = MagicMock()
+        mock_cg.run_process_to_completion.return_value = FinishedProcess(
+            stdout="git version 2.44.0",
+            stderr="",
+            returncode=0,
+            command=("test",),
+            is_output_already_logged=False,
+        )
+
+        service = DependencyManagementService.model_construct(concurrency_group=mock_cg)
+        with patch("shutil.which", return_value=str(binary)):
+            first = service.check_installed(Dependency.GIT)
+            second = service.check_installed(Dependency.GIT)
+            assert mock_cg.run_process_to_completion.call_count == 1
+
+            binary.write_text("#!/bin/sh\n# upgraded\n")
+            third = service.check_installed(Dependency.GIT)
+            assert mock_cg.run_process_to_completion.call_count == 2
+
+            service.invalidate_version_probes()
+            service.check_installed(Dependency.GIT)
+            assert mock_cg.run_process_to_completion.call_count == 3
+
+        assert first == second == third
+        assert first.version == "2.44.0"
+
+    @patch("sculptor.services.dependency_management_service.get_user_config_instance")
+    def test_failed_version_probe_is_not_cached(self, mock_config: MagicMock, tmp_path: Path) -> None:
+        mock_config.return_value = _make_user_config()
+        binary = tmp_path / "git"
+        binary.write_text("#!/bin/sh\n")
+
+        mock_cg = MagicMock()
+        mock_cg.run_process_to_completion.side_effect = [
+            ProcessError(("test",), "", "", returncode=1),
+            FinishedProcess(
+                stdout="git version 2.44.0",
+                stderr="",
+                returncode=0,
+                command=("test",),
+                is_output_already_logged=False,
+            ),
+        ]
+
+        service = DependencyManagementService.model_construct(concurrency_group=mock_cg)
+        with patch("shutil.which", return_value=str(binary)):
+            assert service.check_installed(Dependency.GIT).installed is False
+            assert service.check_installed(Dependency.GIT).installed is True
+
+
+class TestGetCachedStatus:
+    def test_serves_the_last_status_and_refreshes_it_in_the_background(self) -> None:
+        statuses = [MagicMock(name="first"), MagicMock(name="second")]
+        refreshed = threading.Event()
+
+        def _get_status(service: DependencyManagementService) -> MagicMock:
+            status = statuses.pop(0)
+            service._last_status = status
+            if not statuses:
+                refreshed.set()
+            return status
+
+        with ConcurrencyGroup(name="test") as cg:
+            service = DependencyManagementService(concurrency_group=cg)
+            # Patch the class, not the instance — patch.object can't cleanly tear down a pydantic-model attr.
+            with patch.object(DependencyManagementService, "_get_status", autospec=True, side_effect=_get_status):
+                first = service.get_cached_status()
+                # Answered from memory while the fresh status is computed in the background.
+                assert service.get_cached_status() is first
+                assert refreshed.wait(timeout=5.0)
+                while service._is_status_refresh_running:
+                    time.sleep(0.01)
+
+                assert service.get_cached_status() is not first
+
 
 class TestInstallProgress:
     @patch("sculptor.services.managed_tools._current_claude_platform_key", return_value="darwin-arm64")
@@ -0,0 +1,484 @@
+"""Object lookups served by long-lived ``git cat-file --batch`` processes.
+
+Reading a file at a ref, checking that an object exists or resolving a ref to
+a hash each used to fork a ``git show`` / ``git ls-tree`` / ``git rev-parse``,
+and the fork+exec (plus git's own startup) dominates the cost of such small
+queries. ``GitObjectReader`` keeps a few ``git cat-file --batch`` and
+``--batch-check`` processes per repository and feeds them object names over
+stdin instead, so a lookup is a pipe round trip and a bulk read of N files is
+N pipelined requests to one process rather than N processes.
+
+A cat-file process resolves names like ``HEAD:path`` or ``refs/heads/main``
+afresh on every request, so it sees commits and ref updates made after it
+started. Processes are still recycled after ``_MAX_PROCESS_AGE_SECONDS`` to
+bound how long one holds on to pack files that ``git gc`` has replaced.
+
+The shared readers are owned by the workspace service: it starts them on its
+concurrency group (``start_git_object_readers``), which then tracks every
+cat-file process and runs the sweep that closes readers gone idle, and it stops
+them all on shutdown (``stop_git_object_readers``).
+"""
+
+import os
+import selectors
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from queue import Queue
+from typing import Any
+from typing import Final
+from typing import Mapping
+from typing import NamedTuple
+from typing import Sequence
+
+from loguru import logger
+
+from sculptor.foundation.concurrency_group import ConcurrencyGroup
+from sculptor.foundation.concurrency_group import InvalidConcurrencyGroupStateError
+from sculptor.foundation.processes.local_process import RunningProcess
+from sculptor.services.git_repo_service.git_errors import GitCommandFailure
+
+_BATCH: Final[str] = "--batch"
+_BATCH_CHECK: Final[str] = "--batch-check"
+
+_MAX_PROCESSES_PER_READER: Final[int] = 4
+_MAX_PROCESS_AGE_SECONDS: Final[float] = 600.0
+# Requests written to a process before reading their responses; small enough that the names never fill the
+# stdin pipe while cat-file is blocked writing responses we have not read yet.
+_MAX_PIPELINED_REQUESTS: Final[int] = 32
+_REQUEST_TIMEOUT_SECONDS: Final[float] = 30.0
+_READ_SIZE: Final[int] = 2**16
+
+_MAX_READERS: Final[int] = 32
+_IDLE_READER_TIMEOUT_SECONDS: Final[float] = 300.0
+# How often the sweep looks for readers that have gone unused for _IDLE_READER_TIMEOUT_SECONDS.
+_IDLE_SWEEP_INTERVAL_SECONDS: Final[float] = 60.0
+
+
+class GitObjectReadersNotRunningError(Exception):
+    """Raised when a shared reader is requested while no service has started the shared readers."""
+
+
+class GitObjectInfo(NamedTuple):
+    object_id: str
+    object_type: str
+    size: int
+
+
+class GitObject(NamedTuple):
+    object_id: str
+    object_type: str
+    content: bytes
+
+
+class _CatFileProcess(RunningProcess):
+    """One ``git cat-file`` process and the unread part of its output.
+
+    A ``RunningProcess`` so that the concurrency group it is started on tracks it; its pipes are driven directly
+    by ``request`` rather than by an output reader thread.
+    """
+
+    def __init__(self, repo_path: Path, batch_option: str, env: Mapping[str, str]) -> None:
+        self.batch_option = batch_option
+        self._repo_path = repo_path
+        self._env = env
+        self.started_at = time.monotonic()
+        self.request_count = 0
+        self._popen: subprocess.Popen[bytes] | None = None
+        self._buffer = bytearray()
+
+    @property
+    def is_checked(self) -> bool:
+        return False
+
+    @property
+    def returncode(self) -> int | None:
+        return self.poll()
+
+    @property
+    def command(self) -> tuple[str, ...]:
+        return ("git", "cat-file", self.batch_option)
+
+    def start(self, kwargs: Mapping[str, Any] | None = None) -> None:
+        self._popen = subprocess.Popen(
+            self.command,
+            cwd=self._repo_path,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env={**os.environ, **self._env},
+            bufsize=0,
+        )
+        assert self._popen.stdin is not None and self._popen.stdout is not None
+        self._stdin_fd = self._popen.stdin.fileno()
+        self._stdout_fd = self._popen.stdout.fileno()
+        # Writes wait in a selector too, so that a cat-file that stops reading its stdin cannot block them forever.
+        os.set_blocking(self._stdin_fd, False)
+        self._read_selector = selectors.DefaultSelector()
+        self._read_selector.register(self._stdout_fd, selectors.EVENT_READ)
+        self._write_selector = selectors.DefaultSelector()
+        self._write_selector.register(self._stdin_fd, selectors.EVENT_WRITE)
+
+    def request(self, object_names: Sequence[str]) -> list[tuple[GitObjectInfo | None, bytes | None]]:
+        """Look up `object_names` in order; the content is None for ``--batch-check`` and missing objects."""
+        deadline = time.monotonic() + _REQUEST_TIMEOUT_SECONDS
+        self.request_count += 1
+        self._write("".join(f"{name}\n" for name in object_names).encode(), deadline)
+        responses: list[tuple[GitObjectInfo | None, bytes | None]] = []
+        for _ in object_names:
+            info = _parse_header(self._read_line(deadline))
+            if info is None or self.batch_option == _BATCH_CHECK:
+                responses.append((info, None))
+                continue
+            # The content is followed by a newline.
+            content = self._read_exactly(info.size + 1, deadline)[:-1]
+            responses.append((info, content))
+        return responses
+
+    def close(self) -> None:
+        popen = self._popen
+        if popen is None or popen.stdin is None or popen.stdin.closed:
+            return
+        self._read_selector.close()
+        self._write_selector.close()
+        for pipe in (popen.stdin, popen.stdout):
+            if pipe is not None:
+                pipe.close()
+        # cat-file exits on stdin EOF; kill it if it is stuck mid-response.
+        try:
+            popen.wait(timeout=1.0)
+        except subprocess.TimeoutExpired:
+            popen.kill()
+            popen.wait()
+
+    def poll(self) -> int | None:
+        return self._popen.poll() if self._popen is not None else None
+
+    def is_finished(self) -> bool:
+        return self.poll() is not None
+
+    def wait(self, timeout: float | None = None) -> int:
+        if self._popen is None:
+            return 0
+        return self._popen.wait(timeout=timeout)
+
+    def terminate(self, force_kill_seconds: float = 5.0) -> None:
+        self.close()
+
+    def check(self) -> None:
+        pass
+
+    def read_stdout(self) -> str:
+        return ""
+
+    def read_stderr(self) -> str:
+        return ""
+
+    def get_timed_out(self) -> bool:
+        return False
+
+    def run(self, kwargs: Mapping[str, Any]) -> None:
+        pass
+
+    def get_queue(self) -> Queue[tuple[str, bool]]:
+        raise NotImplementedError("git cat-file processes do not support output queues")
+
+    def _write(self, data: bytes, deadline: float) -> None:
+        view = memoryview(data)
+        while view:
+            try:
+                written = os.write(self._stdin_fd, view)
+            except BlockingIOError:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._write_selector.select(remaining):
+                    raise TimeoutError(f"git cat-file {self.batch_option} did not read its input")
+                continue
+            view = view[written:]
+
+    def _fill(self, deadline: float) -> None:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not self._read_selector.select(remaining):
+            raise TimeoutError(f"git cat-file {self.batch_option} did not respond")
+        data = os.read(self._stdout_fd, _READ_SIZE)
+        if not data:
+            raise EOFError(f"git cat-file {self.batch_option} exited")
+        self._buffer.extend(data)
+
+    def _read_line(self, deadline: float) -> bytes:
+        end = self._buffer.find(b"\n")
+        while end == -1:
+            self._fill(deadline)
+            end = self._buffer.find(b"\n")
+        line = bytes(self._buffer[:end])
+        del self._buffer[: end + 1]
+        return line
+
+    def _read_exactly(self, size: int, deadline: float) -> bytes:
+        while len(self._buffer) < size:
+            self._fill(deadline)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+
+def _start(process: _CatFileProcess) -> _CatFileProcess:
+    process.start()
+    return process
+
+
+def _parse_header(line: bytes) -> GitObjectInfo | None:
+    # "<oid> <type> <size>" for a found object, "<name> missing" or "<name> ambiguous" otherwise.
+    parts = line.decode("utf-8", errors="replace").rsplit(" ", 2)
+    if len(parts) != 3 or not parts[2].isdigit():
+        return None
+    object_id, object_type, size = parts
+    return GitObjectInfo(object_id=object_id, object_type=object_type, size=int(size))
+
+
+class GitObjectReader:
+    """Resolves and reads objects of one repository through a small pool of ``git cat-file`` processes.
+
+    Object names are anything ``git rev-parse`` accepts, e.g. ``HEAD``, ``refs/heads/main``, ``<hash>^`` or
+    ``<ref>:<path>``. Lookups of objects that do not exist return None; a git process that cannot be started or
+    stops responding raises GitCommandFailure. Safe to use from several threads.
+    """
+
+    def __init__(
+        self, repo_path: Path, concurrency_group: ConcurrencyGroup, env: Mapping[str, str] | None = None
+    ) -> None:
+        self.repo_path = repo_path
+        self._concurrency_group = concurrency_group
+        self._env = dict(env or {})
+        self._condition = threading.Condition()
+        self._idle_processes: list[_CatFileProcess] = []
+        self._process_count = 0
+        self._in_use_count = 0
+        self._is_closed = False
+        self.last_used_at = time.monotonic()
+
+    def get_info(self, object_name: str) -> GitObjectInfo | None:
+        return self.get_infos([object_name])[0]
+
+    def get_infos(self, object_names: Sequence[str]) -> list[GitObjectInfo | None]:
+        return [info for info, _ in self._request(_BATCH_CHECK, object_names)]
+
+    def read(self, object_name: str) -> GitObject | None:
+        return self.read_many([object_name])[0]
+
+    def read_many(self, object_names: Sequence[str]) -> list[GitObject | None]:
+        """Read several objects with pipelined requests to a single process."""
+        return [
+            GitObject(object_id=info.object_id, object_type=info.object_type, content=content)
+            if info is not None and content is not None
+            else None
+            for info, content in self._request(_BATCH, object_names)
+        ]
+
+    def is_idle(self) -> bool:
+        with self._condition:
+            return self._in_use_count == 0
+
+    def close(self) -> None:
+        """Stop the idle processes now and the busy ones as soon as their current request finishes."""
+        with self._condition:
+            self._is_closed = True
+            idle_processes, self._idle_processes = self._idle_processes, []
+            self._process_count -= len(idle_processes)
+            self._condition.notify_all()
+        for process in idle_processes:
+            process.close()
+
+    def _request(
+        self, batch_option: str, object_names: Sequence[str]
+    ) -> list[tuple[GitObjectInfo | None, bytes | None]]:
+        for name in object_names:
+            if "\n" in name:
+                raise ValueError(f"Object names cannot contain newlines: {name!r}")
+        self.last_used_at = time.monotonic()
+        responses: list[tuple[GitObjectInfo | None, bytes | None]] = []
+        for start in range(0, len(object_names), _MAX_PIPELINED_REQUESTS):
+            responses.extend(self._request_batch(batch_option, object_names[start : start + _MAX_PIPELINED_REQUESTS]))
+        return responses
+
+    def _request_batch(
+        self, batch_option: str, object_names: Sequence[str]
+    ) -> list[tuple[GitObjectInfo | None, bytes | None]]:
+        while True:
+            process = self._acquire(batch_option)
+            try:
+                responses = process.request(object_names)
+            except (OSError, EOFError, TimeoutError) as e:
+                self._discard(process)
+                if process.request_count > 1:
+                    # A process that sat idle may have died (e.g. the repository moved); retry on a fresh one.
+                    logger.debug("Replacing broken git cat-file process for {}: {}", self.repo_path, e)
+                    continue
+                raise GitCommandFailure(
+                    f"git cat-file {batch_option} failed in {self.repo_path}: {e}",
+                    command=["git", "cat-file", batch_option],
+                    returncode=None,
+                    stdout="",
+                    stderr=str(e),
+                ) from e
+            self._release(process)
+            return responses
+
+    def _acquire(self, batch_option: str) -> _CatFileProcess:
+        with self._condition:
+            while True:
+                if self._is_closed:
+                    raise GitCommandFailure(
+                        f"Object reader for {self.repo_path} is closed",
+                        command=["git", "cat-file", batch_option],
+                        returncode=None,
+                        stdout="",
+                        stderr="",
+                    )
+                for index, process in enumerate(self._idle_processes):
+                    if process.batch_option == batch_option:
+                        self._in_use_count += 1
+                        return self._idle_processes.pop(index)
+                if self._process_count < _MAX_PROCESSES_PER_READER:
+                    self._process_count += 1
+                    self._in_use_count += 1
+                    break
+                if self._idle_processes:
+                    # At the limit, but an idle process of the other kind can make room.
+                    process_to_close = self._idle_processes.pop(0)
+                    self._process_count -= 1
+                    self._condition.release()
+                    try:
+                        process_to_close.close()
+                    finally:
+                        self._condition.acquire()
+                    continue
+                self._condition.wait()
+        process = _CatFileProcess(self.repo_path, batch_option, self._env)
+        try:
+            # Started by the group under its lock, so that it cannot start once the group is shutting down.
+            self._concurrency_group.start_background_process_from_factory(lambda: _start(process))
+            return process
+        except (OSError, ValueError, InvalidConcurrencyGroupStateError) as e:
+            with self._condition:
+                self._process_count -= 1
+                self._in_use_count -= 1
+                self._condition.notify()
+            raise GitCommandFailure(
+                f"Failed to start git cat-file {batch_option} in {self.repo_path}: {e}",
+                command=["git", "cat-file", batch_option],
+                returncode=None,
+                stdout="",
+                stderr=str(e),
+            ) from e
+
+    def _release(self, process: _CatFileProcess) -> None:
+        is_expired = time.monotonic() - process.started_at > _MAX_PROCESS_AGE_SECONDS
+        with self._condition:
+            self._in_use_count -= 1
+            if not self._is_closed and not is_expired:
+                self._idle_processes.append(process)
+                self._condition.notify()
+                return
+            self._process_count -= 1
+            self._condition.notify()
+        process.close()
+
+    def _discard(self, process: _CatFileProcess) -> None:
+        with self._condition:
+            self._in_use_count -= 1
+            self._process_count -= 1
+            self._condition.notify()
+        process.close()
+
+
+_readers: OrderedDict[tuple[Path, tuple[tuple[str, str], ...]], GitObjectReader] = OrderedDict()
+_readers_lock = threading.Lock()
+# The group the shared readers start their processes on, and the event that stops its idle sweep; set while running.
+_readers_concurrency_group: ConcurrencyGroup | None = None
+_sweep_stop_event: threading.Event | None = None
+
+
+def start_git_object_readers(concurrency_group: ConcurrencyGroup) -> None:
+    """Start the shared readers' processes and their idle sweep on ``concurrency_group``, unless already running."""
+    global _readers_concurrency_group, _sweep_stop_event
+    with _readers_lock:
+        if _readers_concurrency_group is not None:
+            return
+        stop_event = threading.Event()
+        concurrency_group.start_new_thread(
+            target=_sweep_idle_readers,
+            args=(stop_event,),
+            name="git-object-reader-sweep",
+            is_checked=False,
+        )
+        _readers_concurrency_group = concurrency_group
+        _sweep_stop_event = stop_event
+
+
+def stop_git_object_readers() -> None:
+    """Stop the idle sweep and every shared reader's git processes."""
+    global _readers_concurrency_group, _sweep_stop_event
+    with _readers_lock:
+        readers = list(_readers.values())
+        _readers.clear()
+        stop_event = _sweep_stop_event
+        _readers_concurrency_group = None
+        _sweep_stop_event = None
+    if stop_event is not None:
+        stop_event.set()
+    for reader in readers:
+        reader.close()
+
+
+def get_git_object_reader(repo_path: Path | str, env: Mapping[str, str] | None = None) -> GitObjectReader:
+    """Get the shared reader for `repo_path` (and `env`, e.g. GIT_ALTERNATE_OBJECT_DIRECTORIES).
+
+    Readers that fall off the end of the LRU list are closed here; readers that have gone unused for a while are
+    closed by the idle sweep.
+    """
+    key = (Path(repo_path), tuple(sorted((env or {}).items())))
+    readers_to_close: list[GitObjectReader] = []
+    with _readers_lock:
+        if _readers_concurrency_group is None:
+            raise GitObjectReadersNotRunningError("The shared git object readers have not been started")
+        reader = _readers.pop(key, None)
+        if reader is None:
+            reader = GitObjectReader(Path(repo_path), _readers_concurrency_group, env)
+        _readers[key] = reader
+        while len(_readers) > _MAX_READERS:
+            readers_to_close.append(_readers.popitem(last=False)[1])
+    for reader_to_close in readers_to_close:
+        reader_to_close.close()
+    return reader
+
+
+def close_git_object_readers_under(directory: Path) -> None:
+    """Stop the git processes of the shared readers of repositories in `directory`, e.g. before deleting it."""
+    with _readers_lock:
+        keys = [key for key in _readers if key[0].is_relative_to(directory)]
+        readers = [_readers.pop(key) for key in keys]
+    for reader in readers:
+        reader.close()
+
+
+def _close_idle_readers() -> None:
+    now = time.monotonic()
+    with _readers_lock:
+        idle_keys = [
+            key
+            for key, reader in _readers.items()
+            if now - reader.last_used_at > _IDLE_READER_TIMEOUT_SECONDS and reader.is_idle()
+        ]
+        readers = [_readers.pop(key) for key in idle_keys]
+    for reader in readers:
+        reader.close()
+
+
+def _sweep_idle_readers(stop_event: threading.Event) -> None:
+    while not stop_event.wait(_IDLE_SWEEP_INTERVAL_SECONDS):
+        try:
+            _close_idle_readers()
+        except Exception as e:
+            logger.warning("Failed to close idle git object readers: {}", e)
@@ -0,0 +1,185 @@
+import subprocess
+from pathlib import Path
+from unittest.mock import PropertyMock
+from unittest.mock import patch
+
+import pytest
+
+from sculptor.foundation.concurrency_group import ConcurrencyGroup
+from sculptor.services.git_repo_service import git_object_reader
+from sculptor.services.git_repo_service.git_errors import GitCommandFailure
+from sculptor.services.git_repo_service.git_object_reader import GitObjectReader
+from sculptor.services.git_repo_service.git_object_reader import GitObjectReadersNotRunningError
+from sculptor.services.git_repo_service.git_object_reader import _CatFileProcess
+from sculptor.services.git_repo_service.git_object_reader import close_git_object_readers_under
+from sculptor.services.git_repo_service.git_object_reader import get_git_object_reader
+from sculptor.services.git_repo_service.git_object_reader import start_git_object_readers
+from sculptor.services.git_repo_service.git_object_reader import stop_git_object_readers
+
+
+def _git(repo_path: Path, *args: str) -> str:
+    return subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        cwd=repo_path,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+
+
+def _commit_files(repo_path: Path, files: dict[str, bytes], message: str) -> str:
+    for name, content in files.items():
+        (repo_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (repo_path / name).write_bytes(content)
+    _git(repo_path, "add", *files)
+    _git(repo_path, "commit", "-q", "-m", message)
+    return _git(repo_path, "rev-parse", "HEAD")
+
+
+@pytest.fixture
+def repo_path(tmp_path: Path) -> Path:
+    _git(tmp_path, "init", "-q", "-b", "main")
+    return tmp_path
+
+
+def test_reads_files_and_resolves_refs_including_later_commits(
+    repo_path: Path, test_root_concurrency_group: ConcurrencyGroup
+) -> None:
+    first_commit = _commit_files(repo_path, {"a.txt": b"one\n", "bin/data": b"\x00\x01\xff"}, "first")
+    reader = GitObjectReader(repo_path, test_root_concurrency_group)
+    try:
+        git_object = reader.read("HEAD:a.txt")
+        assert git_object is not None
+        assert (git_object.object_type, git_object.content) == ("blob", b"one\n")
+        binary = reader.read("HEAD:bin/data")
+        assert binary is not None and binary.content == b"\x00\x01\xff"
+        assert reader.read("HEAD:missing.txt") is None
+        assert reader.get_info("HEAD:bin").object_type == "tree"
+
+        second_commit = _commit_files(repo_path, {"a.txt": b"two\n"}, "second")
+
+        assert reader.read("HEAD:a.txt").content == b"two\n"
+        assert reader.read(f"{first_commit}:a.txt").content == b"one\n"
+        head, parent, branch = reader.get_infos(["HEAD", "HEAD^", "refs/heads/main"])
+        assert (head.object_id, head.object_type) == (second_commit, "commit")
+        assert parent.object_id == first_commit
+        assert branch.object_id == second_commit
+        assert reader.get_info("refs/heads/does-not-exist") is None
+    finally:
+        reader.close()
+
+
+def test_bulk_reads_are_served_by_one_process(repo_path: Path, test_root_concurrency_group: ConcurrencyGroup) -> None:
+    files = {f"dir/file_{index}.txt": f"content {index}\n".encode() for index in range(100)}
+    _commit_files(repo_path, files, "many files")
+    reader = GitObjectReader(repo_path, test_root_concurrency_group)
+    try:
+        git_objects = reader.read_many([f"HEAD:{name}" for name in files] + ["HEAD:nope"])
+
+        assert [git_object.content for git_object in git_objects[:-1]] == list(files.values())
+        assert git_objects[-1] is None
+        assert reader._process_count == 1
+    finally:
+        reader.close()
+
+
+def test_a_dead_process_is_replaced(repo_path: Path, test_root_concurrency_group: ConcurrencyGroup) -> None:
+    _commit_files(repo_path, {"a.txt": b"one\n"}, "first")
+    reader = GitObjectReader(repo_path, test_root_concurrency_group)
+    try:
+        assert reader.read("HEAD:a.txt") is not None
+        [process] = reader._idle_processes
+        process._popen.kill()
+        process._popen.wait()
+
+        assert reader.read("HEAD:a.txt").content == b"one\n"
+    finally:
+        reader.close()
+
+
+def test_lookups_outside_a_repository_fail(tmp_path: Path, test_root_concurrency_group: ConcurrencyGroup) -> None:
+    reader = GitObjectReader(tmp_path, test_root_concurrency_group)
+
+    with pytest.raises(GitCommandFailure):
+        reader.get_info("HEAD")
+    with pytest.raises(ValueError):
+        reader.read("HEAD:a\nb")
+
+
+@pytest.mark.usefixtures("running_git_object_readers")
+def test_shared_readers_are_keyed_by_path_and_environment(repo_path: Path) -> None:
+    reader = get_git_object_reader(repo_path)
+
+    assert get_git_object_reader(repo_path) is reader
+    assert get_git_object_reader(str(repo_path)) is reader
+    assert get_git_object_reader(repo_path, {"GIT_ALTERNATE_OBJECT_DIRECTORIES": "/tmp"}) is not reader
+
+
+@pytest.mark.usefixtures("running_git_object_readers")
+def test_readers_under_a_directory_are_closed_together(
+    repo_path: Path, tmp_path_factory: pytest.TempPathFactory
+) -> None:
+    nested_reader = get_git_object_reader(repo_path / "nested")
+    other_path = tmp_path_factory.mktemp("elsewhere")
+    other_reader = get_git_object_reader(other_path)
+
+    close_git_object_readers_under(repo_path)
+
+    with pytest.raises(GitCommandFailure):
+        nested_reader.get_info("HEAD")
+    assert get_git_object_reader(repo_path / "nested") is not nested_reader
+    assert get_git_object_reader(other_path) is other_reader
+
+
+def test_processes_are_started_on_the_concurrency_group(
+    repo_path: Path, test_root_concurrency_group: ConcurrencyGroup
+) -> None:
+    _commit_files(repo_path, {"a.txt": b"one\n"}, "first")
+    with test_root_concurrency_group.make_concurrency_group("git_object_reader_test") as concurrency_group:
+        reader = GitObjectReader(repo_path, concurrency_group)
+        assert reader.read("HEAD:a.txt") is not None
+        [process] = reader._idle_processes
+        assert process in concurrency_group._processes
+        reader.close()
+        assert process.is_finished()
+
+    with pytest.raises(GitCommandFailure):
+        reader = GitObjectReader(repo_path, concurrency_group)
+        reader.get_info("HEAD")
+
+
+def test_a_process_that_stops_reading_its_input_times_out(repo_path: Path) -> None:
+    with patch.object(_CatFileProcess, "command", new_callable=PropertyMock, return_value=("sleep", "30")):
+        process = _CatFileProcess(repo_path, "--batch-check", {})
+        process.start()
+    try:
+        with patch.object(git_object_reader, "_REQUEST_TIMEOUT_SECONDS", 0.2):
+            # More than a pipe buffer's worth of names, which a process that does not read them cannot all take.
+            with pytest.raises(TimeoutError, match="did not read its input"):
+                process.request(["x" * 4096] * 32)
+    finally:
+        process._popen.kill()
+        process.close()
+
+
+def test_the_sweep_closes_readers_that_went_idle(
+    repo_path: Path, test_root_concurrency_group: ConcurrencyGroup
+) -> None:
+    _commit_files(repo_path, {"a.txt": b"one\n"}, "first")
+    with pytest.raises(GitObjectReadersNotRunningError):
+        get_git_object_reader(repo_path)
+
+    start_git_object_readers(test_root_concurrency_group)
+    try:
+        reader = get_git_object_reader(repo_path)
+        assert reader.get_info("HEAD") is not None
+
+        git_object_reader._close_idle_readers()
+        assert get_git_object_reader(repo_path) is reader
+
+        with patch.object(git_object_reader, "_IDLE_READER_TIMEOUT_SECONDS", 0.0):
+            git_object_reader._close_idle_readers()
+        assert reader._process_count == 0
+        assert get_git_object_reader(repo_path) is not reader
+    finally:
+        stop_git_object_readers()
@@ -40,44 +40,6 @@ def stat_signature(path: Path) -> StatSignature | None:
     return (stat_result.st_mtime_ns, stat_result.st_size)
 
 
-def resolve_git_dirs(working_dir: Path) -> tuple[Path, Path] | None:
-    """Resolve a working dir to its ``(git_dir, common_dir)`` by reading files, not forking git.
-
-    For a normal checkout both are ``<working_dir>/.git``. For a linked worktree,
-    ``.git`` is a file pointing at ``<common>/.git/worktrees/<name>`` (the git_dir,
-    which owns this worktree's ``HEAD``); the common dir — which owns ``refs/remotes``
-    and ``packed-refs``, shared across all worktrees of the repo — is read from the
-    git_dir's ``commondir`` file.
-
-    Returns None if ``working_dir`` is not (or no longer) a git checkout, so a
-    caller can skip a vanished directory without ever forking git.
-    """
-    dot_git = working_dir / ".git"
-    if dot_git.is_dir():
-        return dot_git, dot_git
-    if not dot_git.is_file():
-        return None
-    try:
-        text = dot_git.read_text().strip()
-    except OSError:
-        return None
-    if not text.startswith("gitdir:"):
-        return None
-    git_dir = Path(text[len("gitdir:") :].strip())
-    if not git_dir.is_absolute():
-        git_dir = (working_dir / git_dir).resolve()
-    commondir_file = git_dir / "commondir"
-    common_dir = git_dir
-    try:
-        if commondir_file.is_file():
-            relative_or_absolute = commondir_file.read_text().strip()
-            candidate = Path(relative_or_absolute)
-            common_dir = candidate if candidate.is_absolute() else (git_dir / candidate).resolve()
-    except OSError:
-        common_dir = git_dir
-    return git_dir, common_dir
-
-
 def remote_refs_signature(common_dir: Path) -> RemoteRefsSignature:
     """Change-signature for a repo's remote-tracking refs (see ``RemoteRefsSignature``)."""
     packed = stat_signature(common_dir / "packed-refs")
@@ -0,0 +1,283 @@
+"""Push-based detection of git ref changes, via Linux inotify.
+
+The companion of ``git_ref_scanning``: where a stat-first scan has to look at
+every ref file of every repo to find out that nothing moved, an inotify watch
+on the few directories that hold refs reports a move the moment git renames a
+``*.lock`` file into place, and costs nothing while nothing moves.
+
+``GitRefWatcher`` watches two kinds of directory:
+
+- a **git dir**, for its ``HEAD`` (the current branch of one checkout), and
+- a **common git dir**, for ``packed-refs`` and, recursively, ``refs/remotes``
+  and ``refs/heads`` (the repo's remote-tracking and local branches).
+
+It reports which of those changed, not what they changed to: callers re-read
+the refs with the same primitives a scan uses. inotify is Linux-only and
+watches are a limited resource (``fs.inotify.max_user_watches``), so
+``GitRefWatcher.build()`` returns None elsewhere and the ``watch_*`` methods
+return False when a directory cannot be watched; callers keep stat-polling
+those. A common dir stops being watched (see ``is_watching_common_dir``) when a
+ref directory created under it later cannot be watched either.
+"""
+
+import ctypes
+import ctypes.util
+import dataclasses
+import errno
+import os
+import selectors
+import struct
+import sys
+import threading
+from pathlib import Path
+from typing import Callable
+from typing import Final
+
+from loguru import logger
+
+_IN_MODIFY: Final[int] = 0x00000002
+_IN_CLOSE_WRITE: Final[int] = 0x00000008
+_IN_MOVED_FROM: Final[int] = 0x00000040
+_IN_MOVED_TO: Final[int] = 0x00000080
+_IN_CREATE: Final[int] = 0x00000100
+_IN_DELETE: Final[int] = 0x00000200
+_IN_DELETE_SELF: Final[int] = 0x00000400
+_IN_MOVE_SELF: Final[int] = 0x00000800
+_IN_Q_OVERFLOW: Final[int] = 0x00004000
+_IN_IGNORED: Final[int] = 0x00008000
+_IN_ONLYDIR: Final[int] = 0x01000000
+_IN_ISDIR: Final[int] = 0x40000000
+_IN_NONBLOCK: Final[int] = os.O_NONBLOCK
+_IN_CLOEXEC: Final[int] = os.O_CLOEXEC
+
+# git updates a ref by writing `<ref>.lock` and renaming it over `<ref>`; a few tools write refs in place.
+_WATCH_MASK: Final[int] = (
+    _IN_CLOSE_WRITE
+    | _IN_MODIFY
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+    | _IN_MOVE_SELF
+    | _IN_ONLYDIR
+)
+_EVENT_HEADER: Final[struct.Struct] = struct.Struct("iIII")
+_READ_SIZE: Final[int] = 2**16
+
+# The watch limit is per user, so once one watcher hits it, the others will too: report it once per process.
+_is_out_of_watches_reported = threading.Event()
+
+
+@dataclasses.dataclass
+class GitRefChanges:
+    """What moved since the last read; `is_overflowed` means events were lost and everything may have."""
+
+    head_git_dirs: set[Path] = dataclasses.field(default_factory=set)
+    remote_ref_common_dirs: set[Path] = dataclasses.field(default_factory=set)
+    local_ref_common_dirs: set[Path] = dataclasses.field(default_factory=set)
+    is_overflowed: bool = False
+
+    def __bool__(self) -> bool:
+        return bool(self.head_git_dirs or self.remote_ref_common_dirs or self.local_ref_common_dirs) or (
+            self.is_overflowed
+        )
+
+
+@dataclasses.dataclass(frozen=True)
+class _WatchRole:
+    # "head" (a git dir's HEAD), "packed" (a common dir's packed-refs), "refs" (the refs dir of a common dir),
+    # or "remote" / "local" (a directory under refs/remotes or refs/heads).
+    kind: str
+    root: Path
+
+
+class GitRefWatcher:
+    """Watches git dirs and common git dirs for ref changes. Not thread-safe, except for `wake`."""
+
+    def __init__(self, inotify_fd: int, libc: ctypes.CDLL) -> None:
+        self._fd = inotify_fd
+        self._libc = libc
+        self._roles_by_wd: dict[int, set[_WatchRole]] = {}
+        self._path_by_wd: dict[int, Path] = {}
+        # The watch on the git dir (for "head") or common dir (for "packed") itself, per watched root.
+        self._root_wd_by_role: dict[_WatchRole, int] = {}
+        self._wakeup_read_fd, self._wakeup_write_fd = os.pipe()
+        os.set_blocking(self._wakeup_read_fd, False)
+        os.set_blocking(self._wakeup_write_fd, False)
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._fd, selectors.EVENT_READ)
+        self._selector.register(self._wakeup_read_fd, selectors.EVENT_READ)
+
+    @classmethod
+    def build(cls) -> "GitRefWatcher | None":
+        """A watcher, or None where inotify is unavailable."""
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            inotify_fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        except (OSError, AttributeError) as e:
+            logger.info("inotify is unavailable, git refs will be polled: {}", e)
+            return None
+        if inotify_fd < 0:
+            logger.info("inotify_init1 failed, git refs will be polled: {}", os.strerror(ctypes.get_errno()))
+            return None
+        return cls(inotify_fd, libc)
+
+    def watch_git_dir(self, git_dir: Path) -> bool:
+        """Report changes to `git_dir`'s HEAD; False if it cannot be watched."""
+        return self._add_root_watch(git_dir, _WatchRole("head", git_dir))
+
+    def watch_common_dir(self, common_dir: Path) -> bool:
+        """Report changes to the repo's local and remote-tracking branches; False if they cannot all be watched."""
+        refs_dir = common_dir / "refs"
+        is_watched = self._add_root_watch(common_dir, _WatchRole("packed", common_dir))
+        is_watched = is_watched and self._add_watch(refs_dir, _WatchRole("refs", common_dir)) is not None
+        for subdirectory, kind in (("remotes", "remote"), ("heads", "local")):
+            if is_watched and (refs_dir / subdirectory).is_dir():
+                is_watched = self._add_tree_watches(refs_dir / subdirectory, _WatchRole(kind, common_dir))
+        if not is_watched:
+            self._remove_roles(lambda role: role.root == common_dir and role.kind != "head")
+        return is_watched
+
+    def is_watching_git_dir(self, git_dir: Path) -> bool:
+        """Whether `git_dir` is (still) watched; the kernel drops the watch when the directory goes away."""
+        return _WatchRole("head", git_dir) in self._root_wd_by_role
+
+    def is_watching_common_dir(self, common_dir: Path) -> bool:
+        return _WatchRole("packed", common_dir) in self._root_wd_by_role
+
+    def unwatch(self, root: Path) -> None:
+        """Stop reporting changes for a git dir or common dir passed to one of the `watch_*` methods."""
+        self._remove_roles(lambda role: role.root == root)
+
+    def wait_for_changes(self, timeout: float | None) -> GitRefChanges:
+        """Block until refs change, `wake` is called, or `timeout` passes; then read what changed."""
+        for key, _ in self._selector.select(timeout):
+            if key.fd == self._wakeup_read_fd:
+                try:
+                    while os.read(self._wakeup_read_fd, 4096):
+                        pass
+                except BlockingIOError:
+                    pass
+        return self.read_changes()
+
+    def read_changes(self) -> GitRefChanges:
+        """Read the changes reported since the last call, without blocking."""
+        changes = GitRefChanges()
+        while True:
+            try:
+                data = os.read(self._fd, _READ_SIZE)
+            except BlockingIOError:
+                return changes
+            offset = 0
+            while offset < len(data):
+                wd, mask, _cookie, name_length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset : offset + name_length].rstrip(b"\0").decode("utf-8", errors="surrogateescape")
+                offset += name_length
+                self._handle_event(wd, mask, name, changes)
+
+    def wake(self) -> None:
+        """Make a blocked `wait_for_changes` return; safe to call from any thread."""
+        try:
+            os.write(self._wakeup_write_fd, b"\0")
+        except BlockingIOError:
+            pass
+
+    def close(self) -> None:
+        self._selector.close()
+        for fd in (self._fd, self._wakeup_read_fd, self._wakeup_write_fd):
+            os.close(fd)
+
+    def _handle_event(self, wd: int, mask: int, name: str, changes: GitRefChanges) -> None:
+        if mask & _IN_Q_OVERFLOW:
+            changes.is_overflowed = True
+            return
+        roles = self._roles_by_wd.get(wd, set())
+        if mask & _IN_IGNORED:
+            # The directory was deleted or moved away and the kernel dropped the watch.
+            self._forget_watch(wd)
+        for role in roles:
+            if role.kind == "head":
+                if name == "HEAD":
+                    changes.head_git_dirs.add(role.root)
+            elif role.kind == "packed":
+                if name == "packed-refs":
+                    changes.remote_ref_common_dirs.add(role.root)
+                    changes.local_ref_common_dirs.add(role.root)
+            elif role.kind == "refs":
+                kind = {"remotes": "remote", "heads": "local"}.get(name)
+                if kind is not None and mask & _IN_ISDIR:
+                    self._on_ref_change(_WatchRole(kind, role.root), changes)
+                    if mask & (_IN_CREATE | _IN_MOVED_TO):
+                        self._watch_new_tree(role.root / "refs" / name, _WatchRole(kind, role.root))
+            elif not name.endswith(".lock") or mask & _IN_DELETE_SELF:
+                self._on_ref_change(role, changes)
+                if mask & _IN_ISDIR and mask & (_IN_CREATE | _IN_MOVED_TO) and wd in self._path_by_wd:
+                    self._watch_new_tree(self._path_by_wd[wd] / name, role)
+
+    @staticmethod
+    def _on_ref_change(role: _WatchRole, changes: GitRefChanges) -> None:
+        if role.kind == "remote":
+            changes.remote_ref_common_dirs.add(role.root)
+        else:
+            changes.local_ref_common_dirs.add(role.root)
+
+    def _watch_new_tree(self, directory: Path, role: _WatchRole) -> None:
+        # Refs created in a directory that is not watched would go unreported, so if any part of the tree cannot
+        # be watched, stop watching the common dir altogether: callers then see that it is not watched and poll it.
+        if not self._add_tree_watches(directory, role):
+            self._remove_roles(lambda other: other.root == role.root and other.kind != "head")
+
+    def _add_tree_watches(self, directory: Path, role: _WatchRole) -> bool:
+        try:
+            for dirpath, _dirnames, _filenames in os.walk(directory):
+                if self._add_watch(Path(dirpath), role) is None:
+                    return False
+        except OSError:
+            return False
+        return True
+
+    def _add_root_watch(self, path: Path, role: _WatchRole) -> bool:
+        wd = self._add_watch(path, role)
+        if wd is None:
+            return False
+        self._root_wd_by_role[role] = wd
+        return True
+
+    def _add_watch(self, path: Path, role: _WatchRole) -> int | None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            error_number = ctypes.get_errno()
+            if error_number == errno.ENOSPC and not _is_out_of_watches_reported.is_set():
+                # Callers retry every scan, and polling still picks up the changes, so only say this once.
+                _is_out_of_watches_reported.set()
+                logger.info("Out of inotify watches (fs.inotify.max_user_watches); polling {}", path)
+            elif error_number not in (errno.ENOENT, errno.ENOSPC):
+                logger.debug("Cannot watch {}: {}", path, os.strerror(error_number))
+            return None
+        # Watching the same directory again (e.g. a checkout's .git as both git dir and common dir) returns the
+        # same watch descriptor, which then serves both roles.
+        self._roles_by_wd.setdefault(wd, set()).add(role)
+        self._path_by_wd[wd] = path
+        return wd
+
+    def _remove_roles(self, predicate: Callable[[_WatchRole], bool]) -> None:
+        for wd, roles in list(self._roles_by_wd.items()):
+            remaining = {role for role in roles if not predicate(role)}
+            if remaining:
+                self._roles_by_wd[wd] = remaining
+            else:
+                self._forget_watch(wd)
+                # Fails harmlessly if the kernel already dropped the watch.
+                self._libc.inotify_rm_watch(self._fd, wd)
+        for role in [role for role in self._root_wd_by_role if predicate(role)]:
+            del self._root_wd_by_role[role]
+
+    def _forget_watch(self, wd: int) -> None:
+        self._roles_by_wd.pop(wd, None)
+        self._path_by_wd.pop(wd, None)
+        for role in [role for role, root_wd in self._root_wd_by_role.items() if root_wd == wd]:
+            del self._root_wd_by_role[role]
@@ -0,0 +1,101 @@
+import subprocess
+import time
+from pathlib import Path
+from typing import Generator
+from unittest.mock import patch
+
+import pytest
+
+from sculptor.services.git_repo_service.git_ref_watching import GitRefWatcher
+
+
+def _git(repo_path: Path, *args: str) -> None:
+    subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        cwd=repo_path,
+        check=True,
+        capture_output=True,
+    )
+
+
+@pytest.fixture
+def repo_path(tmp_path: Path) -> Path:
+    _git(tmp_path, "init", "-q", "-b", "main")
+    _git(tmp_path, "commit", "-q", "--allow-empty", "-m", "init")
+    return tmp_path
+
+
+@pytest.fixture
+def watcher() -> Generator[GitRefWatcher, None, None]:
+    ref_watcher = GitRefWatcher.build()
+    if ref_watcher is None:
+        pytest.skip("inotify is unavailable")
+    yield ref_watcher
+    ref_watcher.close()
+
+
+def test_reports_head_and_ref_changes(repo_path: Path, watcher: GitRefWatcher) -> None:
+    git_dir = repo_path / ".git"
+    assert watcher.watch_git_dir(git_dir)
+    assert watcher.watch_common_dir(git_dir)
+
+    _git(repo_path, "checkout", "-q", "-b", "feature")
+    changes = watcher.wait_for_changes(timeout=5.0)
+    assert changes.head_git_dirs == {git_dir}
+    assert changes.local_ref_common_dirs == {git_dir}
+    assert not changes.remote_ref_common_dirs
+
+    # refs/remotes does not exist yet: its creation, and that of refs/remotes/origin, are followed.
+    _git(repo_path, "update-ref", "refs/remotes/origin/main", "HEAD")
+    assert watcher.wait_for_changes(timeout=5.0).remote_ref_common_dirs == {git_dir}
+    _git(repo_path, "update-ref", "refs/remotes/origin/next", "HEAD")
+    assert watcher.wait_for_changes(timeout=5.0).remote_ref_common_dirs == {git_dir}
+
+    _git(repo_path, "pack-refs", "--all")
+    changes = watcher.wait_for_changes(timeout=5.0)
+    assert changes.remote_ref_common_dirs == {git_dir}
+    assert not changes.head_git_dirs
+
+
+def test_unwatched_and_unchanged_repos_report_nothing(repo_path: Path, watcher: GitRefWatcher) -> None:
+    git_dir = repo_path / ".git"
+    assert watcher.watch_git_dir(git_dir)
+    assert watcher.watch_common_dir(git_dir)
+
+    # Reading, and writing files that are not refs, is not a change.
+    _git(repo_path, "log", "--oneline")
+    (repo_path / "file.txt").write_text("content")
+    _git(repo_path, "add", "file.txt")
+    assert not watcher.wait_for_changes(timeout=0.2)
+
+    watcher.unwatch(git_dir)
+    _git(repo_path, "checkout", "-q", "-b", "feature")
+    assert not watcher.is_watching_git_dir(git_dir)
+    assert not watcher.wait_for_changes(timeout=0.2)
+
+
+def test_wake_interrupts_a_wait(watcher: GitRefWatcher) -> None:
+    watcher.wake()
+    started_at = time.monotonic()
+
+    assert not watcher.wait_for_changes(timeout=5.0)
+    assert time.monotonic() - started_at < 1.0
+
+
+def test_a_new_ref_directory_that_cannot_be_watched_stops_the_common_dir_watch(
+    repo_path: Path, watcher: GitRefWatcher
+) -> None:
+    git_dir = repo_path / ".git"
+    assert watcher.watch_git_dir(git_dir)
+    assert watcher.watch_common_dir(git_dir)
+
+    # E.g. out of inotify watches: refs/remotes and the refs created in it would go unreported.
+    with patch.object(watcher, "_add_watch", return_value=None):
+        _git(repo_path, "update-ref", "refs/remotes/origin/main", "HEAD")
+        changes = watcher.wait_for_changes(timeout=5.0)
+
+    assert changes.remote_ref_common_dirs == {git_dir}
+    assert not watcher.is_watching_common_dir(git_dir)
+    assert watcher.is_watching_git_dir(git_dir)
+    _git(repo_path, "update-ref", "refs/heads/other", "HEAD")
+    assert not watcher.wait_for_changes(timeout=0.2)
@@ -4,10 +4,14 @@ from collections.abc import Sequence
 from contextlib import contextmanager
 from pathlib import Path
 from queue import Queue
+from typing import Any
+from typing import Callable
 from typing import Generator
+from typing import TYPE_CHECKING
 
 from pydantic import AnyUrl
 
+from sculptor.database.models import SavedAgentMessage
 from sculptor.database.models import Task
 from sculptor.database.models import TaskID
 from sculptor.foundation.pydantic_serialization import FrozenModel
@@ -15,6 +19,7 @@ from sculptor.interfaces.agents.agent import MessageTypes
 from sculptor.interfaces.agents.agent import PersistentMessageTypes
 from sculptor.interfaces.agents.agent import ResumeAgentResponseRunnerMessage
 from sculptor.interfaces.agents.agent import UserMessageUnion
+from sculptor.interfaces.agents.harness import Harness
 from sculptor.interfaces.environments.base import Environment
 from sculptor.primitives.ids import ProjectID
 from sculptor.primitives.ids import UserReference
@@ -24,12 +29,31 @@ from sculptor.services.data_model_service.data_types import DataModelTransaction
 from sculptor.state.messages import Message
 from sculptor.state.messages import ModelOption
 
+if TYPE_CHECKING:
+    # Imported only for type-checking: web.data_types imports this module, so a
+    # runtime import here would cycle.
+    from sculptor.web.derived import TaskUpdate
+
+
+# An entry of `TaskService.write_messages`: a message to persist and publish, or a
+# post-commit callback to run at that position.
+MessageWriteEntry = MessageTypes | Callable[[], Any]
+
 
 class TaskMessageContainer(FrozenModel):
     tasks: tuple[Task, ...]
     messages: tuple[tuple[Message, TaskID], ...]
 
 
+class TaskUpdateCursor(FrozenModel):
+    """How much of a task's shared folded state one stream subscriber has already received."""
+
+    # Number of messages folded into the state the subscriber last read.
+    version: int = 0
+    # Number of completed chat messages the subscriber has already been sent.
+    chat_message_count: int = 0
+
+
 class TaskService(Service, ABC):
     """
     Allows creation, observation, cancellation, and interaction with tasks.
@@ -51,6 +75,16 @@ class TaskService(Service, ABC):
     @abstractmethod
     def create_message(self, message: MessageTypes, task_id: TaskID, transaction: DataModelTransaction) -> None: ...
 
+    @abstractmethod
+    def write_messages(self, task_id: TaskID, entries: Sequence[MessageWriteEntry]) -> None:
+        """Persist and publish a batch of a task's messages through the shared group-commit writer.
+
+        Behaves like `create_message` for every message in one transaction, with each
+        callable entry registered as a post-commit callback at its position, except
+        that the transaction is shared with concurrent writes of other tasks.
+        Returns once the entries are committed and their callbacks have run.
+        """
+
     @abstractmethod
     def get_task(self, task_id: TaskID, transaction: DataModelTransaction) -> Task | None: ...
 
@@ -112,11 +146,34 @@ class TaskService(Service, ABC):
         self, task_id: TaskID, transaction: DataModelTransaction
     ) -> tuple[PersistentMessageTypes, ...]: ...
 
+    @abstractmethod
+    def get_saved_message_page(
+        self, task_id: TaskID, transaction: DataModelTransaction, after_seq: int | None = None, limit: int = 500
+    ) -> tuple[SavedAgentMessage, ...]:
+        """Up to `limit` of the task's persisted messages with `seq` > `after_seq`, in log order.
+
+        Read the whole log page by page by passing the last returned message's
+        `seq` back in as `after_seq` until a short page comes back."""
+
     @abstractmethod
     def get_live_messages_for_task(self, task_id: TaskID) -> tuple[Message, ...]:
         """Snapshot of the task's in-memory messages, INCLUDING ephemeral
         run-scoped ones (e.g. terminal-agent signals) that
-        get_saved_messages_for_task never sees."""
+        get_saved_messages_for_task never sees.
+
+        Bounded: older high-volume content messages (response blocks and
+        streaming partials) are dropped from memory once they leave the recent
+        tail; read those back with get_saved_message_page."""
+
+    @abstractmethod
+    def read_task_update(
+        self, task_id: TaskID, harness: Harness, cursor: TaskUpdateCursor
+    ) -> tuple["TaskUpdate | None", TaskUpdateCursor]:
+        """Read the task's shared folded TaskUpdate as a delta against `cursor`.
+
+        The fold runs once per message no matter how many streams are attached;
+        each stream keeps its own cursor. Returns the advanced cursor alongside
+        the update, or (None, cursor) while the task has no folded messages."""
 
     @abstractmethod
     @contextmanager
@@ -17,7 +17,9 @@ from loguru import logger
 from pydantic import AnyUrl
 from pydantic import PrivateAttr
 
+from sculptor.agents.harness_registry import get_harness_for_config
 from sculptor.config.settings import SculptorSettings
+from sculptor.database.models import AgentTaskInputsV2
 from sculptor.database.models import AgentTaskStateV2
 from sculptor.database.models import SavedAgentMessage
 from sculptor.database.models import Task
@@ -45,6 +47,7 @@ from sculptor.interfaces.agents.agent import UpdatedArtifactAgentMessage
 from sculptor.interfaces.agents.agent import UserMessageUnion
 from sculptor.interfaces.agents.artifacts import ArtifactType
 from sculptor.interfaces.agents.artifacts import FileAgentArtifact
+from sculptor.interfaces.agents.harness import Harness
 from sculptor.interfaces.agents.tasks import TaskState
 from sculptor.interfaces.environments.base import Environment
 from sculptor.primitives.constants import MESSAGE_LOG_TYPE
@@ -60,14 +63,24 @@ from sculptor.services.data_model_service.sql_implementation import SQLTransacti
 from sculptor.services.dependency_management_service import DependencyManagementService
 from sculptor.services.git_repo_service.api import GitRepoService
 from sculptor.services.project_service.api import ProjectService
+from sculptor.services.task_service.api import MessageWriteEntry
 from sculptor.services.task_service.api import TaskMessageContainer
 from sculptor.services.task_service.api import TaskService
+from sculptor.services.task_service.api import TaskUpdateCursor
 from sculptor.services.task_service.data_types import ServiceCollectionForTask
 from sculptor.services.task_service.errors import InvalidTaskOperation
 from sculptor.services.task_service.errors import TaskError
 from sculptor.services.task_service.errors import TaskNotFound
 from sculptor.services.task_service.errors import UserPausedTaskError
 from sculptor.services.task_service.errors import UserStoppedTaskError
+from sculptor.services.task_service.group_commit_writer import GroupCommitWriter
+from sculptor.services.task_service.message_history import DROPPABLE_OUTSIDE_TAIL_MESSAGE_TYPE_NAMES
+from sculptor.services.task_service.message_history import MESSAGE_HISTORY_KEPT_SIZE
+from sculptor.services.task_service.message_history import MESSAGE_HISTORY_TAIL_SIZE
+from sculptor.services.task_service.message_history import TaskMessageHistory
+from sculptor.services.task_service.task_update_checkpoints import TaskUpdateCheckpoint
+from sculptor.services.task_service.task_update_checkpoints import TaskUpdateCheckpointStore
+from sculptor.services.task_service.task_update_materializer import TaskUpdateMaterializer
 from sculptor.services.workspace_service.api import WorkspaceService
 from sculptor.state.messages import AgentMessageSource
 from sculptor.state.messages import Message
@@ -76,9 +89,23 @@ from sculptor.state.messages import PersistentMessage
 from sculptor.tasks.api import run_task
 from sculptor.utils.errors import is_irrecoverable_exception
 from sculptor.utils.filtered_queue import FilteredQueue
+from sculptor.web.derived import TaskUpdate
 
 _RegistryKeyT = TypeVar("_RegistryKeyT")
 
+# Saved messages read per transaction when folding a task's log after a restart.
+_REPLAY_PAGE_SIZE = 1000
+
+
+class _MessageWrite:
+    """One `write_messages` call as queued on the group-commit writer."""
+
+    def __init__(self, task_id: TaskID, entries: Sequence[MessageWriteEntry]) -> None:
+        self.task_id = task_id
+        self.entries = entries
+        # The task row read in the committing transaction, for the publish afterwards.
+        self.task: Task | None = None
+
 
 class BaseTaskService(TaskService, ABC):
     """The DefaultTaskService exists to broker requests for tasks running."""
@@ -106,23 +133,96 @@ class BaseTaskService(TaskService, ABC):
     )
     # this is important for robustness -- we want to ensure that no messages are missed when starting a subscription
     _subscription_lock: Lock = PrivateAttr(default_factory=Lock)
-    _messages_by_task_id: dict[TaskID, list[Message]] = PrivateAttr(default_factory=dict)
+    # Bounded per-task message logs; see TaskMessageHistory for what is retained.
+    _messages_by_task_id: dict[TaskID, TaskMessageHistory] = PrivateAttr(default_factory=dict)
     _latest_task_by_task_id: dict[TaskID, Task] = PrivateAttr(default_factory=dict)
     _task_ids_pending_creation: set[TaskID] = PrivateAttr(default_factory=set)
+    # Shared fold of every task's messages into TaskUpdate state, read by all stream subscribers.
+    _task_update_materializer: TaskUpdateMaterializer = PrivateAttr(default_factory=TaskUpdateMaterializer)
+    # Writes the materializer's checkpoints on its own thread; None until started.
+    _task_update_checkpoint_store: TaskUpdateCheckpointStore | None = PrivateAttr(default=None)
+    # Commits write_messages calls of all tasks in shared transactions; None until started.
+    _message_writer: GroupCommitWriter[_MessageWrite] | None = PrivateAttr(default=None)
 
     _shutdown_flag: ShutdownEvent = PrivateAttr(default_factory=ShutdownEvent.build_root)
     _shutdown_flag_by_task_id: dict[TaskID, ShutdownEvent] = PrivateAttr(default_factory=dict)
 
     def start(self) -> None:
         super().start()
+        if self._message_writer is None:
+            self._message_writer = self._build_message_writer()
+            self._message_writer.start(self.concurrency_group)
         self._finalize_recently_deleted_tasks()
+        checkpoint_store = TaskUpdateCheckpointStore(Path(self.task_sync_dir))
+        checkpoint_store.start(self.concurrency_group)
+        self._task_update_checkpoint_store = checkpoint_store
+        self._task_update_materializer = TaskUpdateMaterializer(checkpoint_store)
+        harness_by_backlogged_task_id: dict[TaskID, Harness] = {}
         with self.data_model_service.open_task_transaction() as transaction:
-            tasks = transaction.get_active_tasks()
-            all_messages = transaction.get_messages_for_tasks([task.object_id for task in tasks])
-            for task in tasks:
-                saved_messages = all_messages.get(task.object_id, ())
-                self._messages_by_task_id[task.object_id] = [saved_message.message for saved_message in saved_messages]
+            for task in transaction.get_active_tasks():
+                # Only the retained part of the log is read here; the rest is folded page by page later.
+                tail = transaction.get_latest_messages_for_task(task.object_id, MESSAGE_HISTORY_TAIL_SIZE)
+                kept: tuple[SavedAgentMessage, ...] = ()
+                if tail:
+                    kept = transaction.get_latest_messages_for_task(
+                        task.object_id,
+                        MESSAGE_HISTORY_KEPT_SIZE,
+                        before_seq=tail[0].seq,
+                        excluded_message_types=DROPPABLE_OUTSIDE_TAIL_MESSAGE_TYPE_NAMES,
+                    )
+                history = TaskMessageHistory()
+                history.extend([saved_message.message for saved_message in (*kept, *tail)])
+                self._messages_by_task_id[task.object_id] = history
+                last_seq = tail[-1].seq if tail else 0
+                folded_seq = 0
+                checkpoint = checkpoint_store.load(task.object_id)
+                if checkpoint is not None and _is_checkpoint_of_log(checkpoint, transaction, last_seq):
+                    self._task_update_materializer.restore(task.object_id, checkpoint)
+                    folded_seq = checkpoint.persisted_message_count
+                if folded_seq < last_seq:
+                    self._task_update_materializer.replay_log(
+                        task.object_id, self._read_saved_message_pages(task.object_id, folded_seq, last_seq)
+                    )
+                harness = _get_harness_for_task(task)
+                if harness is not None:
+                    harness_by_backlogged_task_id[task.object_id] = harness
                 self._latest_task_by_task_id[task.object_id] = task
+        # Folding long unwatched logs is slow, so it happens off the startup path and outside the transaction.
+        if harness_by_backlogged_task_id:
+            self.concurrency_group.start_new_thread(
+                target=self._fold_task_update_backlogs,
+                args=(harness_by_backlogged_task_id,),
+                name=f"{self.__class__.__name__}::_fold_task_update_backlogs",
+            )
+
+    def _read_saved_message_pages(
+        self, task_id: TaskID, after_seq: int, last_seq: int
+    ) -> Generator[list[Message], None, None]:
+        """Read the task's saved messages with `after_seq` < `seq` <= `last_seq`, one short transaction per page."""
+        while after_seq < last_seq:
+            with self.data_model_service.open_task_transaction() as transaction:
+                page = self.get_saved_message_page(
+                    task_id, transaction, after_seq=after_seq, limit=min(_REPLAY_PAGE_SIZE, last_seq - after_seq)
+                )
+            if not page:
+                return
+            after_seq = page[-1].seq
+            yield [saved_message.message for saved_message in page]
+
+    def _fold_task_update_backlogs(self, harness_by_task_id: dict[TaskID, Harness]) -> None:
+        for task_id, harness in harness_by_task_id.items():
+            if self._shutdown_flag.is_set():
+                return
+            self._task_update_materializer.fold_backlog(task_id, harness)
+
+    def stop(self) -> None:
+        # Commits whatever is still queued; later writes commit inline.
+        if self._message_writer is not None:
+            self._message_writer.stop()
+        # Writes whatever checkpoints are still queued.
+        if self._task_update_checkpoint_store is not None:
+            self._task_update_checkpoint_store.stop()
+        super().stop()
 
     @abstractmethod
     def on_new_task(self, task: Task) -> None:
@@ -154,6 +254,44 @@ class BaseTaskService(TaskService, ABC):
             transaction.insert_message(saved_message)
             transaction.add_callback(lambda: self._publish_task_update(task=task_row, message=message))
 
+    def write_messages(self, task_id: TaskID, entries: Sequence[MessageWriteEntry]) -> None:
+        if not entries:
+            return
+        # Before start() (e.g. in tests) an unstarted writer just commits inline.
+        writer = self._message_writer or self._build_message_writer()
+        writer.write(_MessageWrite(task_id, entries))
+
+    def _build_message_writer(self) -> GroupCommitWriter[_MessageWrite]:
+        return GroupCommitWriter(
+            name=f"{self.__class__.__name__}::message_writer",
+            open_transaction=self.data_model_service.open_task_transaction,
+            write_group=self._insert_message_writes,
+            on_committed=self._publish_message_write,
+            post_commit_key=lambda write: write.task_id,
+        )
+
+    def _insert_message_writes(self, transaction: SQLTransaction, writes: Sequence[_MessageWrite]) -> None:
+        task_by_id: dict[TaskID, Task] = {}
+        saved_messages: list[SavedAgentMessage] = []
+        for write in writes:
+            if write.task_id not in task_by_id:
+                task_row = transaction.get_task(write.task_id)
+                assert task_row is not None
+                task_by_id[write.task_id] = task_row
+            write.task = task_by_id[write.task_id]
+            for entry in write.entries:
+                if isinstance(entry, PersistentMessage):
+                    saved_messages.append(SavedAgentMessage.build(message=entry, task_id=write.task_id))
+        transaction.insert_messages(saved_messages)
+
+    def _publish_message_write(self, write: _MessageWrite) -> None:
+        assert write.task is not None
+        for entry in write.entries:
+            if isinstance(entry, Message):
+                self._publish_task_update(task=write.task, message=entry)
+            else:
+                entry()
+
     def get_task(self, task_id: TaskID, transaction: DataModelTransaction) -> Task | None:
         assert isinstance(transaction, SQLTransaction)
         return transaction.get_task(task_id)
@@ -373,10 +511,25 @@ class BaseTaskService(TaskService, ABC):
         assert isinstance(transaction, SQLTransaction)
         return tuple(x.message for x in transaction.get_messages_for_task(task_id))
 
+    def get_saved_message_page(
+        self, task_id: TaskID, transaction: DataModelTransaction, after_seq: int | None = None, limit: int = 500
+    ) -> tuple[SavedAgentMessage, ...]:
+        assert isinstance(transaction, SQLTransaction)
+        return transaction.get_messages_for_task(task_id, after_seq=after_seq, limit=limit)
+
     def get_live_messages_for_task(self, task_id: TaskID) -> tuple[Message, ...]:
         # Same lock as create_message's append so the snapshot is consistent.
         with self._subscription_lock:
-            return tuple(self._messages_by_task_id.get(task_id, ()))
+            return self._get_retained_messages(task_id)
+
+    def _get_retained_messages(self, task_id: TaskID) -> tuple[Message, ...]:
+        history = self._messages_by_task_id.get(task_id)
+        return () if history is None else history.snapshot()
+
+    def read_task_update(
+        self, task_id: TaskID, harness: Harness, cursor: TaskUpdateCursor
+    ) -> tuple[TaskUpdate | None, TaskUpdateCursor]:
+        return self._task_update_materializer.read(task_id, harness, cursor)
 
     @contextmanager
     def subscribe_to_all_tasks_for_user(
@@ -400,8 +553,10 @@ class BaseTaskService(TaskService, ABC):
                 for task_id in task_ids
                 if task_id in self._latest_task_by_task_id
             )
+            # Only the retained tail goes out: chat history is served from the shared
+            # fold (read_task_update), not by replaying the raw log.
             messages_and_task_ids = tuple(
-                (message, task_id) for task_id in task_ids for message in self._messages_by_task_id.get(task_id, [])
+                (message, task_id) for task_id in task_ids for message in self._get_retained_messages(task_id)
             )
 
             # Ephemeral artifact notifications are lost across restarts because they
@@ -485,9 +640,7 @@ class BaseTaskService(TaskService, ABC):
                 if task_id in self._latest_task_by_task_id
             )
             messages_and_task_ids = tuple(
-                (message, task_id)
-                for task_id in matching_task_ids
-                for message in self._messages_by_task_id.get(task_id, [])
+                (message, task_id) for task_id in matching_task_ids for message in self._get_retained_messages(task_id)
             )
             artifact_messages = self._build_existing_artifact_messages(matching_task_ids)
 
@@ -567,8 +720,9 @@ class BaseTaskService(TaskService, ABC):
                     log_type=MESSAGE_LOG_TYPE, task_id=str(task_id), serialized_message=message.model_dump_json()
                 ).trace("Published new message to task listeners")
                 if task_id not in self._messages_by_task_id:
-                    self._messages_by_task_id[task_id] = []
+                    self._messages_by_task_id[task_id] = TaskMessageHistory()
                 self._messages_by_task_id[task_id].append(message)
+                self._task_update_materializer.append_messages(task_id, [message])
 
                 listeners = self._subscriptions_by_task_id.get(task_id, ())
                 for listener in listeners:
@@ -596,6 +750,11 @@ class BaseTaskService(TaskService, ABC):
             for listener in self._subscriptions_by_task_id_for_containers.get(task_id, ()):
                 listener.put_nowait(task_update)
 
+        # Outside the subscription lock: a due fold can take a while and must not stall every other publisher.
+        harness = _get_harness_for_task(task) if message is not None else None
+        if harness is not None:
+            self._task_update_materializer.fold_backlog(task_id, harness)
+
     @contextmanager
     def _subscribe_to_task(
         self,
@@ -610,9 +769,10 @@ class BaseTaskService(TaskService, ABC):
             # we must query the existing messages for this task inside the lock
             # otherwise there is a race condition where the listener might not see some messages that are being committed
             # or they might arrive out of order (both of which are bad)
-            messages = self._messages_by_task_id.get(task_id, [])
+            messages = self._get_retained_messages(task_id)
 
-        # we make sure that any existing messages are here, thus the subscriber will get all messages
+        # we make sure that any retained messages are here, thus the subscriber will get every message it
+        # needs to act on (see TaskMessageHistory for the content messages that are not retained)
         if is_history_included:
             for message in messages:
                 listener.put_nowait(message)
@@ -807,9 +967,38 @@ class BaseTaskService(TaskService, ABC):
             self._messages_by_task_id.pop(task_id, None)
             self._latest_task_by_task_id.pop(task_id, None)
             self._shutdown_flag_by_task_id.pop(task_id, None)
+        self._task_update_materializer.forget(task_id)
 
     def _finalize_recently_deleted_tasks(self) -> None:
         with self.data_model_service.open_task_transaction() as transaction:
             to_delete = transaction.get_stuck_deleting_tasks()
         for task in to_delete:
             self._finalize_task(task, TaskState.DELETED, None, None, False)
+
+
+def _get_harness_for_task(task: Task) -> Harness | None:
+    if not isinstance(task.input_data, AgentTaskInputsV2):
+        return None
+    return get_harness_for_config(task.input_data.agent_config)
+
+
+def _is_checkpoint_of_log(
+    checkpoint: TaskUpdateCheckpoint, transaction: TaskAndDataModelTransaction, last_seq: int
+) -> bool:
+    """Whether `checkpoint` folds the first messages of the task's saved log, whose last `seq` is `last_seq`.
+
+    `seq` numbers each task's messages from 1, so the last message the checkpoint
+    covers is the one whose `seq` is its `persisted_message_count`.
+    """
+    count = checkpoint.persisted_message_count
+    if not 0 < count <= last_seq:
+        return False
+    saved_messages = transaction.get_messages_for_task(checkpoint.task_id, after_seq=count - 1, limit=1)
+    if (
+        not saved_messages
+        or saved_messages[0].seq != count
+        or saved_messages[0].message.message_id != checkpoint.last_persisted_message_id
+    ):
+        logger.debug("Ignoring TaskUpdate checkpoint of task {} that does not match its log", checkpoint.task_id)
+        return False
+    return True
@@ -128,6 +128,7 @@ class ConcurrentTaskService(BaseTaskService, ABC):
         # Wait for the spawner until it receives the shutdown flag and closes. We're okay to wait infinitely here
         if self._spawner is not None:
             self._spawner.join(timeout=SHUTDOWN_TIMEOUT_SECONDS)
+        super().stop()
 
     def on_new_task(self, task: Task) -> None:
         super().on_new_task(task)
@@ -0,0 +1,208 @@
+"""Batches writes from many threads into shared transactions on a single writer thread.
+
+SQLite admits one writer at a time, so when dozens of agent runners each open
+their own transaction per batch of messages, they queue for the writer slot and
+"database is locked" errors follow. `GroupCommitWriter` instead hands every
+write to one thread that commits whatever has queued up, from all tasks, in a
+single transaction.
+
+The writer thread only commits. Post-commit work (publishing, folding, artifact
+syncs, ...) is handed to a few post-commit threads, each item to the thread its
+key maps to, so slow post-commit work of one task never holds up the commits of
+the others.
+
+Semantics callers can rely on:
+- `write` returns only once the item is committed and its post-commit work has
+  run, and raises if either failed, so durability is what it was with a
+  transaction per caller.
+- Items are committed in `write` call order, and the post-commit work of items
+  with the same key runs in commit order, so the per-task order of a single
+  calling thread is preserved.
+- A group whose transaction fails is retried one item per transaction, so a
+  single bad item only fails its own caller.
+"""
+
+import time
+from queue import Empty
+from queue import SimpleQueue
+from threading import Event
+from threading import Lock
+from threading import get_ident
+from typing import Callable
+from typing import ContextManager
+from typing import Final
+from typing import Generic
+from typing import Hashable
+from typing import Sequence
+from typing import TypeVar
+
+from loguru import logger
+
+from sculptor.foundation.concurrency_group import ConcurrencyGroup
+from sculptor.foundation.thread_utils import ObservableThread
+from sculptor.services.data_model_service.sql_implementation import SQLTransaction
+
+# How long the writer waits for more items after the first one of a group.
+GROUP_COMMIT_WINDOW_SECONDS: Final[float] = 0.002
+MAX_GROUP_SIZE: Final[int] = 256
+# Number of threads running post-commit work; items with the same key share one.
+POST_COMMIT_THREAD_COUNT: Final[int] = 4
+# How often the idle writer and post-commit threads check for shutdown.
+_IDLE_POLL_SECONDS: Final[float] = 0.5
+
+ItemT = TypeVar("ItemT")
+
+
+class _PendingWrite(Generic[ItemT]):
+    def __init__(self, item: ItemT) -> None:
+        self.item = item
+        self.done = Event()
+        self.error: BaseException | None = None
+
+
+class GroupCommitWriter(Generic[ItemT]):
+    """Commits items in groups; see the module docstring.
+
+    `write_group` writes a group of items into one open transaction. `on_committed`
+    runs for each item after its transaction committed (this is where callers'
+    publish callbacks go, so that they run outside the transaction), on the
+    post-commit thread that `post_commit_key` of the item maps to. Until `start`
+    is called, and after `stop`, `write` commits and runs `on_committed` inline on
+    the calling thread instead.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        open_transaction: Callable[[], ContextManager[SQLTransaction]],
+        write_group: Callable[[SQLTransaction, Sequence[ItemT]], None],
+        on_committed: Callable[[ItemT], None],
+        post_commit_key: Callable[[ItemT], Hashable] = lambda item: None,
+    ) -> None:
+        self._name = name
+        self._open_transaction = open_transaction
+        self._write_group = write_group
+        self._on_committed = on_committed
+        self._post_commit_key = post_commit_key
+        self._queue: SimpleQueue[_PendingWrite[ItemT]] = SimpleQueue()
+        self._post_commit_queues: tuple[SimpleQueue[_PendingWrite[ItemT]], ...] = tuple(
+            SimpleQueue() for _ in range(POST_COMMIT_THREAD_COUNT)
+        )
+        # Guards `_is_running` so nothing is queued after the writer's final drain.
+        self._lock = Lock()
+        self._is_running = False
+        self._stop_event = Event()
+        self._post_commit_stop_event = Event()
+        self._thread: ObservableThread | None = None
+        self._post_commit_threads: list[ObservableThread] = []
+        self._post_commit_thread_ids: set[int] = set()
+
+    def start(self, concurrency_group: ConcurrencyGroup) -> None:
+        with self._lock:
+            assert self._thread is None, "GroupCommitWriter can only be started once"
+            self._is_running = True
+        self._post_commit_threads = [
+            concurrency_group.start_new_thread(
+                target=self._run_post_commit, args=(post_commit_queue,), name=f"{self._name}::post_commit_{index}"
+            )
+            for index, post_commit_queue in enumerate(self._post_commit_queues)
+        ]
+        self._thread = concurrency_group.start_new_thread(target=self._run, name=self._name)
+
+    def stop(self) -> None:
+        with self._lock:
+            self._is_running = False
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+        # The writer has handed over everything it committed, so the post-commit threads can drain and exit.
+        self._post_commit_stop_event.set()
+        for thread in self._post_commit_threads:
+            thread.join()
+
+    def write(self, item: ItemT) -> None:
+        """Commit `item` together with whatever else is queued; blocks until its post-commit work has run."""
+        pending = _PendingWrite(item)
+        with self._lock:
+            # A post-commit callback that writes again must not wait on its own thread.
+            is_queued = self._is_running and get_ident() not in self._post_commit_thread_ids
+            if is_queued:
+                self._queue.put(pending)
+        if not is_queued:
+            self._commit_group([pending], is_inline=True)
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                first = self._queue.get(timeout=_IDLE_POLL_SECONDS)
+            except Empty:
+                continue
+            self._commit_group(self._collect_group(first), is_inline=False)
+        # `write` no longer queues, so this drains everything that was accepted.
+        remaining = self._drain()
+        while remaining:
+            self._commit_group(remaining[:MAX_GROUP_SIZE], is_inline=False)
+            remaining = remaining[MAX_GROUP_SIZE:]
+
+    def _run_post_commit(self, post_commit_queue: SimpleQueue[_PendingWrite[ItemT]]) -> None:
+        with self._lock:
+            self._post_commit_thread_ids.add(get_ident())
+        while True:
+            try:
+                pending = post_commit_queue.get(timeout=_IDLE_POLL_SECONDS)
+            except Empty:
+                if self._post_commit_stop_event.is_set():
+                    return
+                continue
+            self._finish(pending)
+
+    def _collect_group(self, first: _PendingWrite[ItemT]) -> list[_PendingWrite[ItemT]]:
+        group = [first]
+        deadline = time.monotonic() + GROUP_COMMIT_WINDOW_SECONDS
+        while len(group) < MAX_GROUP_SIZE:
+            remaining_seconds = deadline - time.monotonic()
+            try:
+                group.append(
+                    self._queue.get(timeout=remaining_seconds) if remaining_seconds > 0 else self._queue.get_nowait()
+                )
+            except Empty:
+                break
+        return group
+
+    def _drain(self) -> list[_PendingWrite[ItemT]]:
+        drained: list[_PendingWrite[ItemT]] = []
+        while True:
+            try:
+                drained.append(self._queue.get_nowait())
+            except Empty:
+                return drained
+
+    def _commit_group(self, group: list[_PendingWrite[ItemT]], is_inline: bool) -> None:
+        try:
+            with self._open_transaction() as transaction:
+                self._write_group(transaction, [pending.item for pending in group])
+        except Exception as e:
+            if len(group) == 1:
+                group[0].error = e
+                group[0].done.set()
+                return
+            logger.debug("Group commit of {} writes failed ({}), retrying them one by one", len(group), e)
+            for pending in group:
+                self._commit_group([pending], is_inline)
+            return
+        for pending in group:
+            if is_inline:
+                self._finish(pending)
+            else:
+                key = self._post_commit_key(pending.item)
+                self._post_commit_queues[hash(key) % len(self._post_commit_queues)].put(pending)
+
+    def _finish(self, pending: _PendingWrite[ItemT]) -> None:
+        try:
+            self._on_committed(pending.item)
+        except Exception as e:
+            pending.error = e
+        pending.done.set()
@@ -0,0 +1,159 @@
+import threading
+from contextlib import contextmanager
+from typing import Generator
+from typing import Sequence
+from unittest.mock import MagicMock
+
+import pytest
+
+from sculptor.foundation.concurrency_group import ConcurrencyGroup
+from sculptor.services.task_service.group_commit_writer import GroupCommitWriter
+from sculptor.services.task_service.group_commit_writer import _PendingWrite
+
+
+class _RecordingDatabase:
+    """Stands in for the data model service: records which items each transaction committed."""
+
+    def __init__(self, failing_item: str | None = None) -> None:
+        self.failing_item = failing_item
+        self.committed_groups: list[list[str]] = []
+        self.published: list[str] = []
+        # Let a test hold the writer inside a transaction while more writes queue up.
+        self.entered = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    @contextmanager
+    def open_transaction(self) -> Generator[MagicMock, None, None]:
+        transaction = MagicMock()
+        transaction.items = []
+        self.entered.set()
+        yield transaction
+        self.release.wait()
+        self.committed_groups.append(transaction.items)
+
+    def write_group(self, transaction: MagicMock, items: Sequence[str]) -> None:
+        if self.failing_item in items:
+            raise ValueError(f"cannot write {self.failing_item}")
+        transaction.items.extend(items)
+
+    def on_committed(self, item: str) -> None:
+        self.published.append(item)
+
+    def build_writer(self) -> GroupCommitWriter[str]:
+        return GroupCommitWriter(
+            name="test_writer",
+            open_transaction=self.open_transaction,
+            write_group=self.write_group,
+            on_committed=self.on_committed,
+        )
+
+
+def test_an_unstarted_writer_commits_inline() -> None:
+    database = _RecordingDatabase()
+    writer = database.build_writer()
+
+    writer.write("a")
+    writer.write("b")
+
+    assert database.committed_groups == [["a"], ["b"]]
+    assert database.published == ["a", "b"]
+
+
+def test_writes_queued_behind_a_commit_share_the_next_transaction() -> None:
+    database = _RecordingDatabase()
+    writer = database.build_writer()
+    with ConcurrencyGroup(name="group_commit_writer_test") as concurrency_group:
+        writer.start(concurrency_group)
+        database.release.clear()
+        first = concurrency_group.start_new_thread(target=writer.write, args=("first",))
+        # Wait until the writer is holding "first" in an open transaction.
+        database.entered.wait()
+        followers = [concurrency_group.start_new_thread(target=writer.write, args=(f"next-{i}",)) for i in range(5)]
+        while writer._queue.qsize() < len(followers):
+            threading.Event().wait(0.001)
+        database.release.set()
+        for thread in [first, *followers]:
+            thread.join()
+        writer.stop()
+
+    assert database.committed_groups[0] == ["first"]
+    assert sorted(database.committed_groups[1]) == [f"next-{i}" for i in range(5)]
+    # Every item has its own key, so only the set of published items is deterministic.
+    assert sorted(database.published) == sorted(item for group in database.committed_groups for item in group)
+
+
+def test_a_failing_item_only_fails_its_own_write() -> None:
+    database = _RecordingDatabase(failing_item="bad")
+    writer = database.build_writer()
+
+    with pytest.raises(ValueError):
+        writer.write("bad")
+    writer.write("good")
+
+    assert database.committed_groups == [["good"]]
+    assert database.published == ["good"]
+
+
+def test_a_failed_group_is_retried_one_item_per_transaction() -> None:
+    database = _RecordingDatabase(failing_item="bad")
+    writer = database.build_writer()
+    pending = [_PendingWrite(item) for item in ("a", "bad", "b")]
+
+    writer._commit_group(pending, is_inline=True)
+
+    assert database.committed_groups == [["a"], ["b"]]
+    assert [p.done.is_set() for p in pending] == [True, True, True]
+    assert isinstance(pending[1].error, ValueError)
+    assert pending[0].error is None and pending[2].error is None
+
+
+def test_post_commit_work_runs_off_the_writer_thread_in_commit_order_per_key() -> None:
+    database = _RecordingDatabase()
+    publishing_thread_names: list[str] = []
+
+    def on_committed(item: str) -> None:
+        publishing_thread_names.append(threading.current_thread().name)
+        database.on_committed(item)
+
+    writer = GroupCommitWriter(
+        name="test_writer",
+        open_transaction=database.open_transaction,
+        write_group=database.write_group,
+        on_committed=on_committed,
+        post_commit_key=lambda item: item.split("-")[0],
+    )
+    with ConcurrencyGroup(name="group_commit_writer_test") as concurrency_group:
+        writer.start(concurrency_group)
+        for i in range(10):
+            writer.write(f"a-{i}")
+            writer.write(f"b-{i}")
+        writer.stop()
+
+    assert [item for item in database.published if item.startswith("a")] == [f"a-{i}" for i in range(10)]
+    assert [item for item in database.published if item.startswith("b")] == [f"b-{i}" for i in range(10)]
+    assert all("post_commit" in name for name in publishing_thread_names)
+
+
+def test_a_post_commit_callback_that_writes_again_commits_inline() -> None:
+    database = _RecordingDatabase()
+    writer: GroupCommitWriter[str]
+
+    def on_committed(item: str) -> None:
+        database.on_committed(item)
+        if item == "outer":
+            writer.write("nested")
+
+    writer = GroupCommitWriter(
+        name="test_writer",
+        open_transaction=database.open_transaction,
+        write_group=database.write_group,
+        on_committed=on_committed,
+    )
+    with ConcurrencyGroup(name="group_commit_writer_test") as concurrency_group:
+        writer.start(concurrency_group)
+        writer.write("outer")
+        writer.stop()
+
+    assert database.committed_groups == [["outer"], ["nested"]]
+    assert database.published == ["outer", "nested"]
@@ -0,0 +1,86 @@
+"""Bounded in-memory message log for a single task.
+
+`BaseTaskService` used to keep every message of every active task in memory and
+replay the whole list into each new subscription, so a long-running agent's RSS
+and subscription cost grew with its entire history. `TaskMessageHistory` keeps a
+hot tail of the most recent messages instead. Once a message falls out of the
+tail it is dropped right away if it is one of the high-volume content messages
+whose effect is already captured by the shared `TaskUpdate` fold (see
+`TaskUpdateMaterializer`). Control messages (user input, runner state, request
+lifecycle, ...) are kept for longer, because the runner's dedup cursor, the
+environment lookup and the derived task status all scan for them, but only the
+most recent `MESSAGE_HISTORY_KEPT_SIZE` of them: those scans look for recent
+state, which the oldest control messages of a long-running task no longer carry.
+
+Dropped persistent messages stay readable page by page from the database through
+`TaskService.get_saved_message_page`.
+"""
+
+from collections import deque
+from typing import Final
+
+from sculptor.interfaces.agents.agent import PartialResponseBlockAgentMessage
+from sculptor.interfaces.agents.agent import PartialResponseTextDeltaAgentMessage
+from sculptor.interfaces.agents.agent import StreamingMessageCompleteAgentMessage
+from sculptor.state.messages import Message
+from sculptor.state.messages import ResponseBlockAgentMessage
+
+# Number of most recent messages kept in full for each task.
+MESSAGE_HISTORY_TAIL_SIZE: Final[int] = 2000
+
+# Number of control messages kept for each task once they have left the tail.
+MESSAGE_HISTORY_KEPT_SIZE: Final[int] = 5000
+
+# Message types that make up the bulk of a long agent's log and that only matter
+# for building chat messages, which the shared fold has already done by the time
+# they leave the tail.
+_DROPPABLE_OUTSIDE_TAIL_MESSAGE_TYPES: Final = (
+    ResponseBlockAgentMessage,
+    PartialResponseBlockAgentMessage,
+    PartialResponseTextDeltaAgentMessage,
+    StreamingMessageCompleteAgentMessage,
+)
+
+# The `object_type`s of the messages above, for skipping them when reading a log back from the database.
+DROPPABLE_OUTSIDE_TAIL_MESSAGE_TYPE_NAMES: Final = tuple(
+    message_type.__name__ for message_type in _DROPPABLE_OUTSIDE_TAIL_MESSAGE_TYPES
+)
+
+
+class TaskMessageHistory:
+    """The retained part of one task's message log, in publish order.
+
+    Not thread-safe; `BaseTaskService` guards it with its subscription lock.
+    """
+
+    def __init__(self, tail_size: int = MESSAGE_HISTORY_TAIL_SIZE, kept_size: int = MESSAGE_HISTORY_KEPT_SIZE) -> None:
+        assert tail_size > 0 and kept_size > 0
+        self._tail_size = tail_size
+        # The most recent control messages that left the tail. Every one of them is
+        # older than everything in `_tail`, so the retained log is `_kept + _tail`.
+        self._kept: deque[Message] = deque(maxlen=kept_size)
+        self._tail: deque[Message] = deque()
+        self.dropped_message_count = 0
+
+    def __len__(self) -> int:
+        return len(self._kept) + len(self._tail)
+
+    def append(self, message: Message) -> None:
+        self._tail.append(message)
+        if len(self._tail) > self._tail_size:
+            oldest = self._tail.popleft()
+            if isinstance(oldest, _DROPPABLE_OUTSIDE_TAIL_MESSAGE_TYPES):
+                self.dropped_message_count += 1
+                return
+            if len(self._kept) == self._kept.maxlen:
+                # The deque evicts its oldest control message to make room.
+                self.dropped_message_count += 1
+            self._kept.append(oldest)
+
+    def extend(self, messages: list[Message]) -> None:
+        for message in messages:
+            self.append(message)
+
+    def snapshot(self) -> tuple[Message, ...]:
+        """The retained messages, oldest first."""
+        return (*self._kept, *self._tail)
@@ -0,0 +1,62 @@
+from sculptor.interfaces.agents.agent import PartialResponseBlockAgentMessage
+from sculptor.interfaces.agents.agent import RequestStartedAgentMessage
+from sculptor.interfaces.agents.agent import RequestSuccessAgentMessage
+from sculptor.primitives.ids import AgentMessageID
+from sculptor.primitives.ids import AssistantMessageID
+from sculptor.services.task_service.message_history import TaskMessageHistory
+from sculptor.state.chat_state import TextBlock
+from sculptor.state.messages import ChatInputUserMessage
+from sculptor.state.messages import Message
+from sculptor.state.messages import ResponseBlockAgentMessage
+
+
+def _response_block(text: str) -> ResponseBlockAgentMessage:
+    return ResponseBlockAgentMessage(
+        role="assistant",
+        assistant_message_id=AssistantMessageID(f"assistant-{text}"),
+        message_id=AgentMessageID(),
+        content=(TextBlock(text=text),),
+    )
+
+
+def test_history_keeps_everything_while_under_the_tail_size() -> None:
+    history = TaskMessageHistory(tail_size=10)
+    messages: list[Message] = [_response_block(str(i)) for i in range(5)]
+
+    history.extend(messages)
+
+    assert history.snapshot() == tuple(messages)
+    assert history.dropped_message_count == 0
+
+
+def test_history_drops_old_content_messages_but_keeps_control_messages() -> None:
+    history = TaskMessageHistory(tail_size=3)
+    user_message = ChatInputUserMessage(text="go")
+    started = RequestStartedAgentMessage(request_id=user_message.message_id)
+    old_blocks = [_response_block(f"old {i}") for i in range(4)]
+    partial = PartialResponseBlockAgentMessage(
+        message_id=AgentMessageID(),
+        assistant_message_id=AssistantMessageID("assistant-partial"),
+        first_response_message_id=AgentMessageID(),
+        content=(TextBlock(text="partial"),),
+    )
+    recent: list[Message] = [_response_block("recent"), RequestSuccessAgentMessage(request_id=user_message.message_id)]
+
+    history.extend([user_message, started, *old_blocks, partial, *recent])
+
+    # The tail holds the 3 newest messages; older control messages survive in
+    # order ahead of it, older content messages are gone.
+    assert history.snapshot() == (user_message, started, partial, *recent)
+    assert history.dropped_message_count == 4
+    assert len(history) == 5
+
+
+def test_history_caps_the_control_messages_kept_outside_the_tail() -> None:
+    history = TaskMessageHistory(tail_size=2, kept_size=3)
+    user_messages: list[Message] = [ChatInputUserMessage(text=str(i)) for i in range(7)]
+
+    history.extend(user_messages)
+
+    # 2 in the tail, the 3 most recent of the other 5 kept, the 2 oldest dropped.
+    assert history.snapshot() == tuple(user_messages[2:])
+    assert history.dropped_message_count == 2
@@ -0,0 +1,264 @@
+"""On-disk checkpoints of a task's folded `TaskUpdate` state.
+
+Without them every server start re-folds each active task's whole persisted log
+through `convert_agent_messages_to_task_update` before the first stream can be
+served. `TaskUpdateMaterializer` periodically writes a checkpoint of its fold
+(the folded state plus every completed chat message) together with the last
+persisted message it covers; on start the task service restores it and folds
+only the messages after that one.
+
+Checkpoints are incremental, so that the bytes written per checkpoint do not
+grow with the task's history: completed chat messages go to an append-only log
+(`chat_messages.jsonl`), and each checkpoint appends only the ones completed
+since the previous checkpoint, then atomically replaces a small header with the
+folded state and how much of the log it covers. Bytes in the log past that point
+(left behind by a crash between the two writes) are ignored and overwritten.
+Once `start`ed, the store writes on its own thread so folds never wait on disk.
+
+A checkpoint is a cache: one that is missing, unreadable, written by a different
+fold format or inconsistent with the log is ignored, and the task is re-folded
+from scratch. The fold format is the hand-bumped version below together with a
+fingerprint of the JSON schemas of what a checkpoint stores, so a change to
+`TaskUpdate` or `ChatMessage` invalidates old checkpoints without a bump.
+"""
+
+import functools
+import hashlib
+import json
+import os
+from pathlib import Path
+from queue import Empty
+from queue import SimpleQueue
+from threading import Event
+from threading import Lock
+from typing import Callable
+from typing import Final
+
+from loguru import logger
+from pydantic import ValidationError
+
+from sculptor.foundation.concurrency_group import ConcurrencyGroup
+from sculptor.foundation.pydantic_serialization import SerializableModel
+from sculptor.foundation.thread_utils import ObservableThread
+from sculptor.primitives.ids import AgentMessageID
+from sculptor.primitives.ids import TaskID
+from sculptor.state.chat_state import ChatMessage
+from sculptor.web.derived import TaskUpdate
+
+# Bump whenever `convert_agent_messages_to_task_update` changes what it derives
+# from a message, so checkpoints folded by the old logic are not reused. Changes
+# to the stored models' schemas are caught by the schema fingerprint instead.
+TASK_UPDATE_CHECKPOINT_FORMAT_VERSION: Final[int] = 2
+
+_HEADER_FILENAME: Final[str] = "task_update_checkpoint.json"
+_CHAT_MESSAGE_LOG_FILENAME: Final[str] = "chat_messages.jsonl"
+# How often the idle writer thread checks for shutdown.
+_IDLE_POLL_SECONDS: Final[float] = 0.5
+
+
+class TaskUpdateCheckpoint(SerializableModel):
+    task_id: TaskID
+    # The last persisted message folded into `state`, and how many persisted
+    # messages were folded in total. Both must match the saved log for the
+    # checkpoint to be used.
+    last_persisted_message_id: AgentMessageID
+    persisted_message_count: int
+    # Completed chat messages of the fold, in order, starting at index
+    # `chat_message_offset`. A checkpoint being saved carries only those completed
+    # since the previous save; a loaded one carries all of them.
+    chat_message_offset: int = 0
+    chat_messages: tuple[ChatMessage, ...]
+    # The folded state; its `chat_messages` is not meaningful here.
+    state: TaskUpdate
+
+
+@functools.cache
+def get_task_update_checkpoint_schema_fingerprint() -> str:
+    """A digest of the JSON schemas of the models a checkpoint stores."""
+    schemas = [TaskUpdate.model_json_schema(), ChatMessage.model_json_schema()]
+    return hashlib.sha256(json.dumps(schemas, sort_keys=True).encode()).hexdigest()
+
+
+class _CheckpointHeader(SerializableModel):
+    format_version: int = TASK_UPDATE_CHECKPOINT_FORMAT_VERSION
+    schema_fingerprint: str = ""
+    task_id: TaskID
+    last_persisted_message_id: AgentMessageID
+    persisted_message_count: int
+    # The checkpoint's chat messages are the first `chat_message_count` lines of
+    # the chat message log, which take up its first `chat_message_log_size` bytes.
+    chat_message_count: int
+    chat_message_log_size: int
+    state: TaskUpdate
+
+
+class _LogExtent:
+    """How much of a task's chat message log the header on disk covers."""
+
+    def __init__(self, chat_message_count: int, size: int) -> None:
+        self.chat_message_count = chat_message_count
+        self.size = size
+
+
+class TaskUpdateCheckpointStore:
+    """Reads and writes one checkpoint per task under `root/<task_id>/`.
+
+    Until `start` is called, and after `stop`, writes happen inline on the calling thread.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self._root = root
+        # Guards the two collections below and `_is_running`.
+        self._lock = Lock()
+        # What this process last loaded or wrote for each task; an append is only
+        # valid right after it.
+        self._log_extent_by_task_id: dict[TaskID, _LogExtent] = {}
+        # Tasks whose next save must start the log over because an append was lost.
+        self._task_ids_to_rewrite: set[TaskID] = set()
+        self._queue: SimpleQueue[Callable[[], None]] = SimpleQueue()
+        self._is_running = False
+        self._stop_event = Event()
+        self._thread: ObservableThread | None = None
+
+    def start(self, concurrency_group: ConcurrencyGroup) -> None:
+        with self._lock:
+            assert self._thread is None, "TaskUpdateCheckpointStore can only be started once"
+            self._is_running = True
+        self._thread = concurrency_group.start_new_thread(target=self._run, name="TaskUpdateCheckpointStore::writer")
+
+    def stop(self) -> None:
+        with self._lock:
+            self._is_running = False
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def load(self, task_id: TaskID) -> TaskUpdateCheckpoint | None:
+        header_path = self._get_header_path(task_id)
+        try:
+            header = _CheckpointHeader.model_validate_json(header_path.read_bytes())
+            if (
+                header.format_version != TASK_UPDATE_CHECKPOINT_FORMAT_VERSION
+                or header.schema_fingerprint != get_task_update_checkpoint_schema_fingerprint()
+                or header.task_id != task_id
+            ):
+                logger.debug("Ignoring stale TaskUpdate checkpoint {}", header_path)
+                return None
+            with self._get_chat_message_log_path(task_id).open("rb") as log_file:
+                log_bytes = log_file.read(header.chat_message_log_size)
+            lines = log_bytes.splitlines()
+            if len(log_bytes) != header.chat_message_log_size or len(lines) != header.chat_message_count:
+                logger.debug("Ignoring TaskUpdate checkpoint {} with a truncated chat message log", header_path)
+                return None
+            chat_messages = tuple(ChatMessage.model_validate_json(line) for line in lines)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValidationError) as e:
+            logger.info("Ignoring unreadable TaskUpdate checkpoint {}: {}", header_path, e)
+            return None
+        with self._lock:
+            self._log_extent_by_task_id[task_id] = _LogExtent(header.chat_message_count, header.chat_message_log_size)
+        return TaskUpdateCheckpoint(
+            task_id=task_id,
+            last_persisted_message_id=header.last_persisted_message_id,
+            persisted_message_count=header.persisted_message_count,
+            chat_messages=chat_messages,
+            state=header.state,
+        )
+
+    def claim_rewrite(self, task_id: TaskID) -> bool:
+        """Whether the task's next checkpoint must carry all of its chat messages; clears the flag.
+
+        True after an earlier save of the task was lost, since appending to the log
+        is then no longer possible.
+        """
+        with self._lock:
+            if task_id not in self._task_ids_to_rewrite:
+                return False
+            self._task_ids_to_rewrite.remove(task_id)
+            return True
+
+    def save(self, checkpoint: TaskUpdateCheckpoint) -> None:
+        self._submit(lambda: self._write(checkpoint))
+
+    def delete(self, task_id: TaskID) -> None:
+        self._submit(lambda: self._remove(task_id))
+
+    def _submit(self, operation: Callable[[], None]) -> None:
+        with self._lock:
+            is_queued = self._is_running
+            if is_queued:
+                self._queue.put(operation)
+        if not is_queued:
+            operation()
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                operation = self._queue.get(timeout=_IDLE_POLL_SECONDS)
+            except Empty:
+                continue
+            operation()
+        # `_submit` no longer queues, so this drains everything that was accepted.
+        while True:
+            try:
+                operation = self._queue.get_nowait()
+            except Empty:
+                return
+            operation()
+
+    def _write(self, checkpoint: TaskUpdateCheckpoint) -> None:
+        task_id = checkpoint.task_id
+        with self._lock:
+            extent = self._log_extent_by_task_id.pop(task_id, None)
+        if checkpoint.chat_message_offset == 0:
+            extent = _LogExtent(0, 0)
+        elif extent is None or extent.chat_message_count != checkpoint.chat_message_offset:
+            # The chat messages before this checkpoint's were never written.
+            with self._lock:
+                self._task_ids_to_rewrite.add(task_id)
+            return
+        header_path = self._get_header_path(task_id)
+        temporary_path = header_path.with_suffix(".tmp")
+        try:
+            header_path.parent.mkdir(parents=True, exist_ok=True)
+            with self._get_chat_message_log_path(task_id).open("ab") as log_file:
+                log_file.truncate(extent.size)
+                # Appends land at the new end anyway; seeking keeps `tell` in step with them.
+                log_file.seek(extent.size)
+                log_file.writelines(message.model_dump_json().encode() + b"\n" for message in checkpoint.chat_messages)
+                log_size = log_file.tell()
+            chat_message_count = extent.chat_message_count + len(checkpoint.chat_messages)
+            header = _CheckpointHeader(
+                schema_fingerprint=get_task_update_checkpoint_schema_fingerprint(),
+                task_id=task_id,
+                last_persisted_message_id=checkpoint.last_persisted_message_id,
+                persisted_message_count=checkpoint.persisted_message_count,
+                chat_message_count=chat_message_count,
+                chat_message_log_size=log_size,
+                state=checkpoint.state,
+            )
+            temporary_path.write_text(header.model_dump_json())
+            # Rename so a crash mid-write never leaves a truncated header behind.
+            os.replace(temporary_path, header_path)
+        except OSError as e:
+            # Best-effort: without a checkpoint the next start just folds more.
+            logger.debug("Failed to write TaskUpdate checkpoint {}: {}", header_path, e)
+            with self._lock:
+                self._task_ids_to_rewrite.add(task_id)
+            return
+        with self._lock:
+            self._log_extent_by_task_id[task_id] = _LogExtent(chat_message_count, log_size)
+
+    def _remove(self, task_id: TaskID) -> None:
+        with self._lock:
+            self._log_extent_by_task_id.pop(task_id, None)
+            self._task_ids_to_rewrite.discard(task_id)
+        self._get_header_path(task_id).unlink(missing_ok=True)
+        self._get_chat_message_log_path(task_id).unlink(missing_ok=True)
+
+    def _get_header_path(self, task_id: TaskID) -> Path:
+        return self._root / str(task_id) / _HEADER_FILENAME
+
+    def _get_chat_message_log_path(self, task_id: TaskID) -> Path:
+        return self._root / str(task_id) / _CHAT_MESSAGE_LOG_FILENAME
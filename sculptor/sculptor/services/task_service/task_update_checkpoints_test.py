@@ -0,0 +1,117 @@
+import datetime
+from pathlib import Path
+from unittest.mock import patch
+
+from sculptor.foundation.concurrency_group import ConcurrencyGroup
+from sculptor.primitives.ids import AgentMessageID
+from sculptor.primitives.ids import TaskID
+from sculptor.services.task_service import task_update_checkpoints
+from sculptor.services.task_service.task_update_checkpoints import TaskUpdateCheckpoint
+from sculptor.services.task_service.task_update_checkpoints import TaskUpdateCheckpointStore
+from sculptor.state.chat_state import ChatMessage
+from sculptor.state.chat_state import ChatMessageRole
+from sculptor.state.chat_state import TextBlock
+from sculptor.web.derived import TaskUpdate
+
+
+def _chat_message(text: str) -> ChatMessage:
+    return ChatMessage(
+        id=AgentMessageID(),
+        role=ChatMessageRole.ASSISTANT,
+        content=(TextBlock(text=text),),
+        approximate_creation_time=datetime.datetime.now(datetime.timezone.utc),
+    )
+
+
+def _checkpoint(
+    task_id: TaskID, chat_message_offset: int, chat_messages: tuple[ChatMessage, ...], persisted_message_count: int
+) -> TaskUpdateCheckpoint:
+    return TaskUpdateCheckpoint(
+        task_id=task_id,
+        last_persisted_message_id=AgentMessageID(),
+        persisted_message_count=persisted_message_count,
+        chat_message_offset=chat_message_offset,
+        chat_messages=chat_messages,
+        state=TaskUpdate(
+            task_id=task_id,
+            chat_messages=(),
+            updated_artifacts=(),
+            in_progress_chat_message=None,
+            queued_chat_messages=(),
+            in_progress_user_message_id=None,
+            streaming_start_index=0,
+        ),
+    )
+
+
+def test_each_save_appends_only_the_new_chat_messages(tmp_path: Path) -> None:
+    store = TaskUpdateCheckpointStore(tmp_path)
+    task_id = TaskID()
+    first = (_chat_message("one"), _chat_message("two"))
+    second = (_chat_message("three"),)
+
+    store.save(_checkpoint(task_id, 0, first, persisted_message_count=4))
+    log_path = tmp_path / str(task_id) / "chat_messages.jsonl"
+    first_log_size = log_path.stat().st_size
+    store.save(_checkpoint(task_id, 2, second, persisted_message_count=6))
+
+    assert log_path.stat().st_size - first_log_size == len(second[0].model_dump_json()) + 1
+    loaded = TaskUpdateCheckpointStore(tmp_path).load(task_id)
+    assert loaded is not None
+    assert loaded.chat_messages == first + second
+    assert loaded.persisted_message_count == 6
+
+
+def test_chat_messages_past_the_header_are_ignored_and_overwritten(tmp_path: Path) -> None:
+    store = TaskUpdateCheckpointStore(tmp_path)
+    task_id = TaskID()
+    first = (_chat_message("one"),)
+    store.save(_checkpoint(task_id, 0, first, persisted_message_count=4))
+    # As if a later save crashed between appending to the log and replacing the header.
+    with (tmp_path / str(task_id) / "chat_messages.jsonl").open("ab") as log_file:
+        log_file.write(_chat_message("lost").model_dump_json().encode() + b"\n")
+
+    restarted = TaskUpdateCheckpointStore(tmp_path)
+    loaded = restarted.load(task_id)
+    assert loaded is not None and loaded.chat_messages == first
+    second = (_chat_message("two"),)
+    restarted.save(_checkpoint(task_id, 1, second, persisted_message_count=6))
+
+    reloaded = TaskUpdateCheckpointStore(tmp_path).load(task_id)
+    assert reloaded is not None and reloaded.chat_messages == first + second
+
+
+def test_a_save_that_cannot_append_asks_for_a_rewrite(tmp_path: Path) -> None:
+    store = TaskUpdateCheckpointStore(tmp_path)
+    task_id = TaskID()
+
+    # Nothing was written before, so there is nothing to append to.
+    store.save(_checkpoint(task_id, 3, (_chat_message("orphan"),), persisted_message_count=8))
+
+    assert store.load(task_id) is None
+    assert store.claim_rewrite(task_id)
+    assert not store.claim_rewrite(task_id)
+
+
+def test_a_started_store_writes_queued_checkpoints_by_stop(tmp_path: Path) -> None:
+    store = TaskUpdateCheckpointStore(tmp_path)
+    task_id = TaskID()
+    chat_messages = (_chat_message("one"),)
+
+    with ConcurrencyGroup(name="task_update_checkpoints_test") as concurrency_group:
+        store.start(concurrency_group)
+        store.save(_checkpoint(task_id, 0, chat_messages, persisted_message_count=4))
+        store.stop()
+
+    loaded = store.load(task_id)
+    assert loaded is not None and loaded.chat_messages == chat_messages
+
+
+def test_a_checkpoint_saved_under_another_schema_is_ignored(tmp_path: Path) -> None:
+    task_id = TaskID()
+    with patch.object(
+        task_update_checkpoints, "get_task_update_checkpoint_schema_fingerprint", return_value="older schema"
+    ):
+        TaskUpdateCheckpointStore(tmp_path).save(_checkpoint(task_id, 0, (_chat_message("one"),), 4))
+
+    assert TaskUpdateCheckpointStore(tmp_path).load(task_id) is None
@@ -0,0 +1,244 @@
+"""Process-wide, per-task fold of agent messages into `TaskUpdate` state.
+
+Every stream subscriber used to run its own `convert_agent_messages_to_task_update`
+fold over the same messages, so backend CPU scaled with the number of open
+connections. The materializer folds each published message exactly once and lets
+subscribers read versioned deltas from the shared state through a per-connection
+`TaskUpdateCursor`.
+
+Folding is lazy: publishing a message only appends it to the task's pending list;
+the first reader that needs the state folds everything pending in one batch, and
+every other reader reuses the result. So that a task nobody is watching does not
+hold its whole log in the pending list, publishers that know the task's harness
+call `fold_backlog` after queueing (outside their own locks), which folds once
+`_MAX_PENDING_MESSAGES` have piled up.
+
+With a `TaskUpdateCheckpointStore`, the fold of a task is also checkpointed to
+disk every `_CHECKPOINT_INTERVAL` persisted messages, at a point where no request
+is in flight, so that a restart can `restore` it instead of re-folding the whole
+log. Each checkpoint carries only the chat messages completed since the previous
+one, and the store writes it on its own thread once started.
+
+A log that was persisted before a restart is not loaded up front either:
+`replay_log` takes an iterator of pages read from the database, and the next fold
+of the task drains it one page at a time ahead of the live messages.
+"""
+
+from collections.abc import Iterator
+from collections.abc import Sequence
+from threading import Lock
+from typing import Final
+
+from sculptor.database.models import TaskID
+from sculptor.interfaces.agents.harness import Harness
+from sculptor.primitives.ids import AgentMessageID
+from sculptor.services.task_service.api import TaskUpdateCursor
+from sculptor.services.task_service.task_update_checkpoints import TaskUpdateCheckpoint
+from sculptor.services.task_service.task_update_checkpoints import TaskUpdateCheckpointStore
+from sculptor.state.chat_state import ChatMessage
+from sculptor.state.messages import Message
+from sculptor.state.messages import PersistentMessage
+from sculptor.web.derived import TaskUpdate
+from sculptor.web.message_conversion import InProgressChatMessageBuilder
+from sculptor.web.message_conversion import convert_agent_messages_to_task_update
+
+_MAX_PENDING_MESSAGES: Final[int] = 1000
+
+# Minimum number of newly folded persisted messages between two checkpoints of a task.
+_CHECKPOINT_INTERVAL: Final[int] = 500
+
+
+class _TaskFold:
+    """Folded state for a single task plus the messages not yet folded into it."""
+
+    def __init__(self) -> None:
+        # Guards `pending_messages` only, so publishers never wait on a fold.
+        self.pending_lock = Lock()
+        self.pending_messages: list[Message] = []
+        # Serializes folds and reads of the folded state below.
+        self.fold_lock = Lock()
+        # Pages of the persisted log that precede `pending_messages` and are not folded yet.
+        self.unreplayed_pages: Iterator[Sequence[Message]] | None = None
+        self.version = 0
+        self.state: TaskUpdate | None = None
+        self.completed_message_by_id: dict[AgentMessageID, ChatMessage] = {}
+        self.in_progress_builder = InProgressChatMessageBuilder()
+        # Every completed chat message in the order the fold produced them.
+        # Subscribers slice this by their cursor to get their delta.
+        self.chat_messages: list[ChatMessage] = []
+        # Persisted messages folded so far, for checkpointing.
+        self.persisted_message_count = 0
+        self.last_persisted_message_id: AgentMessageID | None = None
+        self.checkpointed_message_count = 0
+        self.checkpointed_chat_message_count = 0
+
+    def fold_pending(self, task_id: TaskID, harness: Harness) -> bool:
+        """Fold the unreplayed log and then the pending messages; returns whether there were any."""
+        has_folded = False
+        if self.unreplayed_pages is not None:
+            for page in self.unreplayed_pages:
+                if page:
+                    self._fold_batch(task_id, harness, page)
+                    has_folded = True
+            self.unreplayed_pages = None
+        with self.pending_lock:
+            batch = self.pending_messages
+            self.pending_messages = []
+        if not batch:
+            return has_folded
+        self._fold_batch(task_id, harness, batch)
+        return True
+
+    def _fold_batch(self, task_id: TaskID, harness: Harness, batch: Sequence[Message]) -> None:
+        self.state = convert_agent_messages_to_task_update(
+            new_messages=batch,
+            task_id=task_id,
+            completed_message_by_id=self.completed_message_by_id,
+            harness=harness,
+            current_state=self.state,
+            in_progress_builder=self.in_progress_builder,
+        )
+        self.chat_messages.extend(self.state.chat_messages)
+        self.version += len(batch)
+        for message in batch:
+            if isinstance(message, PersistentMessage):
+                self.persisted_message_count += 1
+                self.last_persisted_message_id = message.message_id
+
+    def is_checkpoint_due(self) -> bool:
+        if self.state is None or self.last_persisted_message_id is None:
+            return False
+        if self.persisted_message_count - self.checkpointed_message_count < _CHECKPOINT_INTERVAL:
+            return False
+        # Only between requests: a half-built in-progress message is not worth
+        # persisting and the builder's indexes are not part of the checkpoint.
+        return (
+            self.state.in_progress_chat_message is None
+            and self.state.in_progress_user_message_id is None
+            and not self.state.is_streaming_active
+        )
+
+    def take_checkpoint(self, task_id: TaskID, is_rewrite: bool) -> TaskUpdateCheckpoint:
+        """Checkpoint the fold with the chat messages completed since the last one (all of them if `is_rewrite`)."""
+        assert self.state is not None and self.last_persisted_message_id is not None
+        chat_message_offset = 0 if is_rewrite else self.checkpointed_chat_message_count
+        checkpoint = TaskUpdateCheckpoint(
+            task_id=task_id,
+            last_persisted_message_id=self.last_persisted_message_id,
+            persisted_message_count=self.persisted_message_count,
+            chat_message_offset=chat_message_offset,
+            chat_messages=tuple(self.chat_messages[chat_message_offset:]),
+            state=self.state.model_copy(update={"chat_messages": (), "updated_artifacts": ()}),
+        )
+        self.checkpointed_message_count = self.persisted_message_count
+        self.checkpointed_chat_message_count = len(self.chat_messages)
+        return checkpoint
+
+
+class TaskUpdateMaterializer:
+    """Folds every task's message log once and serves per-subscriber deltas."""
+
+    def __init__(self, checkpoint_store: TaskUpdateCheckpointStore | None = None) -> None:
+        self._lock = Lock()
+        self._fold_by_task_id: dict[TaskID, _TaskFold] = {}
+        self._checkpoint_store = checkpoint_store
+
+    def restore(self, task_id: TaskID, checkpoint: TaskUpdateCheckpoint) -> None:
+        """Seed a task's fold from a checkpoint; append only the messages after it.
+
+        Must be called before any message is appended for the task.
+        """
+        fold = self._get_or_create_fold(task_id)
+        with fold.fold_lock:
+            assert fold.state is None and not fold.pending_messages
+            fold.chat_messages = list(checkpoint.chat_messages)
+            fold.completed_message_by_id = {message.id: message for message in checkpoint.chat_messages}
+            fold.state = checkpoint.state
+            fold.persisted_message_count = checkpoint.persisted_message_count
+            fold.last_persisted_message_id = checkpoint.last_persisted_message_id
+            fold.checkpointed_message_count = checkpoint.persisted_message_count
+            fold.checkpointed_chat_message_count = len(checkpoint.chat_messages)
+            fold.version = checkpoint.persisted_message_count
+
+    def replay_log(self, task_id: TaskID, pages: Iterator[Sequence[Message]]) -> None:
+        """Queue the task's persisted log, as lazily read pages, to be folded before anything appended.
+
+        Must be called before any message is appended for the task, and after `restore`
+        if the pages continue from a checkpoint.
+        """
+        fold = self._get_or_create_fold(task_id)
+        with fold.fold_lock:
+            assert fold.unreplayed_pages is None and not fold.pending_messages
+            fold.unreplayed_pages = pages
+
+    def append_messages(self, task_id: TaskID, messages: list[Message]) -> None:
+        """Queue messages for folding. Cheap, so callers may hold their own locks."""
+        fold = self._get_or_create_fold(task_id)
+        with fold.pending_lock:
+            fold.pending_messages.extend(messages)
+
+    def fold_backlog(self, task_id: TaskID, harness: Harness) -> None:
+        """Fold the task's pending messages now if `_MAX_PENDING_MESSAGES` have piled up or a log is unreplayed.
+
+        Amortized at most one fold per `_MAX_PENDING_MESSAGES` appended messages, but a
+        single call can fold a whole batch, so do not call it while holding other locks.
+        """
+        with self._lock:
+            fold = self._fold_by_task_id.get(task_id)
+        if fold is None:
+            return
+        with fold.pending_lock:
+            is_fold_due = len(fold.pending_messages) >= _MAX_PENDING_MESSAGES or fold.unreplayed_pages is not None
+        if is_fold_due:
+            with fold.fold_lock:
+                self._fold_pending(task_id, fold, harness)
+
+    def read(
+        self, task_id: TaskID, harness: Harness, cursor: TaskUpdateCursor
+    ) -> tuple[TaskUpdate | None, TaskUpdateCursor]:
+        """Return the task's state as a delta against `cursor`, and the advanced cursor.
+
+        The returned update carries only the completed chat messages the cursor has
+        not seen yet; every other field is the current full state, matching the
+        `TaskUpdate` field semantics. `updated_artifacts` is always empty because
+        artifact notifications are per-connection (see `stream_everything`).
+        Returns None while no message has ever been folded for the task.
+        """
+        with self._lock:
+            fold = self._fold_by_task_id.get(task_id)
+        if fold is None:
+            return None, cursor
+        with fold.fold_lock:
+            self._fold_pending(task_id, fold, harness)
+            if fold.state is None:
+                return None, cursor
+            update = fold.state.model_copy(
+                update={
+                    "chat_messages": tuple(fold.chat_messages[cursor.chat_message_count :]),
+                    "updated_artifacts": (),
+                }
+            )
+            new_cursor = TaskUpdateCursor(version=fold.version, chat_message_count=len(fold.chat_messages))
+        return update, new_cursor
+
+    def forget(self, task_id: TaskID) -> None:
+        with self._lock:
+            self._fold_by_task_id.pop(task_id, None)
+        if self._checkpoint_store is not None:
+            self._checkpoint_store.delete(task_id)
+
+    def _fold_pending(self, task_id: TaskID, fold: _TaskFold, harness: Harness) -> None:
+        # Called with `fold.fold_lock` held.
+        if not fold.fold_pending(task_id, harness) or self._checkpoint_store is None:
+            return
+        if fold.is_checkpoint_due():
+            is_rewrite = self._checkpoint_store.claim_rewrite(task_id)
+            self._checkpoint_store.save(fold.take_checkpoint(task_id, is_rewrite))
+
+    def _get_or_create_fold(self, task_id: TaskID) -> _TaskFold:
+        with self._lock:
+            fold = self._fold_by_task_id.get(task_id)
+            if fold is None:
+                fold = _TaskFold()
+                self._fold_by_task_id[task_id] = fold
+            return fold
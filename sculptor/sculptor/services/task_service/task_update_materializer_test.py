@@ -0,0 +1,176 @@
+from collections.abc import Iterator
+from pathlib import Path
+from unittest.mock import patch
+
+from sculptor.agents.default.claude_code_sdk.harness import CLAUDE_CODE_HARNESS
+from sculptor.interfaces.agents.agent import RequestStartedAgentMessage
+from sculptor.interfaces.agents.agent import RequestSuccessAgentMessage
+from sculptor.interfaces.agents.agent import ResponseBlockAgentMessage
+from sculptor.primitives.ids import AgentMessageID
+from sculptor.primitives.ids import AssistantMessageID
+from sculptor.primitives.ids import TaskID
+from sculptor.services.task_service import task_update_materializer
+from sculptor.services.task_service.api import TaskUpdateCursor
+from sculptor.services.task_service.task_update_checkpoints import TaskUpdateCheckpointStore
+from sculptor.services.task_service.task_update_materializer import TaskUpdateMaterializer
+from sculptor.state.chat_state import TextBlock
+from sculptor.state.messages import ChatInputUserMessage
+from sculptor.state.messages import Message
+
+
+def _turn(text: str) -> list[Message]:
+    user_message = ChatInputUserMessage(text=f"prompt for {text}")
+    return [
+        user_message,
+        RequestStartedAgentMessage(request_id=user_message.message_id),
+        ResponseBlockAgentMessage(
+            role="assistant",
+            assistant_message_id=AssistantMessageID(f"assistant-{text}"),
+            message_id=AgentMessageID(),
+            content=(TextBlock(text=text),),
+        ),
+        RequestSuccessAgentMessage(request_id=user_message.message_id),
+    ]
+
+
+def test_read_before_any_message_returns_none() -> None:
+    materializer = TaskUpdateMaterializer()
+    cursor = TaskUpdateCursor()
+
+    update, new_cursor = materializer.read(TaskID(), CLAUDE_CODE_HARNESS, cursor)
+
+    assert update is None
+    assert new_cursor == cursor
+
+
+def test_each_subscriber_gets_full_state_then_only_new_chat_messages() -> None:
+    materializer = TaskUpdateMaterializer()
+    task_id = TaskID()
+    materializer.append_messages(task_id, _turn("first"))
+
+    first_update, first_cursor = materializer.read(task_id, CLAUDE_CODE_HARNESS, TaskUpdateCursor())
+    assert first_update is not None
+    assert len(first_update.chat_messages) == 2
+
+    materializer.append_messages(task_id, _turn("second"))
+    second_update, second_cursor = materializer.read(task_id, CLAUDE_CODE_HARNESS, first_cursor)
+    assert second_update is not None
+    assert [m.content[0] for m in second_update.chat_messages][-1] == TextBlock(text="second")
+    assert len(second_update.chat_messages) == 2
+    assert second_cursor.version == 8
+
+    # A subscriber that attaches late starts from an empty cursor and sees everything.
+    late_update, late_cursor = materializer.read(task_id, CLAUDE_CODE_HARNESS, TaskUpdateCursor())
+    assert late_update is not None
+    assert len(late_update.chat_messages) == 4
+    assert late_cursor == second_cursor
+
+
+def test_messages_are_folded_once_regardless_of_subscriber_count() -> None:
+    materializer = TaskUpdateMaterializer()
+    task_id = TaskID()
+    materializer.append_messages(task_id, _turn("only"))
+    original_fold = task_update_materializer.convert_agent_messages_to_task_update
+
+    with patch.object(
+        task_update_materializer, "convert_agent_messages_to_task_update", side_effect=original_fold
+    ) as fold:
+        updates = [materializer.read(task_id, CLAUDE_CODE_HARNESS, TaskUpdateCursor())[0] for _ in range(10)]
+
+    assert fold.call_count == 1
+    assert all(update is not None and len(update.chat_messages) == 2 for update in updates)
+
+
+def test_forget_drops_the_folded_state() -> None:
+    materializer = TaskUpdateMaterializer()
+    task_id = TaskID()
+    materializer.append_messages(task_id, _turn("gone"))
+
+    materializer.forget(task_id)
+
+    assert materializer.read(task_id, CLAUDE_CODE_HARNESS, TaskUpdateCursor())[0] is None
+
+
+def test_fold_backlog_folds_only_once_the_pending_list_is_full() -> None:
+    materializer = TaskUpdateMaterializer()
+    task_id = TaskID()
+    original_fold = task_update_materializer.convert_agent_messages_to_task_update
+
+    with (
+        patch.object(task_update_materializer, "_MAX_PENDING_MESSAGES", 8),
+        patch.object(
+            task_update_materializer, "convert_agent_messages_to_task_update", side_effect=original_fold
+        ) as fold,
+    ):
+        materializer.append_messages(task_id, _turn("first"))
+        materializer.fold_backlog(task_id, CLAUDE_CODE_HARNESS)
+        assert fold.call_count == 0
+        materializer.append_messages(task_id, _turn("second"))
+        assert fold.call_count == 0
+        materializer.fold_backlog(task_id, CLAUDE_CODE_HARNESS)
+        assert fold.call_count == 1
+        update, cursor = materializer.read(task_id, CLAUDE_CODE_HARNESS, TaskUpdateCursor())
+
+    # Nothing was left pending for the reader to fold.
+    assert fold.call_count == 1
+    assert update is not None and len(update.chat_messages) == 4
+    assert cursor.version == 8
+
+
+def test_a_replayed_log_is_read_lazily_and_folded_ahead_of_live_messages() -> None:
+    task_id = TaskID()
+    first_turn = _turn("first")
+    second_turn = _turn("second")
+    live_turn = _turn("live")
+    read_pages: list[int] = []
+
+    def read_log() -> Iterator[list[Message]]:
+        for page_index, page in enumerate((first_turn, second_turn)):
+            read_pages.append(page_index)
+            yield page
+
+    replayed = TaskUpdateMaterializer()
+    replayed.replay_log(task_id, read_log())
+    replayed.append_messages(task_id, live_turn)
+    assert read_pages == []
+    materializer = TaskUpdateMaterializer()
+    materializer.append_messages(task_id, [*first_turn, *second_turn, *live_turn])
+
+    update, cursor = replayed.read(task_id, CLAUDE_CODE_HARNESS, TaskUpdateCursor())
+
+    assert read_pages == [0, 1]
+    assert (update, cursor) == materializer.read(task_id, CLAUDE_CODE_HARNESS, TaskUpdateCursor())
+    assert cursor.version == 12
+
+
+def test_a_restored_checkpoint_folds_to_the_same_state_as_the_full_log(tmp_path: Path) -> None:
+    store = TaskUpdateCheckpointStore(tmp_path)
+    task_id = TaskID()
+    first_turn = _turn("first")
+    second_turn = _turn("second")
+
+    with patch.object(task_update_materializer, "_CHECKPOINT_INTERVAL", 4):
+        materializer = TaskUpdateMaterializer(store)
+        materializer.append_messages(task_id, first_turn)
+        materializer.read(task_id, CLAUDE_CODE_HARNESS, TaskUpdateCursor())
+        materializer.append_messages(task_id, second_turn)
+        materializer.read(task_id, CLAUDE_CODE_HARNESS, TaskUpdateCursor())
+
+    # The second fold was also due, so the checkpoint covers both turns.
+    checkpoint = store.load(task_id)
+    assert checkpoint is not None
+    assert checkpoint.persisted_message_count == 8
+    assert checkpoint.last_persisted_message_id == second_turn[-1].message_id
+
+    restored = TaskUpdateMaterializer(store)
+    restored.restore(task_id, checkpoint)
+    third_turn = _turn("third")
+    restored.append_messages(task_id, third_turn)
+    materializer.append_messages(task_id, third_turn)
+
+    assert restored.read(task_id, CLAUDE_CODE_HARNESS, TaskUpdateCursor()) == materializer.read(
+        task_id, CLAUDE_CODE_HARNESS, TaskUpdateCursor()
+    )
+
+    restored.forget(task_id)
+    assert store.load(task_id) is None
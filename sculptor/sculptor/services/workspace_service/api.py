@@ -66,6 +66,16 @@ class FileAtRefResult(FrozenModel):
     encoding: Literal["utf-8", "base64"]
 
 
+class FileSearchMatch(FrozenModel):
+    """A workspace file path matching a fuzzy search query."""
+
+    path: str
+    # Higher is a better match; only comparable between results of the same query.
+    score: int
+    # Indices of the characters of `path` that matched the query, for highlighting.
+    matched_indices: tuple[int, ...]
+
+
 class CommitFileChange(FrozenModel):
     """Per-file change within a single commit."""
 
@@ -325,8 +335,8 @@ class WorkspaceService(Service, ABC):
         """
         Regenerate workspace diff if needed (e.g., files changed).
 
-        Called by agents after file modifications. For now, always refreshes.
-        In the future, may check if files actually changed before regenerating.
+        Called by agents after file modifications. Implementations may reuse the
+        diffs of files that did not change since the previous refresh.
 
         Args:
             workspace_id: The workspace to potentially refresh diff for.
@@ -524,6 +534,35 @@ class WorkspaceService(Service, ABC):
                 (e.g. transient lock contention) and the file list cannot be produced.
         """
 
+    @abstractmethod
+    def search_workspace_files(
+        self,
+        workspace_id: WorkspaceID,
+        query: str,
+        limit: int,
+        transaction: DataModelTransaction,
+    ) -> list[FileSearchMatch]:
+        """
+        Fuzzy-search the workspace's file paths.
+
+        Matches `query` case-insensitively as a subsequence of each path (whitespace
+        is ignored) and ranks contiguous matches, matches in the file name and
+        matches at word starts first.
+
+        Args:
+            workspace_id: The workspace to search.
+            query: The text typed by the user. An empty query returns the shortest paths.
+            limit: Maximum number of matches to return.
+            transaction: Database transaction for atomicity.
+
+        Returns:
+            Up to `limit` matches, best first.
+
+        Raises:
+            WorkspaceNotFoundError: If the workspace does not exist or environment is not ready.
+            WorkspaceFilesUnavailableError: If the file list cannot be produced.
+        """
+
     @abstractmethod
     def read_file_at_ref(
         self,
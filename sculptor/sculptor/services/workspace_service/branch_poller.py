@@ -18,11 +18,15 @@ clone with its own ``refs/remotes``, so a ref freshly fetched into one clone is
 invisible from any other repo (including the project's own). Keying on the common
 dir scans each distinct repo exactly once and lets a clone see its own fetches.
 
-Both scans are stat-first: a cycle stats the relevant ref files (``HEAD`` for the
-branch; ``packed-refs`` + ``refs/remotes`` for the targets) and only reads/forks
-``git`` when a signature actually moved, so an idle cycle forks nothing. A
-periodic forced recompute covers ref-mutation shapes that leave the signature
-unchanged (e.g. a loose ref being packed).
+Where inotify is available (``GitRefWatcher``), each git dir and common git dir
+is watched and a change is handled as soon as it is reported, between scans; a
+scan then only discovers new and removed workspaces and re-reads nothing that is
+watched and quiet. Anything that cannot be watched falls back to the stat-first
+poll: a cycle stats the relevant ref files (``HEAD`` for the branch;
+``packed-refs`` + ``refs/remotes`` for the targets) and only reads/forks ``git``
+when a signature actually moved, so an idle cycle forks nothing. A periodic
+forced recompute covers ref-mutation shapes that leave the signature unchanged
+(e.g. a loose ref being packed).
 
 Results are fanned out as ``WorkspaceBranchInfo`` / ``WorkspaceTargetBranchesInfo``
 — the same streaming types as before — so the downstream stream conversion and
@@ -31,6 +35,7 @@ websocket connections subscribe rather than each starting their own pollers.
 """
 
 import threading
+import time
 from pathlib import Path
 from queue import Queue
 from typing import Callable
@@ -46,21 +51,25 @@ from sculptor.services.data_model_service.api import DataModelService
 from sculptor.services.git_repo_service.default_implementation import LocalReadOnlyGitRepo
 from sculptor.services.git_repo_service.error_types import GitRepoError
 from sculptor.services.git_repo_service.error_types import GitRepoNotFoundError
+from sculptor.services.git_repo_service.git_dirs import resolve_git_dirs
 from sculptor.services.git_repo_service.git_ref_scanning import RemoteRefsSignature
 from sculptor.services.git_repo_service.git_ref_scanning import StatSignature
 from sculptor.services.git_repo_service.git_ref_scanning import read_current_branch
 from sculptor.services.git_repo_service.git_ref_scanning import remote_refs_signature
-from sculptor.services.git_repo_service.git_ref_scanning import resolve_git_dirs
 from sculptor.services.git_repo_service.git_ref_scanning import stat_signature
+from sculptor.services.git_repo_service.git_ref_watching import GitRefChanges
+from sculptor.services.git_repo_service.git_ref_watching import GitRefWatcher
 from sculptor.web.data_types import StreamingUpdateSourceTypes
 from sculptor.web.data_types import WorkspaceBranchInfo
 from sculptor.web.data_types import WorkspaceTargetBranchesInfo
 
 # Matches the previous per-workspace poll interval so detection latency (and the
-# e2e waits keyed to it) are unchanged.
+# e2e waits keyed to it) are unchanged for anything that is polled rather than
+# watched. Also how quickly a new workspace is picked up.
 _BRANCH_POLL_INTERVAL_IN_SECONDS = 3.0
-# Periodic forced re-read even when the HEAD stat signature looks unchanged — the
-# backstop for filesystems with coarse mtime granularity. ~20 cycles ≈ 60s.
+# Periodic forced re-read of polled repos even when the HEAD stat signature looks
+# unchanged — the backstop for filesystems with coarse mtime granularity. ~20
+# cycles ≈ 60s.
 _FALLBACK_RECOMPUTE_EVERY_CYCLES = 20
 
 
@@ -108,6 +117,20 @@ class WorkspaceBranchPoller:
 
         self._cycle = 0
 
+        # inotify watches, created by the scan loop (None where unavailable, and in
+        # tests that drive ``_scan_once`` without one). Used only by the scan
+        # thread; ``_watcher_lock`` guards ``stop``'s wake-up against the loop
+        # closing it.
+        self._watcher: GitRefWatcher | None = None
+        self._watcher_lock = threading.Lock()
+        self._watched_roots: set[Path] = set()
+        # Live workspaces as of the last scan, so a reported change can be handled
+        # without re-reading the workspace list. Scan-thread-only.
+        self._workspaces_by_git_dir: dict[Path, list[tuple[Workspace, Path]]] = {}
+        self._common_dir_by_git_dir: dict[Path, Path] = {}
+        self._members_by_common_dir: dict[Path, list[Workspace]] = {}
+        self._working_dir_by_common_dir: dict[Path, Path] = {}
+
     # -- Observer registry -------------------------------------------------
 
     def add_observer(self, queue: Queue[StreamingUpdateSourceTypes]) -> None:
@@ -161,24 +184,51 @@ class WorkspaceBranchPoller:
 
     def stop(self) -> None:
         self._stop_event.set()
+        with self._watcher_lock:
+            if self._watcher is not None:
+                self._watcher.wake()
 
     def _run_loop(self) -> None:
-        while not self._stop_event.wait(_BRANCH_POLL_INTERVAL_IN_SECONDS):
-            try:
-                self._scan_once()
-            except Exception as e:
-                logger.warning("Workspace branch scan cycle failed: {}", e)
+        with self._watcher_lock:
+            if not self._stop_event.is_set():
+                self._watcher = GitRefWatcher.build()
+        try:
+            next_scan_at = time.monotonic() + _BRANCH_POLL_INTERVAL_IN_SECONDS
+            while not self._stop_event.is_set():
+                remaining = next_scan_at - time.monotonic()
+                try:
+                    if remaining <= 0:
+                        next_scan_at = time.monotonic() + _BRANCH_POLL_INTERVAL_IN_SECONDS
+                        self._scan_once()
+                    elif self._watcher is None:
+                        self._stop_event.wait(remaining)
+                    else:
+                        changes = self._watcher.wait_for_changes(remaining)
+                        if changes and not self._stop_event.is_set():
+                            self._apply_ref_changes(changes)
+                except Exception as e:
+                    logger.warning("Workspace branch scan cycle failed: {}", e)
+        finally:
+            with self._watcher_lock:
+                if self._watcher is not None:
+                    self._watcher.close()
+                    self._watcher = None
 
     # -- Scan --------------------------------------------------------------
 
-    def _scan_once(self) -> None:
+    def _scan_once(self, is_everything_changed: bool = False) -> None:
         self._cycle += 1
         force_recompute = self._cycle % _FALLBACK_RECOMPUTE_EVERY_CYCLES == 0
+        # Changes reported since the loop last waited are handled by this scan.
+        changes = self._watcher.read_changes() if self._watcher is not None else GitRefChanges()
+        is_everything_changed = is_everything_changed or changes.is_overflowed
 
         with self._data_model_service.open_transaction(RequestID()) as transaction:
             workspaces = list(transaction.get_workspaces())
 
         live_workspace_ids: set[WorkspaceID] = set()
+        workspaces_by_git_dir: dict[Path, list[tuple[Workspace, Path]]] = {}
+        common_dir_by_git_dir: dict[Path, Path] = {}
         # Group live workspaces by the common git dir they share so the repo-level
         # remote scan runs once per repo, not once per workspace. ``working_dir``
         # is a representative checkout to fork git from for that repo.
@@ -196,23 +246,91 @@ class WorkspaceBranchPoller:
                 continue
             git_dir, common_dir = git_dirs
             live_workspace_ids.add(workspace.object_id)
+            # Watched means watched since before this scan, so that nothing changed
+            # between the last read and the watch being added can be missed.
+            is_watched = self._ensure_watched(git_dir, is_common_dir=False)
             # Branch first: the target projection's no-remote fallback excludes the
             # workspace's own (current) branch, so the branch cache must be current.
-            self._update_branch(workspace, working_dir, git_dir, force_recompute)
+            is_head_changed = (
+                is_everything_changed or git_dir in changes.head_git_dirs or (force_recompute and not is_watched)
+            )
+            self._update_branch(workspace, working_dir, git_dir, is_head_changed, is_watched)
+            workspaces_by_git_dir.setdefault(git_dir, []).append((workspace, working_dir))
+            common_dir_by_git_dir[git_dir] = common_dir
             members_by_common_dir.setdefault(common_dir, []).append(workspace)
             working_dir_by_common_dir.setdefault(common_dir, working_dir)
 
         for common_dir, members in members_by_common_dir.items():
-            self._scan_remote_branches(common_dir, working_dir_by_common_dir[common_dir], force_recompute)
+            is_watched = self._ensure_watched(common_dir, is_common_dir=True)
+            is_refs_changed = (
+                is_everything_changed
+                or self._is_target_source_changed(common_dir, changes)
+                or (force_recompute and not is_watched)
+            )
+            self._scan_remote_branches(common_dir, working_dir_by_common_dir[common_dir], is_refs_changed, is_watched)
             for workspace in members:
                 self._update_target_branches(workspace, common_dir)
 
-        self._prune(live_workspace_ids, set(members_by_common_dir))
+        self._workspaces_by_git_dir = workspaces_by_git_dir
+        self._common_dir_by_git_dir = common_dir_by_git_dir
+        self._members_by_common_dir = members_by_common_dir
+        self._working_dir_by_common_dir = working_dir_by_common_dir
+        self._prune(live_workspace_ids, set(workspaces_by_git_dir), set(members_by_common_dir))
+
+    def _apply_ref_changes(self, changes: GitRefChanges) -> None:
+        """Handle changes reported by the watcher between scans, for the workspaces found by the last scan."""
+        if changes.is_overflowed:
+            # Events were dropped, so anything may have moved.
+            self._scan_once(is_everything_changed=True)
+            return
+        # The no-remote fallback excludes each workspace's current branch, so a
+        # branch change can change its repo's targets too.
+        affected_common_dirs: set[Path] = set()
+        for git_dir in changes.head_git_dirs:
+            for workspace, working_dir in self._workspaces_by_git_dir.get(git_dir, ()):
+                self._update_branch(workspace, working_dir, git_dir, force_recompute=True, is_watched=True)
+            if git_dir in self._common_dir_by_git_dir:
+                affected_common_dirs.add(self._common_dir_by_git_dir[git_dir])
+        for common_dir, members in self._members_by_common_dir.items():
+            if self._is_target_source_changed(common_dir, changes):
+                working_dir = self._working_dir_by_common_dir[common_dir]
+                self._scan_remote_branches(common_dir, working_dir, force_recompute=True, is_watched=True)
+            elif common_dir not in affected_common_dirs:
+                continue
+            for workspace in members:
+                self._update_target_branches(workspace, common_dir)
 
-    def _update_branch(self, workspace: Workspace, working_dir: Path, git_dir: Path, force_recompute: bool) -> None:
+    def _is_target_source_changed(self, common_dir: Path, changes: GitRefChanges) -> bool:
+        if common_dir in changes.remote_ref_common_dirs:
+            return True
+        # Local branches only matter as the fallback for a repo without remotes.
+        return common_dir in changes.local_ref_common_dirs and not self._remote_branches_by_common_dir.get(common_dir)
+
+    def _ensure_watched(self, root: Path, is_common_dir: bool) -> bool:
+        """Whether ``root`` was already being watched; starts watching it if not (and if possible)."""
+        watcher = self._watcher
+        if watcher is None:
+            return False
+        if is_common_dir:
+            if watcher.is_watching_common_dir(root):
+                return True
+            is_now_watched = watcher.watch_common_dir(root)
+        else:
+            if watcher.is_watching_git_dir(root):
+                return True
+            is_now_watched = watcher.watch_git_dir(root)
+        if is_now_watched:
+            self._watched_roots.add(root)
+        return False
+
+    def _update_branch(
+        self, workspace: Workspace, working_dir: Path, git_dir: Path, force_recompute: bool, is_watched: bool
+    ) -> None:
         workspace_id = workspace.object_id
-        head_signature = stat_signature(git_dir / "HEAD")
         already_known = workspace_id in self._branch_info_by_workspace
+        if is_watched and already_known and not force_recompute:
+            return  # Watched and quiet since the last read — not even a stat.
+        head_signature = stat_signature(git_dir / "HEAD")
         if (
             not force_recompute
             and already_known
@@ -236,14 +354,19 @@ class WorkspaceBranchPoller:
             self._refresh_diff_safely(workspace_id)
         self._publish_branch_info(WorkspaceBranchInfo(current_branch=current_branch, workspace_id=workspace_id))
 
-    def _scan_remote_branches(self, common_dir: Path, working_dir: Path, force_recompute: bool) -> None:
+    def _scan_remote_branches(
+        self, common_dir: Path, working_dir: Path, force_recompute: bool, is_watched: bool
+    ) -> None:
         """Refresh the cached merge-target candidates for the repo at ``common_dir``.
 
-        Stat-first: an unchanged remote-ref signature skips the git fork. Computed
+        Stat-first: an unchanged remote-ref signature skips the git fork, and a
+        watched repo with no reported change skips the stat walk too. Computed
         once per common dir per cycle and reused for every workspace on that repo.
         """
-        signature = remote_refs_signature(common_dir)
         already_scanned = common_dir in self._remote_branches_by_common_dir
+        if is_watched and already_scanned and not force_recompute:
+            return
+        signature = remote_refs_signature(common_dir)
         unchanged = self._remote_signature_by_common_dir.get(common_dir) == signature
         if not force_recompute and already_scanned and unchanged:
             return  # Stat fast-path: remote refs unchanged since last scan — no fork.
@@ -296,7 +419,9 @@ class WorkspaceBranchPoller:
             # until the next branch change or an agent-initiated refresh.
             logger.warning("Failed to refresh workspace diff on branch change: {}", e)
 
-    def _prune(self, live_workspace_ids: set[WorkspaceID], live_common_dirs: set[Path]) -> None:
+    def _prune(
+        self, live_workspace_ids: set[WorkspaceID], live_git_dirs: set[Path], live_common_dirs: set[Path]
+    ) -> None:
         stale_ids = (set(self._branch_info_by_workspace) | set(self._target_info_by_workspace)) - live_workspace_ids
         # Pop from the observer-visible caches under the lock (add_observer may be
         # iterating them); the head-signature cache is scan-thread-only.
@@ -311,3 +436,7 @@ class WorkspaceBranchPoller:
             self._remote_signature_by_common_dir.pop(common_dir, None)
             self._remote_branches_by_common_dir.pop(common_dir, None)
             self._local_branches_by_common_dir.pop(common_dir, None)
+        if self._watcher is not None:
+            for root in self._watched_roots - live_git_dirs - live_common_dirs:
+                self._watcher.unwatch(root)
+            self._watched_roots &= live_git_dirs | live_common_dirs
@@ -9,7 +9,9 @@ a single ``_scan_once()`` and assert on what is fanned out to observer queues:
   by common git dir) — including the no-remote fallback that excludes the
   workspace's own branch, and
 - an idle re-scan of an unchanged repo forks no git (symbolic ``HEAD`` read from
-  the file; remote-ref stat signature unchanged).
+  the file; remote-ref stat signature unchanged), and
+- with an inotify watcher, changes are applied as they are reported and an idle
+  re-scan does not even stat the refs.
 """
 
 from contextlib import contextmanager
@@ -21,10 +23,12 @@ from unittest.mock import patch
 import pytest
 
 import sculptor.services.git_repo_service.default_implementation as git_repo_default
+import sculptor.services.workspace_service.branch_poller as branch_poller
 from sculptor.foundation.concurrency_group import ConcurrencyGroup
 from sculptor.primitives.ids import ProjectID
 from sculptor.primitives.ids import WorkspaceID
 from sculptor.services.git_repo_service.default_implementation import LocalWritableGitRepo
+from sculptor.services.git_repo_service.git_ref_watching import GitRefWatcher
 from sculptor.services.workspace_service.branch_poller import WorkspaceBranchPoller
 from sculptor.testing.local_git_repo import LocalGitRepo
 from sculptor.web.data_types import StreamingUpdateSourceTypes
@@ -251,3 +255,65 @@ def test_remote_scan_runs_once_per_repo_across_worktrees(
 
     remote_listing_calls = [call for call in spy.call_args_list if {"branch", "-r"} <= set(call.args[1])]
     assert len(remote_listing_calls) == 1
+
+
+@pytest.fixture
+def ref_watcher() -> Generator[GitRefWatcher, None, None]:
+    watcher = GitRefWatcher.build()
+    if watcher is None:
+        pytest.skip("inotify is unavailable")
+    yield watcher
+    watcher.close()
+
+
+def test_watched_branch_and_remote_changes_are_applied_between_scans(
+    base_repo: Path, tmp_path: Path, test_root_concurrency_group: ConcurrencyGroup, ref_watcher: GitRefWatcher
+) -> None:
+    _add_remote_ref(base_repo, "origin/main")
+    worktree = tmp_path / "ws"
+    _add_worktree(base_repo, worktree, "wsbranch")
+    workspace = _FakeWorkspace(WorkspaceID(), ProjectID())
+    refresh_calls: list[WorkspaceID] = []
+    poller = _build_poller(
+        [workspace], {workspace.object_id: worktree}, test_root_concurrency_group, refresh_calls=refresh_calls
+    )
+    poller._watcher = ref_watcher
+    queue: Queue[StreamingUpdateSourceTypes] = Queue()
+    poller.add_observer(queue)
+    poller._scan_once()
+    _drain(queue)
+
+    LocalGitRepo(worktree).run_git(["checkout", "-b", "switched"])
+    _add_remote_ref(base_repo, "upstream/feature")
+    poller._apply_ref_changes(ref_watcher.wait_for_changes(timeout=5.0))
+
+    emitted = _drain(queue)
+    branch_infos = [item for item in emitted if isinstance(item, WorkspaceBranchInfo)]
+    target_infos = [item for item in emitted if isinstance(item, WorkspaceTargetBranchesInfo)]
+    assert [info.current_branch for info in branch_infos] == ["switched"]
+    assert refresh_calls == [workspace.object_id]
+    assert set(target_infos[-1].target_branches) == {"origin/main", "upstream/feature"}
+
+
+def test_idle_rescan_of_watched_repo_reads_nothing(
+    base_repo: Path, tmp_path: Path, test_root_concurrency_group: ConcurrencyGroup, ref_watcher: GitRefWatcher
+) -> None:
+    """Once a repo is watched, a scan that was not told of any change neither stats its refs nor forks git."""
+    _add_remote_ref(base_repo, "origin/main")
+    worktree = tmp_path / "ws"
+    _add_worktree(base_repo, worktree, "wsbranch")
+    workspace = _FakeWorkspace(WorkspaceID(), ProjectID())
+    poller = _build_poller([workspace], {workspace.object_id: worktree}, test_root_concurrency_group)
+    poller._watcher = ref_watcher
+    poller._scan_once()
+
+    with (
+        patch.object(branch_poller, "stat_signature", wraps=branch_poller.stat_signature) as stat_spy,
+        patch.object(branch_poller, "remote_refs_signature", wraps=branch_poller.remote_refs_signature) as walk_spy,
+        patch.object(git_repo_default, "run_git_command_local", wraps=git_repo_default.run_git_command_local) as spy,
+    ):
+        for _ in range(branch_poller._FALLBACK_RECOMPUTE_EVERY_CYCLES):
+            poller._scan_once()
+
+    assert (stat_spy.call_count, walk_spy.call_count, spy.call_count) == (0, 0, 0)
+    assert poller.get_current_branch(workspace.object_id) == "wsbranch"
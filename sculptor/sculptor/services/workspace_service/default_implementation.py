@@ -1,8 +1,10 @@
 import base64
+import dataclasses
 import json
 import re
 import threading
 import uuid
+from collections import OrderedDict
 from collections.abc import Callable
 from contextlib import contextmanager
 from pathlib import Path
@@ -47,12 +49,17 @@ from sculptor.services.data_model_service.data_types import WorkspaceFieldUpdate
 from sculptor.services.dependency_management_service import DependencyManagementService
 from sculptor.services.git_repo_service.git_commands import run_git_command_local
 from sculptor.services.git_repo_service.git_errors import GitCommandFailure
+from sculptor.services.git_repo_service.git_object_reader import close_git_object_readers_under
+from sculptor.services.git_repo_service.git_object_reader import get_git_object_reader
+from sculptor.services.git_repo_service.git_object_reader import start_git_object_readers
+from sculptor.services.git_repo_service.git_object_reader import stop_git_object_readers
 from sculptor.services.project_service.api import ProjectService
 from sculptor.services.user_config.user_config import get_user_config_instance
 from sculptor.services.workspace_service.api import CommitFileChange
 from sculptor.services.workspace_service.api import CommitRecord
 from sculptor.services.workspace_service.api import FileAtRefResult
 from sculptor.services.workspace_service.api import FileNotFoundAtRefError
+from sculptor.services.workspace_service.api import FileSearchMatch
 from sculptor.services.workspace_service.api import GitOperationResult
 from sculptor.services.workspace_service.api import WorkspaceFilesUnavailableError
 from sculptor.services.workspace_service.api import WorkspaceNotFoundError
@@ -70,11 +77,18 @@ from sculptor.services.workspace_service.environment_manager.environments.local_
 from sculptor.services.workspace_service.environment_manager.environments.local_terminal_manager import (
     stop_terminals_for_environment,
 )
+from sculptor.services.workspace_service.environment_manager.environments.pty_reactor import start_pty_reactor
+from sculptor.services.workspace_service.environment_manager.environments.pty_reactor import stop_pty_reactor
 from sculptor.services.workspace_service.environment_manager.environments.worktree_strategy import remove_worktree
+from sculptor.services.workspace_service.file_index import WorkspaceFileIndex
+from sculptor.services.workspace_service.incremental_diff import WorkspaceDiffCache
+from sculptor.services.workspace_service.setup_cache import SetupCommandCache
 from sculptor.services.workspace_service.setup_command_runner import DefaultSetupStateProvider
 from sculptor.services.workspace_service.setup_command_runner import SetupCommandRunner
 from sculptor.services.workspace_service.setup_command_runner import SetupStateChanged
 from sculptor.services.workspace_service.setup_command_runner import SetupStateProvider
+from sculptor.services.workspace_service.workspace_pool import WorkspacePool
+from sculptor.services.workspace_service.workspace_pool import WorkspacePoolKey
 from sculptor.utils.build import build_sculpt_backend_env
 from sculptor.utils.build import get_sculpt_bin_dir
 from sculptor.utils.timeout import timeout_monitor
@@ -90,6 +104,9 @@ _GIT_COMMAND_TIMEOUT = 30.0
 _DEFAULT_DIFF_CONTEXT_LINES = 3
 _MAX_DIFF_CONTEXT_LINES = 50
 
+# Number of workspace file indexes kept in memory; the least recently queried one is dropped past it.
+_MAX_FILE_INDEXES = 8
+
 # Shell snippet that produces a unified diff for every untracked file.
 # Used by both the uncommitted diff and the target-branch diff so that new
 # (un-added) files appear in both views.
@@ -114,23 +131,48 @@ class DefaultWorkspaceService(WorkspaceService):
     project_service: ProjectService
     workspace_sync_dir: Path
     backend_port: int
+    # Where setup outputs are cached for projects that declare cache inputs/outputs; None disables the cache.
+    setup_cache_dir: Path | None = None
 
     _diff_lock_by_workspace: dict[WorkspaceID, threading.Lock] = PrivateAttr(default_factory=dict)
     _diff_lock_map_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    # Per-file diff chunks from each workspace's previous refresh; only used under its diff lock.
+    _diff_cache_by_workspace: dict[WorkspaceID, WorkspaceDiffCache] = PrivateAttr(default_factory=dict)
+    # Least recently queried first; see _MAX_FILE_INDEXES.
+    _file_index_by_workspace: OrderedDict[WorkspaceID, WorkspaceFileIndex] = PrivateAttr(default_factory=OrderedDict)
+    _file_index_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
     _environment_setup_locks: dict[WorkspaceID, threading.Lock] = PrivateAttr(default_factory=dict)
     _environment_setup_locks_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
     _setup_runner_instance: SetupCommandRunner | None = PrivateAttr(default=None)
     _setup_runner_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _setup_cache_instance: SetupCommandCache | None = PrivateAttr(default=None)
     _branch_poller_instance: WorkspaceBranchPoller | None = PrivateAttr(default=None)
     _branch_poller_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _workspace_pool_instance: WorkspacePool | None = PrivateAttr(default=None)
+    _workspace_pool_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
 
     @property
     def setup_runner(self) -> SetupCommandRunner:
         with self._setup_runner_lock:
             if self._setup_runner_instance is None:
-                self._setup_runner_instance = SetupCommandRunner(concurrency_group=self.concurrency_group)
+                self._setup_runner_instance = SetupCommandRunner(
+                    concurrency_group=self.concurrency_group, setup_cache=self._get_setup_cache()
+                )
             return self._setup_runner_instance
 
+    def _get_setup_cache(self) -> SetupCommandCache | None:
+        """The cache shared by the workspaces' and the pool's setup runners; call under ``_setup_runner_lock``."""
+        if self.setup_cache_dir is not None and self._setup_cache_instance is None:
+            self._setup_cache_instance = SetupCommandCache(
+                cache_dir=self.setup_cache_dir, get_max_size_bytes=self._get_setup_cache_size_limit_bytes
+            )
+        return self._setup_cache_instance
+
+    @staticmethod
+    def _get_setup_cache_size_limit_bytes() -> int:
+        user_config = get_user_config_instance()
+        return user_config.setup_cache_size_limit_mb * 1024 * 1024 if user_config is not None else 0
+
     @property
     def _branch_poller(self) -> WorkspaceBranchPoller:
         """The process-global git-state scanner this service owns.
@@ -150,6 +192,20 @@ class DefaultWorkspaceService(WorkspaceService):
                 )
             return self._branch_poller_instance
 
+    @property
+    def _workspace_pool(self) -> WorkspacePool:
+        """Pre-created environments that new WORKTREE/CLONE workspaces claim; lazily built like ``setup_runner``."""
+        with self._workspace_pool_lock:
+            if self._workspace_pool_instance is None:
+                with self._setup_runner_lock:
+                    setup_cache = self._get_setup_cache()
+                self._workspace_pool_instance = WorkspacePool(
+                    concurrency_group=self.concurrency_group,
+                    environment_manager=self.environment_manager,
+                    setup_cache=setup_cache,
+                )
+            return self._workspace_pool_instance
+
     def add_observer(self, queue: Queue[StreamingUpdateSourceTypes]) -> None:
         self._branch_poller.add_observer(queue)
 
@@ -254,6 +310,7 @@ class DefaultWorkspaceService(WorkspaceService):
             project_service=project_service,
             workspace_sync_dir=settings.workspace_sync_path,
             backend_port=settings.BACKEND_PORT,
+            setup_cache_dir=settings.setup_cache_path,
         )
 
     def _get_diff_lock(self, workspace_id: WorkspaceID) -> threading.Lock:
@@ -263,45 +320,55 @@ class DefaultWorkspaceService(WorkspaceService):
                 self._diff_lock_by_workspace[workspace_id] = threading.Lock()
         return self._diff_lock_by_workspace[workspace_id]
 
+    def _get_diff_cache(self, workspace_id: WorkspaceID) -> WorkspaceDiffCache:
+        """Get the per-workspace incremental diff cache, creating one lazily if needed."""
+        with self._diff_lock_map_lock:
+            return self._diff_cache_by_workspace.setdefault(workspace_id, WorkspaceDiffCache())
+
     def start(self) -> None:
         """Start the workspace service."""
+        start_pty_reactor(self.concurrency_group)
+        start_git_object_readers(self.concurrency_group)
         self._branch_poller.start()
+        workspace_pool_size = self._get_workspace_pool_size()
+        if workspace_pool_size > 0:
+            with self.data_model_service.open_transaction(request_id=RequestID()) as transaction:
+                project_ids = {project.object_id for project in transaction.get_projects()}
+            self._workspace_pool.start(workspace_pool_size, project_ids)
 
     def stop(self) -> None:
         """Stop the workspace service.
 
         Stops all active terminals before the ConcurrencyGroup shuts down,
-        ensuring pty processes and reader threads are cleanly terminated.
+        ensuring pty processes and the pty reactor thread are cleanly terminated,
+        and stops the shared git object readers' processes and idle sweep.
         Also cancels any in-flight setup-command subprocesses and the branch
-        scan loop.
+        scan loop, and stops filling the workspace pool; its pre-created
+        environments stay on disk for the next start to adopt.
         """
         if self._branch_poller_instance is not None:
             self._branch_poller_instance.stop()
         if self._setup_runner_instance is not None:
             self._setup_runner_instance.stop_all()
+        if self._workspace_pool_instance is not None:
+            self._workspace_pool_instance.stop()
         stop_all_terminals()
+        stop_pty_reactor()
+        stop_git_object_readers()
 
     # Workspace Operations
 
     def _get_current_git_hash(self, project_path: Path) -> str | None:
         """Get the current HEAD git hash for a project."""
         try:
-            returncode, stdout, stderr = run_git_command_local(
-                self.concurrency_group,
-                ["git", "rev-parse", "HEAD"],
-                cwd=project_path,
-                check_output=False,
-                timeout=_GIT_COMMAND_TIMEOUT,
-                is_retry_safe=True,
-            )
-            if returncode == 0:
-                return stdout.strip()
-            else:
-                logger.warning("Failed to get git hash: {}", stderr)
-                return None
+            head = get_git_object_reader(project_path).get_info("HEAD")
         except GitCommandFailure as e:
             logger.warning("Failed to get git hash: {}", e)
             return None
+        if head is None:
+            logger.warning("Failed to get git hash: HEAD does not resolve in {}", project_path)
+            return None
+        return head.object_id
 
     def _resolve_default_target_branch(
         self,
@@ -362,21 +429,16 @@ class DefaultWorkspaceService(WorkspaceService):
             pass
 
         # 2. Check for common default branch names
-        for branch_name in ("main", "master"):
-            candidate = f"{remote}/{branch_name}"
-            try:
-                returncode, _stdout, _stderr = run_git_command_local(
-                    self.concurrency_group,
-                    ["git", "rev-parse", "--verify", f"refs/remotes/{candidate}"],
-                    cwd=project_path,
-                    check_output=False,
-                    timeout=_GIT_COMMAND_TIMEOUT,
-                    is_retry_safe=True,
-                )
-                if returncode == 0:
-                    return candidate
-            except GitCommandFailure:
-                continue
+        candidates = [f"{remote}/{branch_name}" for branch_name in ("main", "master")]
+        try:
+            infos = get_git_object_reader(project_path).get_infos(
+                [f"refs/remotes/{candidate}" for candidate in candidates]
+            )
+        except GitCommandFailure:
+            return None
+        for candidate, info in zip(candidates, infos):
+            if info is not None:
+                return candidate
 
         return None
 
@@ -385,20 +447,16 @@ class DefaultWorkspaceService(WorkspaceService):
 
         Returns ``None`` if neither local branch exists.
         """
-        for branch_name in ("main", "master"):
-            try:
-                returncode, _stdout, _stderr = run_git_command_local(
-                    self.concurrency_group,
-                    ["git", "rev-parse", "--verify", f"refs/heads/{branch_name}"],
-                    cwd=project_path,
-                    check_output=False,
-                    timeout=_GIT_COMMAND_TIMEOUT,
-                    is_retry_safe=True,
-                )
-                if returncode == 0:
-                    return branch_name
-            except GitCommandFailure:
-                continue
+        branch_names = ("main", "master")
+        try:
+            infos = get_git_object_reader(project_path).get_infos(
+                [f"refs/heads/{branch_name}" for branch_name in branch_names]
+            )
+        except GitCommandFailure:
+            return None
+        for branch_name, info in zip(branch_names, infos):
+            if info is not None:
+                return branch_name
         return None
 
     def _detect_fallback_branch_for_clone_target(self, project_path: Path) -> str | None:
@@ -472,6 +530,11 @@ class DefaultWorkspaceService(WorkspaceService):
         )
         created_workspace = transaction.upsert_workspace(workspace)
 
+        # Start warming the pool now, so that the next workspace (if not this one) skips the checkout.
+        pool_key = self._get_workspace_pool_key(project, created_workspace)
+        if pool_key is not None:
+            transaction.add_callback(lambda: self._fill_workspace_pool(pool_key))
+
         return created_workspace
 
     def update_workspace(
@@ -521,6 +584,10 @@ class DefaultWorkspaceService(WorkspaceService):
         updated_workspace = workspace.evolve(workspace.ref().is_deleted, True)
         transaction.upsert_workspace(updated_workspace)
         logger.debug("Soft-deleted workspace {}", workspace_id)
+        with self._diff_lock_map_lock:
+            self._diff_cache_by_workspace.pop(workspace_id, None)
+        with self._file_index_lock:
+            self._file_index_by_workspace.pop(workspace_id, None)
 
         # Delete the environment after the transaction commits so filesystem
         # stays in sync with the database.
@@ -549,6 +616,8 @@ class DefaultWorkspaceService(WorkspaceService):
                 # Cancel any in-flight setup-command subprocess before the
                 # environment directory is removed.
                 setup_runner.cancel(str(workspace_id))
+                # The workspace's cat-file processes would otherwise keep its object files open until they idle out.
+                close_git_object_readers_under(Path(environment_id))
                 # For WORKTREE workspaces, run `git worktree remove` in the user's
                 # repo before rmtree so the gitfile entry is cleaned up and the
                 # tri-state branch deletion policy is applied.
@@ -602,6 +671,56 @@ class DefaultWorkspaceService(WorkspaceService):
 
     # Environment Lifecycle
 
+    @staticmethod
+    def _get_workspace_pool_size() -> int:
+        user_config = get_user_config_instance()
+        return user_config.workspace_pool_size if user_config is not None else 0
+
+    def _get_workspace_pool_key(self, project: Project, workspace: Workspace) -> WorkspacePoolKey | None:
+        """The pool a new environment for ``workspace`` can come from, or None if it cannot be pooled."""
+        if workspace.initialization_strategy not in (
+            WorkspaceInitializationStrategy.CLONE,
+            WorkspaceInitializationStrategy.WORKTREE,
+        ):
+            return None
+        if self._get_workspace_pool_size() == 0:
+            return None
+        user_config = get_user_config_instance()
+        # Only pre-run the setup command for workspaces that would run it (``pending``) on first open.
+        setup_command = (
+            resolve_workspace_setup_command(project.workspace_setup_command)
+            if workspace.setup_status == "pending"
+            else None
+        )
+        return WorkspacePoolKey(
+            project_id=project.object_id,
+            project_path=project.get_local_user_path(),
+            initialization_strategy=workspace.initialization_strategy,
+            source_branch=workspace.source_branch,
+            setup_command=setup_command or None,
+            env_var_override=user_config.env_var_override_enabled if user_config is not None else False,
+        )
+
+    def _fill_workspace_pool(self, pool_key: WorkspacePoolKey) -> None:
+        self._workspace_pool.fill(pool_key, self._get_workspace_pool_size())
+
+    def _claim_pooled_environment(
+        self, pool_key: WorkspacePoolKey, workspace: Workspace, concurrency_group: ConcurrencyGroup
+    ) -> Environment | None:
+        """Take a pre-created environment for ``workspace`` from the pool, recording its finished setup run."""
+        claimed = self._workspace_pool.claim(pool_key, workspace.requested_branch_name, concurrency_group)
+        if claimed is None:
+            return None
+        if claimed.setup_state is not None:
+            # The setup command already ran in this checkout; record that run, and its log, as this workspace's.
+            environment = claimed.environment
+            self.setup_runner.adopt_finished_run(
+                dataclasses.replace(claimed.setup_state, workspace_id=str(workspace.object_id), pid=None),
+                state_dir=environment.to_host_path(environment.get_state_path()),
+                on_persist=self._persist_setup_state,
+            )
+        return claimed.environment
+
     @contextmanager
     def _environment_setup_lock(self, workspace_id: WorkspaceID) -> Generator[None, None, None]:
         """Per-workspace lock for environment setup.
@@ -664,6 +783,11 @@ class DefaultWorkspaceService(WorkspaceService):
             except (EnvironmentNotFoundError, EnvironmentConfigurationChangedError) as e:
                 logger.debug("Unable to resume environment: {}", e)
 
+                pool_key = self._get_workspace_pool_key(project, workspace)
+                if pool_key is not None:
+                    environment = self._claim_pooled_environment(pool_key, workspace, concurrency_group)
+                    self._fill_workspace_pool(pool_key)
+            if environment is None:
                 with (
                     timeout_monitor(
                         concurrency_group,
@@ -799,6 +923,7 @@ class DefaultWorkspaceService(WorkspaceService):
                     shutdown_event_source=environment.concurrency_group.shutdown_event,
                     state_dir=state_dir,
                     on_persist=self._persist_setup_state,
+                    working_directory=environment.get_working_directory(),
                 )
             except Exception as e:
                 logger.error("Failed to kick off workspace setup for {}: {}", workspace_id, e)
@@ -828,7 +953,14 @@ class DefaultWorkspaceService(WorkspaceService):
                 environment.destroy()
 
             if should_cleanup_environments:
-                self.environment_manager.cleanup_stale_environments()
+                self.environment_manager.cleanup_stale_environments(
+                    preserved_environment_ids=self._get_pooled_environment_ids()
+                )
+
+    def _get_pooled_environment_ids(self) -> set[str]:
+        with self._workspace_pool_lock:
+            pool = self._workspace_pool_instance
+        return pool.get_environment_ids() if pool is not None else set()
 
     # Workspace Diff Operations
 
@@ -937,6 +1069,7 @@ class DefaultWorkspaceService(WorkspaceService):
         working_dir: Path,
         context_lines: int = _DEFAULT_DIFF_CONTEXT_LINES,
         target_branch: str | None = None,
+        diff_cache: WorkspaceDiffCache | None = None,
     ) -> DiffArtifact:
         """Create a diff artifact using local git commands.
 
@@ -945,20 +1078,14 @@ class DefaultWorkspaceService(WorkspaceService):
             working_dir: Working directory for git commands.
             context_lines: Number of unchanged context lines around each diff hunk.
             target_branch: If set, compute target-branch diff using merge-base.
+            diff_cache: The workspace's per-file diff cache; without one every diff is computed in full.
         """
         if not isinstance(context_lines, int) or context_lines < 0:
             raise ValueError(f"context_lines must be a non-negative integer, got {context_lines!r}")
-        context_flag = f"-U{context_lines}"
 
-        # Commands to generate each diff type.
-        # -M enables rename detection so renames show as a single entry instead of delete+add.
-        untracked = _UNTRACKED_FILES_DIFF_CMD
-        uncommitted_diff_command = [
-            "bash",
-            "-c",
-            f"git --no-pager diff -M {context_flag} HEAD; {untracked}",
-        ]
-        uncommitted_diff = self._run_diff_command(uncommitted_diff_command, working_dir, "uncommitted")
+        uncommitted_diff = self._compute_working_tree_diff(
+            working_dir, "HEAD", context_lines, "uncommitted", diff_cache
+        )
 
         # Compute target-branch diff if requested.  Resolve the merge-base once
         # and reuse it both to compute the diff and to expose it on the artifact,
@@ -971,7 +1098,11 @@ class DefaultWorkspaceService(WorkspaceService):
             merge_base = self._get_merge_base(working_dir, target_branch)
             if merge_base is not None:
                 target_branch_merge_base = merge_base
-                target_branch_diff = self._compute_target_branch_diff(working_dir, merge_base, context_flag)
+                # Diff merge-base against the working tree (not HEAD) so the
+                # "All changes" view also includes uncommitted changes.
+                target_branch_diff = self._compute_working_tree_diff(
+                    working_dir, merge_base, context_lines, "target-branch", diff_cache
+                )
 
         # Detect per-file errors (e.g., files inside nested git repositories)
         file_errors = self._detect_file_errors(working_dir)
@@ -1000,29 +1131,33 @@ class DefaultWorkspaceService(WorkspaceService):
         except GitCommandFailure:
             return None
 
-    def _compute_target_branch_diff(
+    def _compute_working_tree_diff(
         self,
         working_dir: Path,
-        merge_base: str,
-        context_flag: str,
+        base_ref: str,
+        context_lines: int,
+        diff_kind: str,
+        diff_cache: WorkspaceDiffCache | None,
     ) -> str:
-        """Compute the diff from the given merge-base commit to the working tree.
+        """Diff the working tree, untracked files included, against *base_ref*.
 
-        This includes both committed and uncommitted changes so the "All changes"
-        view reflects the full delta against the target branch. The caller
-        resolves the merge-base (so the exact same commit can be exposed on the
-        artifact for the frontend's old-side content fetch).
+        Goes through the workspace's incremental diff cache when there is one, and
+        falls back to computing the whole diff if that fails.
         """
-        # Diff merge-base against the working tree (not HEAD) so uncommitted
-        # changes are included.  Also append untracked files, matching the
-        # approach used for the uncommitted diff.
-        untracked = _UNTRACKED_FILES_DIFF_CMD
+        if diff_cache is not None:
+            try:
+                return diff_cache.compute_diff(
+                    self.concurrency_group, working_dir, base_ref, context_lines, diff_kind, _GIT_COMMAND_TIMEOUT
+                )
+            except GitCommandFailure as e:
+                logger.info("Incremental {} diff failed, computing it in full: {}", diff_kind, e)
+        # -M enables rename detection so renames show as a single entry instead of delete+add.
         diff_command = [
             "bash",
             "-c",
-            f"git --no-pager diff -M {context_flag} {merge_base}; {untracked}",
+            f"git --no-pager diff -M -U{context_lines} {base_ref}; {_UNTRACKED_FILES_DIFF_CMD}",
         ]
-        return self._run_diff_command(diff_command, working_dir, "target-branch")
+        return self._run_diff_command(diff_command, working_dir, diff_kind)
 
     def _detect_file_errors(self, working_dir: Path) -> dict[str, str]:
         """Detect files that cannot be diffed (e.g., inside nested git repos)."""
@@ -1101,7 +1236,11 @@ class DefaultWorkspaceService(WorkspaceService):
 
             # Generate the diff artifact (outside transaction — may be slow)
             diff_artifact = self._create_diff_artifact_local(
-                base_ref, working_dir, effective_context_lines, target_branch=target_branch
+                base_ref,
+                working_dir,
+                effective_context_lines,
+                target_branch=target_branch,
+                diff_cache=self._get_diff_cache(workspace_id),
             )
 
             # Store the artifact to disk
@@ -1109,7 +1248,7 @@ class DefaultWorkspaceService(WorkspaceService):
             artifact_dir.mkdir(parents=True, exist_ok=True)
 
             artifact_path = artifact_dir / ArtifactType.DIFF
-            artifact_path.write_text(diff_artifact.model_dump_json(indent=2))
+            artifact_path.write_text(diff_artifact.model_dump_json())
 
             metadata = {"generated_at": generated_at.isoformat()}
             metadata_path = artifact_dir / _DIFF_METADATA_FILENAME
@@ -1146,10 +1285,17 @@ class DefaultWorkspaceService(WorkspaceService):
         self,
         workspace_id: WorkspaceID,
     ) -> None:
-        """Regenerate workspace diff if needed. For now, always refreshes."""
-        # Future: could check if files actually changed before regenerating
-        # For now, always refresh.  Always include the target-branch diff so the
-        # frontend "All changes" view stays up-to-date without extra requests.
+        """Regenerate workspace diff if needed.
+
+        Always refreshes, but the workspace's `WorkspaceDiffCache` only re-diffs files that changed.
+        """
+        # Agents call this after modifying files, which may have added or removed some.
+        with self._file_index_lock:
+            file_index = self._file_index_by_workspace.get(workspace_id)
+        if file_index is not None:
+            file_index.invalidate()
+        # Always include the target-branch diff so the frontend "All changes"
+        # view stays up-to-date without extra requests.
         self.refresh_workspace_diff(workspace_id, include_target_branch_diff=True)
 
     def mark_workspace_diff_stale(
@@ -1323,51 +1469,16 @@ class DefaultWorkspaceService(WorkspaceService):
         if not self._COMMIT_HASH_PATTERN.match(commit_hash):
             raise ValueError(f"Invalid commit hash: {commit_hash}")
 
-        # Validate it's actually a commit object and resolve to full hash
+        # Validate it's actually a commit object, and resolve it and its parent (if any) to full hashes
+        # so callers always get a canonical 40-char SHA
         try:
-            returncode, stdout, _stderr = run_git_command_local(
-                self.concurrency_group,
-                ["git", "cat-file", "-t", commit_hash],
-                cwd=working_dir,
-                check_output=False,
-                timeout=_GIT_COMMAND_TIMEOUT,
-                is_retry_safe=True,
-            )
-            if returncode != 0 or stdout.strip() != "commit":
-                raise ValueError(f"Not a valid commit: {commit_hash}")
+            commit_info, parent_info = get_git_object_reader(working_dir).get_infos([commit_hash, f"{commit_hash}^"])
         except GitCommandFailure as e:
             raise ValueError(f"Not a valid commit: {commit_hash}") from e
-
-        # Resolve to full hash so callers always get a canonical 40-char SHA
-        try:
-            returncode, stdout, _stderr = run_git_command_local(
-                self.concurrency_group,
-                ["git", "rev-parse", commit_hash],
-                cwd=working_dir,
-                check_output=False,
-                timeout=_GIT_COMMAND_TIMEOUT,
-                is_retry_safe=True,
-            )
-            if returncode == 0 and stdout.strip():
-                commit_hash = stdout.strip()
-        except GitCommandFailure:
-            pass
-
-        # Try to get parent hash
-        parent_hash: str | None = None
-        try:
-            returncode, stdout, _stderr = run_git_command_local(
-                self.concurrency_group,
-                ["git", "rev-parse", f"{commit_hash}^"],
-                cwd=working_dir,
-                check_output=False,
-                timeout=_GIT_COMMAND_TIMEOUT,
-                is_retry_safe=True,
-            )
-            if returncode == 0 and stdout.strip():
-                parent_hash = stdout.strip()
-        except GitCommandFailure:
-            pass
+        if commit_info is None or commit_info.object_type != "commit":
+            raise ValueError(f"Not a valid commit: {commit_hash}")
+        commit_hash = commit_info.object_id
+        parent_hash = parent_info.object_id if parent_info is not None else None
 
         # Generate the diff
         if parent_hash is not None:
@@ -1632,13 +1743,43 @@ class DefaultWorkspaceService(WorkspaceService):
         workspace_id: WorkspaceID,
         transaction: DataModelTransaction,
     ) -> list[str]:
-        """List all tracked and untracked file paths in the workspace."""
+        """List all tracked and untracked file paths in the workspace, from its file index."""
+        return list(self._get_file_index(workspace_id, transaction).get_paths())
+
+    def search_workspace_files(
+        self,
+        workspace_id: WorkspaceID,
+        query: str,
+        limit: int,
+        transaction: DataModelTransaction,
+    ) -> list[FileSearchMatch]:
+        """Fuzzy-search the workspace's file paths using its file index."""
+        return self._get_file_index(workspace_id, transaction).search(query, limit)
+
+    def _get_file_index(self, workspace_id: WorkspaceID, transaction: DataModelTransaction) -> WorkspaceFileIndex:
+        """Get the workspace's file index, creating it if needed (or if its working directory moved)."""
         workspace = transaction.get_workspace(workspace_id)
         if workspace is None:
             raise WorkspaceNotFoundError(workspace_id)
 
         working_dir = self._get_workspace_working_dir(workspace, transaction)
-
+        with self._file_index_lock:
+            file_index = self._file_index_by_workspace.get(workspace_id)
+            if file_index is None or file_index.working_dir != working_dir:
+                file_index = WorkspaceFileIndex(
+                    name=str(workspace_id),
+                    working_dir=working_dir,
+                    list_files=lambda: self._list_workspace_files(workspace_id, working_dir),
+                    concurrency_group=self.concurrency_group,
+                )
+                self._file_index_by_workspace[workspace_id] = file_index
+            self._file_index_by_workspace.move_to_end(workspace_id)
+            while len(self._file_index_by_workspace) > _MAX_FILE_INDEXES:
+                self._file_index_by_workspace.popitem(last=False)
+        return file_index
+
+    def _list_workspace_files(self, workspace_id: WorkspaceID, working_dir: Path) -> list[str]:
+        """Run `git ls-files` for the workspace's file index."""
         try:
             returncode, stdout, stderr = run_git_command_local(
                 self.concurrency_group,
@@ -1662,8 +1803,7 @@ class DefaultWorkspaceService(WorkspaceService):
             raise WorkspaceFilesUnavailableError(workspace_id, stderr.strip() or f"git ls-files exited {returncode}")
 
         file_paths = [f for f in stdout.split("\0") if f.strip()]
-        file_paths = [f for f in file_paths if not f.startswith(".git/")]
-        return sorted(file_paths)
+        return [f for f in file_paths if not f.startswith(".git/")]
 
     def read_file_at_ref(
         self,
@@ -1679,21 +1819,21 @@ class DefaultWorkspaceService(WorkspaceService):
 
         working_dir = self._get_workspace_working_dir(workspace, transaction)
 
-        returncode, stdout, stderr = run_git_command_local(
-            self.concurrency_group,
-            ["git", "--no-pager", "show", f"{git_ref}:{file_path}"],
-            cwd=working_dir,
-            check_output=False,
-            timeout=_GIT_COMMAND_TIMEOUT,
-            is_retry_safe=True,
-        )
-
-        if returncode != 0:
-            raise FileNotFoundAtRefError(file_path, git_ref, stderr)
+        if "\n" in git_ref or "\n" in file_path:
+            raise FileNotFoundAtRefError(file_path, git_ref, "paths and refs cannot contain newlines")
+        try:
+            git_object = get_git_object_reader(working_dir).read(f"{git_ref}:{file_path}")
+        except GitCommandFailure as e:
+            # As with `git show` failing, e.g. when the working directory is gone.
+            raise FileNotFoundAtRefError(file_path, git_ref, e.stderr) from e
+        if git_object is None:
+            raise FileNotFoundAtRefError(file_path, git_ref, "no such path at this ref")
+        if git_object.object_type != "blob":
+            raise FileNotFoundAtRefError(file_path, git_ref, f"path is a {git_object.object_type}, not a file")
 
         # Detect binary content (null bytes) and base64-encode
-        if "\0" in stdout:
-            encoded = base64.b64encode(stdout.encode("utf-8", errors="surrogateescape")).decode("ascii")
+        if b"\0" in git_object.content:
+            encoded = base64.b64encode(git_object.content).decode("ascii")
             return FileAtRefResult(content=encoded, encoding="base64")
 
-        return FileAtRefResult(content=stdout, encoding="utf-8")
+        return FileAtRefResult(content=git_object.content.decode("utf-8", errors="replace"), encoding="utf-8")
@@ -1,5 +1,6 @@
 from abc import ABC
 from abc import abstractmethod
+from collections.abc import Collection
 from pathlib import Path
 
 from sculptor.database.workspace_enums import WorkspaceInitializationStrategy
@@ -83,9 +84,19 @@ class EnvironmentManager(ABC):
         """
 
     @abstractmethod
-    def cleanup_stale_environments(self) -> None:
+    def cleanup_stale_environments(self, preserved_environment_ids: Collection[str] = ()) -> None:
         """
         Clean up stale environments that are no longer needed.
+
+        Args:
+            preserved_environment_ids: Environments to keep even though no workspace uses them yet
+                (e.g. pre-created ones waiting to be claimed).
+        """
+
+    @abstractmethod
+    def get_environment_ids(self) -> list[str]:
+        """
+        Every environment that exists, whether or not a workspace uses it.
         """
 
     @abstractmethod
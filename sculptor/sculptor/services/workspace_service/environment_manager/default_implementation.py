@@ -1,4 +1,5 @@
 import shutil
+from collections.abc import Collection
 from pathlib import Path
 from uuid import uuid4
 
@@ -144,14 +145,25 @@ class DefaultEnvironmentManager(MutableModel, EnvironmentManager):
         else:
             logger.debug("Environment workspace already deleted or doesn't exist: {}", workspace_path)
 
-    def cleanup_stale_environments(self) -> None:
+    def get_environment_ids(self) -> list[str]:
+        """Every workspace directory, whether or not a workspace uses it."""
+        if not LOCAL_WORKSPACE_DIR.exists():
+            return []
+        return [
+            str(workspace_dir)
+            for workspace_dir in LOCAL_WORKSPACE_DIR.iterdir()
+            if workspace_dir.is_dir() and not workspace_dir.name.startswith(".")
+        ]
+
+    def cleanup_stale_environments(self, preserved_environment_ids: Collection[str] = ()) -> None:
         """Clean up stale environments (workspaces) that are no longer needed.
 
-        Only deletes workspaces that are NOT associated with any active (non-deleted) workspace.
+        Only deletes workspaces that are NOT associated with any active (non-deleted) workspace
+        or listed in ``preserved_environment_ids``.
         Workspace is the single owner of environment, so we query workspaces directly.
         """
         # Get environment_ids of all active workspaces (non-deleted)
-        active_environment_ids: set[str] = set()
+        active_environment_ids: set[str] = set(preserved_environment_ids)
         with self.data_model_service.open_task_transaction() as transaction:
             # get_workspaces() returns non-deleted workspaces
             all_workspaces = transaction.get_workspaces()
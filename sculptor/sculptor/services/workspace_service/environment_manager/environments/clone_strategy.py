@@ -8,22 +8,58 @@ upstream matches the source's. When the source has no remotes, a single
 ``origin`` remote pointing at the source path on disk is created as a
 fallback so that merge-base / diff against ``origin/<branch>`` continues to
 work.
+
+The bootstrap is planned up front: the source's refs and remote config are
+read with one ``git for-each-ref`` and one ``git config``, the clone's config
+is written as a file, and all of its refs are created in a single
+``git update-ref --stdin`` transaction, so the number of git processes per
+clone does not grow with the number of remotes, config keys or branches.
 """
 
+import dataclasses
+import os
 import re
-import shlex
+import tempfile
 from pathlib import Path
 
 from loguru import logger
 
 from sculptor.foundation.concurrency_group import ConcurrencyGroup
 from sculptor.foundation.subprocess_utils import ProcessError
+from sculptor.services.git_repo_service.git_dirs import resolve_git_dirs
+
+_FALLBACK_REMOTE_NAME = "origin"
+_FALLBACK_FETCH_REFSPEC = "+refs/heads/*:refs/remotes/origin/*"
+# Fields of one ``git for-each-ref`` line, separated by NUL (which cannot appear in ref names).
+_REF_FORMAT = "%(HEAD)%00%(objectname)%00%(refname)%00%(upstream:remotename)%00%(upstream:remoteref)"
+# Section headers in the config file ``git clone`` writes; see _rewrite_clone_config.
+_CLONE_CONFIG_SECTION_PATTERN = re.compile(r'^\[(\w+)(?:\s+"(?:[^"\\]|\\.)*")?\]\s*$')
 
 
 class CloneError(Exception):
     """Error raised when cloning a repository fails."""
 
 
+@dataclasses.dataclass(frozen=True)
+class _LocalBranch:
+    object_id: str
+    # The upstream as ``branch.<name>.remote`` / ``branch.<name>.merge`` record it, if one is set.
+    upstream_remote: str | None
+    upstream_merge: str | None
+
+
+@dataclasses.dataclass(frozen=True)
+class _SourceMetadata:
+    """Everything the clone bootstrap needs to know about the source repository."""
+
+    # Every ``remote.<name>.*`` key, in config order, grouped by remote.
+    remote_config: dict[str, list[tuple[str, str | None]]]
+    local_branches: dict[str, _LocalBranch]
+    remote_refs: dict[str, str]
+    # None when HEAD is detached (or the repo has no commits).
+    current_branch: str | None
+
+
 def clone_repository(
     source_repo_path: Path,
     destination: Path,
@@ -51,15 +87,15 @@ def clone_repository(
     """
     logger.debug("Cloning repository from {} to {}", source_repo_path, destination)
 
-    source_remotes = _list_remotes(source_repo_path, concurrency_group)
-    branch_to_checkout = target_branch or _get_current_branch(source_repo_path, concurrency_group)
+    source = _read_source_metadata(source_repo_path, concurrency_group)
+    branch_to_checkout = target_branch or source.current_branch
 
     # ``git clone --reference`` rejects worktrees ("reference repository ... as
     # a linked checkout is not supported yet"). The worktree's object store
     # lives in its parent repo, which is the correct ``--reference`` target
-    # anyway. Other operations below operate via ``git -C <worktree>`` and
-    # work fine because config/refs are shared with the parent.
-    reference_repo_path = _resolve_worktree_to_parent(source_repo_path, concurrency_group)
+    # anyway. The metadata reads above work on the worktree itself because
+    # config/refs are shared with the parent.
+    reference_repo_path = _resolve_worktree_to_parent(source_repo_path)
     _run_git_command(
         [
             "git",
@@ -67,6 +103,8 @@ def clone_repository(
             "--reference",
             str(reference_repo_path),
             "--no-origin",
+            # The requested branch is checked out below; skip populating the work tree twice.
+            *(["--no-checkout"] if branch_to_checkout else []),
             str(source_repo_path),
             str(destination),
         ],
@@ -77,307 +115,239 @@ def clone_repository(
 
     # Git versions prior to ~2.42 ignore ``--no-origin`` for local clones and
     # create an ``origin`` remote anyway, populating ``refs/remotes/origin/*``
-    # from the clone source's local branches. Remove any such auto-created
-    # remote so we start from a clean slate before replaying source's real
-    # remote config. ``git remote remove`` also removes the associated
-    # ``refs/remotes/<name>/*`` tracking refs.
-    _remove_all_remotes(destination, concurrency_group)
-
-    if source_remotes:
-        for remote_name in source_remotes:
-            _replay_remote_config(source_repo_path, destination, remote_name, concurrency_group)
-        _copy_remote_refs(source_repo_path, destination, concurrency_group)
-    else:
-        _set_fallback_origin(destination, source_repo_path, concurrency_group)
-        _copy_local_branches_as_origin_refs(source_repo_path, destination, concurrency_group)
+    # from the clone source's local branches. Drop any such auto-created
+    # remote (and the branch config pointing at it) while writing the source's
+    # real remote config, and delete its tracking refs in the ref transaction.
+    is_origin_auto_created = _rewrite_clone_config(destination, source, source_repo_path, branch_to_checkout)
+    ref_updates = _plan_ref_updates(source, branch_to_checkout)
+    stale_refs: list[str] = []
+    if is_origin_auto_created:
+        stale_refs = [f"refs/remotes/{_FALLBACK_REMOTE_NAME}/HEAD"] + [
+            f"refs/remotes/{_FALLBACK_REMOTE_NAME}/{name}" for name in source.local_branches
+        ]
+    _update_refs(destination, ref_updates, [ref for ref in stale_refs if ref not in ref_updates], concurrency_group)
 
     if branch_to_checkout:
-        _ensure_target_branch_resolvable_in_clone(source_repo_path, destination, branch_to_checkout, concurrency_group)
         _run_git_command(
             ["git", "checkout", branch_to_checkout],
             cwd=destination,
             concurrency_group=concurrency_group,
             error_message=f"Failed to checkout branch {branch_to_checkout}",
         )
-        _mirror_branch_upstream(source_repo_path, destination, branch_to_checkout, concurrency_group)
 
     logger.debug("Successfully cloned repository to {} on branch {}", destination, branch_to_checkout)
 
 
-def _resolve_worktree_to_parent(repo_path: Path, concurrency_group: ConcurrencyGroup) -> Path:
-    """Return the parent repo path if ``repo_path`` is a worktree, else ``repo_path`` unchanged.
+def _read_source_metadata(source_repo_path: Path, concurrency_group: ConcurrencyGroup) -> _SourceMetadata:
+    """Read the source's branches, remote-tracking refs, current branch and remote config with two git processes.
 
-    A worktree's ``.git`` is a file containing ``gitdir: <parent>/.git/worktrees/<name>``.
-    We detect that shape, then ask git for the canonical common-dir and walk
-    one level up to the parent repo's working tree.
+    A source that cannot be read (e.g. an empty repository) yields empty
+    metadata — it is still a valid starting point for a clone.
     """
-    git_marker = repo_path / ".git"
-    if not git_marker.is_file():
-        return repo_path
-
+    local_branches: dict[str, _LocalBranch] = {}
+    remote_refs: dict[str, str] = {}
+    current_branch: str | None = None
     try:
         result = concurrency_group.run_process_to_completion(
-            ["git", "rev-parse", "--path-format=absolute", "--git-common-dir"],
-            cwd=repo_path,
+            ["git", "for-each-ref", f"--format={_REF_FORMAT}", "refs/heads/", "refs/remotes/"],
+            cwd=source_repo_path,
             is_checked_after=True,
         )
     except ProcessError:
-        return repo_path
-
-    common_dir = Path(result.stdout.strip())
-    if not common_dir.exists():
-        return repo_path
-    return common_dir.parent
-
-
-def _list_remotes(repo_path: Path, concurrency_group: ConcurrencyGroup) -> list[str]:
-    """Return the names of every remote defined in the source repository.
-
-    Returns an empty list if the source has no remotes or if ``git remote``
-    fails for any other reason — an empty source repo is still a valid
-    starting point for a clone.
-    """
-    try:
-        result = concurrency_group.run_process_to_completion(
-            ["git", "remote"],
-            cwd=repo_path,
-            is_checked_after=True,
+        result = None
+    for line in result.stdout.splitlines() if result is not None else []:
+        fields = line.split("\0")
+        if len(fields) != 5:
+            continue
+        head_marker, object_id, ref_name, upstream_remote, upstream_merge = fields
+        if ref_name.startswith("refs/remotes/"):
+            remote_refs[ref_name] = object_id
+            continue
+        branch_name = ref_name.removeprefix("refs/heads/")
+        local_branches[branch_name] = _LocalBranch(
+            object_id=object_id,
+            upstream_remote=upstream_remote or None,
+            upstream_merge=(upstream_merge or None) if upstream_remote else None,
         )
-    except ProcessError:
-        return []
-    return [line.strip() for line in result.stdout.splitlines() if line.strip()]
-
+        if head_marker == "*":
+            current_branch = branch_name
 
-def _get_current_branch(repo_path: Path, concurrency_group: ConcurrencyGroup) -> str | None:
-    """Get the current branch name, or None if in detached HEAD state."""
+    # Without --local, like ``git remote``: remotes defined in the user's global config count too.
+    remote_config: dict[str, list[tuple[str, str | None]]] = {}
     try:
         result = concurrency_group.run_process_to_completion(
-            ["git", "rev-parse", "--abbrev-ref", "HEAD"],
-            cwd=repo_path,
-            is_checked_after=True,
+            ["git", "config", "-z", "--get-regexp", r"^remote\."],
+            cwd=source_repo_path,
+            # Exits with 1 when there is no remote config at all.
+            is_checked_after=False,
         )
-        branch = result.stdout.strip()
-        # In detached HEAD state, this returns "HEAD"
-        if branch == "HEAD":
-            return None
-        return branch
     except ProcessError:
-        return None
+        result = None
+    if result is not None and result.returncode == 0:
+        for entry in result.stdout.split("\0"):
+            key, separator, value = entry.partition("\n")
+            # A key without a value (``[remote "x"] foo``) is printed without the newline.
+            remote_and_variable = key.removeprefix("remote.")
+            remote_name, dot, variable = remote_and_variable.rpartition(".")
+            if not key.startswith("remote.") or not dot or not remote_name:
+                continue
+            remote_config.setdefault(remote_name, []).append((variable, value if separator else None))
+
+    return _SourceMetadata(
+        remote_config=remote_config,
+        local_branches=local_branches,
+        remote_refs=remote_refs,
+        current_branch=current_branch,
+    )
 
 
-def _remove_all_remotes(destination: Path, concurrency_group: ConcurrencyGroup) -> None:
-    """Remove every remote configured on the clone, along with its tracking refs.
+def _resolve_worktree_to_parent(repo_path: Path) -> Path:
+    """Return the parent repo path if ``repo_path`` is a worktree, else ``repo_path`` unchanged.
 
-    Used to clean up any remote that ``git clone`` created implicitly before
-    we replay the source's real remote configuration.
+    A worktree's ``.git`` is a file containing ``gitdir: <parent>/.git/worktrees/<name>``,
+    whose ``commondir`` file leads to the parent's ``.git``; its parent is the
+    parent repo's working tree.
     """
-    for remote_name in _list_remotes(destination, concurrency_group):
-        _run_git_command(
-            ["git", "remote", "remove", remote_name],
-            cwd=destination,
-            concurrency_group=concurrency_group,
-            error_message=f"Failed to remove auto-created remote {remote_name} from clone",
-        )
+    if not (repo_path / ".git").is_file():
+        return repo_path
+    git_dirs = resolve_git_dirs(repo_path)
+    if git_dirs is None:
+        return repo_path
+    _git_dir, common_dir = git_dirs
+    if not common_dir.exists():
+        return repo_path
+    return common_dir.parent
 
 
-def _replay_remote_config(
-    source_repo_path: Path,
-    destination: Path,
-    remote_name: str,
-    concurrency_group: ConcurrencyGroup,
-) -> None:
-    """Replay every ``remote.<remote_name>.*`` config key from source onto the clone.
+def _rewrite_clone_config(
+    destination: Path, source: _SourceMetadata, source_repo_path: Path, branch_to_checkout: str | None
+) -> bool:
+    """Write the source's remotes (and the checked-out branch's upstream) into the clone's config file.
 
-    Uses ``git config --add`` so multi-valued keys (e.g. multiple
-    ``remote.origin.fetch`` refspecs) are preserved in order.
+    The file is the one ``git clone`` just wrote, so it is in git's canonical
+    layout and nothing else is using it; it is rewritten directly rather than
+    through one ``git config`` process per key. Any ``remote`` or ``branch``
+    section the clone created on its own is dropped. Returns whether the
+    clone had created an ``origin`` remote.
     """
-    pattern = rf"^remote\.{re.escape(remote_name)}\."
+    config_path = destination / ".git" / "config"
     try:
-        result = concurrency_group.run_process_to_completion(
-            ["git", "config", "--get-regexp", pattern],
-            cwd=source_repo_path,
-            is_checked_after=True,
-        )
-    except ProcessError as e:
-        raise CloneError(f"Failed to read remote config for {remote_name} from source") from e
-
-    for line in result.stdout.splitlines():
-        if not line.strip():
-            continue
-        key, _, value = line.partition(" ")
-        _run_git_command(
-            ["git", "config", "--add", key, value],
-            cwd=destination,
-            concurrency_group=concurrency_group,
-            error_message=f"Failed to replay config key {key} onto clone",
-        )
-
-
-def _set_fallback_origin(
-    destination: Path,
-    source_repo_path: Path,
-    concurrency_group: ConcurrencyGroup,
-) -> None:
-    """Create a single ``origin`` remote pointing at the source path on disk.
-
-    Used when the source repository has zero remotes. A standard fetch
-    refspec is configured so that ``git checkout <branch>`` can DWIM to
-    ``refs/remotes/origin/<branch>`` — without it, git refuses to create a
-    local branch from a remote-tracking ref.
-    """
-    _run_git_command(
-        ["git", "config", "remote.origin.url", str(source_repo_path)],
-        cwd=destination,
-        concurrency_group=concurrency_group,
-        error_message="Failed to set fallback origin URL",
-    )
-    _run_git_command(
-        ["git", "config", "--add", "remote.origin.fetch", "+refs/heads/*:refs/remotes/origin/*"],
-        cwd=destination,
-        concurrency_group=concurrency_group,
-        error_message="Failed to set fallback origin fetch refspec",
-    )
-
-
-def _copy_remote_refs(
-    source_repo_path: Path,
-    destination: Path,
-    concurrency_group: ConcurrencyGroup,
-) -> None:
-    """Copy all ``refs/remotes/*`` tracking refs from the source repo into the clone.
-
-    Since the clone uses ``--reference`` to share the object store, the objects
-    are already available — only the ref pointers need to be created. This is
-    done via a single shell pipeline: ``git for-each-ref`` in the source piped
-    into ``git update-ref --stdin`` in the clone.
-    """
-    src = shlex.quote(str(source_repo_path))
-    dst = shlex.quote(str(destination))
-    script = f"git -C {src} for-each-ref --format='create %(refname) %(objectname)' refs/remotes/ | git -C {dst} update-ref --stdin"
-    command = ["bash", "-c", script]
+        original_lines = config_path.read_text().splitlines(keepends=True)
+    except OSError as e:
+        raise CloneError(f"Failed to read the clone's git config: {e}") from e
+
+    kept_lines: list[str] = []
+    is_origin_auto_created = False
+    is_in_dropped_section = False
+    for line in original_lines:
+        match = _CLONE_CONFIG_SECTION_PATTERN.match(line.strip())
+        if match is not None:
+            section = match.group(1).lower()
+            is_in_dropped_section = section in ("remote", "branch")
+            if section == "remote" and line.strip() == f'[remote "{_FALLBACK_REMOTE_NAME}"]':
+                is_origin_auto_created = True
+        if not is_in_dropped_section:
+            kept_lines.append(line)
+
+    remote_config = source.remote_config or {
+        _FALLBACK_REMOTE_NAME: [("url", str(source_repo_path)), ("fetch", _FALLBACK_FETCH_REFSPEC)]
+    }
+    added_lines: list[str] = []
+    for remote_name, entries in remote_config.items():
+        added_lines.append(f"[remote {_quote_config_subsection(remote_name)}]\n")
+        added_lines.extend(_format_config_entry(variable, value) for variable, value in entries)
+    # If the source branch has no upstream, the clone's branch gets none either, mirroring the source.
+    upstream_branch = source.local_branches.get(branch_to_checkout) if branch_to_checkout else None
+    if upstream_branch is not None and upstream_branch.upstream_remote and upstream_branch.upstream_merge:
+        added_lines.append(f"[branch {_quote_config_subsection(branch_to_checkout or '')}]\n")
+        added_lines.append(_format_config_entry("remote", upstream_branch.upstream_remote))
+        added_lines.append(_format_config_entry("merge", upstream_branch.upstream_merge))
+
+    if kept_lines and not kept_lines[-1].endswith("\n"):
+        kept_lines[-1] += "\n"
+    _write_file_atomically(config_path, "".join(kept_lines + added_lines))
+    return is_origin_auto_created
+
+
+def _quote_config_subsection(name: str) -> str:
+    escaped = name.replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+def _format_config_entry(variable: str, value: str | None) -> str:
+    if value is None:
+        return f"\t{variable}\n"
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n").replace("\t", "\\t")
+    return f'\t{variable} = "{escaped}"\n'
+
+
+def _write_file_atomically(path: Path, content: str) -> None:
     try:
-        concurrency_group.run_process_to_completion(command, is_checked_after=True)
-    except ProcessError:
-        # Source repo may have no remote-tracking refs — not an error.
-        logger.debug("No remote-tracking refs to copy from {} to {}", source_repo_path, destination)
+        with tempfile.NamedTemporaryFile("w", dir=path.parent, prefix=f"{path.name}.", delete=False) as f:
+            f.write(content)
+        os.replace(f.name, path)
+    except OSError as e:
+        raise CloneError(f"Failed to write {path}: {e}") from e
 
 
-def _copy_local_branches_as_origin_refs(
-    source_repo_path: Path,
+def _plan_ref_updates(source: _SourceMetadata, branch_to_checkout: str | None) -> dict[str, str]:
+    """The refs the clone needs, by name: remote-tracking refs plus the branch to check out."""
+    if source.remote_config:
+        ref_updates = dict(source.remote_refs)
+    else:
+        # No remotes: project the source's local branches onto the fallback origin.
+        ref_updates = {
+            f"refs/remotes/{_FALLBACK_REMOTE_NAME}/{name}": branch.object_id
+            for name, branch in source.local_branches.items()
+        }
+    # ``clone_repository`` deliberately mirrors the source's *remote* layout and
+    # does not bulk-copy its ``refs/heads/*`` (those are user-private working
+    # state and would clutter every workspace). The branch to check out is the
+    # one exception: a local-only branch in the source — e.g. a
+    # ``sculptor/transfer/*`` branch produced by the ``split-changes`` flow,
+    # which lands in the user's primary repo via
+    # ``git push local HEAD:sculptor/transfer/...`` and never reaches a real
+    # remote — must still be cloneable. A branch the source does not have
+    # locally is left to ``git checkout``, which either creates it from a
+    # remote-tracking ref or fails with its usual "pathspec did not match".
+    checkout_branch = source.local_branches.get(branch_to_checkout) if branch_to_checkout else None
+    if checkout_branch is not None:
+        ref_updates[f"refs/heads/{branch_to_checkout}"] = checkout_branch.object_id
+    return ref_updates
+
+
+def _update_refs(
     destination: Path,
+    ref_updates: dict[str, str],
+    ref_deletions: list[str],
     concurrency_group: ConcurrencyGroup,
 ) -> None:
-    """Project source's ``refs/heads/*`` onto the clone's ``refs/remotes/origin/*``.
-
-    Used in the fallback case when the source repository has no remotes:
-    the widened :func:`_copy_remote_refs` would copy nothing, but the clone
-    still needs ``refs/remotes/origin/<branch>`` populated for
-    merge-base / diff against ``origin/<branch>`` to work.
-    """
-    src = shlex.quote(str(source_repo_path))
-    dst = shlex.quote(str(destination))
-    script = f"git -C {src} for-each-ref --format='create refs/remotes/origin/%(refname:lstrip=2) %(objectname)' refs/heads/ | git -C {dst} update-ref --stdin"
-    command = ["bash", "-c", script]
-    try:
-        concurrency_group.run_process_to_completion(command, is_checked_after=True)
-    except ProcessError:
-        # Source repo may have no local branches — not an error.
-        logger.debug("No local branches to project as origin refs from {} to {}", source_repo_path, destination)
-
+    """Create, move and delete the clone's refs in one ``git update-ref --stdin`` transaction.
 
-def _ensure_target_branch_resolvable_in_clone(
-    source_repo_path: Path,
-    destination: Path,
-    target_branch: str,
-    concurrency_group: ConcurrencyGroup,
-) -> None:
-    """Project source's ``refs/heads/<target_branch>`` into the clone if the
-    branch exists in source as a local ref but the clone has no local ref for
-    it.
-
-    ``clone_repository`` deliberately mirrors source's *remote* layout and does
-    not bulk-copy source's ``refs/heads/*`` (those are user-private working
-    state and would clutter every workspace). The requested target branch is
-    the one exception: a local-only branch in the source — e.g. a
-    ``sculptor/transfer/*`` branch produced by the ``split-changes`` flow,
-    which lands in the user's primary repo via
-    ``git push local HEAD:sculptor/transfer/...`` and never reaches a real
-    remote — must still be cloneable. Without this, the upcoming
-    ``git checkout <branch>`` would fail with
-    ``pathspec '<branch>' did not match any file(s) known to git`` because the
-    auto-created refs that ``git clone`` projected from source's local
-    branches were stripped by :func:`_remove_all_remotes`.
+    The objects are already available through ``--reference``, so only the
+    ref pointers need to be written. ``--no-deref`` makes updates and
+    deletions act on symbolic refs (like an auto-created
+    ``refs/remotes/origin/HEAD``) themselves rather than on their targets.
     """
-    if _ref_exists(destination, f"refs/heads/{target_branch}", concurrency_group):
+    if not ref_updates and not ref_deletions:
         return
-    source_hash = _resolve_ref(source_repo_path, f"refs/heads/{target_branch}", concurrency_group)
-    if source_hash is None:
-        # Source has no local ref either — let the upcoming checkout fail with
-        # its original "pathspec did not match" error so the surface stays
-        # consistent for genuinely-missing branches.
-        return
-    _run_git_command(
-        ["git", "update-ref", f"refs/heads/{target_branch}", source_hash],
-        cwd=destination,
-        concurrency_group=concurrency_group,
-        error_message=f"Failed to project source's local branch {target_branch} into the clone",
-    )
-
-
-def _ref_exists(repo_path: Path, ref: str, concurrency_group: ConcurrencyGroup) -> bool:
-    """Whether ``ref`` (e.g. ``refs/heads/foo``) resolves in ``repo_path``."""
+    instructions = [f"delete {ref}\n" for ref in ref_deletions]
+    instructions.extend(f"update {ref} {object_id}\n" for ref, object_id in ref_updates.items())
+    instructions_path = destination / ".git" / "sculptor-clone-refs"
     try:
-        concurrency_group.run_process_to_completion(
-            ["git", "rev-parse", "--verify", "--quiet", ref],
-            cwd=repo_path,
-            is_checked_after=True,
-        )
-        return True
-    except ProcessError:
-        return False
-
-
-def _resolve_ref(repo_path: Path, ref: str, concurrency_group: ConcurrencyGroup) -> str | None:
-    """Resolve ``ref`` to a commit hash in ``repo_path``, or ``None`` if it doesn't exist."""
+        instructions_path.write_text("".join(instructions))
+    except OSError as e:
+        raise CloneError(f"Failed to write the clone's ref updates: {e}") from e
     try:
-        result = concurrency_group.run_process_to_completion(
-            ["git", "rev-parse", "--verify", ref],
-            cwd=repo_path,
-            is_checked_after=True,
-        )
-    except ProcessError:
-        return None
-    return result.stdout.strip() or None
-
-
-def _mirror_branch_upstream(
-    source_repo_path: Path,
-    destination: Path,
-    branch: str,
-    concurrency_group: ConcurrencyGroup,
-) -> None:
-    """If the source branch has an upstream, set the same upstream on the clone.
-
-    If the source branch has no upstream, do nothing — the clone's branch
-    will have no upstream either, mirroring the source.
-    """
-    try:
-        result = concurrency_group.run_process_to_completion(
-            ["git", "rev-parse", "--abbrev-ref", f"{branch}@{{upstream}}"],
-            cwd=source_repo_path,
-            is_checked_after=True,
+        # run_process_to_completion has no stdin, so let the shell redirect the file into git.
+        _run_git_command(
+            ["sh", "-c", 'exec git update-ref --no-deref --stdin < "$1"', "sh", str(instructions_path)],
+            cwd=destination,
+            concurrency_group=concurrency_group,
+            error_message="Failed to create the clone's refs",
         )
-    except ProcessError:
-        return
-    upstream = result.stdout.strip()
-    if not upstream:
-        return
-    _run_git_command(
-        ["git", "branch", f"--set-upstream-to={upstream}"],
-        cwd=destination,
-        concurrency_group=concurrency_group,
-        error_message=f"Failed to set upstream {upstream} on branch {branch}",
-    )
+    finally:
+        instructions_path.unlink(missing_ok=True)
 
 
 def _run_git_command(
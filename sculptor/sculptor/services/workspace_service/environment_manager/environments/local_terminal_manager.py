@@ -5,11 +5,9 @@ Unlike ttyd-based approaches, this keeps the pty alive across WebSocket disconne
 providing VS Code-like terminal persistence.
 """
 
-import errno
 import fcntl
 import hashlib
 import os
-import select
 import struct
 import termios
 import threading
@@ -21,34 +19,28 @@ from loguru import logger
 from pydantic import Field
 
 from sculptor.foundation.concurrency_group import ConcurrencyGroup
+from sculptor.foundation.concurrency_group import InvalidConcurrencyGroupStateError
 from sculptor.foundation.pydantic_serialization import FrozenModel
-from sculptor.foundation.thread_utils import ObservableThread
 from sculptor.interfaces.terminal_manager import TerminalManager
 from sculptor.services.workspace_service.environment_manager.env_file_parser import load_project_env_vars
+from sculptor.services.workspace_service.environment_manager.environments.pty_reactor import get_pty_reactor
 from sculptor.services.workspace_service.environment_manager.environments.spawned_pty_process import SpawnedPtyProcess
-
-# Buffer size for reading from pty — larger buffers reduce syscall overhead
-# for bulk output (e.g., `cat large_file`), matching ttyd's approach.
-PTY_READ_BUFFER_SIZE = 32768
-
-# Maximum output buffer size (for replay on reconnect) - ~1MB
-MAX_OUTPUT_BUFFER_SIZE = 1024 * 1024
+from sculptor.services.workspace_service.environment_manager.environments.terminal_screen import TerminalScreen
 
 # Length of the hex-truncated sha256 used as a URL-safe terminal ID.
 _TERMINAL_ID_HASH_LENGTH = 16
 
-# How long the pty reader blocks in poll(2) before re-checking the stop flag.
-_PTY_POLL_TIMEOUT_MS = 100
-
 # How long to wait for each manager's stop() when shutting down concurrently.
 _MANAGER_STOP_JOIN_TIMEOUT_SECONDS = 5.0
 
-# How long stop() waits for the reader thread to exit before closing the pty.
-_READER_THREAD_JOIN_TIMEOUT_SECONDS = 2.0
-
 # Grace period before the pty child is force-killed during teardown.
 _PTY_FORCE_KILL_SECONDS = 1.0
 
+# Output not yet applied to the screen model past which the oldest of it is
+# dropped unparsed. This is roughly what it takes to redraw the screen and the
+# scrollback, which older output would have scrolled out of anyway.
+_MAX_UNFED_OUTPUT_BYTES = 1024 * 1024
+
 
 class TerminalEnvironmentConfig(FrozenModel):
     """Environment-level configuration needed to create terminals.
@@ -293,19 +285,30 @@ class LocalTerminalManager(TerminalManager):
         # never runs in this multi-threaded backend process.
         self._pty_process: SpawnedPtyProcess | None = None
 
-        # Output buffer for replay on reconnect, and callbacks notified on new
-        # output.  Both are protected by a single lock so that a subscriber can
-        # atomically snapshot the buffer and register its callback — otherwise
-        # any output produced between "read buffer" and "register callback" is
-        # buffered but never delivered to that subscriber.
-        self._output_buffer: deque[bytes] = deque()
-        self._output_buffer_size = 0
+        # Model of the screen and scrollback for replay on reconnect. Interpreting
+        # output is too slow for the pty reactor thread every terminal shares, so
+        # the reactor only queues it in `_unfed_output`, and it is fed to the
+        # screen under `_screen_lock` when the screen is needed. A terminal
+        # nobody is watching is never parsed: past _MAX_UNFED_OUTPUT_BYTES, the
+        # oldest queued output is dropped instead.
+        self._screen = TerminalScreen()
+        self._screen_lock = threading.Lock()
+        # Output not yet fed to the screen, and callbacks notified on new output.
+        # Both are protected by a single lock so that a subscriber can atomically
+        # take the output its snapshot covers and register its callback —
+        # otherwise any output produced between the two is never delivered to
+        # that subscriber. Lock order: `_screen_lock`, then `_state_lock`.
+        self._unfed_output: deque[bytes] = deque()
+        self._unfed_output_size = 0
+        self._has_dropped_unfed_output = False
         self._output_callbacks: list[Callable[[bytes], None]] = []
         self._state_lock = threading.Lock()
 
-        # Reader thread
-        self._reader_thread: ObservableThread | None = None
-        self._stop_reader = threading.Event()
+        # The primary fd being read by the shared pty reactor, if any.
+        self._reading_fd: int | None = None
+        # Set by stop(), so that the reactor reporting the pty closed is not
+        # mistaken for the shell exiting on its own.
+        self._is_stopping = threading.Event()
 
     def start(self) -> None:
         """Start the terminal session.
@@ -336,16 +339,8 @@ class LocalTerminalManager(TerminalManager):
         # Register the process with the concurrency group for lifecycle management.
         self._concurrency_group.start_background_process_from_factory(lambda: pty_process)
 
-        # Start the reader thread to continuously read output from the pty.
-        self._stop_reader.clear()
-        self._reader_thread = self._concurrency_group.start_new_thread(
-            target=self._read_loop,
-            name=f"pty-reader-{self._environment_id}",
-            daemon=True,
-            # The reader thread exits gracefully when _stop_reader is set or pty closes,
-            # so we don't need to check it for errors.
-            is_checked=False,
-        )
+        self._is_stopping.clear()
+        self._start_reading()
 
         logger.debug(
             "Terminal started for environment {} (terminal_id={})",
@@ -354,20 +349,20 @@ class LocalTerminalManager(TerminalManager):
         )
 
     def _emit_output(self, data: bytes) -> None:
-        """Buffer output data and notify connected WebSocket clients.
+        """Queue output data for the screen model and notify connected WebSocket clients.
 
-        Buffer append and callback notification run under the same lock so a
-        concurrent `subscribe()` either sees `data` in its snapshot or receives
-        it via callback — never neither.  Callbacks are expected to be
+        Runs on the shared pty reactor thread, so it only queues `data`; see
+        `_feed_screen`. Queueing and callback notification run under the same
+        lock so a concurrent `subscribe()` either sees `data` in its snapshot or
+        receives it via callback — never neither.  Callbacks are expected to be
         non-blocking (the WS handler hands off to an asyncio queue).
         """
         with self._state_lock:
-            self._output_buffer.append(data)
-            self._output_buffer_size += len(data)
-
-            while self._output_buffer_size > MAX_OUTPUT_BUFFER_SIZE and self._output_buffer:
-                removed = self._output_buffer.popleft()
-                self._output_buffer_size -= len(removed)
+            self._unfed_output.append(data)
+            self._unfed_output_size += len(data)
+            while self._unfed_output_size > _MAX_UNFED_OUTPUT_BYTES and len(self._unfed_output) > 1:
+                self._unfed_output_size -= len(self._unfed_output.popleft())
+                self._has_dropped_unfed_output = True
 
             callbacks = list(self._output_callbacks)
 
@@ -377,69 +372,92 @@ class LocalTerminalManager(TerminalManager):
                 except Exception as e:
                     logger.error("Output callback error: {}", e)
 
-    def _read_loop(self) -> None:
-        """Background thread that reads from the pty and buffers output."""
+    def _feed_screen(self) -> None:
+        """Apply all queued output to the screen model; call with `_screen_lock` held."""
+        with self._state_lock:
+            unfed_output = self._take_unfed_output()
+        self._feed_to_screen(unfed_output)
+
+    def _take_unfed_output(self) -> tuple[list[bytes], bool]:
+        # Called with `_state_lock` held.
+        unfed_output = (list(self._unfed_output), self._has_dropped_unfed_output)
+        self._unfed_output.clear()
+        self._unfed_output_size = 0
+        self._has_dropped_unfed_output = False
+        return unfed_output
+
+    def _feed_to_screen(self, unfed_output: tuple[list[bytes], bool]) -> None:
+        # Called with `_screen_lock` held.
+        chunks, has_dropped_output = unfed_output
+        if has_dropped_output:
+            self._screen.skip_dropped_output()
+        for data in chunks:
+            self._screen.feed(data)
+
+    def _start_reading(self) -> None:
+        """Have the shared pty reactor read the pty's output into `_emit_output`."""
         if self._pty_process is None:
             return
         primary_fd = self._pty_process.primary_fd
         if primary_fd is None:
             return
+        self._reading_fd = primary_fd
+        get_pty_reactor().register(
+            primary_fd,
+            name=f"pty-{self._environment_id}",
+            on_output=self._emit_output,
+            on_closed=self._on_pty_closed,
+        )
 
-        # Wait for pty output with poll(2) rather than select(2): select cannot
-        # wait on a file descriptor whose number is >= FD_SETSIZE (1024) and
-        # raises "filedescriptor out of range in select()". A long-lived backend
-        # that has accumulated many open fds hands newly opened ptys high fd
-        # numbers, which would otherwise kill this reader thread — and so the
-        # whole terminal — the instant it opened. poll(2) has no such limit.
-        poller = select.poll()
-        poller.register(primary_fd, select.POLLIN)
-
-        while not self._stop_reader.is_set():
-            try:
-                # Wake on readable data (and, unsolicited, POLLHUP/POLLERR);
-                # the 100ms timeout bounds how long we wait before re-checking
-                # the stop flag. Any returned event funnels into os.read, whose
-                # EOF/EIO handling below covers shell exit.
-                if not poller.poll(_PTY_POLL_TIMEOUT_MS):
-                    continue
-
-                data = os.read(primary_fd, PTY_READ_BUFFER_SIZE)
-                if not data:
-                    # EOF - shell has exited
-                    logger.debug("Pty EOF for environment {}", self._environment_id)
-                    break
-
-                self._emit_output(data)
-
-            except OSError as e:
-                if e.errno == errno.EIO:  # Terminal closed
-                    logger.debug("Pty closed for environment {}", self._environment_id)
-                    break
-                if e.errno in (errno.EAGAIN, errno.EWOULDBLOCK):  # No data available (non-blocking)
-                    continue
-                logger.error("Pty read error for environment {}: {}", self._environment_id, e)
-                break
-            except Exception as e:
-                logger.error("Unexpected error in pty reader: {}", e)
-                break
-
-        # The shell has exited — notify the user via the terminal output stream.
+    def _stop_reading(self) -> bool:
+        """Stop reading the pty; returns whether it was still being read (the shell had not exited).
+
+        The reactor also closes the primary fd then, so that it stays open for as long
+        as the reactor may still watch it, even if the reactor is slow to let go of it.
+        """
+        primary_fd = self._reading_fd
+        if primary_fd is None:
+            return False
+        self._reading_fd = None
+        pty_process = self._pty_process
+        if pty_process is not None and pty_process.release_primary_fd() == primary_fd:
+            return get_pty_reactor().unregister_and_close(primary_fd)
+        return get_pty_reactor().unregister(primary_fd)
+
+    def _on_pty_closed(self) -> None:
+        """Called on the reactor thread once the pty reports EOF/EIO: the shell has exited."""
+        self._reading_fd = None
+        logger.debug("Pty closed for environment {}", self._environment_id)
         # Use \r\n (carriage return + newline) for correct terminal rendering.
         self._emit_output(b"\r\n[Process exited]\r\n")
-
-        # When the shell exits on its own (EOF/EIO — e.g. the user typed `exit`)
-        # rather than because stop() asked the reader to stop, nothing else will
-        # close the pty primary fd or unregister this manager: stop() only runs
-        # on an explicit user action (closing the panel) or workspace teardown.
-        # Without this, every self-exited shell leaks one pty primary fd until
-        # then, pushing the long-lived backend toward the fd ceiling. Tear down
-        # here — directly, NOT via stop(), because stop() joins the reader thread
-        # and this IS the reader thread (joining itself would deadlock). The
-        # cleanup helpers are idempotent, so a later stop() is still safe.
-        if not self._stop_reader.is_set():
-            logger.debug("Shell self-exited for environment {}; cleaning up pty", self._environment_id)
-            self._unregister_from_registry()
-            self._close_pty_process()
+        if self._is_stopping.is_set():
+            return
+        # When the shell exits on its own (e.g. the user typed `exit`) rather
+        # than because of stop(), nothing else will close the pty primary fd or
+        # unregister this manager: stop() only runs on an explicit user action
+        # (closing the panel) or workspace teardown. Without this, every
+        # self-exited shell leaks one pty primary fd until then, pushing the
+        # long-lived backend toward the fd ceiling. Terminating the shell can
+        # take up to _PTY_FORCE_KILL_SECONDS, which must not stall the reactor
+        # every terminal shares, so the teardown runs on its own thread.
+        try:
+            self._concurrency_group.start_new_thread(
+                target=self._clean_up_after_shell_exit,
+                name=f"pty-exit-{self._environment_id}",
+                daemon=True,
+                is_checked=False,
+            )
+        except InvalidConcurrencyGroupStateError:
+            # The group is shutting down, and with it the terminals it owns.
+            logger.debug("Not cleaning up self-exited shell for environment {}", self._environment_id)
+
+    def _clean_up_after_shell_exit(self) -> None:
+        if self._is_stopping.is_set():
+            return
+        logger.debug("Shell self-exited for environment {}; cleaning up pty", self._environment_id)
+        # The cleanup helpers are idempotent, so a concurrent or later stop() is still safe.
+        self._unregister_from_registry()
+        self._close_pty_process()
 
     @property
     def shell_pid(self) -> int | None:
@@ -482,20 +500,36 @@ class LocalTerminalManager(TerminalManager):
             fcntl.ioctl(primary_fd, termios.TIOCSWINSZ, winsize)
         except OSError as e:
             logger.error("Failed to resize pty: {}", e)
+            return
+        with self._screen_lock:
+            # Output so far was produced for the old size.
+            self._feed_screen()
+            self._screen.resize(rows, cols)
 
     def subscribe(self, callback: Callable[[bytes], None]) -> bytes:
-        """Atomically snapshot the output buffer and register ``callback``.
-
-        Returns the buffered output for session replay.  After this call, every
-        future `_emit_output` invocation also fires ``callback``.  Holding the
-        state lock across both operations is what prevents the "callback
-        registered after new output was already buffered" race that would
-        otherwise drop bytes produced during reconnect.
+        """Atomically snapshot the screen and register ``callback``.
+
+        Returns escape codes that redraw the current screen and scrollback, for
+        session replay (empty if the terminal has not output anything yet).
+        After this call, every future `_emit_output` invocation also fires
+        ``callback``.  Holding the state lock across both operations is what
+        prevents the "callback registered after new output was already
+        applied" race that would otherwise drop bytes produced during reconnect.
+        The screen lock is held until the snapshot is taken, so no output queued
+        after the callback was registered can make it into the snapshot too.
         """
-        with self._state_lock:
-            snapshot = b"".join(self._output_buffer)
-            self._output_callbacks.append(callback)
-            return snapshot
+        with self._screen_lock:
+            with self._state_lock:
+                unfed_output = self._take_unfed_output()
+                self._output_callbacks.append(callback)
+            self._feed_to_screen(unfed_output)
+            return self._screen.serialize()
+
+    def get_output_text(self) -> str:
+        """The plain text of the terminal's scrollback and screen, e.g. for searching its output."""
+        with self._screen_lock:
+            self._feed_screen()
+            return self._screen.get_text()
 
     def remove_output_callback(self, callback: Callable[[bytes], None]) -> None:
         """Remove an output callback.
@@ -534,7 +568,8 @@ class LocalTerminalManager(TerminalManager):
         Idempotent: ``close_primary_fd`` and ``terminate`` both no-op once the
         fd is closed / the shell is gone, and ``_pty_process`` is cleared so a
         second call returns immediately. This is what lets both stop() (external
-        teardown) and _read_loop (the shell self-exited) call it safely.
+        teardown) and _clean_up_after_shell_exit (the shell self-exited) call it
+        safely.
         """
         pty_process = self._pty_process
         if pty_process is None:
@@ -549,12 +584,12 @@ class LocalTerminalManager(TerminalManager):
 
         self._unregister_from_registry()
 
-        # Stop the reader thread before tearing down the pty so it is not
-        # polling a primary fd we are about to close.
-        self._stop_reader.set()
-        if self._reader_thread is not None:
-            self._reader_thread.join(timeout=_READER_THREAD_JOIN_TIMEOUT_SECONDS)
-            self._reader_thread = None
+        # Stop reading before tearing down the pty: once closed, its fd number
+        # can be reused by another terminal the reactor is watching. This also
+        # closes the primary fd, which sends the shell its SIGHUP.
+        self._is_stopping.set()
+        if self._stop_reading():
+            self._emit_output(b"\r\n[Process exited]\r\n")
 
         self._close_pty_process()
 
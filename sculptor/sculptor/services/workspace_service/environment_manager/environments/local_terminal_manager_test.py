@@ -13,11 +13,13 @@ import resource
 import sys
 import threading
 import time
+from collections.abc import Iterator
 from pathlib import Path
 
 import pytest
 
 from sculptor.foundation.concurrency_group import ConcurrencyGroup
+from sculptor.services.workspace_service.environment_manager.environments import local_terminal_manager
 from sculptor.services.workspace_service.environment_manager.environments.local_terminal_manager import (
     LocalTerminalManager,
 )
@@ -33,11 +35,24 @@ from sculptor.services.workspace_service.environment_manager.environments.local_
 from sculptor.services.workspace_service.environment_manager.environments.local_terminal_manager import (
     unregister_terminal_manager,
 )
+from sculptor.services.workspace_service.environment_manager.environments.pty_reactor import start_pty_reactor
+from sculptor.services.workspace_service.environment_manager.environments.pty_reactor import stop_pty_reactor
 from sculptor.services.workspace_service.environment_manager.environments.spawned_pty_process import SpawnedPtyProcess
 
 pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="POSIX-only")
 
 
+@pytest.fixture(autouse=True)
+def _running_pty_reactor() -> Iterator[None]:
+    """Run the process-wide pty reactor, which the workspace service starts outside of these tests."""
+    with ConcurrencyGroup(name="pty-reactor") as group:
+        start_pty_reactor(group)
+        try:
+            yield
+        finally:
+            stop_pty_reactor()
+
+
 @pytest.fixture(autouse=True)
 def _isolate_shell_config(monkeypatch: pytest.MonkeyPatch, tmp_path_factory: pytest.TempPathFactory) -> None:
     """Point the spawned login shell at an empty HOME/ZDOTDIR so it sources no
@@ -118,9 +133,9 @@ def test_unregister_missing_returns_none() -> None:
     assert unregister_terminal_manager("nonexistent-terminal-id") is None
 
 
-def test_read_loop_closes_primary_fd_and_unregisters_on_shell_self_exit(tmp_path: Path) -> None:
-    """When the shell exits on its own (e.g. the user types ``exit``), the reader
-    thread must tear the terminal down itself — close the pty primary fd and
+def test_shell_self_exit_closes_primary_fd_and_unregisters(tmp_path: Path) -> None:
+    """When the shell exits on its own (e.g. the user types ``exit``), the
+    manager must tear the terminal down itself — close the pty primary fd and
     unregister the manager.
 
     stop() only runs on an explicit user action (closing the panel) or workspace
@@ -149,8 +164,8 @@ def test_read_loop_closes_primary_fd_and_unregisters_on_shell_self_exit(tmp_path
             # The primary fd is open right now.
             os.fstat(primary_fd)
 
-            # Tell the login shell to exit on its own. The reader thread should
-            # then observe EOF/EIO and run the self-exit cleanup path, which
+            # Tell the login shell to exit on its own. The pty reactor should
+            # then observe EOF/EIO and the manager run the self-exit cleanup path, which
             # clears _pty_process once it has closed the fd + terminated the
             # shell (manager.stop() is never called here).
             #
@@ -158,10 +173,10 @@ def test_read_loop_closes_primary_fd_and_unregisters_on_shell_self_exit(tmp_path
             # shell with a heavy rc can still be initializing — and discarding
             # typed-ahead input — right after start(), so a single early write
             # can be dropped and the shell would never exit. Resending until the
-            # reader tears the terminal down makes this robust under load.
+            # manager tears the terminal down makes this robust under load.
             #
             # Write straight to the captured pty fd rather than via
-            # ``manager.write()``: the reader thread is concurrently nulling
+            # ``manager.write()``: the cleanup thread is concurrently nulling
             # ``manager._pty_process`` as it tears down, and ``write()`` reads
             # that attribute twice, so a resend racing the teardown could hit an
             # AttributeError. ``pty_process`` is a stable reference and its
@@ -180,7 +195,7 @@ def test_read_loop_closes_primary_fd_and_unregisters_on_shell_self_exit(tmp_path
                     next_write = now + 0.5
                 time.sleep(0.02)
 
-            assert manager._pty_process is None, "reader did not tear down the pty after the shell self-exited"
+            assert manager._pty_process is None, "manager did not tear down the pty after the shell self-exited"
             assert pty_process._is_primary_fd_closed, "primary fd was not closed after the shell self-exited"
             assert get_terminal_manager(terminal_id) is None, (
                 "manager was not unregistered after the shell self-exited"
@@ -208,9 +223,9 @@ class _HighFdPtyProcess(SpawnedPtyProcess):
     """A SpawnedPtyProcess whose ``primary_fd`` is a caller-supplied fd.
 
     Constructing the base does not spawn anything (that happens in ``start()``),
-    so this lets us point ``_read_loop`` at a pty fd we have deliberately placed
-    at a high number without launching a real shell. ``_read_loop`` only reads
-    ``primary_fd``, which we override here.
+    so this lets us point the pty reactor at a pty fd we have deliberately placed
+    at a high number without launching a real shell. ``_start_reading`` only
+    reads ``primary_fd``, which we override here.
     """
 
     def __init__(self, primary_fd: int) -> None:
@@ -222,13 +237,13 @@ class _HighFdPtyProcess(SpawnedPtyProcess):
         return self._test_primary_fd
 
 
-def test_read_loop_reads_from_high_numbered_fd(tmp_path: Path) -> None:
+def test_reads_from_high_numbered_fd(tmp_path: Path) -> None:
     """The pty reader must keep working when the primary fd is >= 1024.
 
     A long-lived backend steadily accumulates open fds; eventually a freshly
     opened pty is handed a fd number at or above FD_SETSIZE (1024).
     ``select.select()`` raises "filedescriptor out of range in select()" for
-    such fds, which killed the reader thread the instant the terminal opened
+    such fds, which killed the pty reader the instant the terminal opened
     and surfaced to the user as "failing to open new terminals". This forces a
     real pty's primary fd onto a high number and asserts shell output still
     reaches subscribers.
@@ -258,7 +273,7 @@ def test_read_loop_reads_from_high_numbered_fd(tmp_path: Path) -> None:
                 working_directory=tmp_path,
                 concurrency_group=group,
             )
-            # Inject the high-fd pty directly; we are exercising _read_loop, not start().
+            # Inject the high-fd pty directly; we are exercising the reading, not start().
             manager._pty_process = _HighFdPtyProcess(high_primary)
 
             received = bytearray()
@@ -270,8 +285,7 @@ def test_read_loop_reads_from_high_numbered_fd(tmp_path: Path) -> None:
 
             manager.subscribe(_collect)
 
-            reader = threading.Thread(target=manager._read_loop, name="test-pty-reader", daemon=True)
-            reader.start()
+            manager._start_reading()
             try:
                 os.write(secondary, b"hello-high-fd\n")
                 deadline = time.monotonic() + 3.0
@@ -281,8 +295,7 @@ def test_read_loop_reads_from_high_numbered_fd(tmp_path: Path) -> None:
                             break
                     time.sleep(0.02)
             finally:
-                manager._stop_reader.set()
-                reader.join(timeout=2.0)
+                manager._stop_reading()
 
             with received_lock:
                 got = bytes(received)
@@ -299,3 +312,46 @@ def test_read_loop_reads_from_high_numbered_fd(tmp_path: Path) -> None:
                 except OSError:
                     pass
         resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+
+
+def test_output_reaches_the_screen_only_when_it_is_read(tmp_path: Path) -> None:
+    """The pty reactor thread only queues output; interpreting it is left to whoever reads the screen."""
+    with ConcurrencyGroup(name="terminal-deferred-screen-test") as group:
+        manager = LocalTerminalManager(
+            environment_id="env-deferred-screen",
+            workspace_path=tmp_path,
+            working_directory=tmp_path,
+            concurrency_group=group,
+        )
+        received: list[bytes] = []
+        manager._emit_output(b"before subscribing\r\n")
+        assert manager._screen.get_text() == ""
+
+        snapshot = manager.subscribe(received.append)
+        manager._emit_output(b"after subscribing\r\n")
+
+        assert b"before subscribing" in snapshot
+        assert received == [b"after subscribing\r\n"]
+        assert "after subscribing" not in manager._screen.get_text()
+        assert "after subscribing" in manager.get_output_text()
+
+
+def test_output_nobody_subscribes_to_is_bounded_and_never_parsed(tmp_path: Path) -> None:
+    with ConcurrencyGroup(name="terminal-screen-drop-test") as group:
+        manager = LocalTerminalManager(
+            environment_id="env-screen-drop",
+            workspace_path=tmp_path,
+            working_directory=tmp_path,
+            concurrency_group=group,
+        )
+        for index in range(4096):
+            manager._emit_output(f"line {index}\r\n".encode() + b"x" * 1000 + b"\r\n")
+
+        assert not manager._screen.has_output
+        assert manager._unfed_output_size <= local_terminal_manager._MAX_UNFED_OUTPUT_BYTES
+        assert manager._has_dropped_unfed_output
+
+        text = manager.get_output_text()
+
+    assert "line 4095" in text
+    assert "line 0\n" not in text
@@ -0,0 +1,312 @@
+"""One shared I/O thread that reads every terminal's pty.
+
+Each ``LocalTerminalManager`` used to run its own reader thread, waking every
+100 ms in poll(2) to re-check its stop flag. With dozens of workspaces times
+several terminals (plus terminal agents and pi login ptys) that is one mostly
+idle thread, and ten wakeups a second, per pty. ``PtyReactor`` multiplexes all
+pty primary fds on a single thread that blocks without a timeout while every
+terminal is idle; registrations and unregistrations wake it through a pipe.
+
+Output is coalesced per frame: the first read after a quiet period is delivered
+immediately (keystroke echo stays instant), and anything else that arrives in
+the same ``_FRAME_SECONDS`` is delivered as one chunk at the end of the frame,
+so bulk output (``cat large_file``) turns into ~60 subscriber notifications a
+second instead of one per 32 KiB read.
+
+Callbacks run on the reactor thread and must not block; they are shared by
+every terminal in the process.
+
+The process-wide reactor is owned by the workspace service, which starts it on
+its concurrency group (``start_pty_reactor``) and stops it once every terminal
+is stopped (``stop_pty_reactor``).
+"""
+
+import errno
+import os
+import selectors
+import threading
+import time
+from typing import Callable
+from typing import Final
+
+from loguru import logger
+
+from sculptor.foundation.concurrency_group import ConcurrencyGroup
+from sculptor.foundation.thread_utils import ObservableThread
+
+# Buffer size for reading from pty — larger buffers reduce syscall overhead
+# for bulk output (e.g., `cat large_file`), matching ttyd's approach.
+PTY_READ_BUFFER_SIZE: Final[int] = 32768
+
+# Reads per fd per wakeup, so one terminal streaming output cannot starve the others.
+_MAX_READS_PER_WAKEUP: Final[int] = 8
+
+_FRAME_SECONDS: Final[float] = 1 / 60
+
+# How long unregister() waits for the reactor thread to acknowledge.
+_UNREGISTER_TIMEOUT_SECONDS: Final[float] = 2.0
+
+# epoll (and poll(2), the fallback) have no limit on fd numbers, unlike
+# select(2), which cannot wait on an fd >= FD_SETSIZE (1024) — and a long-lived
+# backend hands newly opened ptys high fd numbers. kqueue, the default selector
+# on macOS, does not support ttys there, hence poll rather than DefaultSelector.
+_SelectorClass: type[selectors.BaseSelector] = getattr(selectors, "EpollSelector", selectors.PollSelector)
+
+
+class PtyReactorNotRunningError(Exception):
+    """Raised when a pty is to be read while no service has started the process-wide reactor."""
+
+
+class _PtyRegistration:
+    def __init__(self, fd: int, name: str, on_output: Callable[[bytes], None], on_closed: Callable[[], None]) -> None:
+        self.fd = fd
+        self.name = name
+        self.on_output = on_output
+        self.on_closed = on_closed
+        # Output read during the current frame, delivered when it ends.
+        self.pending: list[bytes] = []
+        self.frame_started_at = float("-inf")
+
+
+class PtyReactor:
+    """Reads a set of pty primary fds on one thread and hands their output to callbacks.
+
+    The thread runs from ``start`` until ``stop``.
+    """
+
+    def __init__(self, name: str = "pty-reactor") -> None:
+        self._name = name
+        self._selector = _SelectorClass()
+        self._wakeup_read_fd, self._wakeup_write_fd = os.pipe()
+        os.set_blocking(self._wakeup_read_fd, False)
+        os.set_blocking(self._wakeup_write_fd, False)
+        self._selector.register(self._wakeup_read_fd, selectors.EVENT_READ)
+        # Mutations of the selector and of _registrations happen only on the reactor
+        # thread; other threads queue them here and wake it up.
+        self._commands_lock = threading.Lock()
+        self._pending_registrations: list[_PtyRegistration] = []
+        # (fd, whether to close it, acknowledgement, result)
+        self._pending_unregistrations: list[tuple[int, bool, threading.Event, list[bool]]] = []
+        self._registrations: dict[int, _PtyRegistration] = {}
+        # Number of times the reactor thread returned from waiting; for diagnostics and tests.
+        self.wakeup_count = 0
+        self._is_stopping = threading.Event()
+        self._thread: ObservableThread | None = None
+
+    def start(self, concurrency_group: ConcurrencyGroup) -> None:
+        assert self._thread is None, "PtyReactor can only be started once"
+        self._thread = concurrency_group.start_new_thread(target=self._run, name=self._name)
+
+    def stop(self) -> None:
+        """Stop the reactor thread; fds still registered are no longer read, but stay open."""
+        self._is_stopping.set()
+        self._wake()
+        if self._thread is not None:
+            self._thread.join()
+        # Close the fds handed over by requests the thread did not get to.
+        self._apply_commands()
+        self._selector.close()
+        os.close(self._wakeup_read_fd)
+        os.close(self._wakeup_write_fd)
+
+    def register(self, fd: int, name: str, on_output: Callable[[bytes], None], on_closed: Callable[[], None]) -> None:
+        """Start reading ``fd``, which is switched to non-blocking mode.
+
+        ``on_output`` receives the output; ``on_closed`` is called once, after any
+        remaining output, when the fd reaches EOF or fails. The fd is then no
+        longer watched, but closing it is up to the caller.
+        """
+        os.set_blocking(fd, False)
+        with self._commands_lock:
+            self._pending_registrations.append(_PtyRegistration(fd, name, on_output, on_closed))
+        self._wake()
+
+    def unregister(self, fd: int) -> bool:
+        """Stop reading ``fd``, delivering output already read; only then is it safe to close.
+
+        Returns whether ``fd`` was still registered; if so, its ``on_closed`` is never called.
+        Returns False, too, if the reactor did not get to it in time, in which case ``fd``
+        may still be watched: use ``unregister_and_close`` to give up the fd regardless.
+        """
+        return self._request_unregistration(fd, is_closing=False)
+
+    def unregister_and_close(self, fd: int) -> bool:
+        """Stop reading ``fd`` like ``unregister``, then close it on the reactor thread.
+
+        The caller hands over ``fd``: it is closed even if the reactor does not get to
+        it in time, just later, so its number is never reused while still watched.
+        """
+        return self._request_unregistration(fd, is_closing=True)
+
+    def _request_unregistration(self, fd: int, is_closing: bool) -> bool:
+        if threading.current_thread() is self._thread:
+            return self._unregister_now(fd, is_closing)
+        done = threading.Event()
+        result: list[bool] = []
+        with self._commands_lock:
+            self._pending_unregistrations.append((fd, is_closing, done, result))
+        self._wake()
+        if not done.wait(timeout=_UNREGISTER_TIMEOUT_SECONDS):
+            logger.error("Timed out waiting for {} to unregister fd {}", self._name, fd)
+            return False
+        return result[0]
+
+    def _wake(self) -> None:
+        try:
+            os.write(self._wakeup_write_fd, b"\0")
+        except BlockingIOError:
+            # The pipe is full, so a wakeup is already pending.
+            pass
+
+    def _run(self) -> None:
+        while not self._is_stopping.is_set():
+            try:
+                self._apply_commands()
+                events = self._selector.select(self._get_select_timeout())
+                self.wakeup_count += 1
+                for key, _ in events:
+                    if key.fd == self._wakeup_read_fd:
+                        self._drain_wakeup_pipe()
+                        continue
+                    registration = self._registrations.get(key.fd)
+                    if registration is not None:
+                        self._read(registration)
+                self._flush_finished_frames()
+            except Exception as e:
+                logger.opt(exception=e).error("Unexpected error in {}", self._name)
+
+    def _get_select_timeout(self) -> float | None:
+        frame_ends = [
+            registration.frame_started_at + _FRAME_SECONDS
+            for registration in self._registrations.values()
+            if registration.pending
+        ]
+        if not frame_ends:
+            return None
+        return max(0.0, min(frame_ends) - time.monotonic())
+
+    def _drain_wakeup_pipe(self) -> None:
+        try:
+            while os.read(self._wakeup_read_fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def _apply_commands(self) -> None:
+        with self._commands_lock:
+            registrations, self._pending_registrations = self._pending_registrations, []
+            unregistrations, self._pending_unregistrations = self._pending_unregistrations, []
+        for registration in registrations:
+            try:
+                self._selector.register(registration.fd, selectors.EVENT_READ)
+            except (OSError, ValueError, KeyError) as e:
+                logger.error("Cannot watch pty fd {} for {}: {}", registration.fd, registration.name, e)
+                self._call_on_closed(registration)
+                continue
+            self._registrations[registration.fd] = registration
+        for fd, is_closing, done, result in unregistrations:
+            result.append(self._unregister_now(fd, is_closing))
+            done.set()
+
+    def _unregister_now(self, fd: int, is_closing: bool) -> bool:
+        registration = self._registrations.pop(fd, None)
+        if registration is not None:
+            self._selector.unregister(fd)
+            self._flush(registration)
+        if is_closing:
+            try:
+                os.close(fd)
+            except OSError as e:
+                logger.debug("Failed to close pty fd {}: {}", fd, e)
+        return registration is not None
+
+    def _read(self, registration: _PtyRegistration) -> None:
+        chunks: list[bytes] = []
+        is_closed = False
+        for _ in range(_MAX_READS_PER_WAKEUP):
+            try:
+                data = os.read(registration.fd, PTY_READ_BUFFER_SIZE)
+            except BlockingIOError:
+                break
+            except OSError as e:
+                # EIO is how a pty primary reports that the shell side has closed.
+                if e.errno != errno.EIO:
+                    logger.error("Pty read error for {}: {}", registration.name, e)
+                is_closed = True
+                break
+            if not data:
+                is_closed = True
+                break
+            chunks.append(data)
+            if len(data) < PTY_READ_BUFFER_SIZE:
+                break
+
+        if chunks:
+            registration.pending.extend(chunks)
+            now = time.monotonic()
+            if now - registration.frame_started_at >= _FRAME_SECONDS:
+                # First output since the last frame ended: deliver it now and start a new frame.
+                self._flush(registration)
+                registration.frame_started_at = now
+        if is_closed:
+            logger.debug("Pty closed for {}", registration.name)
+            self._registrations.pop(registration.fd, None)
+            self._selector.unregister(registration.fd)
+            self._flush(registration)
+            self._call_on_closed(registration)
+
+    def _flush_finished_frames(self) -> None:
+        now = time.monotonic()
+        for registration in self._registrations.values():
+            if registration.pending and now - registration.frame_started_at >= _FRAME_SECONDS:
+                self._flush(registration)
+                registration.frame_started_at = now
+
+    def _flush(self, registration: _PtyRegistration) -> None:
+        if not registration.pending:
+            return
+        data = b"".join(registration.pending)
+        registration.pending = []
+        try:
+            registration.on_output(data)
+        except Exception as e:
+            logger.error("Pty output callback error for {}: {}", registration.name, e)
+
+    def _call_on_closed(self, registration: _PtyRegistration) -> None:
+        try:
+            registration.on_closed()
+        except Exception as e:
+            logger.error("Pty close callback error for {}: {}", registration.name, e)
+
+
+_reactor: PtyReactor | None = None
+_reactor_lock = threading.Lock()
+
+
+def start_pty_reactor(concurrency_group: ConcurrencyGroup) -> None:
+    """Start the process-wide reactor on a thread of ``concurrency_group``, unless it is running."""
+    global _reactor
+    with _reactor_lock:
+        if _reactor is not None:
+            return
+        reactor = PtyReactor()
+        reactor.start(concurrency_group)
+        _reactor = reactor
+
+
+def stop_pty_reactor() -> None:
+    """Stop the process-wide reactor, if running; stop the terminals reading through it first."""
+    global _reactor
+    with _reactor_lock:
+        reactor = _reactor
+        _reactor = None
+    if reactor is not None:
+        reactor.stop()
+
+
+def get_pty_reactor() -> PtyReactor:
+    """Get the running process-wide reactor."""
+    with _reactor_lock:
+        if _reactor is None:
+            raise PtyReactorNotRunningError("The pty reactor has not been started")
+        return _reactor
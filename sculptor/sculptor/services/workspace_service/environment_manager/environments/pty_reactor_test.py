@@ -0,0 +1,192 @@
+import os
+import pty
+import sys
+import threading
+import time
+from collections.abc import Callable
+from collections.abc import Iterator
+from unittest.mock import patch
+
+import pytest
+
+from sculptor.foundation.async_monkey_patches_test import expect_exact_logged_errors
+from sculptor.foundation.concurrency_group import ConcurrencyGroup
+from sculptor.services.workspace_service.environment_manager.environments import pty_reactor
+from sculptor.services.workspace_service.environment_manager.environments.pty_reactor import PtyReactor
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="POSIX-only")
+
+
+class _Recorder:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.chunks: list[bytes] = []
+        self.closed = threading.Event()
+
+    def on_output(self, data: bytes) -> None:
+        with self.lock:
+            self.chunks.append(data)
+
+    def on_closed(self) -> None:
+        self.closed.set()
+
+    def output(self) -> bytes:
+        with self.lock:
+            return b"".join(self.chunks)
+
+
+def _wait_for(condition: Callable[[], bool], timeout: float = 3.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.fixture
+def reactor() -> Iterator[PtyReactor]:
+    reactor = PtyReactor()
+    with ConcurrencyGroup(name="pty_reactor_test") as concurrency_group:
+        reactor.start(concurrency_group)
+        try:
+            yield reactor
+        finally:
+            reactor.stop()
+
+
+@pytest.fixture
+def ptys() -> Iterator[list[tuple[int, int]]]:
+    pairs: list[tuple[int, int]] = []
+    yield pairs
+    for primary, secondary in pairs:
+        for fd in (primary, secondary):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+def _open_pty(ptys: list[tuple[int, int]]) -> tuple[int, int]:
+    pair = pty.openpty()
+    ptys.append(pair)
+    return pair
+
+
+def test_one_thread_serves_many_ptys_and_sleeps_while_they_are_idle(
+    reactor: PtyReactor, ptys: list[tuple[int, int]]
+) -> None:
+    recorders = [_Recorder() for _ in range(100)]
+    threads_before = threading.active_count()
+    for index, recorder in enumerate(recorders):
+        primary, _ = _open_pty(ptys)
+        reactor.register(primary, f"test-{index}", recorder.on_output, recorder.on_closed)
+
+    for index, (_, secondary) in enumerate(ptys):
+        os.write(secondary, f"hello-{index}\n".encode())
+    assert _wait_for(
+        lambda: all(f"hello-{index}".encode() in recorder.output() for index, recorder in enumerate(recorders))
+    )
+    assert threading.active_count() == threads_before
+
+    # Let the last frame flush, then check that idle ptys do not wake the reactor.
+    time.sleep(0.1)
+    wakeups_before = reactor.wakeup_count
+    time.sleep(0.3)
+    assert reactor.wakeup_count == wakeups_before
+
+    for primary, _ in ptys:
+        assert reactor.unregister(primary)
+
+
+def test_output_within_a_frame_is_delivered_as_one_chunk(reactor: PtyReactor, ptys: list[tuple[int, int]]) -> None:
+    recorder = _Recorder()
+    primary, secondary = _open_pty(ptys)
+    reactor.register(primary, "test", recorder.on_output, recorder.on_closed)
+
+    expected = b"".join(f"line {index}\n".encode() for index in range(200))
+    for index in range(200):
+        os.write(secondary, f"line {index}\n".encode())
+
+    # The pty turns "\n" into "\r\n" on the way out.
+    assert _wait_for(lambda: recorder.output() == expected.replace(b"\n", b"\r\n"))
+    with recorder.lock:
+        assert len(recorder.chunks) < 20
+    assert reactor.unregister(primary)
+
+
+def test_closed_pty_is_reported_once_and_unregistered(reactor: PtyReactor, ptys: list[tuple[int, int]]) -> None:
+    recorder = _Recorder()
+    primary, secondary = _open_pty(ptys)
+    reactor.register(primary, "test", recorder.on_output, recorder.on_closed)
+
+    os.write(secondary, b"bye\n")
+    os.close(secondary)
+    ptys[-1] = (primary, -1)
+
+    assert recorder.closed.wait(timeout=3.0)
+    assert b"bye" in recorder.output()
+    assert not reactor.unregister(primary)
+
+
+def test_unregistered_pty_is_no_longer_read(reactor: PtyReactor, ptys: list[tuple[int, int]]) -> None:
+    recorder = _Recorder()
+    primary, secondary = _open_pty(ptys)
+    reactor.register(primary, "test", recorder.on_output, recorder.on_closed)
+
+    assert reactor.unregister(primary)
+    os.write(secondary, b"unread\n")
+    time.sleep(0.1)
+
+    assert recorder.output() == b""
+    assert not recorder.closed.is_set()
+    assert os.read(primary, 100) == b"unread\r\n"
+
+
+def test_unregister_and_close_closes_the_fd_even_when_it_times_out(
+    reactor: PtyReactor, ptys: list[tuple[int, int]]
+) -> None:
+    recorder = _Recorder()
+    primary, _ = _open_pty(ptys)
+    is_blocked = threading.Event()
+    release = threading.Event()
+
+    def block_the_reactor() -> None:
+        is_blocked.set()
+        release.wait()
+
+    reactor.register(primary, "test", recorder.on_output, recorder.on_closed)
+    blocker, blocker_secondary = _open_pty(ptys)
+    reactor.register(blocker, "blocker", lambda data: block_the_reactor(), lambda: None)
+    os.write(blocker_secondary, b"x")
+    assert is_blocked.wait(timeout=3.0)
+
+    with patch.object(pty_reactor, "_UNREGISTER_TIMEOUT_SECONDS", 0.05):
+        with expect_exact_logged_errors(["Timed out waiting for {} to unregister fd {}"]):
+            assert not reactor.unregister_and_close(primary)
+    # Still open while the reactor may be watching it, so its number cannot be reused yet.
+    os.fstat(primary)
+
+    release.set()
+    assert _wait_for(lambda: _is_closed(primary))
+    ptys[0] = (-1, ptys[0][1])
+    assert reactor.unregister(blocker)
+
+
+def test_stop_ends_the_reactor_thread(ptys: list[tuple[int, int]]) -> None:
+    reactor = PtyReactor()
+    with ConcurrencyGroup(name="pty_reactor_test") as concurrency_group:
+        reactor.start(concurrency_group)
+        primary, _ = _open_pty(ptys)
+        reactor.register(primary, "test", _Recorder().on_output, lambda: None)
+        reactor.stop()
+
+        assert reactor._thread is not None and not reactor._thread.is_alive()
+
+
+def _is_closed(fd: int) -> bool:
+    try:
+        os.fstat(fd)
+    except OSError:
+        return True
+    return False
@@ -534,6 +534,13 @@ class SpawnedPtyProcess(RunningProcess):
             pass
         self._is_primary_fd_closed = True
 
+    def release_primary_fd(self) -> int | None:
+        """Hand the primary fd over to the caller, who must close it; None if it is already closed."""
+        if self._helper is None or self._is_primary_fd_closed:
+            return None
+        self._is_primary_fd_closed = True
+        return self._helper.primary_fd
+
     def check(self) -> None:
         pass
 
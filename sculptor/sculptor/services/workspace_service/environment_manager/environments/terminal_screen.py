@@ -0,0 +1,775 @@
+"""Headless model of a terminal's screen and scrollback, for replaying a session on reconnect.
+
+``LocalTerminalManager`` used to keep the last 1 MB of raw pty output and send
+all of it to every reconnecting client, which made xterm re-parse up to a
+megabyte of escape sequences (and lost everything older). ``TerminalScreen``
+interprets the output as it arrives, keeping the visible grid plus a bounded
+number of scrollback lines, and ``serialize()`` turns that into a compact
+sequence of escape codes that redraws the same state in a fresh xterm: its size
+is proportional to the screen, not to the session's history.
+
+This is not a complete VT emulator. It implements what shells and full-screen
+programs commonly use: text with autowrap and wide characters, cursor
+movement, erasing, insert/delete of lines and characters, scroll regions, SGR
+attributes, the alternate screen, and the private modes that change how the
+client encodes input (so a reconnected vim still gets application cursor keys
+and mouse reports). Anything else is parsed and ignored.
+"""
+
+import codecs
+import functools
+import itertools
+import re
+import unicodedata
+from collections import deque
+from enum import Enum
+from enum import auto
+from typing import Final
+from typing import NamedTuple
+
+from sculptor.services.workspace_service.environment_manager.environments.spawned_pty_process import (
+    DEFAULT_TERMINAL_COLS,
+)
+from sculptor.services.workspace_service.environment_manager.environments.spawned_pty_process import (
+    DEFAULT_TERMINAL_ROWS,
+)
+
+# Matches xterm.js's default scrollback.
+DEFAULT_MAX_SCROLLBACK_LINES: Final[int] = 1000
+
+_TAB_WIDTH: Final[int] = 8
+# Longer (malformed) control sequences are dropped rather than accumulated.
+_MAX_SEQUENCE_LENGTH: Final[int] = 512
+
+_PRINTABLE_RUN: Final = re.compile(r"[^\x00-\x1f\x7f]+")
+# A complete CSI sequence after its ESC: parameters (with any private marker), intermediates, final byte.
+_CSI_SEQUENCE: Final = re.compile(r"\[([0-?]*)([ -/]*)([@-~])")
+
+# Private modes that switch to the alternate screen; handled rather than just recorded.
+_ALTERNATE_SCREEN_MODES: Final = frozenset((47, 1047, 1049))
+_AUTOWRAP_MODE: Final[int] = 7
+
+_ATTRIBUTE_CODES: Final = frozenset((1, 2, 3, 5, 6, 7, 8, 9, 53))
+_ATTRIBUTE_RESETS: Final = {
+    22: ("1", "2"),
+    23: ("3",),
+    25: ("5", "6"),
+    27: ("7",),
+    28: ("8",),
+    29: ("9",),
+    55: ("53",),
+}
+_UNDERLINE_CODES: Final = frozenset(("4", "21"))
+
+
+class _State(Enum):
+    GROUND = auto()
+    ESCAPE = auto()
+    # ESC followed by a character set or similar designator; its one argument is ignored.
+    ESCAPE_ARGUMENT = auto()
+    CSI = auto()
+    # OSC, DCS, APC, PM and SOS strings: ignored up to their terminator.
+    STRING = auto()
+    STRING_ESCAPE = auto()
+
+
+class _Pen(NamedTuple):
+    """The current SGR attributes, as the canonical SGR parameters that select them."""
+
+    attributes: tuple[str, ...] = ()
+    foreground: str = ""
+    background: str = ""
+    underline_color: str = ""
+
+    def to_sgr(self) -> str:
+        colors = (self.foreground, self.background, self.underline_color)
+        return ";".join((*self.attributes, *(color for color in colors if color)))
+
+    def to_erase_sgr(self) -> str:
+        # Like xterm, erased and scrolled-in cells take the current background color.
+        return self.background
+
+
+_DEFAULT_PEN: Final = _Pen()
+
+
+@functools.lru_cache(maxsize=1024)
+def _apply_sgr(pen: _Pen, parameters: str) -> _Pen:
+    tokens = parameters.split(";") if parameters else ["0"]
+    attributes = set(pen.attributes)
+    foreground, background, underline_color = pen.foreground, pen.background, pen.underline_color
+    index = 0
+    while index < len(tokens):
+        token = tokens[index]
+        index += 1
+        code = _parse_parameter(token)
+        if code == 0:
+            attributes.clear()
+            foreground = background = underline_color = ""
+        elif code in (38, 48, 58):
+            if ":" in token:
+                color = token
+            elif index < len(tokens) and tokens[index] == "5":
+                color = ";".join(tokens[index - 1 : index + 2])
+                index += 2
+            elif index < len(tokens) and tokens[index] == "2":
+                color = ";".join(tokens[index - 1 : index + 4])
+                index += 4
+            else:
+                continue
+            if code == 38:
+                foreground = color
+            elif code == 48:
+                background = color
+            else:
+                underline_color = color
+        elif 30 <= code <= 37 or 90 <= code <= 97:
+            foreground = str(code)
+        elif code == 39:
+            foreground = ""
+        elif 40 <= code <= 47 or 100 <= code <= 107:
+            background = str(code)
+        elif code == 49:
+            background = ""
+        elif code == 59:
+            underline_color = ""
+        elif code in (4, 21, 24):
+            attributes = {attribute for attribute in attributes if attribute.partition(":")[0] not in _UNDERLINE_CODES}
+            if code != 24 and token != "4:0":
+                attributes.add(token)
+        elif code in _ATTRIBUTE_RESETS:
+            attributes.difference_update(_ATTRIBUTE_RESETS[code])
+        elif code in _ATTRIBUTE_CODES:
+            attributes.add(str(code))
+    return _Pen(tuple(sorted(attributes)), foreground, background, underline_color)
+
+
+def _parse_parameter(parameter: str) -> int:
+    head = parameter.partition(":")[0]
+    return int(head) if head.isdigit() else 0
+
+
+def _get_char_width(char: str) -> int:
+    if unicodedata.combining(char) or unicodedata.category(char) in ("Mn", "Me", "Cf"):
+        return 0
+    return 2 if unicodedata.east_asian_width(char) in ("W", "F") else 1
+
+
+class _Line:
+    """One row of cells. A wide character occupies its cell and an empty-string continuation cell."""
+
+    __slots__ = ("chars", "sgrs", "is_wrapped")
+
+    def __init__(self, cols: int, sgr: str = "") -> None:
+        self.chars = [" "] * cols
+        # The SGR parameters of each cell; "" is the default rendition.
+        self.sgrs = [sgr] * cols
+        # Whether the text continues on the next line because it was autowrapped.
+        self.is_wrapped = False
+
+    def resize(self, cols: int) -> None:
+        missing = cols - len(self.chars)
+        if missing > 0:
+            self.chars.extend([" "] * missing)
+            self.sgrs.extend([""] * missing)
+        elif missing < 0:
+            self.truncate(cols)
+            self.is_wrapped = False
+
+    def truncate(self, cols: int) -> None:
+        del self.chars[cols:]
+        del self.sgrs[cols:]
+        # A wide character whose continuation cell was cut off.
+        if self.chars and self.chars[-1] != "" and _get_char_width(self.chars[-1][0]) == 2:
+            self.chars[-1] = " "
+
+    def erase(self, start: int, end: int, sgr: str) -> None:
+        if start >= end:
+            return
+        self.split_wide_chars(start, end)
+        self.chars[start:end] = [" "] * (end - start)
+        self.sgrs[start:end] = [sgr] * (end - start)
+
+    def split_wide_chars(self, start: int, end: int) -> None:
+        """Blank the wide characters that straddle either edge of cells [start, end), before those are modified."""
+        for edge in (start, end):
+            if 0 < edge < len(self.chars) and self.chars[edge] == "":
+                self.chars[edge - 1] = " "
+                self.chars[edge] = " "
+
+    def render(self) -> tuple[str, str]:
+        """Return the escape codes that draw this line from its first column, and its plain text."""
+        # Runs of cells with the same rendition; lines scroll into the scrollback one
+        # at a time, so this avoids a Python-level loop over every cell.
+        runs: list[tuple[str, str]] = []
+        if self.sgrs.count(self.sgrs[0]) == len(self.sgrs):
+            runs.append((self.sgrs[0], "".join(self.chars)))
+        else:
+            start = 0
+            for sgr, cells in itertools.groupby(self.sgrs):
+                end = start + len(list(cells))
+                runs.append((sgr, "".join(self.chars[start:end])))
+                start = end
+        if not self.is_wrapped and runs and runs[-1][0] == "":
+            trimmed = runs[-1][1].rstrip(" ")
+            if trimmed:
+                runs[-1] = ("", trimmed)
+            else:
+                runs.pop()
+        parts: list[str] = []
+        current_sgr = ""
+        for sgr, text in runs:
+            if sgr != current_sgr:
+                parts.append(f"\x1b[0;{sgr}m" if sgr else "\x1b[0m")
+                current_sgr = sgr
+            parts.append(text)
+        if current_sgr:
+            parts.append("\x1b[0m")
+        return "".join(parts), "".join(text for _, text in runs)
+
+
+class _ScrollbackLine(NamedTuple):
+    rendered: str
+    text: str
+    is_wrapped: bool
+
+
+class TerminalScreen:
+    """The visible grid and scrollback of a terminal, maintained from its output.
+
+    Not thread-safe; ``LocalTerminalManager`` feeds and serializes it under its state lock.
+    """
+
+    def __init__(
+        self,
+        rows: int = DEFAULT_TERMINAL_ROWS,
+        cols: int = DEFAULT_TERMINAL_COLS,
+        max_scrollback_lines: int = DEFAULT_MAX_SCROLLBACK_LINES,
+    ) -> None:
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._max_scrollback_lines = max_scrollback_lines
+        self._rows = max(rows, 1)
+        self._cols = max(cols, 1)
+        self._reset()
+
+    def _reset(self) -> None:
+        self._has_output = False
+        self._main_lines = [_Line(self._cols) for _ in range(self._rows)]
+        self._alternate_lines: list[_Line] | None = None
+        self._scrollback: deque[_ScrollbackLine] = deque(maxlen=self._max_scrollback_lines)
+        self._row = 0
+        self._col = 0
+        self._is_wrap_pending = False
+        self._pen = _DEFAULT_PEN
+        self._sgr = ""
+        self._erase_sgr = ""
+        self._saved_cursor: tuple[int, int, _Pen] | None = None
+        self._scroll_top = 0
+        self._scroll_bottom = self._rows - 1
+        # Modes set or reset by the program, replayed so the client encodes input the same way.
+        self._private_modes: dict[int, bool] = {}
+        self._ansi_modes: dict[int, bool] = {}
+        self._is_application_keypad = False
+        self._cursor_style: str | None = None
+        self._state = _State.GROUND
+        self._sequence = ""
+
+    @property
+    def _lines(self) -> list[_Line]:
+        return self._alternate_lines if self._alternate_lines is not None else self._main_lines
+
+    @property
+    def has_output(self) -> bool:
+        return self._has_output
+
+    def feed(self, data: bytes) -> None:
+        """Interpret a chunk of the terminal's output."""
+        text = self._decoder.decode(data)
+        if not text:
+            return
+        self._has_output = True
+        index = 0
+        length = len(text)
+        while index < length:
+            if self._state is _State.GROUND:
+                match = _PRINTABLE_RUN.match(text, index)
+                if match is not None:
+                    self._write_text(match.group())
+                    index = match.end()
+                    continue
+                char = text[index]
+                if char == "\x1b":
+                    # Fast path for the common case: a complete CSI sequence within this chunk.
+                    match = _CSI_SEQUENCE.match(text, index + 1)
+                    if match is not None:
+                        self._dispatch_csi(match.group(1), match.group(2), match.group(3))
+                        index = match.end()
+                        continue
+                    self._state = _State.ESCAPE
+                else:
+                    self._execute(char)
+                index += 1
+                continue
+            self._advance_sequence(text[index])
+            index += 1
+
+    def skip_dropped_output(self) -> None:
+        """Note that output was dropped before the next chunk, which therefore starts a new sequence or character.
+
+        The screen itself is kept: whatever the dropped output drew would mostly
+        have been scrolled out or overdrawn by the output that follows it.
+        """
+        self._decoder.reset()
+        self._state = _State.GROUND
+        self._sequence = ""
+
+    def resize(self, rows: int, cols: int) -> None:
+        rows = max(rows, 1)
+        cols = max(cols, 1)
+        if cols != self._cols:
+            for line in self._main_lines + (self._alternate_lines or []):
+                line.resize(cols)
+            self._cols = cols
+        if rows != self._rows:
+            # Like xterm, shrinking pushes lines above the cursor into scrollback rather than losing them.
+            excess = max(0, self._row - (rows - 1))
+            if excess and self._alternate_lines is None:
+                self._push_to_scrollback(self._main_lines[:excess])
+            for lines in (self._main_lines, self._alternate_lines):
+                if lines is None:
+                    continue
+                if lines is self._lines:
+                    del lines[:excess]
+                del lines[rows:]
+                lines.extend(_Line(cols) for _ in range(rows - len(lines)))
+            self._row -= excess
+            self._rows = rows
+        self._row = min(self._row, self._rows - 1)
+        self._col = min(self._col, self._cols - 1)
+        self._is_wrap_pending = False
+        self._scroll_top = 0
+        self._scroll_bottom = self._rows - 1
+
+    def serialize(self) -> bytes:
+        """Escape codes that reproduce the current screen, scrollback, cursor and modes in a fresh terminal.
+
+        Empty if nothing was ever output, so callers can still tell a silent terminal apart.
+
+        The redraw assumes the client's terminal has this screen's current size:
+        a client of a different size shows lines re-wrapped or clipped until its
+        own resize reaches the pty and the program redraws. OSC strings (window
+        title, hyperlinks, shell-integration marks) are ignored when fed, so they
+        are not replayed either.
+        """
+        if not self._has_output:
+            return b""
+        # Start from a full reset so the result is the same whatever the client showed before.
+        parts = ["\x1bc"]
+        for line in self._scrollback:
+            parts.append(line.rendered)
+            if not line.is_wrapped:
+                parts.append("\r\n")
+        for index, line in enumerate(self._main_lines):
+            parts.append(line.render()[0])
+            if index < self._rows - 1 and not line.is_wrapped:
+                parts.append("\r\n")
+        if self._alternate_lines is not None:
+            if self._saved_cursor is not None:
+                saved_row, saved_col, _ = self._saved_cursor
+                parts.append(f"\x1b[{saved_row + 1};{saved_col + 1}H")
+            parts.append("\x1b[?1049h")
+            for index, line in enumerate(self._alternate_lines):
+                parts.append(f"\x1b[{index + 1};1H\x1b[2K{line.render()[0]}")
+        parts.append("\x1b[0m")
+        if self._scroll_top != 0 or self._scroll_bottom != self._rows - 1:
+            parts.append(f"\x1b[{self._scroll_top + 1};{self._scroll_bottom + 1}r")
+        parts.append(f"\x1b[{self._row + 1};{self._col + 1}H")
+        if self._sgr:
+            parts.append(f"\x1b[0;{self._sgr}m")
+        for mode, is_set in self._ansi_modes.items():
+            parts.append(f"\x1b[{mode}{'h' if is_set else 'l'}")
+        for mode, is_set in self._private_modes.items():
+            if mode not in _ALTERNATE_SCREEN_MODES:
+                parts.append(f"\x1b[?{mode}{'h' if is_set else 'l'}")
+        if self._is_application_keypad:
+            parts.append("\x1b=")
+        if self._cursor_style is not None:
+            parts.append(f"\x1b[{self._cursor_style} q")
+        return "".join(parts).encode()
+
+    def get_text(self) -> str:
+        """The plain text of the scrollback and the main screen, with autowrapped lines joined."""
+        parts: list[str] = []
+        for line in self._scrollback:
+            parts.append(line.text)
+            if not line.is_wrapped:
+                parts.append("\n")
+        for line in self._main_lines:
+            parts.append(line.render()[1])
+            if not line.is_wrapped:
+                parts.append("\n")
+        return "".join(parts).rstrip("\n")
+
+    # Parsing
+
+    def _advance_sequence(self, char: str) -> None:
+        state = self._state
+        if state is _State.ESCAPE:
+            self._state = _State.GROUND
+            self._dispatch_escape(char)
+        elif state is _State.CSI:
+            if "@" <= char <= "~":
+                self._state = _State.GROUND
+                match = re.fullmatch(r"([0-?]*)([ -/]*)", self._sequence)
+                if match is not None:
+                    self._dispatch_csi(match.group(1), match.group(2), char)
+            elif char == "\x1b":
+                self._state = _State.ESCAPE
+            elif char < " ":
+                # Controls are executed even in the middle of a sequence.
+                self._execute(char)
+            elif len(self._sequence) < _MAX_SEQUENCE_LENGTH:
+                self._sequence += char
+            else:
+                self._state = _State.GROUND
+        elif state is _State.STRING:
+            if char == "\x07":
+                self._state = _State.GROUND
+            elif char == "\x1b":
+                self._state = _State.STRING_ESCAPE
+        elif state is _State.STRING_ESCAPE:
+            if char == "\\":
+                self._state = _State.GROUND
+            else:
+                self._state = _State.GROUND
+                self._dispatch_escape(char)
+        elif state is _State.ESCAPE_ARGUMENT:
+            self._state = _State.GROUND
+
+    def _dispatch_escape(self, char: str) -> None:
+        if char == "[":
+            self._state = _State.CSI
+            self._sequence = ""
+        elif char in "]P_^X":
+            self._state = _State.STRING
+        elif char in "()*+-./#% ":
+            self._state = _State.ESCAPE_ARGUMENT
+        elif char == "\x1b":
+            self._state = _State.ESCAPE
+        elif char == "7":
+            self._save_cursor()
+        elif char == "8":
+            self._restore_cursor()
+        elif char == "D":
+            self._index()
+        elif char == "E":
+            self._col = 0
+            self._index()
+        elif char == "M":
+            self._reverse_index()
+        elif char == "c":
+            self._reset()
+            self._has_output = True
+        elif char == "=":
+            self._is_application_keypad = True
+        elif char == ">":
+            self._is_application_keypad = False
+
+    def _execute(self, char: str) -> None:
+        if char == "\r":
+            self._col = 0
+            self._is_wrap_pending = False
+        elif char in "\n\v\f":
+            self._index()
+        elif char == "\b":
+            self._col = max(0, self._col - 1)
+            self._is_wrap_pending = False
+        elif char == "\t":
+            self._col = min(self._cols - 1, (self._col // _TAB_WIDTH + 1) * _TAB_WIDTH)
+            self._is_wrap_pending = False
+
+    def _dispatch_csi(self, parameter_text: str, intermediates: str, final: str) -> None:
+        private = ""
+        if parameter_text[:1] in ("<", "=", ">", "?"):
+            private = parameter_text[0]
+            parameter_text = parameter_text[1:]
+        if intermediates:
+            if intermediates == " " and final == "q" and not private:
+                self._cursor_style = parameter_text
+            return
+        if final == "m":
+            if not private:
+                self._pen = _apply_sgr(self._pen, parameter_text)
+                self._sgr = self._pen.to_sgr()
+                self._erase_sgr = self._pen.to_erase_sgr()
+            return
+        parameters = [_parse_parameter(part) for part in parameter_text.split(";")]
+        if final in "hl":
+            is_set = final == "h"
+            for mode in parameters:
+                if private == "?":
+                    self._set_private_mode(mode, is_set)
+                elif not private:
+                    self._ansi_modes[mode] = is_set
+            return
+        if private:
+            return
+        count = max(parameters[0], 1)
+        if final == "A":
+            self._move_to(self._row - count, self._col)
+        elif final in "Be":
+            self._move_to(self._row + count, self._col)
+        elif final in "Ca":
+            self._move_to(self._row, self._col + count)
+        elif final == "D":
+            self._move_to(self._row, self._col - count)
+        elif final == "E":
+            self._move_to(self._row + count, 0)
+        elif final == "F":
+            self._move_to(self._row - count, 0)
+        elif final in "G`":
+            self._move_to(self._row, count - 1)
+        elif final in "Hf":
+            column = max(parameters[1], 1) if len(parameters) > 1 else 1
+            self._move_to(count - 1, column - 1)
+        elif final == "d":
+            self._move_to(count - 1, self._col)
+        elif final == "J":
+            self._erase_in_display(parameters[0])
+        elif final == "K":
+            self._erase_in_line(parameters[0])
+        elif final == "X":
+            self._lines[self._row].erase(self._col, min(self._cols, self._col + count), self._erase_sgr)
+            self._is_wrap_pending = False
+        elif final == "@":
+            self._insert_chars(count)
+        elif final == "P":
+            self._delete_chars(count)
+        elif final == "L":
+            self._insert_lines(count)
+        elif final == "M":
+            self._delete_lines(count)
+        elif final == "S":
+            self._scroll_up(count)
+        elif final == "T":
+            self._scroll_down(count)
+        elif final == "r":
+            top = max(parameters[0], 1) - 1
+            bottom = (parameters[1] if len(parameters) > 1 and parameters[1] else self._rows) - 1
+            if top < min(bottom, self._rows - 1):
+                self._scroll_top = top
+                self._scroll_bottom = min(bottom, self._rows - 1)
+                self._move_to(0, 0)
+        elif final == "s" and not parameter_text:
+            self._save_cursor()
+        elif final == "u" and not parameter_text:
+            self._restore_cursor()
+
+    def _set_private_mode(self, mode: int, is_set: bool) -> None:
+        if mode in _ALTERNATE_SCREEN_MODES:
+            if is_set and self._alternate_lines is None:
+                if mode == 1049:
+                    self._save_cursor()
+                self._alternate_lines = [_Line(self._cols) for _ in range(self._rows)]
+            elif not is_set and self._alternate_lines is not None:
+                self._alternate_lines = None
+                if mode == 1049:
+                    self._restore_cursor()
+        self._private_modes[mode] = is_set
+
+    # Screen operations
+
+    def _write_text(self, text: str) -> None:
+        if not text.isascii():
+            for char in text:
+                self._write_char(char)
+            return
+        is_autowrap = self._private_modes.get(_AUTOWRAP_MODE, True)
+        while text:
+            if self._is_wrap_pending:
+                if is_autowrap:
+                    self._wrap()
+                else:
+                    self._is_wrap_pending = False
+            line = self._lines[self._row]
+            col = self._col
+            part = text[: self._cols - col]
+            text = text[len(part) :]
+            end = col + len(part)
+            line.split_wide_chars(col, end)
+            line.chars[col:end] = part
+            line.sgrs[col:end] = [self._sgr] * len(part)
+            if end >= self._cols:
+                # Without autowrap, the rest of the text overwrites the last column one character at a time.
+                self._col = self._cols - 1
+                self._is_wrap_pending = True
+            else:
+                self._col = end
+
+    def _write_char(self, char: str) -> None:
+        width = _get_char_width(char)
+        if width == 0:
+            # Combining marks join the previous cell's character.
+            line = self._lines[self._row]
+            col = self._col if self._is_wrap_pending else self._col - 1
+            while col > 0 and line.chars[col] == "":
+                col -= 1
+            if col >= 0:
+                line.chars[col] += char
+            return
+        if self._is_wrap_pending or (width == 2 and self._col == self._cols - 1):
+            if self._private_modes.get(_AUTOWRAP_MODE, True):
+                self._wrap()
+            else:
+                self._is_wrap_pending = False
+                if width == 2:
+                    return
+        if width > self._cols:
+            return
+        line = self._lines[self._row]
+        col = self._col
+        line.split_wide_chars(col, col + width)
+        line.chars[col] = char
+        line.sgrs[col] = self._sgr
+        if width == 2:
+            line.chars[col + 1] = ""
+            line.sgrs[col + 1] = self._sgr
+        if col + width >= self._cols:
+            self._col = self._cols - 1
+            self._is_wrap_pending = True
+        else:
+            self._col = col + width
+
+    def _wrap(self) -> None:
+        self._lines[self._row].is_wrapped = True
+        self._col = 0
+        self._is_wrap_pending = False
+        self._index()
+
+    def _move_to(self, row: int, col: int) -> None:
+        self._row = min(max(row, 0), self._rows - 1)
+        self._col = min(max(col, 0), self._cols - 1)
+        self._is_wrap_pending = False
+
+    def _index(self) -> None:
+        self._is_wrap_pending = False
+        if self._row == self._scroll_bottom:
+            self._scroll_up(1)
+        elif self._row < self._rows - 1:
+            self._row += 1
+
+    def _reverse_index(self) -> None:
+        self._is_wrap_pending = False
+        if self._row == self._scroll_top:
+            self._scroll_down(1)
+        elif self._row > 0:
+            self._row -= 1
+
+    def _scroll_up(self, count: int) -> None:
+        lines = self._lines
+        top, bottom = self._scroll_top, self._scroll_bottom
+        count = min(count, bottom - top + 1)
+        removed = lines[top : top + count]
+        del lines[top : top + count]
+        if top == 0 and lines is self._main_lines:
+            self._push_to_scrollback(removed)
+        lines[bottom - count + 1 : bottom - count + 1] = [_Line(self._cols, self._erase_sgr) for _ in range(count)]
+
+    def _scroll_down(self, count: int) -> None:
+        lines = self._lines
+        top, bottom = self._scroll_top, self._scroll_bottom
+        count = min(count, bottom - top + 1)
+        del lines[bottom - count + 1 : bottom + 1]
+        lines[top:top] = [_Line(self._cols, self._erase_sgr) for _ in range(count)]
+
+    def _insert_lines(self, count: int) -> None:
+        if not self._scroll_top <= self._row <= self._scroll_bottom:
+            return
+        lines = self._lines
+        count = min(count, self._scroll_bottom - self._row + 1)
+        del lines[self._scroll_bottom - count + 1 : self._scroll_bottom + 1]
+        lines[self._row : self._row] = [_Line(self._cols, self._erase_sgr) for _ in range(count)]
+        self._col = 0
+        self._is_wrap_pending = False
+
+    def _delete_lines(self, count: int) -> None:
+        if not self._scroll_top <= self._row <= self._scroll_bottom:
+            return
+        lines = self._lines
+        count = min(count, self._scroll_bottom - self._row + 1)
+        del lines[self._row : self._row + count]
+        lines[self._scroll_bottom - count + 1 : self._scroll_bottom - count + 1] = [
+            _Line(self._cols, self._erase_sgr) for _ in range(count)
+        ]
+        self._col = 0
+        self._is_wrap_pending = False
+
+    def _insert_chars(self, count: int) -> None:
+        line = self._lines[self._row]
+        col = self._col
+        count = min(count, self._cols - col)
+        line.split_wide_chars(col, col)
+        line.chars[col:col] = [" "] * count
+        line.sgrs[col:col] = [self._erase_sgr] * count
+        line.truncate(self._cols)
+        self._is_wrap_pending = False
+
+    def _delete_chars(self, count: int) -> None:
+        line = self._lines[self._row]
+        col = self._col
+        count = min(count, self._cols - col)
+        line.split_wide_chars(col, col + count)
+        del line.chars[col : col + count]
+        del line.sgrs[col : col + count]
+        line.chars.extend([" "] * count)
+        line.sgrs.extend([self._erase_sgr] * count)
+        self._is_wrap_pending = False
+
+    def _erase_in_display(self, mode: int) -> None:
+        lines = self._lines
+        if mode == 0:
+            self._erase_in_line(0)
+            for line in lines[self._row + 1 :]:
+                line.erase(0, self._cols, self._erase_sgr)
+                line.is_wrapped = False
+        elif mode == 1:
+            self._erase_in_line(1)
+            for line in lines[: self._row]:
+                line.erase(0, self._cols, self._erase_sgr)
+                line.is_wrapped = False
+        elif mode == 2:
+            for line in lines:
+                line.erase(0, self._cols, self._erase_sgr)
+                line.is_wrapped = False
+        elif mode == 3:
+            self._scrollback.clear()
+
+    def _erase_in_line(self, mode: int) -> None:
+        line = self._lines[self._row]
+        if mode == 0:
+            line.erase(self._col, self._cols, self._erase_sgr)
+            line.is_wrapped = False
+        elif mode == 1:
+            line.erase(0, self._col + 1, self._erase_sgr)
+        elif mode == 2:
+            line.erase(0, self._cols, self._erase_sgr)
+            line.is_wrapped = False
+        self._is_wrap_pending = False
+
+    def _save_cursor(self) -> None:
+        self._saved_cursor = (self._row, self._col, self._pen)
+
+    def _restore_cursor(self) -> None:
+        if self._saved_cursor is None:
+            self._move_to(0, 0)
+            return
+        row, col, pen = self._saved_cursor
+        self._move_to(row, col)
+        self._pen = pen
+        self._sgr = pen.to_sgr()
+        self._erase_sgr = pen.to_erase_sgr()
+
+    def _push_to_scrollback(self, lines: list[_Line]) -> None:
+        for line in lines:
+            rendered, text = line.render()
+            self._scrollback.append(_ScrollbackLine(rendered, text, line.is_wrapped))
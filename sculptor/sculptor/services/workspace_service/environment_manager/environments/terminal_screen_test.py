@@ -0,0 +1,207 @@
+from sculptor.services.workspace_service.environment_manager.environments.terminal_screen import TerminalScreen
+
+
+def _replayed(screen: TerminalScreen) -> TerminalScreen:
+    """A fresh screen of the same size that was fed ``screen``'s serialized state."""
+    replayed = TerminalScreen(rows=screen._rows, cols=screen._cols)
+    replayed.feed(screen.serialize())
+    return replayed
+
+
+def _visible_state(screen: TerminalScreen) -> tuple[object, ...]:
+    alternate_lines = screen._alternate_lines or []
+    return (
+        [line.render() for line in screen._main_lines],
+        [line.render() for line in alternate_lines],
+        [line.rendered for line in screen._scrollback],
+        (screen._row, screen._col),
+        screen._sgr,
+        screen._private_modes,
+    )
+
+
+def test_text_wraps_and_scrolls_into_bounded_scrollback() -> None:
+    screen = TerminalScreen(rows=3, cols=10, max_scrollback_lines=4)
+
+    screen.feed(b"".join(f"line {index}\r\n".encode() for index in range(8)))
+    screen.feed(b"0123456789abc")
+
+    assert screen.get_text() == "line 3\nline 4\nline 5\nline 6\nline 7\n0123456789abc"
+    assert (screen._row, screen._col) == (2, 3)
+
+
+def test_serialized_state_replays_to_the_same_screen() -> None:
+    screen = TerminalScreen(rows=8, cols=20)
+    screen.feed(b"$ ls\r\n\x1b[1mbold \x1b[31mred\x1b[0m plain\r\n")
+    screen.feed(b"\x1b[44m\x1b[Kblue line\x1b[0m\r\n")
+    screen.feed("wide 漢字 and é\r\n".encode())
+    screen.feed(b"x" * 45)
+    screen.feed(b"\x1b[?2004h\x1b[?1h\x1b[2;3H\x1b[32m")
+
+    replayed = _replayed(screen)
+
+    assert _visible_state(replayed) == _visible_state(screen)
+    assert replayed.get_text() == screen.get_text()
+    assert "漢字" in screen.get_text()
+    assert screen._main_lines[1].sgrs[0] == "1"
+    assert screen._main_lines[1].sgrs[5] == "1;31"
+
+
+def test_alternate_screen_is_replayed_on_top_of_the_main_screen() -> None:
+    screen = TerminalScreen(rows=4, cols=20)
+    screen.feed(b"$ vim file.txt")
+    screen.feed(b"\x1b[?1049h\x1b[H\x1b[2Jfirst\r\n~\r\n~\x1b[4;1H\x1b[7m-- INSERT --\x1b[0m\x1b[1;6H")
+
+    replayed = _replayed(screen)
+
+    assert _visible_state(replayed) == _visible_state(screen)
+    # Leaving the alternate screen restores the shell's screen and cursor.
+    for leaving in (screen, replayed):
+        leaving.feed(b"\x1b[?1049l")
+        assert leaving.get_text() == "$ vim file.txt"
+        assert (leaving._row, leaving._col) == (0, 14)
+
+
+def test_scroll_region_and_line_editing() -> None:
+    screen = TerminalScreen(rows=5, cols=10)
+    screen.feed(b"a\r\nb\r\nc\r\nd\r\ne")
+    # Scroll rows 2-4 up by one, then insert a line at row 2 and delete a character.
+    screen.feed(b"\x1b[2;4r\x1b[4;1H\n\x1b[2;1H\x1b[L\x1b[1;1H\x1b[P")
+
+    assert [line.render()[1] for line in screen._main_lines] == ["", "", "c", "d", "e"]
+    assert _visible_state(_replayed(screen)) == _visible_state(screen)
+
+
+def test_serialized_state_is_bounded_by_the_screen_and_scrollback() -> None:
+    screen = TerminalScreen(rows=24, cols=80, max_scrollback_lines=100)
+    for index in range(20_000):
+        screen.feed(f"\x1b[3{index % 8}mline {index} of a long build log\x1b[0m\r\n".encode())
+
+    serialized = screen.serialize()
+
+    assert len(serialized) < 124 * 80 * 2
+    assert b"line 19999 of a long build log" in serialized
+    assert b"line 19000 " not in serialized
+
+
+def test_nothing_is_serialized_before_any_output() -> None:
+    screen = TerminalScreen()
+
+    assert screen.serialize() == b""
+    screen.feed(b"$ ")
+    assert screen.serialize().endswith(b"\x1b[1;3H")
+
+
+def test_sequences_split_across_chunks_are_reassembled() -> None:
+    whole = TerminalScreen(rows=3, cols=20)
+    split = TerminalScreen(rows=3, cols=20)
+    data = "\x1b[1;31mred\x1b[0m \x1b]0;title\x07漢字\x1b[2;5Hx".encode()
+
+    whole.feed(data)
+    for index in range(len(data)):
+        split.feed(data[index : index + 1])
+
+    assert _visible_state(split) == _visible_state(whole)
+
+
+def _cells(screen: TerminalScreen) -> list[str]:
+    return ["".join(line.chars) for line in screen._lines]
+
+
+def test_scrolling_inside_a_scroll_region_leaves_the_other_rows_and_the_scrollback_alone() -> None:
+    screen = TerminalScreen(rows=4, cols=3)
+    screen.feed(b"1\r\n2\r\n3\r\n4")
+
+    # Index at the bottom of rows 2-3 scrolls only those rows up.
+    screen.feed(b"\x1b[2;3r\x1b[3;1H\n")
+    assert _cells(screen) == ["1  ", "3  ", "   ", "4  "]
+    # Reverse index at the top of the region scrolls them back down.
+    screen.feed(b"\x1b[2;1H\x1bM")
+    assert _cells(screen) == ["1  ", "   ", "3  ", "4  "]
+    # Scrolling at the bottom of the region does not move the cursor past it.
+    screen.feed(b"\x1b[3;1H\n\n\n")
+    assert (screen._row, screen._col) == (2, 0)
+
+    assert len(screen._scrollback) == 0
+    assert _visible_state(_replayed(screen)) == _visible_state(screen)
+
+
+def test_output_on_the_alternate_screen_does_not_reach_the_scrollback() -> None:
+    screen = TerminalScreen(rows=3, cols=10)
+    screen.feed(b"$ top")
+    screen.feed(b"\x1b[?1049h" + b"".join(f"row {index}\r\n".encode() for index in range(10)))
+
+    assert len(screen._scrollback) == 0
+    assert _cells(screen) == ["row 8     ", "row 9     ", " " * 10]
+    # The plain text is always the main screen's, which the alternate screen hides but keeps.
+    assert screen.get_text() == "$ top"
+
+    # Mode 47 switches screens without saving and restoring the cursor.
+    screen.feed(b"\x1b[?1049l\x1b[?47h\x1b[3;4H\x1b[?47l")
+    assert screen._alternate_lines is None
+    assert (screen._row, screen._col) == (2, 3)
+
+
+def test_wide_characters_wrap_whole_and_are_blanked_when_half_overwritten() -> None:
+    screen = TerminalScreen(rows=3, cols=5)
+
+    # A wide character does not fit in the last column, so it wraps to the next line.
+    screen.feed("abcd漢".encode())
+    assert screen._main_lines[0].chars == ["a", "b", "c", "d", " "]
+    assert screen._main_lines[0].is_wrapped
+    assert screen._main_lines[1].chars[:2] == ["漢", ""]
+    assert screen.get_text() == "abcd 漢"
+
+    # Writing over its right half leaves neither half of it behind.
+    screen.feed(b"\x1b[2;2Hx")
+    assert screen._main_lines[1].chars[:2] == [" ", "x"]
+
+    # A combining mark joins the character before it, taking no cell of its own.
+    screen.feed("\x1b[3;1Hé!".encode())
+    assert screen._main_lines[2].chars[:2] == ["é", "!"]
+    assert _visible_state(_replayed(screen)) == _visible_state(screen)
+
+
+def test_erase_and_insert_operate_on_cells_and_take_the_background_color() -> None:
+    screen = TerminalScreen(rows=2, cols=10)
+    screen.feed(b"0123456789")
+
+    screen.feed(b"\x1b[1;4H\x1b[2@")
+    assert _cells(screen)[0] == "012  34567"
+    screen.feed(b"\x1b[1;2H\x1b[3X")
+    assert _cells(screen)[0] == "0    34567"
+    screen.feed(b"\x1b[1;7H\x1b[P")
+    assert _cells(screen)[0] == "0    3567 "
+    screen.feed(b"\x1b[44m\x1b[1;9H\x1b[K")
+    assert _cells(screen)[0] == "0    356  "
+    assert screen._main_lines[0].sgrs[7:] == ["", "44", "44"]
+
+    screen.feed(b"\x1b[0m\r\nabc\x1b[2;2H\x1b[1J")
+    assert _cells(screen) == [" " * 10, "  c       "]
+    assert _visible_state(_replayed(screen)) == _visible_state(screen)
+
+
+def test_escape_sequences_and_characters_split_at_every_byte_are_reassembled() -> None:
+    data = "\x1b[?1049h\x1b[2;3r\x1b[38;2;10;20;30m漢\x1b[0m\x1b]8;;https://example.com\x1b\\link\x1b]8;;\x1b\\\x1bM".encode()
+    whole = TerminalScreen(rows=4, cols=10)
+    whole.feed(data)
+
+    for split_at in range(1, len(data)):
+        split = TerminalScreen(rows=4, cols=10)
+        split.feed(data[:split_at])
+        split.feed(data[split_at:])
+        assert _visible_state(split) == _visible_state(whole), split_at
+
+
+def test_output_after_a_dropped_chunk_is_parsed_from_a_clean_state() -> None:
+    screen = TerminalScreen(rows=2, cols=10)
+    # Output that stops in the middle of a CSI sequence and of a character.
+    screen.feed(b"kept\x1b[3")
+    screen.skip_dropped_output()
+    screen.feed(b"1mred")
+
+    assert screen.get_text() == "kept1mred"
+    screen.feed("漢".encode()[:2])
+    screen.skip_dropped_output()
+    screen.feed(b"!")
+    assert screen.get_text() == "kept1mred!"
@@ -0,0 +1,364 @@
+"""A per-workspace index of file paths with ranked fuzzy search.
+
+`get_workspace_files` used to run `git ls-files --cached --others` on every call,
+and clients filtered the full list themselves on every keystroke. A
+`WorkspaceFileIndex` keeps the listing in memory. Only the first query of a
+workspace waits for `git ls-files`; after that, queries are answered from the
+current listing while it is listed again in the background whenever:
+
+- the git index file's stat changed (files were added, removed or renamed
+  through git);
+- the workspace service was told that files changed (`invalidate`, e.g. after
+  an agent edited files);
+- the listing is older than `_REBUILD_AFTER_SECONDS`, to pick up untracked
+  files created outside of sculptor.
+
+Searching is done on a snapshot of the listing. All paths are lowercased, sorted
+shortest first and joined into one newline-separated string, so that finding
+candidates is a `str.find` or regex scan in C that stops as soon as
+`_MAX_SCORED_CANDIDATES` of the shortest matching paths are found; only those
+are scored in Python. The scan of a query is kept for a while, and a query that
+extends it (the user typed one more character) only filters its candidates and
+resumes scanning where it stopped. On 200k paths a keystroke typically takes a
+few milliseconds; the worst case is one full regex pass over the listing.
+"""
+
+import heapq
+import re
+import threading
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+from typing import Final
+from typing import NamedTuple
+
+from loguru import logger
+
+from sculptor.foundation.concurrency_group import ConcurrencyGroup
+from sculptor.services.workspace_service.api import FileSearchMatch
+from sculptor.services.workspace_service.api import WorkspaceFilesUnavailableError
+
+_REBUILD_AFTER_SECONDS: Final[float] = 5.0
+# Upper bound on the paths scored per query; the shortest matching paths are scored first.
+_MAX_SCORED_CANDIDATES: Final[int] = 512
+_MAX_RECENT_SCANS: Final[int] = 64
+
+_SCORE_PER_MATCHED_CHARACTER: Final[int] = 16
+_BONUS_CONSECUTIVE: Final[int] = 8
+_BONUS_WORD_START: Final[int] = 10
+_BONUS_CAMEL_CASE: Final[int] = 8
+_BONUS_IN_BASENAME: Final[int] = 4
+_PENALTY_PER_GAP_CHARACTER: Final[int] = 1
+_WORD_SEPARATORS: Final[str] = "/_-. "
+
+# (mtime, ctime, size, inode) of the git index file; None if it does not exist.
+_IndexStat = tuple[int, int, int, int] | None
+
+
+class _CandidateScan(NamedTuple):
+    """The candidate lines found for one needle, and where scanning for more would resume."""
+
+    needle: str
+    contiguous_lines: tuple[int, ...]
+    contiguous_resume_at: int
+    subsequence_lines: tuple[int, ...]
+    subsequence_resume_at: int
+
+
+class _FileIndexSnapshot:
+    """An immutable listing of a workspace's files, prepared for searching."""
+
+    def __init__(self, paths: list[str], index_stat: _IndexStat, generation: int) -> None:
+        self.sorted_paths: tuple[str, ...] = tuple(sorted(paths))
+        self.index_stat = index_stat
+        self.generation = generation
+        self.built_at = time.monotonic()
+        self.paths_by_length: tuple[str, ...] = tuple(sorted(self.sorted_paths, key=len))
+        self.lowered_paths = [path.lower() for path in self.paths_by_length]
+        # Every path is preceded by a newline, which the subsequence pattern anchors on.
+        self.searchable_text = "".join(f"\n{path}" for path in self.lowered_paths) + "\n"
+        # Offset of each path in `searchable_text`, plus the end of the text.
+        line_starts = [1]
+        for path in self.lowered_paths:
+            line_starts.append(line_starts[-1] + len(path) + 1)
+        self.line_starts = line_starts
+        # Scans of recent needles, so that typing one more character only
+        # filters the previous candidates instead of scanning everything again.
+        self._recent_scans: OrderedDict[str, _CandidateScan] = OrderedDict()
+        self._recent_scans_lock = threading.Lock()
+
+    def search(self, query: str, limit: int) -> list[FileSearchMatch]:
+        needle = "".join(query.lower().split())
+        if not needle:
+            return [FileSearchMatch(path=path, score=0, matched_indices=()) for path in self.paths_by_length[:limit]]
+        scan = self._scan(needle)
+        scored: list[tuple[int, int, tuple[int, ...]]] = []
+        for line in dict.fromkeys(scan.contiguous_lines + scan.subsequence_lines):
+            score_and_positions = _score_path(self.paths_by_length[line], self.lowered_paths[line], needle)
+            if score_and_positions is not None:
+                score, positions = score_and_positions
+                # Ties go to the shorter path, i.e. the one found first.
+                scored.append((score, -line, positions))
+        return [
+            FileSearchMatch(path=self.paths_by_length[-negated_line], score=score, matched_indices=positions)
+            for score, negated_line, positions in heapq.nlargest(limit, scored)
+        ]
+
+    def _scan(self, needle: str) -> _CandidateScan:
+        """Find lines containing `needle` contiguously, and as a subsequence; shortest paths first."""
+        with self._recent_scans_lock:
+            previous = self._recent_scans.get(needle)
+            if previous is not None:
+                self._recent_scans.move_to_end(needle)
+                return previous
+            # Every match of `needle` also matches any prefix of it.
+            for prefix_length in range(len(needle) - 1, 0, -1):
+                previous = self._recent_scans.get(needle[:prefix_length])
+                if previous is not None:
+                    break
+
+        text = self.searchable_text
+        line_starts = self.line_starts
+        contiguous_lines = (
+            []
+            if previous is None
+            else [line for line in previous.contiguous_lines if needle in self.lowered_paths[line]]
+        )
+        contiguous_resume_at = self._scan_lines(
+            lambda position: text.find(needle, position),
+            contiguous_lines,
+            0 if previous is None else previous.contiguous_resume_at,
+        )
+        subsequence_lines: list[int] = []
+        subsequence_resume_at = len(text)
+        if len(needle) > 1:
+            pattern = _compile_subsequence_pattern(needle)
+            if previous is not None:
+                subsequence_lines = [
+                    line
+                    for line in previous.subsequence_lines
+                    if pattern.search(text, line_starts[line] - 1, line_starts[line + 1]) is not None
+                ]
+
+            def _find_subsequence_match(position: int) -> int:
+                match = pattern.search(text, position - 1)
+                return -1 if match is None else match.start() + 1
+
+            subsequence_resume_at = self._scan_lines(
+                _find_subsequence_match,
+                subsequence_lines,
+                # A one-character previous needle has no subsequence scan of its own.
+                0 if previous is None or len(previous.needle) == 1 else previous.subsequence_resume_at,
+            )
+
+        scan = _CandidateScan(
+            needle=needle,
+            contiguous_lines=tuple(contiguous_lines),
+            contiguous_resume_at=contiguous_resume_at,
+            subsequence_lines=tuple(subsequence_lines),
+            subsequence_resume_at=subsequence_resume_at,
+        )
+        with self._recent_scans_lock:
+            self._recent_scans[needle] = scan
+            while len(self._recent_scans) > _MAX_RECENT_SCANS:
+                self._recent_scans.popitem(last=False)
+        return scan
+
+    def _scan_lines(self, find: Callable[[int], int], lines: list[int], resume_at: int) -> int:
+        """Append the lines `find` matches from offset `resume_at` on until there are enough candidates.
+
+        Returns the offset to resume scanning from, which is the end of the text once it was scanned entirely.
+        """
+        text_length = len(self.searchable_text)
+        line_starts = self.line_starts
+        position = find(resume_at) if len(lines) < _MAX_SCORED_CANDIDATES and resume_at < text_length else -1
+        while position != -1:
+            line = bisect_right(line_starts, position) - 1
+            lines.append(line)
+            resume_at = line_starts[line + 1]
+            if len(lines) >= _MAX_SCORED_CANDIDATES:
+                return resume_at
+            position = find(resume_at)
+        return text_length if len(lines) < _MAX_SCORED_CANDIDATES else resume_at
+
+
+class WorkspaceFileIndex:
+    """The file listing of one workspace, kept up to date as described in the module docstring.
+
+    `list_files` produces the listing and raises WorkspaceFilesUnavailableError
+    when it cannot. Thread-safe.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        working_dir: Path,
+        list_files: Callable[[], list[str]],
+        concurrency_group: ConcurrencyGroup,
+    ) -> None:
+        self._name = name
+        self._working_dir = working_dir
+        self._list_files = list_files
+        self._concurrency_group = concurrency_group
+        self._snapshot: _FileIndexSnapshot | None = None
+        # Serializes rebuilds.
+        self._rebuild_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        # Bumped by `invalidate`; a snapshot listed before the latest bump is outdated.
+        self._generation = 0
+        self._is_background_rebuild_running = False
+        self._git_index_path: Path | None = None
+
+    @property
+    def working_dir(self) -> Path:
+        return self._working_dir
+
+    def invalidate(self) -> None:
+        """Files may have been added or removed: list them again in the background."""
+        with self._state_lock:
+            self._generation += 1
+        if self._snapshot is not None:
+            self._start_background_rebuild()
+
+    def get_paths(self) -> tuple[str, ...]:
+        return self._get_snapshot().sorted_paths
+
+    def search(self, query: str, limit: int) -> list[FileSearchMatch]:
+        return self._get_snapshot().search(query, limit)
+
+    def _get_snapshot(self) -> _FileIndexSnapshot:
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._rebuild_lock:
+                snapshot = self._snapshot
+                if snapshot is None:
+                    snapshot = self._rebuild()
+            return snapshot
+        if (
+            snapshot.generation != self._generation
+            or snapshot.index_stat != self._stat_git_index()
+            or time.monotonic() - snapshot.built_at > _REBUILD_AFTER_SECONDS
+        ):
+            self._start_background_rebuild()
+        return snapshot
+
+    def _rebuild(self) -> _FileIndexSnapshot:
+        # Read the freshness markers before listing so that changes made while
+        # listing trigger another rebuild.
+        generation = self._generation
+        index_stat = self._stat_git_index()
+        snapshot = _FileIndexSnapshot(self._list_files(), index_stat, generation)
+        self._snapshot = snapshot
+        return snapshot
+
+    def _start_background_rebuild(self) -> None:
+        with self._state_lock:
+            if self._is_background_rebuild_running:
+                return
+            self._is_background_rebuild_running = True
+        try:
+            self._concurrency_group.start_new_thread(
+                target=self._rebuild_in_background, name=f"file-index-{self._name}", is_checked=False
+            )
+        except BaseException:
+            with self._state_lock:
+                self._is_background_rebuild_running = False
+            raise
+
+    def _rebuild_in_background(self) -> None:
+        try:
+            with self._rebuild_lock:
+                snapshot = self._rebuild()
+                # Invalidated while listing: the listing may already be missing files.
+                while snapshot.generation != self._generation:
+                    snapshot = self._rebuild()
+        except WorkspaceFilesUnavailableError as e:
+            logger.info("Could not refresh the file index of {}, keeping the previous listing: {}", self._name, e)
+        finally:
+            with self._state_lock:
+                self._is_background_rebuild_running = False
+
+    def _stat_git_index(self) -> _IndexStat:
+        if self._git_index_path is None:
+            self._git_index_path = _get_git_index_path(self._working_dir)
+        try:
+            stat_result = self._git_index_path.stat()
+        except OSError:
+            return None
+        return (stat_result.st_mtime_ns, stat_result.st_ctime_ns, stat_result.st_size, stat_result.st_ino)
+
+
+def _get_git_index_path(working_dir: Path) -> Path:
+    dot_git = working_dir / ".git"
+    if dot_git.is_file():
+        # A worktree: `.git` is a `gitdir: <path>` pointer to its own git dir.
+        content = dot_git.read_text().strip()
+        if content.startswith("gitdir:"):
+            return (working_dir / content.removeprefix("gitdir:").strip()) / "index"
+    return dot_git / "index"
+
+
+def _compile_subsequence_pattern(needle: str) -> re.Pattern[str]:
+    """Match a newline followed by a line containing `needle` as a subsequence.
+
+    Starting with the newline makes `re` try each line once, and each gap
+    excludes the character that follows it, so no attempt ever backtracks.
+    """
+    parts = ["\n"]
+    for character in needle:
+        parts.append(f"[^\n{re.escape(character)}]*{re.escape(character)}")
+    return re.compile("".join(parts))
+
+
+def _score_path(path: str, lowered_path: str, needle: str) -> tuple[int, tuple[int, ...]] | None:
+    """Score `path` against the lowercased `needle` and return the score and matched positions; None if no match.
+
+    Prefers, in order, a contiguous match in the basename, a contiguous match
+    anywhere, a subsequence of the basename and a subsequence of the whole path,
+    and then rewards matches at word starts and camel-case humps.
+    """
+    if len(lowered_path) != len(path):
+        # Lowercasing changed the length (rare non-ASCII characters); ignore case entirely.
+        path = lowered_path
+    basename_start = lowered_path.rfind("/") + 1
+    positions: range | list[int] | None = None
+    start = lowered_path.find(needle, basename_start)
+    if start == -1:
+        start = lowered_path.rfind(needle)
+    if start != -1:
+        positions = range(start, start + len(needle))
+    else:
+        positions = _find_subsequence(lowered_path, needle, basename_start)
+        if positions is None:
+            positions = _find_subsequence(lowered_path, needle, 0)
+        if positions is None:
+            return None
+
+    score = 0
+    previous = -2
+    for position in positions:
+        score += _SCORE_PER_MATCHED_CHARACTER
+        if position == previous + 1:
+            score += _BONUS_CONSECUTIVE
+        if position == 0 or path[position - 1] in _WORD_SEPARATORS:
+            score += _BONUS_WORD_START
+        elif path[position].isupper() and path[position - 1].islower():
+            score += _BONUS_CAMEL_CASE
+        if position >= basename_start:
+            score += _BONUS_IN_BASENAME
+        previous = position
+    score -= _PENALTY_PER_GAP_CHARACTER * (positions[-1] - positions[0] + 1 - len(needle))
+    return score, tuple(positions)
+
+
+def _find_subsequence(lowered_path: str, needle: str, start: int) -> list[int] | None:
+    positions: list[int] = []
+    position = start - 1
+    for character in needle:
+        position = lowered_path.find(character, position + 1)
+        if position == -1:
+            return None
+        positions.append(position)
+    return positions
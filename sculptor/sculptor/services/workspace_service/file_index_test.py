@@ -0,0 +1,99 @@
+import subprocess
+import threading
+from pathlib import Path
+
+import pytest
+
+from sculptor.foundation.concurrency_group import ConcurrencyGroup
+from sculptor.primitives.ids import WorkspaceID
+from sculptor.services.workspace_service.api import WorkspaceFilesUnavailableError
+from sculptor.services.workspace_service.file_index import WorkspaceFileIndex
+from sculptor.services.workspace_service.file_index import _FileIndexSnapshot
+
+_PATHS = [
+    "README.md",
+    "src/components/Button.tsx",
+    "src/components/ButtonGroup.tsx",
+    "src/utils/bytes.ts",
+    "sculptor/services/workspace_service/file_index.py",
+    "sculptor/services/workspace_service/file_index_test.py",
+    "sculptor/web/app.py",
+    "docs/a_very_long_directory_name/with/button/somewhere/inside.md",
+]
+
+
+def _search_paths(snapshot: _FileIndexSnapshot, query: str, limit: int = 10) -> list[str]:
+    return [match.path for match in snapshot.search(query, limit)]
+
+
+def test_contiguous_file_name_matches_rank_first() -> None:
+    snapshot = _FileIndexSnapshot(_PATHS, index_stat=None, generation=0)
+
+    results = _search_paths(snapshot, "button")
+
+    assert results[:2] == ["src/components/Button.tsx", "src/components/ButtonGroup.tsx"]
+    assert "docs/a_very_long_directory_name/with/button/somewhere/inside.md" in results
+    assert "src/utils/bytes.ts" not in results
+
+
+def test_subsequence_matches_are_found_and_highlighted() -> None:
+    snapshot = _FileIndexSnapshot(_PATHS, index_stat=None, generation=0)
+
+    [match] = snapshot.search("fidxtest", limit=1)
+
+    assert match.path == "sculptor/services/workspace_service/file_index_test.py"
+    assert "".join(match.path[index] for index in match.matched_indices).lower() == "fidxtest"
+    assert _search_paths(snapshot, "zzz") == []
+
+
+def test_extending_a_query_gives_the_same_results_as_searching_it_directly() -> None:
+    paths = [f"pkg{i % 7}/module_{i}/handler_{i % 13}.py" for i in range(5000)]
+    typed = _FileIndexSnapshot(paths, index_stat=None, generation=0)
+    fresh = _FileIndexSnapshot(paths, index_stat=None, generation=0)
+    query = "pkg3hand12"
+
+    for length in range(1, len(query) + 1):
+        typed.search(query[:length], limit=20)
+
+    assert typed.search(query, limit=20) == fresh.search(query, limit=20)
+
+
+def test_empty_query_returns_the_shortest_paths() -> None:
+    snapshot = _FileIndexSnapshot(_PATHS, index_stat=None, generation=0)
+
+    assert _search_paths(snapshot, "  ", limit=2) == ["README.md", "src/utils/bytes.ts"]
+
+
+def test_index_is_listed_once_and_refreshed_in_the_background_when_git_index_changes(
+    tmp_path: Path, test_root_concurrency_group: ConcurrencyGroup
+) -> None:
+    subprocess.run(["git", "init", "-q"], cwd=tmp_path, check=True)
+    (tmp_path / "first.txt").write_text("1")
+    subprocess.run(["git", "add", "first.txt"], cwd=tmp_path, check=True)
+    listings = [["first.txt"], ["first.txt", "second.txt"]]
+
+    def _list_files() -> list[str]:
+        return listings.pop(0)
+
+    file_index = WorkspaceFileIndex("test", tmp_path, _list_files, test_root_concurrency_group)
+    assert file_index.get_paths() == ("first.txt",)
+    assert file_index.get_paths() == ("first.txt",)
+
+    (tmp_path / "second.txt").write_text("2")
+    subprocess.run(["git", "add", "second.txt"], cwd=tmp_path, check=True)
+    # Still answered from the previous listing while the new one is built.
+    assert file_index.get_paths() == ("first.txt",)
+    while file_index._is_background_rebuild_running:
+        threading.Event().wait(0.01)
+
+    assert file_index.get_paths() == ("first.txt", "second.txt")
+
+
+def test_first_listing_failure_is_raised(tmp_path: Path, test_root_concurrency_group: ConcurrencyGroup) -> None:
+    def _list_files() -> list[str]:
+        raise WorkspaceFilesUnavailableError(WorkspaceID(), "index.lock exists")
+
+    file_index = WorkspaceFileIndex("test", tmp_path, _list_files, test_root_concurrency_group)
+
+    with pytest.raises(WorkspaceFilesUnavailableError):
+        file_index.search("anything", limit=5)
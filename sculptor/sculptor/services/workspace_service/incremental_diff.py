@@ -0,0 +1,303 @@
+"""Incremental computation of a workspace's working-tree diff against a base commit.
+
+`DefaultWorkspaceService` used to run `git diff -M <base>` over the whole tree plus
+one `git diff --no-index` per untracked file on every refresh, even when a single
+file had changed since the previous one. `WorkspaceDiffCache` keeps the diff of
+each changed file from the previous run and only re-diffs files that changed:
+
+- `git diff --raw` lists the files that differ from the base. It is cheap: git
+  answers "is this file modified?" from the index stat cache rather than by
+  reading file contents, and it produces no patch text.
+- Each listed file's chunk of patch text is cached under a fingerprint of the
+  raw entry (modes and blob ids, so a moved base only invalidates the files
+  whose base content changed) and the working-tree file's `lstat`.
+- Only files whose fingerprint changed are diffed again, with one pathspec-
+  limited `git diff`; untracked files are diffed one by one as before, but only
+  when their `lstat` changed.
+
+The result is byte-for-byte what the full commands produce, in the same order.
+Whenever the cheap path cannot guarantee that (stale renames, too many stale
+files, a patch that cannot be split per file), the tracked part is recomputed
+with one full `git diff` and cached from there.
+"""
+
+import os
+import stat
+import time
+from pathlib import Path
+from typing import Final
+from typing import NamedTuple
+
+from loguru import logger
+
+from sculptor.foundation.concurrency_group import ConcurrencyGroup
+from sculptor.services.git_repo_service.git_commands import run_git_command_local
+from sculptor.services.git_repo_service.git_errors import GitCommandFailure
+
+# Above this many stale tracked files one full diff is cheaper than a long pathspec.
+_MAX_PATHSPEC_PATHS: Final[int] = 256
+# Files modified this recently may change again within the filesystem's mtime
+# granularity without their stat changing ("racy git"), so they are not cached.
+_RACY_WINDOW_NANOSECONDS: Final[int] = 2_000_000_000
+_PATCH_HEADER_PREFIXES: Final = ("diff --git ", "diff --cc ", "diff --combined ")
+_GITLINK_MODE: Final[str] = "160000"
+
+# (is regular file, mtime, ctime, size, inode) of a working-tree path; None if it does not exist.
+_StatFingerprint = tuple[bool, int, int, int, int] | None
+
+
+class _RawDiffEntry(NamedTuple):
+    # The `:<modes> <blobs> <status>` field of a `git diff --raw -z` record.
+    metadata: str
+    status: str
+    path: str
+    # Source path of a rename or copy.
+    original_path: str | None
+
+
+class _CachedChunk(NamedTuple):
+    # None for chunks that must not be reused.
+    fingerprint: tuple[object, ...] | None
+    text: str
+
+
+class WorkspaceDiffCache:
+    """Per-file diff chunks of one workspace, from its previous diff computations.
+
+    Not thread-safe; `DefaultWorkspaceService` only uses it under the workspace's diff lock.
+    """
+
+    def __init__(self) -> None:
+        # Keyed by (diff kind, context lines); each holds only the files that
+        # differed from the base at the last computation of that kind.
+        self._tracked_chunks_by_key: dict[tuple[str, int], dict[str, _CachedChunk]] = {}
+        # `git diff --no-index /dev/null <path>` does not depend on the base or the context lines.
+        self._untracked_chunks: dict[str, _CachedChunk] = {}
+
+    def compute_diff(
+        self,
+        concurrency_group: ConcurrencyGroup,
+        working_dir: Path,
+        base_ref: str,
+        context_lines: int,
+        diff_kind: str,
+        timeout: float,
+    ) -> str:
+        """Return the output of `git diff -M -U<context_lines> <base_ref>` followed by the untracked files' diffs.
+
+        Raises GitCommandFailure if a git command fails.
+        """
+        runner = _GitRunner(concurrency_group, working_dir, timeout)
+        key = (diff_kind, context_lines)
+        tracked_chunks = self._compute_tracked_chunks(
+            runner, base_ref, context_lines, self._tracked_chunks_by_key.get(key, {})
+        )
+        self._tracked_chunks_by_key[key] = tracked_chunks
+        untracked_diff = self._compute_untracked_diff(runner)
+        return "".join(chunk.text for chunk in tracked_chunks.values()) + untracked_diff
+
+    def _compute_tracked_chunks(
+        self,
+        runner: "_GitRunner",
+        base_ref: str,
+        context_lines: int,
+        previous_chunks: dict[str, _CachedChunk],
+    ) -> dict[str, _CachedChunk]:
+        entries = _parse_raw_diff(runner.run(["git", "diff", "--raw", "-z", "--no-abbrev", "-M", base_ref]))
+        listed_at_nanoseconds = time.time_ns()
+        fingerprint_by_path = {
+            entry.path: _fingerprint_entry(runner.working_dir, entry, listed_at_nanoseconds) for entry in entries
+        }
+        stale_entries: list[_RawDiffEntry] = []
+        for entry in entries:
+            cached = previous_chunks.get(entry.path)
+            if cached is None or cached.fingerprint is None or cached.fingerprint != fingerprint_by_path[entry.path]:
+                stale_entries.append(entry)
+
+        text_by_path: dict[str, str] | None = {}
+        if stale_entries:
+            text_by_path = None
+            if len(stale_entries) <= _MAX_PATHSPEC_PATHS and not any(
+                entry.original_path is not None for entry in stale_entries
+            ):
+                text_by_path = _diff_entries(runner, base_ref, context_lines, stale_entries)
+            if text_by_path is None:
+                text_by_path = _diff_entries(runner, base_ref, context_lines, entries, is_whole_tree=True)
+            if text_by_path is None:
+                # Cannot attribute the patch to files; serve it whole and cache nothing.
+                logger.debug("Could not split the diff against {} per file, not caching it", base_ref)
+                whole_patch = runner.run(_build_patch_command(base_ref, context_lines), allowed_returncodes=(0, 1))
+                return {"": _CachedChunk(fingerprint=None, text=whole_patch)}
+
+        chunks: dict[str, _CachedChunk] = {}
+        for entry in entries:
+            text = text_by_path.get(entry.path)
+            chunks[entry.path] = (
+                previous_chunks[entry.path]
+                if text is None
+                else _CachedChunk(fingerprint=fingerprint_by_path[entry.path], text=text)
+            )
+        return chunks
+
+    def _compute_untracked_diff(self, runner: "_GitRunner") -> str:
+        untracked_paths = [
+            path
+            for path in runner.run(["git", "ls-files", "--others", "--exclude-standard", "-z"]).split("\0")
+            if path
+        ]
+        listed_at_nanoseconds = time.time_ns()
+        chunks: dict[str, _CachedChunk] = {}
+        for path in untracked_paths:
+            stat_fingerprint = _lstat_fingerprint(runner.working_dir / path)
+            # Like `find -type f`: only regular files, not symlinks or nested repositories.
+            if stat_fingerprint is None or not stat_fingerprint[0]:
+                continue
+            cached = self._untracked_chunks.get(path)
+            if cached is not None and cached.fingerprint == stat_fingerprint:
+                chunks[path] = cached
+                continue
+            text = runner.run(
+                ["git", "--no-pager", "diff", "--no-index", "--", "/dev/null", path], allowed_returncodes=(0, 1)
+            )
+            is_cacheable = not _is_racy(stat_fingerprint, listed_at_nanoseconds)
+            chunks[path] = _CachedChunk(fingerprint=stat_fingerprint if is_cacheable else None, text=text)
+        self._untracked_chunks = chunks
+        return "".join(chunk.text for chunk in chunks.values())
+
+
+class _GitRunner:
+    def __init__(self, concurrency_group: ConcurrencyGroup, working_dir: Path, timeout: float) -> None:
+        self.concurrency_group = concurrency_group
+        self.working_dir = working_dir
+        self.timeout = timeout
+
+    def run(self, command: list[str], allowed_returncodes: tuple[int, ...] = (0,)) -> str:
+        returncode, stdout, stderr = run_git_command_local(
+            self.concurrency_group,
+            command,
+            cwd=self.working_dir,
+            check_output=False,
+            timeout=self.timeout,
+            is_retry_safe=True,
+            log_command=False,
+        )
+        if returncode not in allowed_returncodes:
+            raise GitCommandFailure(
+                f"{' '.join(command[:3])} exited with {returncode}",
+                command=command,
+                returncode=returncode,
+                stdout=stdout,
+                stderr=stderr,
+            )
+        return stdout
+
+
+def _build_patch_command(base_ref: str, context_lines: int, paths: list[str] | None = None) -> list[str]:
+    command = ["git", "--no-pager", "diff", "-M", f"-U{context_lines}", base_ref]
+    if paths is not None:
+        command += ["--", *(f":(literal){path}" for path in paths)]
+    return command
+
+
+def _diff_entries(
+    runner: _GitRunner,
+    base_ref: str,
+    context_lines: int,
+    entries: list[_RawDiffEntry],
+    is_whole_tree: bool = False,
+) -> dict[str, str] | None:
+    """Diff `entries` in one command and split the patch per file; None if it cannot be split reliably."""
+    if len({entry.path for entry in entries}) != len(entries):
+        # e.g. unmerged paths, which can be listed more than once.
+        return None
+    paths = None if is_whole_tree else [entry.path for entry in entries]
+    patch = runner.run(_build_patch_command(base_ref, context_lines, paths), allowed_returncodes=(0, 1))
+    chunks = _split_patch(patch)
+    if len(chunks) != len(entries):
+        return None
+    text_by_path: dict[str, str] = {}
+    # Both listings come out of the same diff machinery with the same options,
+    # so the patch has one chunk per raw entry, in the raw order.
+    for entry, chunk in zip(entries, chunks):
+        if not _chunk_matches_entry(chunk, entry):
+            return None
+        text_by_path[entry.path] = chunk
+    return text_by_path
+
+
+def _parse_raw_diff(raw: str) -> list[_RawDiffEntry]:
+    entries: list[_RawDiffEntry] = []
+    fields = raw.split("\0")
+    index = 0
+    while index < len(fields) and fields[index]:
+        metadata = fields[index]
+        status = metadata.rsplit(" ", 1)[-1]
+        if status[:1] in ("R", "C"):
+            entries.append(
+                _RawDiffEntry(
+                    metadata=metadata, status=status, path=fields[index + 2], original_path=fields[index + 1]
+                )
+            )
+            index += 3
+        else:
+            entries.append(_RawDiffEntry(metadata=metadata, status=status, path=fields[index + 1], original_path=None))
+            index += 2
+    return entries
+
+
+def _split_patch(patch: str) -> list[str]:
+    chunks: list[str] = []
+    current: list[str] = []
+    for line in patch.splitlines(keepends=True):
+        # Hunk lines start with " ", "+", "-" or "\\", so only file headers match.
+        if line.startswith(_PATCH_HEADER_PREFIXES) and current:
+            chunks.append("".join(current))
+            current = []
+        current.append(line)
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+
+def _chunk_matches_entry(chunk: str, entry: _RawDiffEntry) -> bool:
+    if entry.original_path is not None or _needs_quoting(entry.path):
+        # Rename headers and quoted paths are not worth re-deriving; the chunk
+        # count and order already tie chunks to entries.
+        return True
+    return chunk.startswith((f"diff --git a/{entry.path} b/{entry.path}\n", f"diff --cc {entry.path}\n"))
+
+
+def _needs_quoting(path: str) -> bool:
+    return any(ord(character) < 0x20 or ord(character) >= 0x7F or character in '"\\' for character in path)
+
+
+def _fingerprint_entry(
+    working_dir: Path, entry: _RawDiffEntry, listed_at_nanoseconds: int
+) -> tuple[object, ...] | None:
+    """What a file's chunk depends on: modes and blob ids from the raw entry, plus the working-tree file."""
+    stat_fingerprint = _lstat_fingerprint(working_dir / entry.path)
+    # A submodule's chunk also depends on files inside it that its lstat does not reflect.
+    if f" {_GITLINK_MODE}" in f" {entry.metadata}" or _is_racy(stat_fingerprint, listed_at_nanoseconds):
+        return None
+    return (entry.metadata, entry.original_path, stat_fingerprint)
+
+
+def _lstat_fingerprint(path: Path) -> _StatFingerprint:
+    try:
+        stat_result = os.lstat(path)
+    except OSError:
+        return None
+    return (
+        stat.S_ISREG(stat_result.st_mode),
+        stat_result.st_mtime_ns,
+        stat_result.st_ctime_ns,
+        stat_result.st_size,
+        stat_result.st_ino,
+    )
+
+
+def _is_racy(stat_fingerprint: _StatFingerprint, listed_at_nanoseconds: int) -> bool:
+    if stat_fingerprint is None:
+        return False
+    _, mtime_nanoseconds, ctime_nanoseconds, _, _ = stat_fingerprint
+    return listed_at_nanoseconds - max(mtime_nanoseconds, ctime_nanoseconds) < _RACY_WINDOW_NANOSECONDS
@@ -0,0 +1,114 @@
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from sculptor.foundation.concurrency_group import ConcurrencyGroup
+from sculptor.services.workspace_service import incremental_diff
+from sculptor.services.workspace_service.incremental_diff import WorkspaceDiffCache
+from sculptor.testing.git_snapshot import FullLocalGitRepo
+from sculptor.testing.git_snapshot import GitCommitSnapshot
+from sculptor.testing.git_snapshot import create_repo_from_snapshot
+
+
+@pytest.fixture
+def repo_path(tmp_path: Path, test_root_concurrency_group: ConcurrencyGroup) -> Path:
+    repo = create_repo_from_snapshot(
+        FullLocalGitRepo(
+            git_user_email="test@test.com",
+            git_user_name="Test",
+            main_history=(
+                GitCommitSnapshot(
+                    contents_by_path={
+                        "a.txt": "one\ntwo\nthree\n",
+                        "b.txt": "bee\n",
+                        "c.txt": "sea\n",
+                        "moved_from.txt": "a file long enough to be detected as a rename\n" * 4,
+                    },
+                    commit_message="initial",
+                    commit_time="2024-01-01T00:00:00",
+                ),
+            ),
+        ),
+        destination_path=tmp_path / "repo",
+        concurrency_group=test_root_concurrency_group,
+    )
+    return repo.base_path
+
+
+def _full_diff(repo_path: Path) -> str:
+    """What `_create_diff_artifact_local` computed before the cache: one full diff plus one per untracked file."""
+    tracked = subprocess.run(
+        ["git", "--no-pager", "diff", "-M", "-U3", "HEAD"], cwd=repo_path, capture_output=True, text=True
+    ).stdout
+    untracked_paths = subprocess.run(
+        ["git", "ls-files", "--others", "--exclude-standard", "-z"], cwd=repo_path, capture_output=True, text=True
+    ).stdout.split("\0")
+    untracked = "".join(
+        subprocess.run(
+            ["git", "--no-pager", "diff", "--no-index", "--", "/dev/null", path],
+            cwd=repo_path,
+            capture_output=True,
+            text=True,
+        ).stdout
+        for path in untracked_paths
+        if path
+    )
+    return tracked + untracked
+
+
+def _compute(cache: WorkspaceDiffCache, concurrency_group: ConcurrencyGroup, repo_path: Path) -> str:
+    return cache.compute_diff(
+        concurrency_group, repo_path, base_ref="HEAD", context_lines=3, diff_kind="uncommitted", timeout=30.0
+    )
+
+
+def test_incremental_diff_matches_the_full_diff(
+    repo_path: Path, test_root_concurrency_group: ConcurrencyGroup
+) -> None:
+    cache = WorkspaceDiffCache()
+    (repo_path / "a.txt").write_text("one\nTWO\nthree\n")
+    (repo_path / "b.txt").unlink()
+    (repo_path / "untracked.txt").write_text("new\n")
+
+    assert _compute(cache, test_root_concurrency_group, repo_path) == _full_diff(repo_path)
+
+    (repo_path / "c.txt").write_text("see\n")
+    (repo_path / "moved_from.txt").rename(repo_path / "moved_to.txt")
+    subprocess.run(["git", "add", "-A", "moved_from.txt", "moved_to.txt"], cwd=repo_path, check=True)
+    (repo_path / "untracked.txt").write_text("newer\n")
+
+    assert _compute(cache, test_root_concurrency_group, repo_path) == _full_diff(repo_path)
+
+    (repo_path / "a.txt").write_text("one\ntwo\nthree\n")
+
+    assert _compute(cache, test_root_concurrency_group, repo_path) == _full_diff(repo_path)
+
+
+def test_only_changed_files_are_diffed_again(
+    repo_path: Path, test_root_concurrency_group: ConcurrencyGroup, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # The files are all written moments before being diffed; let the cache trust their stat anyway.
+    monkeypatch.setattr(incremental_diff, "_RACY_WINDOW_NANOSECONDS", 0)
+    cache = WorkspaceDiffCache()
+    (repo_path / "a.txt").write_text("one\nTWO\nthree\n")
+    (repo_path / "c.txt").write_text("see\n")
+    (repo_path / "untracked.txt").write_text("new\n")
+    _compute(cache, test_root_concurrency_group, repo_path)
+
+    commands: list[list[str]] = []
+    original_run = incremental_diff._GitRunner.run
+
+    def _recording_run(
+        runner: incremental_diff._GitRunner, command: list[str], *args: object, **kwargs: object
+    ) -> str:
+        commands.append(command)
+        return original_run(runner, command, *args, **kwargs)
+
+    monkeypatch.setattr(incremental_diff._GitRunner, "run", _recording_run)
+    (repo_path / "a.txt").write_text("one\nTWO\nTHREE\n")
+
+    assert _compute(cache, test_root_concurrency_group, repo_path) == _full_diff(repo_path)
+    patch_commands = [command for command in commands if "-U3" in command]
+    assert patch_commands == [["git", "--no-pager", "diff", "-M", "-U3", "HEAD", "--", ":(literal)a.txt"]]
+    assert not any("--no-index" in command for command in commands)
@@ -0,0 +1,338 @@
+"""Content-addressed cache of workspace setup command outputs.
+
+A project opts in by committing ``.sculptor/setup_cache.toml`` next to its
+``.sculptor/.env``::
+
+    # Files whose contents decide what the setup command produces.
+    inputs = ["package-lock.json", "frontend/package-lock.json"]
+    # Directories (or files) the setup command produces, relative to the checkout.
+    outputs = ["node_modules", "frontend/node_modules"]
+
+Before a setup run, ``SetupCommandCache.lookup`` hashes the command together
+with the contents of every file matching an ``inputs`` glob. If an entry for
+that hash exists, ``restore`` copies its outputs into the checkout instead of
+running the command; otherwise the command runs and, if it succeeds, ``store``
+copies the outputs into a new entry.
+
+Outputs are copied with copy-on-write clones where the filesystem supports
+them (``FICLONE`` on Linux, ``clonefile`` on macOS), so a restore costs little
+disk or time there, and with a plain copy elsewhere. Never hard links: setup
+outputs are routinely modified in place later (another ``npm install``), which
+must not reach back into the cache. Outputs must therefore be relocatable; a
+virtualenv, which records its own absolute path, is not.
+
+Entries are evicted least recently used first once the cache is over its size
+budget.
+"""
+
+import ctypes
+import ctypes.util
+import dataclasses
+import errno
+import fcntl
+import functools
+import hashlib
+import json
+import os
+import platform
+import shutil
+import sys
+import threading
+import time
+import tomllib
+import uuid
+from pathlib import Path
+from pathlib import PurePosixPath
+from typing import Callable
+from typing import Final
+
+from loguru import logger
+
+from sculptor.foundation.async_monkey_patches import log_exception
+from sculptor.foundation.constants import ExceptionPriority
+from sculptor.utils.file_utils import copy_dir
+
+SETUP_CACHE_SPEC_PATH: Final[PurePosixPath] = PurePosixPath(".sculptor/setup_cache.toml")
+_ENTRY_METADATA_FILENAME: Final[str] = "entry.json"
+_ENTRY_OUTPUTS_DIRNAME: Final[str] = "outputs"
+_TEMPORARY_ENTRY_PREFIX: Final[str] = ".tmp-"
+# Bump when the key derivation or entry layout changes, so old entries are never restored.
+_KEY_VERSION: Final[str] = "1"
+# From linux/fs.h: _IOW(0x94, 9, int).
+_FICLONE: Final[int] = 0x40049409
+_CLONE_NOFOLLOW: Final[int] = 0x0001
+
+
+class InvalidSetupCacheSpecError(ValueError):
+    pass
+
+
+@dataclasses.dataclass(frozen=True)
+class SetupCacheSpec:
+    """The cache inputs and outputs a project declares for its setup command."""
+
+    inputs: tuple[str, ...]
+    outputs: tuple[str, ...]
+
+
+@dataclasses.dataclass(frozen=True)
+class SetupCacheLookup:
+    """Where a setup run's outputs are cached, and whether they already are."""
+
+    key: str
+    spec: SetupCacheSpec
+    working_directory: Path
+    is_hit: bool
+
+
+def load_setup_cache_spec(working_directory: Path) -> SetupCacheSpec | None:
+    """The spec committed in the checkout at ``working_directory``, or None if it declares none.
+
+    Raises InvalidSetupCacheSpecError for a spec that cannot be used.
+    """
+    spec_path = working_directory / SETUP_CACHE_SPEC_PATH
+    try:
+        with spec_path.open("rb") as f:
+            data = tomllib.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, tomllib.TOMLDecodeError) as e:
+        raise InvalidSetupCacheSpecError(f"Cannot read {SETUP_CACHE_SPEC_PATH}: {e}") from e
+    inputs = _get_relative_paths(working_directory, data, "inputs")
+    outputs = _get_relative_paths(working_directory, data, "outputs")
+    if not outputs:
+        raise InvalidSetupCacheSpecError(f"{SETUP_CACHE_SPEC_PATH} declares no outputs")
+    if any(output in (".", ".sculptor") or output.startswith((".git/", ".sculptor/")) for output in outputs):
+        raise InvalidSetupCacheSpecError(f"{SETUP_CACHE_SPEC_PATH} outputs cannot include .git or .sculptor")
+    return SetupCacheSpec(inputs=inputs, outputs=outputs)
+
+
+def _get_relative_paths(working_directory: Path, data: dict[str, object], field: str) -> tuple[str, ...]:
+    values = data.get(field, [])
+    if not isinstance(values, list) or not all(isinstance(value, str) and value for value in values):
+        raise InvalidSetupCacheSpecError(f"{SETUP_CACHE_SPEC_PATH}: {field} must be a list of paths")
+    resolved_working_directory = working_directory.resolve()
+    paths: list[str] = []
+    for value in values:
+        path = PurePosixPath(value)
+        # Resolving catches a committed symlink (to a parent or to the path itself) that leads out of the repo.
+        if (
+            path.is_absolute()
+            or ".." in path.parts
+            or ".git" in path.parts
+            or not (working_directory / path).resolve().is_relative_to(resolved_working_directory)
+        ):
+            raise InvalidSetupCacheSpecError(f"{SETUP_CACHE_SPEC_PATH}: {field} entry {value!r} must stay in the repo")
+        paths.append(str(path))
+    return tuple(sorted(set(paths)))
+
+
+class SetupCommandCache:
+    """Setup outputs cached under ``cache_dir``, one directory per key. Safe to use from several threads."""
+
+    def __init__(self, cache_dir: Path, get_max_size_bytes: Callable[[], int]) -> None:
+        self._cache_dir = cache_dir
+        self._get_max_size_bytes = get_max_size_bytes
+        self._eviction_lock = threading.Lock()
+
+    def lookup(self, working_directory: Path, command: str) -> SetupCacheLookup | None:
+        """Hash ``command`` and its declared inputs; None if the checkout declares no cache or caching is off."""
+        if self._get_max_size_bytes() <= 0:
+            return None
+        try:
+            spec = load_setup_cache_spec(working_directory)
+        except InvalidSetupCacheSpecError as e:
+            logger.info("Not caching setup outputs for {}: {}", working_directory, e)
+            return None
+        if spec is None:
+            return None
+        try:
+            key = _compute_key(working_directory, command, spec)
+        except OSError as e:
+            logger.info("Cannot hash setup cache inputs in {}: {}", working_directory, e)
+            return None
+        is_hit = (self._cache_dir / key / _ENTRY_METADATA_FILENAME).is_file()
+        return SetupCacheLookup(key=key, spec=spec, working_directory=working_directory, is_hit=is_hit)
+
+    def restore(self, lookup: SetupCacheLookup) -> list[str] | None:
+        """Replace the checkout's outputs with the cached ones; the outputs restored, or None if that failed."""
+        entry_path = self._cache_dir / lookup.key
+        try:
+            metadata = json.loads((entry_path / _ENTRY_METADATA_FILENAME).read_text())
+            # Mark the entry as recently used before copying, so that a concurrent eviction passes it over.
+            os.utime(entry_path / _ENTRY_METADATA_FILENAME)
+            restored: list[str] = []
+            for output in metadata["outputs"]:
+                destination = lookup.working_directory / output
+                _remove_path(destination)
+                destination.parent.mkdir(parents=True, exist_ok=True)
+                _clone_path(entry_path / _ENTRY_OUTPUTS_DIRNAME / output, destination)
+                restored.append(output)
+        except (OSError, ValueError, KeyError) as e:
+            log_exception(
+                exc=e,
+                message=f"Failed to restore setup outputs from cache entry {lookup.key}",
+                priority=ExceptionPriority.LOW_PRIORITY,
+            )
+            return None
+        return restored
+
+    def store(self, lookup: SetupCacheLookup) -> None:
+        """Copy the outputs a successful setup run left in the checkout into the entry for ``lookup``."""
+        entry_path = self._cache_dir / lookup.key
+        if entry_path.exists():
+            return
+        temporary_path = self._cache_dir / f"{_TEMPORARY_ENTRY_PREFIX}{uuid.uuid4().hex}"
+        try:
+            stored_outputs: list[str] = []
+            for output in lookup.spec.outputs:
+                source = lookup.working_directory / output
+                if not source.exists() and not source.is_symlink():
+                    continue
+                destination = temporary_path / _ENTRY_OUTPUTS_DIRNAME / output
+                destination.parent.mkdir(parents=True, exist_ok=True)
+                _clone_path(source, destination)
+                stored_outputs.append(output)
+            if not stored_outputs:
+                logger.info("Setup command produced none of the outputs declared in {}", SETUP_CACHE_SPEC_PATH)
+                return
+            size_bytes = _get_tree_size(temporary_path)
+            (temporary_path / _ENTRY_METADATA_FILENAME).write_text(
+                json.dumps({"outputs": stored_outputs, "size_bytes": size_bytes, "created_at": time.time()})
+            )
+            try:
+                temporary_path.rename(entry_path)
+            except OSError as e:
+                # Another run with the same inputs stored the entry first.
+                if e.errno not in (errno.EEXIST, errno.ENOTEMPTY):
+                    raise
+                return
+            logger.info("Cached setup outputs {} ({} bytes) as {}", stored_outputs, size_bytes, lookup.key)
+        except OSError as e:
+            log_exception(
+                exc=e,
+                message=f"Failed to cache setup outputs from {lookup.working_directory}",
+                priority=ExceptionPriority.LOW_PRIORITY,
+            )
+        finally:
+            shutil.rmtree(temporary_path, ignore_errors=True)
+        self.evict()
+
+    def evict(self) -> None:
+        """Delete least recently used entries until the cache fits its size budget."""
+        max_size_bytes = self._get_max_size_bytes()
+        with self._eviction_lock:
+            entries: list[tuple[float, int, Path]] = []
+            try:
+                entry_paths = list(self._cache_dir.iterdir())
+            except FileNotFoundError:
+                return
+            for entry_path in entry_paths:
+                if entry_path.name.startswith(_TEMPORARY_ENTRY_PREFIX):
+                    continue
+                metadata_path = entry_path / _ENTRY_METADATA_FILENAME
+                try:
+                    last_used_at = metadata_path.stat().st_mtime
+                    size_bytes = int(json.loads(metadata_path.read_text())["size_bytes"])
+                except (OSError, ValueError, KeyError):
+                    # Unreadable or half-deleted.
+                    shutil.rmtree(entry_path, ignore_errors=True)
+                    continue
+                entries.append((last_used_at, size_bytes, entry_path))
+            total_size_bytes = sum(size_bytes for _, size_bytes, _ in entries)
+            for _, size_bytes, entry_path in sorted(entries):
+                if total_size_bytes <= max_size_bytes:
+                    break
+                logger.debug("Evicting setup cache entry {} ({} bytes)", entry_path.name, size_bytes)
+                # Rename first, so that the entry stops being a hit before its files start disappearing.
+                doomed_path = self._cache_dir / f"{_TEMPORARY_ENTRY_PREFIX}{uuid.uuid4().hex}"
+                try:
+                    entry_path.rename(doomed_path)
+                except OSError:
+                    continue
+                shutil.rmtree(doomed_path, ignore_errors=True)
+                total_size_bytes -= size_bytes
+
+
+def _compute_key(working_directory: Path, command: str, spec: SetupCacheSpec) -> str:
+    resolved_working_directory = working_directory.resolve()
+    input_paths: set[Path] = set()
+    for pattern in spec.inputs:
+        input_paths.update(
+            path
+            for path in working_directory.glob(pattern)
+            if path.is_file() and path.resolve().is_relative_to(resolved_working_directory)
+        )
+    digest = hashlib.sha256()
+    # Outputs often contain native binaries, so entries are not shared across platforms.
+    header = [_KEY_VERSION, sys.platform, platform.machine(), command, *spec.outputs]
+    digest.update(json.dumps(header).encode())
+    for path in sorted(input_paths):
+        digest.update(path.relative_to(working_directory).as_posix().encode() + b"\0")
+        digest.update(_hash_file(path).encode() + b"\0")
+    return digest.hexdigest()
+
+
+def _hash_file(path: Path) -> str:
+    with path.open("rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def _get_tree_size(path: Path) -> int:
+    total = 0
+    for dirpath, _dirnames, filenames in os.walk(path):
+        for filename in filenames:
+            total += (Path(dirpath) / filename).lstat().st_size
+    return total
+
+
+def _remove_path(path: Path) -> None:
+    if path.is_symlink() or path.is_file():
+        path.unlink()
+    elif path.exists():
+        shutil.rmtree(path)
+
+
+def _clone_path(source: Path, destination: Path) -> None:
+    if source.is_symlink():
+        os.symlink(os.readlink(source), destination)
+    elif source.is_dir():
+        copy_dir(source, destination, symlinks=True, copy_function=_clone_file)
+    else:
+        _clone_file(source, destination)
+
+
+def _clone_file(source: str | Path, destination: str | Path) -> None:
+    """Copy a file as a copy-on-write clone if the filesystem can, and as a plain copy otherwise."""
+    if sys.platform == "linux":
+        if _try_ficlone(source, destination):
+            shutil.copystat(source, destination)
+            return
+    elif sys.platform == "darwin":
+        if _try_clonefile(source, destination):
+            return
+    shutil.copy2(source, destination)
+
+
+def _try_ficlone(source: str | Path, destination: str | Path) -> bool:
+    try:
+        with open(source, "rb") as source_file, open(destination, "wb") as destination_file:
+            fcntl.ioctl(destination_file.fileno(), _FICLONE, source_file.fileno())
+    except OSError:
+        # Not supported by this filesystem, or across filesystems; copy2 truncates the empty destination.
+        return False
+    return True
+
+
+def _try_clonefile(source: str | Path, destination: str | Path) -> bool:
+    clonefile = _get_clonefile()
+    # clonefile copies the metadata too, and refuses to overwrite.
+    return clonefile is not None and clonefile(os.fsencode(source), os.fsencode(destination), _CLONE_NOFOLLOW) == 0
+
+
+@functools.cache
+def _get_clonefile() -> Callable[[bytes, bytes, int], int] | None:
+    try:
+        return ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True).clonefile
+    except (OSError, AttributeError):
+        return None
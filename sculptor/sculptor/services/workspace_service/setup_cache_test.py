@@ -0,0 +1,126 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from sculptor.services.workspace_service.setup_cache import InvalidSetupCacheSpecError
+from sculptor.services.workspace_service.setup_cache import SetupCacheSpec
+from sculptor.services.workspace_service.setup_cache import SetupCommandCache
+from sculptor.services.workspace_service.setup_cache import load_setup_cache_spec
+
+_SPEC = 'inputs = ["package-lock.json", "**/requirements*.txt"]\noutputs = ["node_modules", "build/generated.txt"]\n'
+
+
+def _make_checkout(path: Path, lockfile: str = "lock v1") -> Path:
+    (path / ".sculptor").mkdir(parents=True)
+    (path / ".sculptor" / "setup_cache.toml").write_text(_SPEC)
+    (path / "package-lock.json").write_text(lockfile)
+    (path / "tools").mkdir()
+    (path / "tools" / "requirements-dev.txt").write_text("pytest\n")
+    return path
+
+
+def _run_fake_setup(checkout: Path, marker: str) -> None:
+    (checkout / "node_modules" / "left-pad" / ".bin").mkdir(parents=True)
+    (checkout / "node_modules" / "left-pad" / "index.js").write_text(marker)
+    (checkout / "node_modules" / "left-pad" / ".bin" / "pad").symlink_to("../index.js")
+    (checkout / "build").mkdir()
+    (checkout / "build" / "generated.txt").write_text(marker)
+
+
+def _make_cache(tmp_path: Path, max_size_bytes: int = 2**30) -> SetupCommandCache:
+    return SetupCommandCache(cache_dir=tmp_path / "cache", get_max_size_bytes=lambda: max_size_bytes)
+
+
+def test_outputs_are_restored_into_a_checkout_with_the_same_inputs(tmp_path: Path) -> None:
+    cache = _make_cache(tmp_path)
+    first = _make_checkout(tmp_path / "first")
+    lookup = cache.lookup(first, "npm ci")
+    assert lookup is not None and not lookup.is_hit
+    _run_fake_setup(first, "from the first run")
+    cache.store(lookup)
+
+    second = _make_checkout(tmp_path / "second")
+    (second / "node_modules").mkdir()
+    (second / "node_modules" / "stale.js").write_text("stale")
+    second_lookup = cache.lookup(second, "npm ci")
+    assert second_lookup is not None and second_lookup.is_hit
+
+    assert cache.restore(second_lookup) == ["build/generated.txt", "node_modules"]
+    assert (second / "node_modules" / "left-pad" / "index.js").read_text() == "from the first run"
+    assert os.readlink(second / "node_modules" / "left-pad" / ".bin" / "pad") == "../index.js"
+    assert (second / "build" / "generated.txt").read_text() == "from the first run"
+    assert not (second / "node_modules" / "stale.js").exists()
+    # The restored files are copies: changing them leaves the cache alone.
+    (second / "node_modules" / "left-pad" / "index.js").write_text("edited")
+    third = _make_checkout(tmp_path / "third")
+    third_lookup = cache.lookup(third, "npm ci")
+    assert third_lookup is not None and cache.restore(third_lookup) is not None
+    assert (third / "node_modules" / "left-pad" / "index.js").read_text() == "from the first run"
+
+
+def test_changed_inputs_or_command_miss(tmp_path: Path) -> None:
+    cache = _make_cache(tmp_path)
+    first = _make_checkout(tmp_path / "first")
+    lookup = cache.lookup(first, "npm ci")
+    assert lookup is not None
+    _run_fake_setup(first, "v1")
+    cache.store(lookup)
+
+    assert not cache.lookup(_make_checkout(tmp_path / "new-lockfile", lockfile="lock v2"), "npm ci").is_hit
+    assert not cache.lookup(first, "npm install").is_hit
+    (first / "tools" / "requirements-dev.txt").write_text("pytest\nruff\n")
+    assert not cache.lookup(first, "npm ci").is_hit
+
+
+def test_least_recently_used_entries_are_evicted_over_budget(tmp_path: Path) -> None:
+    cache = _make_cache(tmp_path, max_size_bytes=40)
+    lookups = []
+    for index in range(3):
+        checkout = _make_checkout(tmp_path / f"checkout-{index}", lockfile=f"lock v{index}")
+        lookup = cache.lookup(checkout, "npm ci")
+        assert lookup is not None
+        (checkout / "node_modules").mkdir()
+        (checkout / "node_modules" / "blob").write_bytes(b"x" * 15)
+        if index == 2:
+            # Entry 0 was used more recently than entry 1.
+            assert cache.restore(lookups[0]) is not None
+        cache.store(lookup)
+        lookups.append(lookup)
+
+    remaining = {entry.name for entry in (tmp_path / "cache").iterdir()}
+    assert remaining == {lookups[0].key, lookups[2].key}
+    assert json.loads((tmp_path / "cache" / lookups[2].key / "entry.json").read_text())["size_bytes"] == 15
+
+
+def test_checkouts_without_a_valid_spec_are_not_cached(tmp_path: Path) -> None:
+    cache = _make_cache(tmp_path)
+    assert cache.lookup(tmp_path, "npm ci") is None
+    assert load_setup_cache_spec(_make_checkout(tmp_path / "checkout")) == SetupCacheSpec(
+        inputs=("**/requirements*.txt", "package-lock.json"), outputs=("build/generated.txt", "node_modules")
+    )
+    assert _make_cache(tmp_path, max_size_bytes=0).lookup(tmp_path / "checkout", "npm ci") is None
+
+    spec_path = tmp_path / "checkout" / ".sculptor" / "setup_cache.toml"
+    for invalid_spec in ('outputs = ["../elsewhere"]', "inputs = []", 'outputs = [".sculptor"]', "outputs = 3"):
+        spec_path.write_text(invalid_spec)
+        with pytest.raises(InvalidSetupCacheSpecError):
+            load_setup_cache_spec(tmp_path / "checkout")
+    assert cache.lookup(tmp_path / "checkout", "npm ci") is None
+
+
+def test_paths_leading_out_of_the_checkout_through_a_symlinked_parent_are_rejected(tmp_path: Path) -> None:
+    checkout = _make_checkout(tmp_path / "checkout")
+    outside = tmp_path / "outside"
+    (outside / "node_modules").mkdir(parents=True)
+    (outside / "package-lock.json").write_text("not in the repo")
+    (checkout / "vendor").symlink_to(outside, target_is_directory=True)
+    spec_path = checkout / ".sculptor" / "setup_cache.toml"
+
+    for spec in ('outputs = ["vendor/node_modules"]', 'inputs = ["vendor/package-lock.json"]\noutputs = ["build"]'):
+        spec_path.write_text(spec)
+        with pytest.raises(InvalidSetupCacheSpecError):
+            load_setup_cache_spec(checkout)
+    assert _make_cache(tmp_path).lookup(checkout, "npm ci") is None
+    assert (outside / "node_modules").is_dir()
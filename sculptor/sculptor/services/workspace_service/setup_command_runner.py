@@ -2,7 +2,9 @@
 
 Owns the lifecycle of the per-project bash setup command for a workspace:
 state machine, head+tail bounded log buffer, on-disk log persistence, and
-observer-based event emission for the streaming layer.
+observer-based event emission for the streaming layer. With a
+``SetupCommandCache``, a run whose declared inputs match an earlier successful
+run restores that run's outputs instead of executing the command.
 """
 
 import dataclasses
@@ -22,11 +24,15 @@ from loguru import logger
 from sculptor.foundation.concurrency_group import ConcurrencyGroup
 from sculptor.foundation.event_utils import CompoundEvent
 from sculptor.foundation.event_utils import ReadOnlyEvent
+from sculptor.services.workspace_service.setup_cache import SetupCacheLookup
+from sculptor.services.workspace_service.setup_cache import SetupCommandCache
 
 SubprocessRunner = Callable[[str, Callable[[bytes], None], Callable[[int], None], ReadOnlyEvent], int]
 
 SetupStatus = Literal["not_configured", "pending", "running", "succeeded", "failed", "legacy"]
 
+SetupCacheResult = Literal["hit", "miss"]
+
 HEAD_BYTES = 512 * 1024
 TAIL_BYTES = 512 * 1024
 TRUNCATION_MARKER = b"\n--- output truncated ---\n"
@@ -52,6 +58,8 @@ class SetupStateChanged:
     log_truncated: bool
     log_path: str | None
     pid: int | None = None
+    # None when the run was not cacheable (no cache, or the checkout declares no cache inputs/outputs).
+    cache_result: SetupCacheResult | None = None
 
 
 @dataclasses.dataclass(frozen=True)
@@ -104,6 +112,7 @@ class RunnerSlot:
         self.pid: int | None = None
         self.pid_ready: threading.Event = threading.Event()
         self.state_dir: Path | None = None
+        self.cache_result: SetupCacheResult | None = None
 
     def to_state_changed(self) -> SetupStateChanged:
         return SetupStateChanged(
@@ -117,12 +126,14 @@ class RunnerSlot:
             log_truncated=self.log_truncated,
             log_path=self.log_path,
             pid=self.pid,
+            cache_result=self.cache_result,
         )
 
 
 class SetupCommandRunner:
-    def __init__(self, concurrency_group: ConcurrencyGroup) -> None:
+    def __init__(self, concurrency_group: ConcurrencyGroup, setup_cache: SetupCommandCache | None = None) -> None:
         self._concurrency_group: ConcurrencyGroup = concurrency_group
+        self._setup_cache: SetupCommandCache | None = setup_cache
         self._slots: dict[str, RunnerSlot] = {}
         self._lock: threading.Lock = threading.Lock()
         self._state_observers: list[Callable[[SetupStateChanged], None]] = []
@@ -194,12 +205,15 @@ class SetupCommandRunner:
         shutdown_event_source: ReadOnlyEvent,
         state_dir: Path,
         on_persist: Callable[[SetupStateChanged], None],
+        working_directory: Path | None = None,
     ) -> SetupStateChanged:
         """Begin (or re-begin) a setup run for `workspace_id`.
 
         Idempotent for in-flight runs: returns the current state without
         starting a new one if a run is already `running`. Used both for the
         initial kick-off and for manual reruns after a terminal state.
+        `working_directory` is the host path of the checkout the command runs
+        in; the setup cache is only consulted when it is given.
         """
         with self._lock:
             existing = self._slots.get(workspace_id)
@@ -229,7 +243,7 @@ class SetupCommandRunner:
         self._notify_state(event)
         self._concurrency_group.start_new_thread(
             target=self._run_worker,
-            args=(slot, command, subprocess_runner, shutdown_event_source, state_dir, on_persist),
+            args=(slot, command, subprocess_runner, shutdown_event_source, state_dir, on_persist, working_directory),
             name=f"setup-runner-{workspace_id}",
             is_checked=False,
         )
@@ -243,6 +257,7 @@ class SetupCommandRunner:
         shutdown_event_source: ReadOnlyEvent,
         state_dir: Path,
         on_persist: Callable[[SetupStateChanged], None],
+        working_directory: Path | None,
     ) -> None:
         combined = CompoundEvent([slot.cancel_event, shutdown_event_source])
         chunk_handler = _ChunkHandler(self, slot)
@@ -250,9 +265,15 @@ class SetupCommandRunner:
 
         exit_code: int | None = None
         event: SetupStateChanged | None = None
+        cache_lookup: SetupCacheLookup | None = None
         try:
             try:
-                exit_code = subprocess_runner(command, chunk_handler, pid_handler, combined)
+                cache_lookup = self._lookup_cache(slot, command, working_directory)
+                if cache_lookup is not None and self._restore_from_cache(cache_lookup, slot, chunk_handler):
+                    cache_lookup = None
+                    exit_code = 0
+                else:
+                    exit_code = subprocess_runner(command, chunk_handler, pid_handler, combined)
             except Exception as exc:
                 logger.error("setup subprocess raised: {}", exc)
                 exit_code = None
@@ -284,6 +305,32 @@ class SetupCommandRunner:
             except Exception as exc:
                 logger.error("on_persist failed for setup terminal state: {}", exc)
             self._notify_state(event)
+        if cache_lookup is not None and exit_code == 0 and self._setup_cache is not None:
+            # After the terminal state is out, so that the workspace does not wait on the copy.
+            self._setup_cache.store(cache_lookup)
+
+    def _lookup_cache(self, slot: RunnerSlot, command: str, working_directory: Path | None) -> SetupCacheLookup | None:
+        if self._setup_cache is None or working_directory is None:
+            return None
+        cache_lookup = self._setup_cache.lookup(working_directory, command)
+        if cache_lookup is not None:
+            with slot.lock:
+                slot.cache_result = "hit" if cache_lookup.is_hit else "miss"
+        return cache_lookup
+
+    def _restore_from_cache(
+        self, cache_lookup: SetupCacheLookup, slot: RunnerSlot, chunk_handler: "_ChunkHandler"
+    ) -> bool:
+        if not cache_lookup.is_hit or self._setup_cache is None:
+            return False
+        restored_outputs = self._setup_cache.restore(cache_lookup)
+        if restored_outputs is None:
+            chunk_handler(b"Restoring from the setup cache failed; running the setup command.\n")
+            with slot.lock:
+                slot.cache_result = "miss"
+            return False
+        chunk_handler(f"Restored {', '.join(restored_outputs)} from the setup cache.\n".encode())
+        return True
 
     def cancel(self, workspace_id: str) -> bool:
         with self._lock:
@@ -317,6 +364,40 @@ class SetupCommandRunner:
         self._notify_state(event)
         return event
 
+    def adopt_finished_run(
+        self,
+        state: SetupStateChanged,
+        state_dir: Path,
+        on_persist: Callable[[SetupStateChanged], None],
+    ) -> SetupStateChanged:
+        """Record a run that finished under another runner as `state.workspace_id`'s own.
+
+        Used when a workspace claims a pooled checkout whose setup command
+        already ran: the run's log stays in the checkout's `state_dir`, and
+        this makes `get_log_path` and `get_state` report it for the workspace.
+        """
+        slot = RunnerSlot(state.workspace_id)
+        slot.run_id = state.run_id
+        slot.command = state.command
+        slot.status = state.status
+        slot.exit_code = state.exit_code
+        slot.started_at = state.started_at
+        slot.finished_at = state.finished_at
+        slot.log_truncated = state.log_truncated
+        slot.log_path = state.log_path
+        slot.cache_result = state.cache_result
+        slot.state_dir = state_dir
+        slot.pid_ready.set()
+        with self._lock:
+            self._slots[state.workspace_id] = slot
+            event = slot.to_state_changed()
+        try:
+            on_persist(event)
+        except Exception as exc:
+            logger.error("on_persist failed for adopted setup run: {}", exc)
+        self._notify_state(event)
+        return event
+
     def wait_for_pid(self, workspace_id: str, timeout: float | None = None) -> int | None:
         with self._lock:
             slot = self._slots.get(workspace_id)
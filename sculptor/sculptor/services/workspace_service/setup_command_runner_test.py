@@ -1,5 +1,6 @@
 """Unit tests for SetupCommandRunner."""
 
+import dataclasses
 import threading
 import time
 from pathlib import Path
@@ -11,6 +12,7 @@ import pytest
 
 from sculptor.foundation.concurrency_group import ConcurrencyGroup
 from sculptor.foundation.event_utils import ReadOnlyEvent
+from sculptor.services.workspace_service.setup_cache import SetupCommandCache
 from sculptor.services.workspace_service.setup_command_runner import HEAD_BYTES
 from sculptor.services.workspace_service.setup_command_runner import LOG_FILENAME
 from sculptor.services.workspace_service.setup_command_runner import SetupCommandRunner
@@ -180,6 +182,24 @@ def test_mark_failed_for_reconcile(runner: SetupCommandRunner, tmp_path: Path) -
     assert len(persisted) == 1
 
 
+def test_adopted_run_reports_the_log_of_the_runner_that_ran_it(
+    runner: SetupCommandRunner, test_root_concurrency_group: ConcurrencyGroup, tmp_path: Path
+) -> None:
+    pool_runner = SetupCommandRunner(test_root_concurrency_group)
+    pool_runner.start("pool-1", "echo hi", _wrap(lambda on_chunk, _shutdown: 0), Event(), tmp_path, lambda _: None)
+    finished = _wait_until_terminal(pool_runner, "pool-1")
+
+    persisted: list[SetupStateChanged] = []
+    adopted = runner.adopt_finished_run(
+        dataclasses.replace(finished, workspace_id="ws"), state_dir=tmp_path, on_persist=persisted.append
+    )
+
+    assert adopted.status == "succeeded" and adopted.run_id == finished.run_id
+    assert persisted == [adopted]
+    assert runner.get_state("ws") == adopted
+    assert runner.get_log_path("ws") == tmp_path / LOG_FILENAME
+
+
 def test_stop_all_cancels_running(runner: SetupCommandRunner, tmp_path: Path) -> None:
     def _execute(_on_chunk: Callable[[bytes], None], shutdown: ReadOnlyEvent) -> int:
         for _ in range(200):
@@ -277,3 +297,59 @@ def test_stop_all_unblocks_waiters(runner: SetupCommandRunner, tmp_path: Path) -
     assert pid is None
     assert elapsed < 5.0
     _wait_until_terminal(runner, "ws")
+
+
+def test_setup_with_cached_inputs_restores_outputs_instead_of_running(
+    test_root_concurrency_group: ConcurrencyGroup, tmp_path: Path
+) -> None:
+    cache = SetupCommandCache(cache_dir=tmp_path / "cache", get_max_size_bytes=lambda: 2**30)
+    runner = SetupCommandRunner(test_root_concurrency_group, setup_cache=cache)
+    commands_run: list[Path] = []
+
+    def _make_subprocess_runner(checkout: Path) -> Callable[..., int]:
+        def _execute(_on_chunk: Callable[[bytes], None], _shutdown: ReadOnlyEvent) -> int:
+            commands_run.append(checkout)
+            (checkout / "node_modules").mkdir()
+            (checkout / "node_modules" / "dep.js").write_text("installed")
+            return 0
+
+        return _wrap(_execute)
+
+    checkouts = []
+    for name in ("first", "second"):
+        checkout = tmp_path / name
+        (checkout / ".sculptor").mkdir(parents=True)
+        (checkout / ".sculptor" / "setup_cache.toml").write_text('inputs = ["lockfile"]\noutputs = ["node_modules"]\n')
+        (checkout / "lockfile").write_text("v1")
+        checkouts.append(checkout)
+
+    runner.start(
+        workspace_id="ws1",
+        command="npm ci",
+        subprocess_runner=_make_subprocess_runner(checkouts[0]),
+        shutdown_event_source=Event(),
+        state_dir=tmp_path / "state1",
+        on_persist=MagicMock(),
+        working_directory=checkouts[0],
+    )
+    assert _wait_until_terminal(runner, "ws1").cache_result == "miss"
+    deadline = time.monotonic() + 5.0
+    while not (tmp_path / "cache").exists() or not any((tmp_path / "cache").iterdir()):
+        assert time.monotonic() < deadline, "setup outputs were not cached"
+        time.sleep(0.05)
+
+    runner.start(
+        workspace_id="ws2",
+        command="npm ci",
+        subprocess_runner=_make_subprocess_runner(checkouts[1]),
+        shutdown_event_source=Event(),
+        state_dir=tmp_path / "state2",
+        on_persist=MagicMock(),
+        working_directory=checkouts[1],
+    )
+    final = _wait_until_terminal(runner, "ws2")
+
+    assert final.status == "succeeded" and final.exit_code == 0 and final.cache_result == "hit"
+    assert commands_run == [checkouts[0]]
+    assert (checkouts[1] / "node_modules" / "dep.js").read_text() == "installed"
+    assert b"from the setup cache" in (tmp_path / "state2" / LOG_FILENAME).read_bytes()
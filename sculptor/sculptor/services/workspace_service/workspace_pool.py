@@ -0,0 +1,463 @@
+"""Pre-created workspace environments, claimed by new workspaces.
+
+Creating a WORKTREE or CLONE environment means a ``git worktree add`` or a
+``git clone --reference`` plus config and ref replay, a checkout, and then the
+project's setup command — tens of seconds before the first prompt can run.
+``WorkspacePool`` does that work ahead of time: it keeps a few environments per
+``WorkspacePoolKey`` (project + creation parameters) checked out at the base
+branch with the setup command already run, and a new workspace claims one by
+just creating its branch at the checkout's ``HEAD``.
+
+Pooled WORKTREE checkouts are detached, so they add no branches to the user's
+repo until claimed. A pooled checkout is only handed out while the refs it was
+made from are unchanged (``_get_source_fingerprint``); otherwise it is thrown
+away and the workspace is created the slow way. Environments are refilled in
+the background, at most ``_MAX_CONCURRENT_FILLS`` at a time across all
+projects, after every claim.
+
+Each ready environment records its key in a manifest in its state directory,
+so the pool outlives the backend: ``stop`` leaves every checkout on disk, and
+``start`` adopts the ones an earlier run left behind and refills their keys.
+"""
+
+import dataclasses
+import os
+import threading
+import uuid
+from collections.abc import Collection
+from pathlib import Path
+
+from loguru import logger
+from pydantic import ValidationError
+
+from sculptor.database.workspace_enums import WorkspaceInitializationStrategy
+from sculptor.foundation.concurrency_group import ConcurrencyGroup
+from sculptor.foundation.pydantic_serialization import FrozenModel
+from sculptor.foundation.subprocess_utils import ProcessError
+from sculptor.interfaces.environments.base import Environment
+from sculptor.interfaces.environments.base import STATE_DIRECTORY
+from sculptor.primitives.ids import ProjectID
+from sculptor.services.git_repo_service.git_dirs import resolve_git_dirs
+from sculptor.services.git_repo_service.git_errors import GitCommandFailure
+from sculptor.services.git_repo_service.git_object_reader import get_git_object_reader
+from sculptor.services.workspace_service.environment_manager.api import EnvironmentManager
+from sculptor.services.workspace_service.environment_manager.env_file_parser import atomic_copy_env_file
+from sculptor.services.workspace_service.setup_cache import SetupCommandCache
+from sculptor.services.workspace_service.setup_command_runner import SetupCommandRunner
+from sculptor.services.workspace_service.setup_command_runner import SetupStateChanged
+
+# Fills run a clone or worktree add and then the setup command (often a full dependency install), so keep only a
+# couple going at once however many projects want refilling.
+_MAX_CONCURRENT_FILLS = 2
+# WORKTREE environments are created on this temporary branch and then detached from it.
+_POOL_BRANCH_PREFIX = "sculptor/pool-"
+# A pooled setup run that takes longer than this is cancelled, so that it stops holding a fill slot.
+_SETUP_TIMEOUT_SECONDS = 30 * 60.0
+# How long to let a cancelled setup run wind down before its checkout is deleted.
+_SETUP_CANCEL_GRACE_SECONDS = 10.0
+# Consecutive setup command failures in fresh checkouts after which a key is no longer filled.
+_MAX_SETUP_FAILURES = 3
+# Written to a pooled environment's state directory once it is ready, and removed when it is claimed.
+_MANIFEST_FILENAME = "workspace_pool.json"
+
+
+@dataclasses.dataclass(frozen=True)
+class WorkspacePoolKey:
+    """The parameters a pooled environment was created with; a workspace can only claim an exact match."""
+
+    project_id: ProjectID
+    project_path: Path
+    initialization_strategy: WorkspaceInitializationStrategy
+    source_branch: str | None
+    setup_command: str | None
+    env_var_override: bool
+
+
+@dataclasses.dataclass(frozen=True)
+class ClaimedEnvironment:
+    environment: Environment
+    # The finished setup run, if the key has a setup command; keyed by the pool's id for the run.
+    setup_state: SetupStateChanged | None
+
+
+@dataclasses.dataclass(frozen=True)
+class _PooledEnvironment:
+    environment_id: str
+    source_fingerprint: tuple[str, ...]
+    setup_state: SetupStateChanged | None
+
+
+class _PoolManifest(FrozenModel):
+    """What ``WorkspacePool.start`` needs to adopt a ready environment left behind by an earlier run."""
+
+    key: WorkspacePoolKey
+    source_fingerprint: tuple[str, ...]
+    setup_state: SetupStateChanged | None
+
+
+class WorkspacePool:
+    """Keeps pre-created environments per ``WorkspacePoolKey`` and hands them out to new workspaces."""
+
+    def __init__(
+        self,
+        *,
+        concurrency_group: ConcurrencyGroup,
+        environment_manager: EnvironmentManager,
+        setup_cache: SetupCommandCache | None = None,
+    ) -> None:
+        self._concurrency_group = concurrency_group
+        self._environment_manager = environment_manager
+        # A private runner, so pooled setup runs are never streamed to the UI as if they belonged to a workspace.
+        self._setup_runner = SetupCommandRunner(concurrency_group=concurrency_group, setup_cache=setup_cache)
+        self._fill_semaphore = threading.BoundedSemaphore(_MAX_CONCURRENT_FILLS)
+
+        # ``_lock`` guards everything below.
+        self._lock = threading.Lock()
+        self._ready_by_key: dict[WorkspacePoolKey, list[_PooledEnvironment]] = {}
+        self._filling_count_by_key: dict[WorkspacePoolKey, int] = {}
+        self._creating_environment_ids: set[str] = set()
+        # Consecutive failures of each key's setup command in a fresh checkout. A key that reaches
+        # _MAX_SETUP_FAILURES is not refilled until the command changes (and with it the key).
+        self._setup_failure_count_by_key: dict[WorkspacePoolKey, int] = {}
+        self._is_stopped = False
+
+    def start(self, size: int, project_ids: Collection[ProjectID]) -> None:
+        """Adopt the ready environments an earlier run left behind, and top their keys up to ``size``.
+
+        Environments of projects that are no longer in ``project_ids`` or on
+        disk are not adopted, so stale-environment cleanup removes them.
+        """
+        adopted_by_key: dict[WorkspacePoolKey, list[tuple[float, _PooledEnvironment]]] = {}
+        for environment_id in self._environment_manager.get_environment_ids():
+            manifest_path = _get_manifest_path(environment_id)
+            try:
+                modified_at = manifest_path.stat().st_mtime
+                manifest = _PoolManifest.model_validate_json(manifest_path.read_text())
+            except FileNotFoundError:
+                continue
+            except (OSError, ValidationError) as e:
+                logger.info("Not adopting pooled environment {}: {}", environment_id, e)
+                continue
+            if manifest.key.project_id not in project_ids or not manifest.key.project_path.exists():
+                continue
+            pooled = _PooledEnvironment(
+                environment_id=environment_id,
+                source_fingerprint=manifest.source_fingerprint,
+                setup_state=manifest.setup_state,
+            )
+            adopted_by_key.setdefault(manifest.key, []).append((modified_at, pooled))
+
+        surplus: list[tuple[WorkspacePoolKey, _PooledEnvironment]] = []
+        with self._lock:
+            if self._is_stopped:
+                return
+            for key, adopted in adopted_by_key.items():
+                adopted.sort(key=lambda entry: entry[0], reverse=True)
+                self._ready_by_key[key] = [pooled for _, pooled in adopted[:size]]
+                surplus.extend((key, pooled) for _, pooled in adopted[size:])
+        if surplus:
+            self._discard_in_background(surplus)
+        if adopted_by_key:
+            logger.info("Adopted pooled environments for {} workspace pool keys", len(adopted_by_key))
+        # ``fill`` drops a project's environments pooled under other keys, so fill the most recent key of each last.
+        for key in sorted(adopted_by_key, key=lambda key: adopted_by_key[key][0][0]):
+            self.fill(key, size)
+
+    def fill(self, key: WorkspacePoolKey, size: int) -> None:
+        """Top the pool for ``key`` up to ``size`` environments in the background.
+
+        Environments pooled for the same project under other parameters (e.g.
+        before its setup command was edited) are discarded.
+        """
+        superseded: list[tuple[WorkspacePoolKey, _PooledEnvironment]] = []
+        with self._lock:
+            if self._is_stopped or self._setup_failure_count_by_key.get(key, 0) >= _MAX_SETUP_FAILURES:
+                return
+            for other_key in list(self._ready_by_key):
+                if other_key.project_id == key.project_id and other_key != key:
+                    superseded.extend((other_key, pooled) for pooled in self._ready_by_key.pop(other_key))
+            ready = self._ready_by_key.setdefault(key, [])
+            missing = size - len(ready) - self._filling_count_by_key.get(key, 0)
+            if missing > 0:
+                self._filling_count_by_key[key] = self._filling_count_by_key.get(key, 0) + missing
+        if superseded:
+            self._discard_in_background(superseded)
+        for _ in range(missing):
+            self._concurrency_group.start_new_thread(
+                target=self._fill_one,
+                args=(key,),
+                name=f"workspace-pool-fill-{key.project_id}",
+                is_checked=False,
+            )
+
+    def claim(
+        self, key: WorkspacePoolKey, requested_branch_name: str | None, concurrency_group: ConcurrencyGroup
+    ) -> ClaimedEnvironment | None:
+        """Hand out a pooled environment for ``key``, on a new ``requested_branch_name`` branch if one is given.
+
+        Returns None when nothing up to date is pooled; the caller then creates
+        the environment itself.
+        """
+        with self._lock:
+            if not self._ready_by_key.get(key):
+                return None
+        fingerprint = _get_source_fingerprint(key, self._concurrency_group)
+        while True:
+            with self._lock:
+                ready = self._ready_by_key.get(key)
+                if not ready:
+                    return None
+                pooled = ready.pop(0)
+            if fingerprint is None or pooled.source_fingerprint != fingerprint:
+                logger.debug("Discarding out-of-date pooled environment {}", pooled.environment_id)
+                self._discard_in_background([(key, pooled)])
+                continue
+            try:
+                # Before anything else, so that a later run never adopts an environment a workspace now owns.
+                _get_manifest_path(pooled.environment_id).unlink(missing_ok=True)
+                environment = self._activate(key, pooled, requested_branch_name, concurrency_group)
+            except (ProcessError, OSError) as e:
+                logger.info("Failed to claim pooled environment {}: {}", pooled.environment_id, e)
+                self._discard_in_background([(key, pooled)])
+                return None
+            logger.info("Claimed pooled environment {} for project {}", pooled.environment_id, key.project_id)
+            return ClaimedEnvironment(environment=environment, setup_state=pooled.setup_state)
+
+    def get_environment_ids(self) -> set[str]:
+        """Every environment the pool owns, which stale-environment cleanup must leave alone."""
+        with self._lock:
+            return {
+                pooled.environment_id for ready in self._ready_by_key.values() for pooled in ready
+            } | self._creating_environment_ids
+
+    def stop(self) -> None:
+        """Stop filling and cancel in-flight setup runs; ready environments stay on disk for the next ``start``."""
+        with self._lock:
+            self._is_stopped = True
+        self._setup_runner.stop_all()
+
+    def _fill_one(self, key: WorkspacePoolKey) -> None:
+        pooled: _PooledEnvironment | None = None
+        try:
+            with self._fill_semaphore:
+                if not self._is_stopped:
+                    pooled = self._create(key)
+        except Exception as e:
+            logger.info("Failed to pre-create a workspace environment for project {}: {}", key.project_id, e)
+        with self._lock:
+            self._filling_count_by_key[key] -= 1
+            # After ``stop`` a finished checkout is kept (and preserved from cleanup) for the next ``start``.
+            if pooled is not None and (self._is_stopped or key in self._ready_by_key):
+                self._ready_by_key.setdefault(key, []).append(pooled)
+                return
+        if pooled is not None:
+            self._discard([(key, pooled)])
+
+    def _create(self, key: WorkspacePoolKey) -> _PooledEnvironment | None:
+        # Taken before the checkout, so that a ref moving while it is made shows up as a mismatch at claim time.
+        fingerprint = _get_source_fingerprint(key, self._concurrency_group)
+        if fingerprint is None:
+            return None
+        placeholder_branch = (
+            f"{_POOL_BRANCH_PREFIX}{uuid.uuid4().hex[:12]}"
+            if key.initialization_strategy == WorkspaceInitializationStrategy.WORKTREE
+            else None
+        )
+        environment = self._environment_manager.create_environment(
+            project_path=key.project_path,
+            project_id=key.project_id,
+            concurrency_group=self._concurrency_group,
+            initialization_strategy=key.initialization_strategy,
+            source_branch=key.source_branch,
+            requested_branch_name=placeholder_branch,
+            env_var_override=key.env_var_override,
+        )
+        environment_id = str(environment.environment_id)
+        pooled = _PooledEnvironment(environment_id=environment_id, source_fingerprint=fingerprint, setup_state=None)
+        with self._lock:
+            self._creating_environment_ids.add(environment_id)
+        try:
+            working_directory = environment.get_working_directory()
+            if placeholder_branch is not None:
+                # Leave no branch behind in the user's repo; the claim creates the real one at this commit.
+                self._run_git(["git", "checkout", "-q", "--detach"], working_directory, self._concurrency_group)
+                self._run_git(["git", "branch", "-D", placeholder_branch], working_directory, self._concurrency_group)
+            if key.setup_command:
+                setup_state = None if self._is_stopped else self._run_setup(environment, key.setup_command)
+                if setup_state is None or setup_state.status != "succeeded":
+                    self._record_setup_failure(key, setup_state)
+                    self._discard_unfinished(key, pooled)
+                    return None
+                with self._lock:
+                    self._setup_failure_count_by_key.pop(key, None)
+                pooled = dataclasses.replace(pooled, setup_state=setup_state)
+            _write_manifest(key, pooled)
+        except BaseException:
+            self._discard_unfinished(key, pooled)
+            raise
+        finally:
+            with self._lock:
+                self._creating_environment_ids.discard(environment_id)
+        logger.debug("Pooled environment {} for project {}", environment_id, key.project_id)
+        return pooled
+
+    def _record_setup_failure(self, key: WorkspacePoolKey, setup_state: SetupStateChanged | None) -> None:
+        # A run that was cancelled (the pool stopping, the app shutting down) or timed out says nothing about
+        # whether the command works, so only count runs that finished on their own.
+        if setup_state is None or self._is_stopped or self._concurrency_group.shutdown_event.is_set():
+            return
+        with self._lock:
+            failure_count = self._setup_failure_count_by_key.get(key, 0) + 1
+            self._setup_failure_count_by_key[key] = failure_count
+        logger.info(
+            "Setup command failed in a fresh checkout of project {} (exit code {}, failure {} of {})",
+            key.project_id,
+            setup_state.exit_code,
+            failure_count,
+            _MAX_SETUP_FAILURES,
+        )
+
+    def _run_setup(self, environment: Environment, command: str) -> SetupStateChanged | None:
+        """Run the setup command in a pooled checkout; None if it did not finish within _SETUP_TIMEOUT_SECONDS."""
+        workspace_id = f"pool-{Path(str(environment.environment_id)).name}"
+        finished = threading.Event()
+        final_states: list[SetupStateChanged] = []
+
+        def on_persist(change: SetupStateChanged) -> None:
+            if change.status in ("succeeded", "failed"):
+                final_states.append(change)
+                finished.set()
+
+        self._setup_runner.start(
+            workspace_id=workspace_id,
+            command=command,
+            subprocess_runner=environment.run_setup_subprocess,
+            shutdown_event_source=self._concurrency_group.shutdown_event,
+            state_dir=environment.to_host_path(environment.get_state_path()),
+            on_persist=on_persist,
+            working_directory=environment.get_working_directory(),
+        )
+        if not finished.wait(timeout=_SETUP_TIMEOUT_SECONDS):
+            logger.info("Setup command in pooled checkout {} timed out; cancelling it", environment.environment_id)
+            self._setup_runner.cancel(workspace_id)
+            finished.wait(timeout=_SETUP_CANCEL_GRACE_SECONDS)
+            return None
+        return final_states[0]
+
+    def _activate(
+        self,
+        key: WorkspacePoolKey,
+        pooled: _PooledEnvironment,
+        requested_branch_name: str | None,
+        concurrency_group: ConcurrencyGroup,
+    ) -> Environment:
+        working_directory = self._resume(key, pooled, concurrency_group).get_working_directory()
+        if requested_branch_name is not None and requested_branch_name.strip():
+            self._run_git(["git", "checkout", "-q", "-b", requested_branch_name], working_directory, concurrency_group)
+        # .sculptor/.env was copied when the checkout was made; pick up edits made since.
+        source_env_file = key.project_path / ".sculptor" / ".env"
+        dest_env_file = working_directory / ".sculptor" / ".env"
+        if source_env_file.exists():
+            atomic_copy_env_file(source_env_file, dest_env_file)
+        elif dest_env_file.exists():
+            dest_env_file.unlink()
+        # Resume again so the environment's project env vars come from the current .env.
+        return self._resume(key, pooled, concurrency_group)
+
+    def _resume(
+        self, key: WorkspacePoolKey, pooled: _PooledEnvironment, concurrency_group: ConcurrencyGroup
+    ) -> Environment:
+        return self._environment_manager.resume_environment(
+            environment_id=pooled.environment_id,
+            project_path=key.project_path,
+            project_id=key.project_id,
+            concurrency_group=concurrency_group,
+            initialization_strategy=key.initialization_strategy,
+            env_var_override=key.env_var_override,
+        )
+
+    def _discard_unfinished(self, key: WorkspacePoolKey, pooled: _PooledEnvironment) -> None:
+        # Nothing is deleted once the pool is stopping; a checkout without a manifest is left to stale cleanup.
+        if not self._is_stopped:
+            self._discard([(key, pooled)])
+
+    def _discard_in_background(self, pooled_by_key: list[tuple[WorkspacePoolKey, _PooledEnvironment]]) -> None:
+        self._concurrency_group.start_new_thread(
+            target=self._discard,
+            args=(pooled_by_key,),
+            name="workspace-pool-discard",
+            is_checked=False,
+        )
+
+    def _discard(self, pooled_by_key: list[tuple[WorkspacePoolKey, _PooledEnvironment]]) -> None:
+        worktree_repo_paths: set[Path] = set()
+        for key, pooled in pooled_by_key:
+            self._environment_manager.delete_environment(pooled.environment_id)
+            if key.initialization_strategy == WorkspaceInitializationStrategy.WORKTREE:
+                worktree_repo_paths.add(key.project_path)
+        # The checkouts were detached, so there is no branch to delete; only the worktree registrations remain.
+        for repo_path in worktree_repo_paths:
+            try:
+                self._run_git(["git", "worktree", "prune"], repo_path, self._concurrency_group)
+            except ProcessError as e:
+                logger.debug("git worktree prune failed in {}: {}", repo_path, e)
+
+    @staticmethod
+    def _run_git(command: list[str], cwd: Path, concurrency_group: ConcurrencyGroup) -> None:
+        concurrency_group.run_process_to_completion(command=command, cwd=cwd, is_checked_after=True)
+
+
+def _get_manifest_path(environment_id: str) -> Path:
+    return Path(environment_id) / STATE_DIRECTORY / _MANIFEST_FILENAME
+
+
+def _write_manifest(key: WorkspacePoolKey, pooled: _PooledEnvironment) -> None:
+    manifest = _PoolManifest(key=key, source_fingerprint=pooled.source_fingerprint, setup_state=pooled.setup_state)
+    manifest_path = _get_manifest_path(pooled.environment_id)
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = manifest_path.with_name(manifest_path.name + ".tmp")
+    tmp_path.write_text(manifest.model_dump_json())
+    os.replace(tmp_path, manifest_path)
+
+
+def _get_source_fingerprint(key: WorkspacePoolKey, concurrency_group: ConcurrencyGroup) -> tuple[str, ...] | None:
+    """What a checkout for ``key`` is made from; None if the project repo cannot be read.
+
+    A WORKTREE checkout shares the project's refs, so only the base commit
+    matters. A CLONE also copies the project's remote-tracking refs (or, with
+    none, its local branches; see ``clone_strategy._plan_ref_updates``) and,
+    without a source branch, checks out the project's current branch.
+    """
+    try:
+        base = get_git_object_reader(key.project_path).get_info(key.source_branch or "HEAD")
+    except GitCommandFailure as e:
+        logger.debug("Cannot resolve the pool base for {}: {}", key.project_path, e)
+        return None
+    if base is None:
+        return None
+    if key.initialization_strategy != WorkspaceInitializationStrategy.CLONE:
+        return (base.object_id,)
+    try:
+        refs = concurrency_group.run_process_to_completion(
+            command=["git", "for-each-ref", "--format=%(objectname) %(refname)", "refs/remotes/", "refs/heads/"],
+            cwd=key.project_path,
+            is_checked_after=True,
+            log_command=False,
+        ).stdout.splitlines()
+    except (OSError, ProcessError) as e:
+        logger.debug("Cannot list the refs of {}: {}", key.project_path, e)
+        return None
+    remote_refs = [ref for ref in refs if " refs/remotes/" in ref]
+    copied_refs = "\n".join(remote_refs or refs)
+    if key.source_branch is not None:
+        return (base.object_id, copied_refs)
+    git_dirs = resolve_git_dirs(key.project_path)
+    if git_dirs is None:
+        return None
+    git_dir, _common_dir = git_dirs
+    try:
+        head = (git_dir / "HEAD").read_text().strip()
+    except OSError as e:
+        logger.debug("Cannot read the current branch of {}: {}", key.project_path, e)
+        return None
+    return (base.object_id, copied_refs, head)
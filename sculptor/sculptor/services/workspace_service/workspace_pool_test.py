@@ -0,0 +1,228 @@
+import subprocess
+import time
+from pathlib import Path
+from typing import Generator
+from typing import cast
+
+import pytest
+
+from sculptor.config.settings import SculptorSettings
+from sculptor.database.workspace_enums import WorkspaceInitializationStrategy
+from sculptor.foundation.concurrency_group import ConcurrencyGroup
+from sculptor.primitives.ids import ProjectID
+from sculptor.service_collections.service_collection import CompleteServiceCollection
+from sculptor.services.data_model_service.api import TaskDataModelService
+from sculptor.services.workspace_service import workspace_pool as workspace_pool_module
+from sculptor.services.workspace_service.environment_manager import (
+    default_implementation as environment_manager_default_implementation,
+)
+from sculptor.services.workspace_service.environment_manager.default_implementation import DefaultEnvironmentManager
+from sculptor.services.workspace_service.environment_manager.environments import local_environment
+from sculptor.services.workspace_service.workspace_pool import WorkspacePool
+from sculptor.services.workspace_service.workspace_pool import WorkspacePoolKey
+
+
+def _git(repo_path: Path, *args: str) -> str:
+    return subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        cwd=repo_path,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+
+
+@pytest.fixture(autouse=True)
+def _redirect_workspace_checkouts_to_tmp_path(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    workspaces_dir = tmp_path / "workspaces"
+    workspaces_dir.mkdir(parents=True, exist_ok=True)
+    monkeypatch.setattr(environment_manager_default_implementation, "LOCAL_WORKSPACE_DIR", workspaces_dir)
+    monkeypatch.setattr(local_environment, "LOCAL_WORKSPACE_DIR", workspaces_dir)
+
+
+@pytest.fixture
+def project_path(tmp_path: Path) -> Path:
+    repo_path = tmp_path / "project"
+    repo_path.mkdir()
+    _git(repo_path, "init", "-q", "-b", "main")
+    (repo_path / "README.md").write_text("test")
+    _git(repo_path, "add", "README.md")
+    _git(repo_path, "commit", "-q", "-m", "initial")
+    return repo_path
+
+
+@pytest.fixture
+def workspace_pool(
+    test_settings: SculptorSettings,
+    test_service_collection: CompleteServiceCollection,
+    test_root_concurrency_group: ConcurrencyGroup,
+) -> Generator[WorkspacePool, None, None]:
+    environment_manager = DefaultEnvironmentManager(
+        data_model_service=cast(TaskDataModelService, test_service_collection.data_model_service),
+    )
+    pool = WorkspacePool(concurrency_group=test_root_concurrency_group, environment_manager=environment_manager)
+    yield pool
+    pool.stop()
+
+
+def _make_key(
+    project_path: Path, initialization_strategy: WorkspaceInitializationStrategy, setup_command: str | None
+) -> WorkspacePoolKey:
+    return WorkspacePoolKey(
+        project_id=ProjectID(),
+        project_path=project_path,
+        initialization_strategy=initialization_strategy,
+        source_branch="main",
+        setup_command=setup_command,
+        env_var_override=False,
+    )
+
+
+def _wait_until_settled(pool: WorkspacePool, key: WorkspacePoolKey, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while pool._filling_count_by_key.get(key, 0) > 0:
+        assert time.monotonic() < deadline, "pool fill did not finish"
+        time.sleep(0.05)
+
+
+@pytest.mark.parametrize(
+    "initialization_strategy", [WorkspaceInitializationStrategy.WORKTREE, WorkspaceInitializationStrategy.CLONE]
+)
+def test_claimed_environment_is_set_up_on_the_requested_branch(
+    workspace_pool: WorkspacePool,
+    project_path: Path,
+    test_root_concurrency_group: ConcurrencyGroup,
+    initialization_strategy: WorkspaceInitializationStrategy,
+) -> None:
+    key = _make_key(project_path, initialization_strategy, setup_command="echo done > setup-marker.txt")
+    workspace_pool.fill(key, 1)
+    _wait_until_settled(workspace_pool, key)
+    [environment_id] = workspace_pool.get_environment_ids()
+    # Pooled checkouts leave no branches behind in the project.
+    assert _git(project_path, "branch", "--list", "sculptor/*") == ""
+
+    claimed = workspace_pool.claim(key, "feature", test_root_concurrency_group)
+
+    assert claimed is not None
+    assert str(claimed.environment.environment_id) == environment_id
+    assert claimed.setup_state is not None and claimed.setup_state.status == "succeeded"
+    working_directory = claimed.environment.get_working_directory()
+    assert (working_directory / "setup-marker.txt").read_text().strip() == "done"
+    assert _git(working_directory, "rev-parse", "--abbrev-ref", "HEAD") == "feature"
+    assert _git(working_directory, "rev-parse", "HEAD") == _git(project_path, "rev-parse", "main")
+    assert workspace_pool.get_environment_ids() == set()
+
+
+def test_environments_pooled_before_the_source_moved_are_not_claimed(
+    workspace_pool: WorkspacePool, project_path: Path, test_root_concurrency_group: ConcurrencyGroup
+) -> None:
+    key = _make_key(project_path, WorkspaceInitializationStrategy.WORKTREE, setup_command=None)
+    workspace_pool.fill(key, 1)
+    _wait_until_settled(workspace_pool, key)
+    [environment_id] = workspace_pool.get_environment_ids()
+
+    _git(project_path, "commit", "-q", "--allow-empty", "-m", "second")
+
+    assert workspace_pool.claim(key, "feature", test_root_concurrency_group) is None
+    deadline = time.monotonic() + 10.0
+    while Path(environment_id).exists():
+        assert time.monotonic() < deadline, "out-of-date environment was not deleted"
+        time.sleep(0.05)
+
+
+def test_keys_with_a_failing_setup_command_are_not_pooled(
+    workspace_pool: WorkspacePool, project_path: Path, test_root_concurrency_group: ConcurrencyGroup
+) -> None:
+    key = _make_key(project_path, WorkspaceInitializationStrategy.WORKTREE, setup_command="exit 3")
+    for _ in range(workspace_pool_module._MAX_SETUP_FAILURES):
+        # Each failure below the limit leaves the key fillable.
+        workspace_pool.fill(key, 1)
+        assert workspace_pool._filling_count_by_key[key] == 1
+        _wait_until_settled(workspace_pool, key)
+
+    assert workspace_pool.get_environment_ids() == set()
+    assert workspace_pool.claim(key, "feature", test_root_concurrency_group) is None
+    workspace_pool.fill(key, 2)
+    assert workspace_pool._filling_count_by_key[key] == 0
+
+
+def test_a_timed_out_setup_command_is_cancelled_and_not_counted_as_a_failure(
+    workspace_pool: WorkspacePool, project_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(workspace_pool_module, "_SETUP_TIMEOUT_SECONDS", 0.5)
+    key = _make_key(project_path, WorkspaceInitializationStrategy.WORKTREE, setup_command="sleep 60")
+    workspace_pool.fill(key, 1)
+    _wait_until_settled(workspace_pool, key, timeout=30.0)
+
+    assert workspace_pool.get_environment_ids() == set()
+    assert key not in workspace_pool._setup_failure_count_by_key
+    # The fill slot was released, so the next fill can run.
+    assert workspace_pool._fill_semaphore.acquire(blocking=False)
+    workspace_pool._fill_semaphore.release()
+
+
+def test_stopping_keeps_pooled_environments_for_the_next_pool_to_adopt(
+    workspace_pool: WorkspacePool,
+    project_path: Path,
+    test_service_collection: CompleteServiceCollection,
+    test_root_concurrency_group: ConcurrencyGroup,
+) -> None:
+    key = _make_key(
+        project_path, WorkspaceInitializationStrategy.WORKTREE, setup_command="echo done > setup-marker.txt"
+    )
+    workspace_pool.fill(key, 1)
+    _wait_until_settled(workspace_pool, key)
+    [environment_id] = workspace_pool.get_environment_ids()
+
+    workspace_pool.stop()
+
+    assert Path(environment_id).exists()
+    next_pool = WorkspacePool(
+        concurrency_group=test_root_concurrency_group,
+        environment_manager=DefaultEnvironmentManager(
+            data_model_service=cast(TaskDataModelService, test_service_collection.data_model_service),
+        ),
+    )
+    try:
+        next_pool.start(1, {key.project_id})
+        assert next_pool.get_environment_ids() == {environment_id}
+        assert next_pool._filling_count_by_key.get(key, 0) == 0
+
+        claimed = next_pool.claim(key, "feature", test_root_concurrency_group)
+
+        assert claimed is not None
+        assert str(claimed.environment.environment_id) == environment_id
+        assert claimed.setup_state is not None and claimed.setup_state.status == "succeeded"
+        assert not workspace_pool_module._get_manifest_path(environment_id).exists()
+    finally:
+        next_pool.stop()
+
+
+def test_pooled_environments_of_deleted_projects_are_not_adopted(
+    workspace_pool: WorkspacePool, project_path: Path
+) -> None:
+    key = _make_key(project_path, WorkspaceInitializationStrategy.WORKTREE, setup_command=None)
+    workspace_pool.fill(key, 1)
+    _wait_until_settled(workspace_pool, key)
+    workspace_pool.stop()
+    workspace_pool._ready_by_key.clear()
+    workspace_pool._is_stopped = False
+
+    workspace_pool.start(1, set())
+
+    assert workspace_pool.get_environment_ids() == set()
+
+
+def test_clone_environments_are_not_invalidated_by_branches_a_clone_does_not_copy(
+    workspace_pool: WorkspacePool, project_path: Path, test_root_concurrency_group: ConcurrencyGroup
+) -> None:
+    _git(project_path, "remote", "add", "upstream", str(project_path))
+    _git(project_path, "update-ref", "refs/remotes/upstream/main", "main")
+    key = _make_key(project_path, WorkspaceInitializationStrategy.CLONE, setup_command=None)
+    workspace_pool.fill(key, 1)
+    _wait_until_settled(workspace_pool, key)
+
+    # The clone copies the remote-tracking refs, not the project's other local branches or its current branch.
+    _git(project_path, "checkout", "-q", "-b", "unrelated")
+
+    assert workspace_pool.claim(key, "feature", test_root_concurrency_group) is not None
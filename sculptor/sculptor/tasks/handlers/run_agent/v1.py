@@ -77,6 +77,7 @@ from sculptor.primitives.ids import TaskID
 from sculptor.primitives.ids import UserReference
 from sculptor.services.data_model_service.data_types import DataModelTransaction
 from sculptor.services.git_repo_service.api import GitRepoService
+from sculptor.services.task_service.api import MessageWriteEntry
 from sculptor.services.task_service.api import TaskService
 from sculptor.services.task_service.data_types import ServiceCollectionForTask
 from sculptor.services.task_service.errors import TaskError
@@ -1113,35 +1114,40 @@ def _save_messages(
 ) -> None:
     """Persist this batch of messages and queue artifact-sync callbacks.
 
-    Per-message publish callbacks and per-artifact sync callbacks are queued
-    on the same transaction (post-commit hooks fire in registration order).
-    For each ``UpdatedArtifactAgentMessage``, the artifact's sync callback is
-    queued *immediately before* the message's publish callback — that way the
-    on-disk task-sync file is written by the time the frontend receives the
-    update notification and fetches ``/artifacts/{name}``, closing the
+    The batch goes through the task service's group-commit writer, which shares
+    one transaction between concurrently running agents; it returns once the
+    batch is committed and published.
+
+    Per-message publish callbacks and per-artifact sync callbacks run in entry
+    order after the commit. For each ``UpdatedArtifactAgentMessage``, the
+    artifact's sync callback is placed *immediately before* the message — that
+    way the on-disk task-sync file is written by the time the frontend receives
+    the update notification and fetches ``/artifacts/{name}``, closing the
     SCU-1295 race. Non-artifact messages publish unblocked.
     """
     if not new_messages and not sync_callbacks_by_artifact_name:
         return
 
-    with services.data_model_service.open_task_transaction() as transaction:
-        registered_sync_names: set[str] = set()
-        for message in new_messages:
-            if isinstance(message, UpdatedArtifactAgentMessage):
-                name = message.artifact.name
-                sync_callback = sync_callbacks_by_artifact_name.get(name)
-                if sync_callback is not None and name not in registered_sync_names:
-                    transaction.add_callback(sync_callback)
-                    registered_sync_names.add(name)
-            services.task_service.create_message(message, task_id, transaction)
-
-        # Defensive: any sync callback whose UpdatedArtifactAgentMessage isn't
-        # in this batch still gets registered, so the file is written. Should
-        # not happen in practice — sync_artifacts only emits callbacks for
-        # artifacts it observed in ``new_messages``.
-        for name, callback in sync_callbacks_by_artifact_name.items():
-            if name not in registered_sync_names:
-                transaction.add_callback(callback)
+    entries: list[MessageWriteEntry] = []
+    registered_sync_names: set[str] = set()
+    for message in new_messages:
+        if isinstance(message, UpdatedArtifactAgentMessage):
+            name = message.artifact.name
+            sync_callback = sync_callbacks_by_artifact_name.get(name)
+            if sync_callback is not None and name not in registered_sync_names:
+                entries.append(sync_callback)
+                registered_sync_names.add(name)
+        entries.append(message)
+
+    # Defensive: any sync callback whose UpdatedArtifactAgentMessage isn't
+    # in this batch still gets registered, so the file is written. Should
+    # not happen in practice — sync_artifacts only emits callbacks for
+    # artifacts it observed in ``new_messages``.
+    for name, callback in sync_callbacks_by_artifact_name.items():
+        if name not in registered_sync_names:
+            entries.append(callback)
+
+    services.task_service.write_messages(task_id, entries)
 
 
 MessageT = TypeVar("MessageT")
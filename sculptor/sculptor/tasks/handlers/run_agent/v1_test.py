@@ -1,5 +1,5 @@
 import threading
-from contextlib import contextmanager
+from collections.abc import Sequence
 from pathlib import Path
 from queue import Queue
 from unittest.mock import MagicMock
@@ -1858,22 +1858,15 @@ def test_save_messages_writes_artifact_before_publishing_its_message() -> None:
         def __call__(self) -> None:
             return None
 
-    class RecordingTransaction:
-        def add_callback(self, callback: object) -> None:
-            registered.append(callback.label if isinstance(callback, LabeledCallback) else "unknown")
-
-    transaction = RecordingTransaction()
-
-    @contextmanager
-    def fake_open_transaction():
-        yield transaction
-
-    def fake_create_message(message: object, _task_id: TaskID, txn: RecordingTransaction) -> None:
-        txn.add_callback(LabeledCallback(f"publish:{type(message).__name__}"))
+    def fake_write_messages(_task_id: TaskID, entries: Sequence[object]) -> None:
+        for entry in entries:
+            if isinstance(entry, LabeledCallback):
+                registered.append(entry.label)
+            else:
+                registered.append(f"publish:{type(entry).__name__}")
 
     services = MagicMock()
-    services.data_model_service.open_task_transaction = fake_open_transaction
-    services.task_service.create_message = fake_create_message
+    services.task_service.write_messages = fake_write_messages
 
     chat_msg = ResponseBlockAgentMessage(
         role="assistant",
@@ -0,0 +1,101 @@
+"""Wall-clock measurements of backend hot paths for the perf comparison pipeline.
+
+The scenario suite measures what the frontend does through Playwright (see
+:mod:`sculptor.testing.perf.collector`). A ``BackendBenchmarkRecorder`` times a
+Python callable directly instead: each ``measure()`` runs a warmup round and then
+``rounds`` timed rounds, each on a fresh input from ``setup`` (not timed), and keeps
+the median, minimum, and maximum.
+
+Measurements are appended to the same JSONL file the scenario suite writes (see
+``resolve_output_path``) with ``"kind": "backend"``, so ``tools/perf/comment.py``
+diffs them against the baseline next to the frontend scenarios.
+"""
+
+import gc
+import json
+import statistics
+import time
+from collections.abc import Callable
+from dataclasses import asdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TypeVar
+
+from loguru import logger
+
+T = TypeVar("T")
+
+
+@dataclass
+class BackendMeasurement:
+    """One benchmark × variant result, written to JSONL when the test finishes."""
+
+    scenario: str
+    variant: str
+    median_ms: float
+    min_ms: float
+    max_ms: float
+    rounds: int
+    kind: str = "backend"
+    test_nodeid: str = ""
+
+
+class BackendBenchmarkRecorder:
+    """Per-test recorder: times callables and flushes JSONL on test teardown."""
+
+    def __init__(self, output_path: Path | None, test_nodeid: str) -> None:
+        self._output_path = output_path
+        self._test_nodeid = test_nodeid
+        self._measurements: list[BackendMeasurement] = []
+
+    def measure(
+        self,
+        *,
+        scenario: str,
+        variant: str,
+        setup: Callable[[], T],
+        run: Callable[[T], object],
+        rounds: int = 5,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> BackendMeasurement:
+        """Time `run(setup())` over `rounds` rounds after one untimed warmup round.
+
+        `clock` returns seconds; pass e.g. `time.process_time` to record CPU time instead of wall-clock time.
+        """
+        timings_ms: list[float] = []
+        for round_index in range(rounds + 1):
+            run_input = setup()
+            # Collect the previous round's garbage now rather than inside the timed call.
+            gc.collect()
+            start = clock()
+            run(run_input)
+            elapsed_ms = (clock() - start) * 1000.0
+            if round_index > 0:
+                timings_ms.append(elapsed_ms)
+        measurement = BackendMeasurement(
+            scenario=scenario,
+            variant=variant,
+            median_ms=statistics.median(timings_ms),
+            min_ms=min(timings_ms),
+            max_ms=max(timings_ms),
+            rounds=rounds,
+            test_nodeid=self._test_nodeid,
+        )
+        logger.info(
+            "{} / {}: median {:.2f}ms, min {:.2f}ms over {} rounds",
+            scenario,
+            variant,
+            measurement.median_ms,
+            measurement.min_ms,
+            rounds,
+        )
+        self._measurements.append(measurement)
+        return measurement
+
+    def flush(self) -> None:
+        if not self._output_path or not self._measurements:
+            return
+        self._output_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._output_path.open("a", encoding="utf-8") as f:
+            for m in self._measurements:
+                f.write(json.dumps(asdict(m), separators=(",", ":")) + "\n")
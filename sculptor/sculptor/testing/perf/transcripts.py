@@ -0,0 +1,81 @@
+"""Synthetic agent transcripts for the backend benchmarks.
+
+Two shapes of the same tool-heavy turn: the `Message` log the backend persists and
+folds (`make_tool_heavy_turn`), and the stream-json lines the Claude CLI writes on
+stdout for it (`make_tool_heavy_claude_cli_transcript`), built with the same
+`fake_claude_jsonl` helpers the fake CLI uses.
+"""
+
+from sculptor.agents.testing.fake_claude_jsonl import make_assistant_message
+from sculptor.agents.testing.fake_claude_jsonl import make_end_message
+from sculptor.agents.testing.fake_claude_jsonl import make_init_message
+from sculptor.agents.testing.fake_claude_jsonl import make_streaming_text_events
+from sculptor.agents.testing.fake_claude_jsonl import make_streaming_tool_events
+from sculptor.agents.testing.fake_claude_jsonl import make_text_block
+from sculptor.agents.testing.fake_claude_jsonl import make_tool_result_message
+from sculptor.agents.testing.fake_claude_jsonl import make_tool_use_block
+from sculptor.interfaces.agents.agent import RequestStartedAgentMessage
+from sculptor.interfaces.agents.agent import RequestSuccessAgentMessage
+from sculptor.interfaces.agents.agent import ResponseBlockAgentMessage
+from sculptor.primitives.ids import AgentMessageID
+from sculptor.primitives.ids import AssistantMessageID
+from sculptor.primitives.ids import ToolUseID
+from sculptor.state.chat_state import GenericToolContent
+from sculptor.state.chat_state import TextBlock
+from sculptor.state.chat_state import ToolResultBlock
+from sculptor.state.chat_state import ToolUseBlock
+from sculptor.state.messages import ChatInputUserMessage
+from sculptor.state.messages import Message
+
+
+def make_tool_heavy_turn(tool_call_count: int) -> list[Message]:
+    """One user turn in which the agent makes `tool_call_count` tool calls, each answered by its result."""
+    user_message = ChatInputUserMessage(text="do a lot of things")
+    messages: list[Message] = [user_message, RequestStartedAgentMessage(request_id=user_message.message_id)]
+    for i in range(tool_call_count):
+        tool_use_id = ToolUseID(f"toolu_{i:05d}")
+        messages.append(
+            ResponseBlockAgentMessage(
+                role="assistant",
+                message_id=AgentMessageID(),
+                assistant_message_id=AssistantMessageID(f"msg_{i:05d}"),
+                content=(
+                    TextBlock(text=f"Step {i}: listing files"),
+                    ToolUseBlock(id=tool_use_id, name="Bash", input={"command": f"ls /tmp/{i}"}),
+                ),
+            )
+        )
+        messages.append(
+            ResponseBlockAgentMessage(
+                role="user",
+                message_id=AgentMessageID(),
+                assistant_message_id=AssistantMessageID(f"msg_{i:05d}"),
+                content=(
+                    ToolResultBlock(
+                        tool_use_id=tool_use_id,
+                        tool_name="Bash",
+                        invocation_string=f"ls /tmp/{i}",
+                        content=GenericToolContent(text="a\nb\nc"),
+                    ),
+                ),
+            )
+        )
+    messages.append(RequestSuccessAgentMessage(request_id=user_message.message_id))
+    return messages
+
+
+def make_tool_heavy_claude_cli_transcript(tool_call_count: int, session_id: str = "perf-session") -> list[dict]:
+    """The CLI's stdout for a streamed turn with `tool_call_count` tool calls and a closing text reply."""
+    lines: list[dict] = [make_init_message(session_id)]
+    for i in range(tool_call_count):
+        message_id = f"msg_{i:05d}"
+        text = f"Step {i}: listing files"
+        tool_use = make_tool_use_block(f"toolu_{i:05d}", "Bash", {"command": f"ls /tmp/{i}"})
+        lines.extend(make_streaming_tool_events(message_id, [tool_use], text_prefix=text))
+        lines.append(make_assistant_message(message_id, [make_text_block(text), tool_use]))
+        lines.append(make_tool_result_message(f"toolu_{i:05d}", "a\nb\nc"))
+    final_message_id = f"msg_{tool_call_count:05d}"
+    lines.extend(make_streaming_text_events(final_message_id, "Done."))
+    lines.append(make_assistant_message(final_message_id, [make_text_block("Done.")]))
+    lines.append(make_end_message(session_id))
+    return lines
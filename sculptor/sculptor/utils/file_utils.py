@@ -41,6 +41,18 @@ def copy_dir(
     dest: Path | str,
     dirs_exist_ok: bool = False,
     ignore: IgnoreFunction | None = None,
+    symlinks: bool = False,
+    copy_function: Callable[[str, str], object] = shutil.copy2,
 ) -> None:
-    """Copy a directory from src to dest, skipping Unix domain sockets. Meant to replace shutil.copytree."""
-    shutil.copytree(src, dest, dirs_exist_ok=dirs_exist_ok, ignore=partial(_combined_ignore, ignore))
+    """Copy a directory from src to dest, skipping Unix domain sockets. Meant to replace shutil.copytree.
+
+    `symlinks` and `copy_function` are passed on to shutil.copytree.
+    """
+    shutil.copytree(
+        src,
+        dest,
+        symlinks=symlinks,
+        ignore=partial(_combined_ignore, ignore),
+        copy_function=copy_function,
+        dirs_exist_ok=dirs_exist_ok,
+    )
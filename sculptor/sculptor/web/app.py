@@ -37,6 +37,7 @@ import typeid.errors
 from fastapi import Depends
 from fastapi import File as FastAPIFile
 from fastapi import HTTPException
+from fastapi import Query
 from fastapi import Request
 from fastapi import Response
 from fastapi import UploadFile
@@ -197,6 +198,7 @@ from sculptor.web.auth import SESSION_TOKEN_HEADER_NAME
 from sculptor.web.auth import SessionTokenMiddleware
 from sculptor.web.auth import UserSession
 from sculptor.web.data_types import AgentDiagnosticsResponse
+from sculptor.web.data_types import AgentMessagePageResponse
 from sculptor.web.data_types import AgentTypeName
 from sculptor.web.data_types import AnswerQuestionRequest
 from sculptor.web.data_types import ArtifactDataResponse
@@ -270,6 +272,8 @@ from sculptor.web.data_types import WebviewNavigateRequest
 from sculptor.web.data_types import WorkspaceDiffResponse
 from sculptor.web.data_types import WorkspaceFileEntry
 from sculptor.web.data_types import WorkspaceFileListResponse
+from sculptor.web.data_types import WorkspaceFileSearchMatch
+from sculptor.web.data_types import WorkspaceFileSearchResponse
 from sculptor.web.data_types import WorkspaceGitOperationResponse
 from sculptor.web.data_types import WorkspaceResponse
 from sculptor.web.data_types import WorkspaceSetupCommandRequest
@@ -292,15 +296,21 @@ from sculptor.web.middleware import get_user_session
 from sculptor.web.middleware import get_user_session_for_websocket
 from sculptor.web.middleware import lifespan
 from sculptor.web.middleware import register_on_startup
+from sculptor.web.middleware import resolve_request_scope
 from sculptor.web.middleware import resolve_stream_scope
+from sculptor.web.middleware import resolve_stream_view
 from sculptor.web.middleware import run_sync_function_with_debugging_support_if_enabled
 from sculptor.web.middleware import shutdown_event as shutdown_event_impl
 from sculptor.web.open_with import open_path_in_external_app
 from sculptor.web.remote_repos import remote_repos_router
 from sculptor.web.skills import discover_skills
+from sculptor.web.streams import KEEPALIVE_FRAME
 from sculptor.web.streams import Scope
 from sculptor.web.streams import ServerStopped
+from sculptor.web.streams import StreamView
 from sculptor.web.streams import StreamingUpdate
+from sculptor.web.streams import encode_streaming_update
+from sculptor.web.streams import read_task_summaries
 from sculptor.web.streams import stream_everything
 from sculptor.web.terminal_input import TerminalDeliveryResult
 from sculptor.web.terminal_input import deliver_prompt_to_terminal_agent
@@ -1647,6 +1657,47 @@ def get_workspace_files(
     return WorkspaceFileListResponse(files=entries)
 
 
+_MAX_WORKSPACE_FILE_SEARCH_RESULTS = 200
+
+
+@router.get("/api/v1/workspaces/{workspace_id}/files/search")
+def search_workspace_files(
+    workspace_id: str,
+    request: Request,
+    query: str = "",
+    limit: int = Query(default=50, ge=1, le=_MAX_WORKSPACE_FILE_SEARCH_RESULTS),
+    user_session: UserSession = Depends(get_user_session),
+) -> WorkspaceFileSearchResponse:
+    """Fuzzy-search a workspace's files, best matches first (for @-mentions and the command palette)."""
+    validated_workspace_id = validate_workspace_id(workspace_id)
+    services = get_services_from_request_or_websocket(request)
+
+    with user_session.open_transaction(services) as transaction:
+        workspace = transaction.get_workspace(validated_workspace_id)
+        if workspace is None or workspace.is_deleted:
+            raise HTTPException(status_code=404, detail=f"Workspace {workspace_id} not found")
+
+        try:
+            matches = services.workspace_service.search_workspace_files(
+                validated_workspace_id, query, limit, transaction
+            )
+        except WorkspaceNotFoundError as e:
+            raise HTTPException(status_code=404, detail=f"Workspace {workspace_id} not found") from e
+        except WorkspaceFilesUnavailableError as e:
+            raise HTTPException(
+                status_code=503,
+                detail=f"Workspace file list temporarily unavailable: {e}",
+                headers={"Retry-After": _WORKSPACE_FILES_RETRY_AFTER_SECONDS},
+            ) from e
+
+    return WorkspaceFileSearchResponse(
+        matches=[
+            WorkspaceFileSearchMatch(path=match.path, score=match.score, matched_indices=list(match.matched_indices))
+            for match in matches
+        ]
+    )
+
+
 @router.post("/api/v1/workspaces/{workspace_id}/open-in-os")
 def workspace_open_in_os(
     workspace_id: str,
@@ -2505,6 +2556,21 @@ def list_workspace_agents(
     return tuple(task_views)
 
 
+@router.get("/api/v1/agents/summaries")
+def list_agent_summaries(
+    request: Request,
+    user_session: UserSession = Depends(get_user_session),
+    scope: Scope = Depends(resolve_request_scope),
+) -> tuple[TaskViewTypes, ...]:
+    """List the agents in ``?scope=`` (default: all) as the summary stream's task views.
+
+    Unlike listing a workspace's agents, each view has the agent's messages folded
+    in, so status, activity and progress are current. Chat history is not read.
+    """
+    services = get_services_from_request_or_websocket(request)
+    return read_task_summaries(user_session, services, scope)
+
+
 @router.delete("/api/v1/workspaces/{workspace_id}/agents/{agent_id}")
 def delete_workspace_agent(
     workspace_id: str,
@@ -2673,6 +2739,36 @@ def get_workspace_agent_diagnostics(
     )
 
 
+_MAX_AGENT_MESSAGE_PAGE_SIZE = 1000
+
+
+@router.get("/api/v1/workspaces/{workspace_id}/agents/{agent_id}/messages")
+def get_workspace_agent_messages(
+    workspace_id: str,
+    agent_id: str,
+    request: Request,
+    after_seq: int | None = None,
+    limit: int = 500,
+    user_session: UserSession = Depends(get_user_session),
+) -> AgentMessagePageResponse:
+    """Get one page of an agent's persisted messages, starting after `after_seq`."""
+    if not 0 < limit <= _MAX_AGENT_MESSAGE_PAGE_SIZE:
+        raise HTTPException(status_code=422, detail=f"limit must be between 1 and {_MAX_AGENT_MESSAGE_PAGE_SIZE}")
+    services = get_services_from_request_or_websocket(request)
+
+    with user_session.open_transaction(services) as transaction:
+        workspace = _get_workspace_or_404(workspace_id, transaction)
+        task = _validate_agent_in_workspace(agent_id, workspace, transaction, services)
+        saved_messages = services.task_service.get_saved_message_page(
+            task.object_id, transaction, after_seq=after_seq, limit=limit
+        )
+
+    return AgentMessagePageResponse(
+        messages=tuple(saved_message.message for saved_message in saved_messages),
+        last_seq=saved_messages[-1].seq if saved_messages else None,
+    )
+
+
 def _raise_for_terminal_delivery_result(result: TerminalDeliveryResult) -> None:
     """Raise the HTTP 409 that a non-DELIVERED PTY write maps to, or return for
     DELIVERED. The frontend's enable/disable logic and the integration tests
@@ -3771,10 +3867,12 @@ async def stream_everything_websocket(
     user_session: UserSession = Depends(get_user_session_for_websocket),
     shutdown_event: Event = Depends(shutdown_event_impl),
     scope: Scope = Depends(resolve_stream_scope),
+    view: StreamView = Depends(resolve_stream_view),
 ) -> None:
     """Unified stream for all updates: tasks, task details, user data, notifications.
 
     Streams for ALL projects and ALL tasks for the authenticated user.
+    ``?view=summary`` streams only the task views, for the CLI and dashboards.
     """
     services = get_services_from_request_or_websocket(websocket)
     root_concurrency_group = get_root_concurrency_group(websocket)
@@ -3790,6 +3888,7 @@ async def stream_everything_websocket(
                 dependency_management_service=services.dependency_management_service,
                 pr_polling_service=services.pr_polling_service,
                 btw_service=services.btw_service,
+                view=view,
             ),
             websocket,
             stream_concurrency_group.shutdown_event,
@@ -4223,7 +4322,7 @@ async def to_websocket_stream(
                     logger.debug("Stream ended normally.")
                     await websocket.close(code=1000, reason="Stream ended normally")
                     return
-            await websocket.send_json(to_yield)
+            await websocket.send_text(to_yield)
             await asyncio.sleep(0.00001)
     except ServerStopped:
         with logger.contextualize(**user_session.logger_kwargs):
@@ -4258,9 +4357,7 @@ async def to_websocket_stream(
         generator.close()
 
 
-def _get_next_elem_for_websocket(
-    itr: Iterator[UpdateT | None], user_session: UserSession
-) -> str | dict[str, Any] | None:
+def _get_next_elem_for_websocket(itr: Iterator[UpdateT | None], user_session: UserSession) -> str | None:
     with logger.contextualize(**user_session.logger_kwargs):
         try:
             entry = next(itr)
@@ -4268,10 +4365,8 @@ def _get_next_elem_for_websocket(
         except StopIteration:
             return None
         if entry is None:
-            to_yield = "null"
-        else:
-            to_yield = entry.model_dump(mode="json", by_alias=True)
-        return to_yield
+            return KEEPALIVE_FRAME
+        return encode_streaming_update(entry)
 
 
 def _get_artifact_data(
@@ -418,6 +418,34 @@ def test_resolve_agent_by_prefix_ambiguous(
     assert response.status_code == 409
 
 
+def test_list_agent_summaries_folds_messages_into_scoped_views(
+    client: TestClient, test_services: CompleteServiceCollection, test_project: Project
+) -> None:
+    user_session = authenticate_anonymous(test_services, RequestID())
+    with user_session.open_transaction(test_services) as transaction:
+        workspace_a = _create_workspace(transaction, test_services, test_project, description="ws-a")
+        workspace_b = _create_workspace(transaction, test_services, test_project, description="ws-b")
+        task_a = _create_task_with_message_in_workspace(
+            transaction, user_session, test_project, test_services, workspace_a
+        )
+        task_b = _create_task_with_message_in_workspace(
+            transaction, user_session, test_project, test_services, workspace_b
+        )
+
+    response = client.get("/api/v1/agents/summaries")
+    assert response.status_code == 200
+    summaries_by_id = {item["id"]: item for item in response.json()}
+    assert {str(task_a.object_id), str(task_b.object_id)} <= summaries_by_id.keys()
+    assert summaries_by_id[str(task_a.object_id)]["goal"] == "foo"
+
+    response = client.get("/api/v1/agents/summaries", params={"scope": f"workspace:{workspace_a.object_id}"})
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()] == [str(task_a.object_id)]
+
+    response = client.get("/api/v1/agents/summaries", params={"scope": "agent:tsk_01h0000000000000000000000a"})
+    assert response.status_code == 404
+
+
 def test_delete_agent_removes_task(
     client: TestClient, test_services: CompleteServiceCollection, test_project: Project
 ) -> None:
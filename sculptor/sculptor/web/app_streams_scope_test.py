@@ -186,6 +186,42 @@ def test_all_scope_matches_existing_unscoped_behavior(
         assert "userUpdate" in update
 
 
+def test_summary_view_initial_frame_has_only_task_views(
+    server_url: str, test_services: CompleteServiceCollection, test_project: Project
+) -> None:
+    user_session = authenticate_anonymous(test_services, RequestID())
+    with user_session.open_transaction(test_services) as transaction:
+        workspace = _create_workspace(transaction, test_services, test_project)
+        task = _create_task_with_message_in_workspace(
+            transaction, user_session, test_project, test_services, workspace
+        )
+
+    stream_url = server_url + "/api/v1/stream/ws?scope=all&view=summary"
+    with stream_response(stream_url) as queue:
+        update = _next_streaming_update(queue)
+        assert update["taskViewsByTaskId"][str(task.object_id)]["goal"] == "foo"
+        assert not update.get("taskUpdateByTaskId")
+        assert not update.get("userUpdate", {}).get("projects")
+        assert update.get("dependenciesStatus") is None
+        assert not update.get("workspaceSetupStatusByWorkspaceId")
+
+
+@pytest.mark.parametrize("view_value", ["junk", "SUMMARY"])
+def test_unknown_view_returns_400(server_url: str, view_value: str) -> None:
+    response = requests.get(
+        server_url + "/api/v1/stream/ws",
+        params={"scope": "all", "view": view_value},
+        headers={
+            "Upgrade": "websocket",
+            "Connection": "upgrade",
+            "Sec-WebSocket-Key": "dGhlIHNhbXBsZSBub25jZQ==",
+            "Sec-WebSocket-Version": "13",
+        },
+        allow_redirects=False,
+    )
+    assert response.status_code == 400
+
+
 # Note: 403 (forbidden) requires two distinct user sessions. The anonymous-only
 # test fixtures only support one user, so the 403 path is exercised via the
 # unit test in streams_scope_test.py (which calls resolve_stream_scope directly
@@ -17,6 +17,7 @@ from sculptor.database.workspace_enums import WorkspaceInitializationStrategy
 from sculptor.foundation.pydantic_serialization import SerializableModel
 from sculptor.foundation.pydantic_serialization import build_discriminator
 from sculptor.foundation.upper_case_str_enum import UpperCaseStrEnum
+from sculptor.interfaces.agents.agent import PersistentMessageTypes
 from sculptor.interfaces.agents.artifacts import DiffArtifact
 from sculptor.interfaces.agents.artifacts import TaskListArtifact
 from sculptor.primitives.ids import ProjectID
@@ -519,6 +520,21 @@ class WorkspaceFileListResponse(SerializableModel):
     files: list[WorkspaceFileEntry]
 
 
+class WorkspaceFileSearchMatch(SerializableModel):
+    """A workspace file matching a fuzzy search query."""
+
+    path: str
+    score: int
+    # Indices of the characters of `path` that matched the query, for highlighting.
+    matched_indices: list[int]
+
+
+class WorkspaceFileSearchResponse(SerializableModel):
+    """Best-first fuzzy search results over a workspace's files."""
+
+    matches: list[WorkspaceFileSearchMatch]
+
+
 class OpenInOsRequest(RequestModel):
     """Request to open a file or its containing folder in the OS default application."""
 
@@ -706,6 +722,15 @@ class AgentDiagnosticsResponse(SerializableModel):
     sculptor_transcript_file_path: str | None = None
 
 
+class AgentMessagePageResponse(SerializableModel):
+    """One page of an agent's persisted message log, in log order."""
+
+    messages: tuple[PersistentMessageTypes, ...]
+    # `seq` of the last message in `messages`; pass it back as `after_seq` to read the
+    # next page or to resume from this point. None when the page is empty.
+    last_seq: int | None = None
+
+
 class VersionRangeInfo(SerializableModel):
     """Version range configuration for Claude CLI compatibility."""
 
@@ -873,6 +898,8 @@ class WorkspaceSetupStatus(SerializableModel):
     started_at: float | None = None
     finished_at: float | None = None
     log_truncated: bool = False
+    # "hit" when the run restored cached outputs instead of executing the command; None if it was not cacheable.
+    cache_result: Literal["hit", "miss"] | None = None
 
 
 class WorkspaceSetupOutputChunk(SerializableModel):
@@ -72,7 +72,6 @@ from sculptor.state.messages import Message
 from sculptor.state.messages import ModelCatalog
 from sculptor.state.messages import ResponseBlockAgentMessage
 from sculptor.state.workflow_state import WorkflowTaskState
-from sculptor.utils.functional import first
 from sculptor.web.data_types import PrApproval  # noqa: F401 — re-exported for existing import sites
 from sculptor.web.data_types import PrComment  # noqa: F401 — re-exported for existing import sites
 from sculptor.web.data_types import PrStatusInfo  # noqa: F401 — re-exported for existing import sites
@@ -102,8 +101,9 @@ class WorkspacePeekAgentStatus(StrEnum):
 def scan_terminal_signal_state(messages: Sequence[Message]) -> tuple[bool, TerminalStatusSignal | None]:
     """(run_started, latest_signal_this_run) from a task's live messages.
 
-    The single home for the run-scoping subtleties shared by the status
-    derivation below and the terminal-input endpoint:
+    The single home for the run-scoping subtleties used by the terminal-input
+    endpoint and the CI babysitter (`CodingAgentTaskView.status` folds the same
+    rules forward, one message at a time, in `_CodingAgentMessageState`):
     EnvironmentAcquiredRunnerMessage is the run-start anchor — both it and
     the signal messages are ephemeral, so the result reflects the live
     program, resets on every (re)start, and a relaunched program's hooks
@@ -286,6 +286,167 @@ def _get_last_task_list_artifact(messages: list[Message]) -> TaskListArtifact |
     return None
 
 
+class _TaskViewMessageState:
+    """What `TaskView`'s computed fields need from the message log, folded one message at a time.
+
+    Views are re-serialized on every streaming frame, so deriving these fields by
+    rescanning `_messages` made each frame O(messages) per task. `observe` updates
+    them in O(1) as each message is added instead; every field matches what a
+    reverse (or forward) scan of the whole log would find.
+    """
+
+    def __init__(self) -> None:
+        self.is_auto_compacting = False
+        # A dict rather than a set so the names keep their first-seen order.
+        self.artifact_names: dict[str, None] = {}
+        self.latest_content_message_time: datetime.datetime | None = None
+        self.first_persistent_message_time: datetime.datetime | None = None
+
+    def observe(self, message: Message) -> None:
+        if isinstance(message, AutoCompactingDoneAgentMessage):
+            self.is_auto_compacting = False
+        elif isinstance(message, AutoCompactingAgentMessage):
+            self.is_auto_compacting = True
+        if isinstance(message, UpdatedArtifactAgentMessage):
+            self.artifact_names[message.artifact.name] = None
+        if _is_content_message(message):
+            self.latest_content_message_time = message.approximate_creation_time
+        if self.first_persistent_message_time is None and not message.is_ephemeral:
+            self.first_persistent_message_time = message.approximate_creation_time
+
+
+def _is_question_evidence(message: Message, harness: Harness) -> bool:
+    """Whether `message` shows the agent asking the user something (a question or a plan to approve)."""
+    if isinstance(message, AskUserQuestionAgentMessage):
+        return True
+    if not isinstance(message, ResponseBlockAgentMessage):
+        return False
+    for block in message.content:
+        if not isinstance(block, ToolUseBlock):
+            continue
+        if harness.is_ask_user_question_tool(block.name) and harness.is_valid_ask_user_question_input(
+            block.name, block.input
+        ):
+            return True
+        if harness.is_exit_plan_mode_tool(block.name):
+            return True
+    return False
+
+
+def _latest_activity_block(message: ResponseBlockAgentMessage) -> ToolUseBlock | TextBlock | None:
+    """The last block of `message` that describes what the agent is doing, if any."""
+    for block in reversed(message.content):
+        if isinstance(block, ToolUseBlock):
+            return block
+        if isinstance(block, TextBlock) and block.text.strip():
+            return block
+    return None
+
+
+class _CodingAgentMessageState:
+    """The message-derived state behind `CodingAgentTaskView`'s computed fields, kept up to date per message.
+
+    The pending-question rule in `CodingAgentTaskView._ready_or_waiting` is a walk
+    back from the newest message that stops at the first "barrier" (an answer, a
+    context clear, a settled request, or a user prompt that has started
+    processing). Here that becomes positions: the question is pending iff the
+    newest question evidence sits after the newest barrier. A prompt only becomes
+    a barrier once its RequestStarted arrives, so prompt positions are kept by id.
+    """
+
+    def __init__(self) -> None:
+        self.message_count = 0
+        self.goal: str | None = None
+        self.latest_selected_model: LLMModel | None = None
+        self.has_environment = False
+        self.has_user_message = False
+        self.is_terminal_run_started = False
+        self.latest_terminal_signal: TerminalStatusSignal | None = None
+        self.finished_request_ids: set[AgentMessageID] = set()
+        self.unfinished_input_ids: set[AgentMessageID] = set()
+        self.is_last_request_failed = False
+        self.latest_request_failure: RequestFailureAgentMessage | None = None
+        self.question_barrier_position = -1
+        self.question_evidence_position = -1
+        self.chat_input_position_by_id: dict[AgentMessageID, int] = {}
+        self.waiting_detail: str | None = None
+        self.latest_activity_block: ToolUseBlock | TextBlock | None = None
+        self.plan_artifact_messages: list[Message] = []
+
+    @property
+    def is_question_pending(self) -> bool:
+        return self.question_evidence_position > self.question_barrier_position
+
+    def observe(self, message: Message, harness: Harness) -> None:
+        position = self.message_count
+        self.message_count += 1
+
+        if isinstance(message, ChatInputUserMessage):
+            self.has_user_message = True
+            if self.goal is None:
+                self.goal = message.text
+            if message.model_name is not None:
+                self.latest_selected_model = message.model_name
+            self.chat_input_position_by_id[message.message_id] = position
+
+        if isinstance(message, (ChatInputUserMessage, UserQuestionAnswerMessage)):
+            if message.message_id not in self.finished_request_ids:
+                self.unfinished_input_ids.add(message.message_id)
+
+        if isinstance(message, EnvironmentAcquiredRunnerMessage):
+            self.has_environment = True
+            self.is_terminal_run_started = True
+            self.latest_terminal_signal = None
+        elif isinstance(message, EnvironmentReleasedRunnerMessage):
+            self.is_terminal_run_started = False
+            self.latest_terminal_signal = None
+        elif isinstance(message, TerminalAgentSignalRunnerMessage) and self.is_terminal_run_started:
+            self.latest_terminal_signal = message.signal
+
+        if isinstance(message, (UserQuestionAnswerMessage, ContextClearedMessage)):
+            self.question_barrier_position = position
+        elif isinstance(message, RequestStartedAgentMessage):
+            prompt_position = self.chat_input_position_by_id.get(message.request_id)
+            if prompt_position is not None:
+                self.question_barrier_position = max(self.question_barrier_position, prompt_position)
+        elif isinstance(message, PersistentRequestCompleteAgentMessage):
+            self.finished_request_ids.add(message.request_id)
+            self.unfinished_input_ids.discard(message.request_id)
+            self.is_last_request_failed = isinstance(message, RequestFailureAgentMessage)
+            if isinstance(message, RequestFailureAgentMessage):
+                self.latest_request_failure = message
+            # A stop the user did not ask for (shutdown/restart) leaves the question answerable.
+            if not isinstance(message, RequestStoppedAgentMessage) or message.stopped_by_user:
+                self.question_barrier_position = position
+        elif _is_question_evidence(message, harness):
+            self.question_evidence_position = position
+
+        if isinstance(message, UserQuestionAnswerMessage):
+            self.waiting_detail = None
+        elif isinstance(message, AskUserQuestionAgentMessage):
+            self.waiting_detail = _describe_question(message)
+        elif isinstance(message, ResponseBlockAgentMessage):
+            if any(isinstance(b, ToolUseBlock) and harness.is_exit_plan_mode_tool(b.name) for b in message.content):
+                self.waiting_detail = "Waiting for plan approval"
+            activity_block = _latest_activity_block(message)
+            if activity_block is not None:
+                self.latest_activity_block = activity_block
+
+        if isinstance(message, UpdatedArtifactAgentMessage) and message.artifact.name == ArtifactType.PLAN:
+            self.plan_artifact_messages.append(message)
+
+
+def _describe_question(message: AskUserQuestionAgentMessage) -> str | None:
+    # The plan-approval AUQ uses a known header — render the short
+    # canonical text instead of the verbose internal question.
+    questions = message.question_data.questions
+    if questions and questions[0].header == "Plan approval":
+        return "Waiting for plan approval"
+    if questions:
+        return questions[0].question
+    return None
+
+
 class TaskView(LimitedBaseTaskView[TaskInputType, TaskStateType], Generic[TaskInputType, TaskStateType], ABC):
     """
     This class represents a view of the state of any task that is being executed.
@@ -303,6 +464,7 @@ class TaskView(LimitedBaseTaskView[TaskInputType, TaskStateType], Generic[TaskIn
     # messages that were sent to or from the task.
     # this attribute is private because it enables easy serialization to the front end.
     _messages: list[Message] = PrivateAttr(default_factory=list)
+    _message_state: _TaskViewMessageState = PrivateAttr(default_factory=_TaskViewMessageState)
 
     @property
     def settings(self) -> SculptorSettings:
@@ -312,24 +474,16 @@ class TaskView(LimitedBaseTaskView[TaskInputType, TaskStateType], Generic[TaskIn
     @property
     def is_auto_compacting(self) -> bool:
         """True when the agent is auto-compacting context (detected via plugin hook)."""
-        for message in reversed(self._messages):
-            if isinstance(message, AutoCompactingDoneAgentMessage):
-                return False
-            if isinstance(message, AutoCompactingAgentMessage):
-                return True
-        return False
+        return self._message_state.is_auto_compacting
 
     @computed_field
     @property
     def artifact_names(self) -> list[str]:
-        artifact_messages = [x for x in self._messages if isinstance(x, UpdatedArtifactAgentMessage)]
-        return list({x.artifact.name for x in artifact_messages})
+        return list(self._message_state.artifact_names)
 
     @computed_field
     @property
     def updated_at(self) -> datetime.datetime:
-        if len(self._messages) == 0:
-            return self.created_at
         # Only consider messages that represent user-visible content changes.
         # This excludes:
         # - Ephemeral messages (runner state transitions, environment lifecycle, artifact
@@ -342,9 +496,8 @@ class TaskView(LimitedBaseTaskView[TaskInputType, TaskStateType], Generic[TaskIn
         # Without this, updated_at can advance past last_read_at from bookkeeping
         # messages saved to the DB after the frontend's mark_read call, causing
         # previously-read tasks to appear unread after a server restart.
-        for msg in reversed(self._messages):
-            if _is_content_message(msg):
-                return msg.approximate_creation_time
+        if self._message_state.latest_content_message_time is not None:
+            return self._message_state.latest_content_message_time
         # No content messages: fall back to the earliest NON-ephemeral message
         # (e.g. a freshly created chat task whose only message is the user's
         # first input). Ephemeral messages (environment lifecycle, runner
@@ -353,14 +506,14 @@ class TaskView(LimitedBaseTaskView[TaskInputType, TaskStateType], Generic[TaskIn
         # idle, already-read terminal agent — whose only message is the
         # ephemeral EnvironmentAcquiredRunnerMessage — look unread. With no
         # non-ephemeral message, fall back to created_at.
-        for msg in self._messages:
-            if not msg.is_ephemeral:
-                return msg.approximate_creation_time
+        if self._message_state.first_persistent_message_time is not None:
+            return self._message_state.first_persistent_message_time
         return self.created_at
 
     def add_message(self, message: Message) -> None:
         """During each update, we add the new messages"""
         self._messages.append(message)
+        self._message_state.observe(message)
 
 
 class CodingAgentTaskView(TaskView[AgentTaskInputsV2, AgentTaskStateV2]):
@@ -380,15 +533,17 @@ class CodingAgentTaskView(TaskView[AgentTaskInputsV2, AgentTaskStateV2]):
     object_type: str = "CodingAgentTaskView"
 
     _cache: dict[str, Any] = PrivateAttr(default_factory=dict)
+    _agent_message_state: _CodingAgentMessageState = PrivateAttr(default_factory=_CodingAgentMessageState)
 
     def add_message(self, message: Message) -> None:
         super().add_message(message)
+        self._agent_message_state.observe(message, self._resolve_harness())
         self._cache.clear()
 
     @property
     def _task_data(self) -> TaskListArtifact | None:
         if "task" not in self._cache:
-            self._cache["task"] = _get_last_task_list_artifact(self._messages)
+            self._cache["task"] = _get_last_task_list_artifact(self._agent_message_state.plan_artifact_messages)
         return self._cache["task"]
 
     @computed_field
@@ -414,9 +569,8 @@ class CodingAgentTaskView(TaskView[AgentTaskInputsV2, AgentTaskStateV2]):
         if is_terminal_agent_config(self.task_input.agent_config):
             return None
         # Use the most recent chat message that carried an explicit model selection.
-        for message in reversed(self._messages):
-            if isinstance(message, ChatInputUserMessage) and message.model_name is not None:
-                return message.model_name
+        if self._agent_message_state.latest_selected_model is not None:
+            return self._agent_message_state.latest_selected_model
         # Fall back to the model selected at agent creation time, then to the
         # product default. Fable is currently disabled with an indefinite
         # timeline, so the default falls back to the 1M-context Opus
@@ -522,38 +676,31 @@ class CodingAgentTaskView(TaskView[AgentTaskInputsV2, AgentTaskStateV2]):
         if task_from_outcome is not None:
             return task_from_outcome
 
+        state = self._agent_message_state
+
         if is_terminal_agent_config(self.task_input.agent_config):
             # Terminal agents have no chat: status comes from the latest
             # signal posted since the most recent run start. No signals this
             # run → calm neutral READY; signals never drive the unread dot.
             # No run-start anchor at all → still acquiring the environment
             # (no "no user message → READY" special case applies).
-            run_started, latest_signal = scan_terminal_signal_state(self._messages)
-            if not run_started:
+            if not state.is_terminal_run_started:
                 return TaskStatus.BUILDING
-            if latest_signal == TerminalStatusSignal.BUSY:
+            if state.latest_terminal_signal == TerminalStatusSignal.BUSY:
                 return TaskStatus.RUNNING
-            if latest_signal == TerminalStatusSignal.WAITING:
+            if state.latest_terminal_signal == TerminalStatusSignal.WAITING:
                 return TaskStatus.WAITING
             return TaskStatus.READY
 
         # Check if environment has been acquired via message
-        has_environment = any(isinstance(m, EnvironmentAcquiredRunnerMessage) for m in self._messages)
-        if not has_environment:
+        if not state.has_environment:
             # If no user message has been sent yet, the agent is waiting for input (prompt-less creation).
             # Show READY so the user can type the first message.
-            has_user_message = any(isinstance(m, ChatInputUserMessage) for m in self._messages)
-            if not has_user_message:
+            if not state.has_user_message:
                 return TaskStatus.READY
             return TaskStatus.BUILDING
 
         # if we're blocked on user input, return READY or WAITING.
-        chat_input_messages = [
-            x for x in self._messages if isinstance(x, (ChatInputUserMessage, UserQuestionAnswerMessage))
-        ]
-        request_finished_messages = {
-            x.request_id for x in self._messages if isinstance(x, PersistentRequestCompleteAgentMessage)
-        }
         # If the agent has emitted an AskUserQuestion / ExitPlanMode whose
         # answer hasn't arrived yet, the task is WAITING regardless of
         # whether the in-flight request has formally completed. Under the
@@ -564,9 +711,10 @@ class CodingAgentTaskView(TaskView[AgentTaskInputsV2, AgentTaskStateV2]):
         if ready_or_waiting == TaskStatus.WAITING:
             return TaskStatus.WAITING
 
-        is_ready = all(input_message.message_id in request_finished_messages for input_message in chat_input_messages)
+        # Every chat input (prompt or question answer) has had its request complete.
+        is_ready = not state.unfinished_input_ids
         if is_ready:
-            if self._last_request_failed():
+            if state.is_last_request_failed:
                 return TaskStatus.REQUEST_ERROR
             return ready_or_waiting
         # otherwise we're running.
@@ -602,60 +750,19 @@ class CodingAgentTaskView(TaskView[AgentTaskInputsV2, AgentTaskStateV2]):
         supersedes it (mirroring message_conversion's pending-question
         clearing).
         """
-        harness = self._resolve_harness()
-        # Check both the ephemeral AskUserQuestionAgentMessage (present during live
-        # streaming) and the persistent ToolUseBlock evidence (survives page reloads).
-        started_request_ids: set[AgentMessageID] = set()
-        for msg in reversed(self._messages):
-            if isinstance(msg, UserQuestionAnswerMessage):
-                break
-            if isinstance(msg, ContextClearedMessage):
-                # A cleared context wipes the session that asked — any older
-                # question (including one preserved across a non-user stop)
-                # can no longer be answered against it.
-                break
-            if isinstance(msg, RequestStartedAgentMessage):
-                started_request_ids.add(msg.request_id)
-            if isinstance(msg, ChatInputUserMessage) and msg.message_id in started_request_ids:
-                # A newer user prompt actually began processing — it supersedes
-                # any older unanswered question. A queued-but-unstarted prompt
-                # (typed while the question was pending) does not: the walk must
-                # continue past it to the question evidence below.
-                break
-            if isinstance(msg, PersistentRequestCompleteAgentMessage):
-                if isinstance(msg, RequestStoppedAgentMessage) and not msg.stopped_by_user:
-                    # Shutdown/restart stop: the question survives — keep walking
-                    # back to find its AUQ evidence.
-                    continue
-                # Any AUQ older than the most recent settled request belongs
-                # to a turn the agent has already finished — no pending question.
-                break
-            if isinstance(msg, AskUserQuestionAgentMessage):
-                return TaskStatus.WAITING
-            if isinstance(msg, ResponseBlockAgentMessage):
-                for b in msg.content:
-                    if not isinstance(b, ToolUseBlock):
-                        continue
-                    if harness.is_ask_user_question_tool(b.name) and harness.is_valid_ask_user_question_input(
-                        b.name, b.input
-                    ):
-                        return TaskStatus.WAITING
-                    if harness.is_exit_plan_mode_tool(b.name):
-                        return TaskStatus.WAITING
+        # Both the ephemeral AskUserQuestionAgentMessage (present during live
+        # streaming) and the persistent ToolUseBlock evidence (survives page
+        # reloads) count; see `_CodingAgentMessageState` for how the walk back
+        # to the newest barrier is kept up to date as messages arrive.
+        if self._agent_message_state.is_question_pending:
+            return TaskStatus.WAITING
         return TaskStatus.READY
 
-    def _last_request_failed(self) -> bool:
-        """Return True if the most recent completed request ended with a failure."""
-        for msg in reversed(self._messages):
-            if isinstance(msg, PersistentRequestCompleteAgentMessage):
-                return isinstance(msg, RequestFailureAgentMessage)
-        return False
-
     @computed_field
     @property
     def goal(self) -> str:
-        # Get the first ChatInputUserMessage
-        goal = first(x.text for x in self._messages if isinstance(x, ChatInputUserMessage))
+        # The text of the first ChatInputUserMessage
+        goal = self._agent_message_state.goal
 
         # NOTE: this is due to a quirk in the task subscription system.
         # goal should *rarely* be None, but it will be None for a single frame when the task is first created.
@@ -708,14 +815,11 @@ class CodingAgentTaskView(TaskView[AgentTaskInputsV2, AgentTaskStateV2]):
         return self._find_latest_activity(past_tense=True)
 
     def _find_latest_activity(self, *, past_tense: bool) -> str | None:
-        for msg in reversed(self._messages):
-            if not isinstance(msg, ResponseBlockAgentMessage):
-                continue
-            for block in reversed(msg.content):
-                if isinstance(block, ToolUseBlock):
-                    return _describe_tool_use(block, past_tense=past_tense)
-                if isinstance(block, TextBlock) and block.text.strip():
-                    return "Responded" if past_tense else "Responding"
+        block = self._agent_message_state.latest_activity_block
+        if isinstance(block, ToolUseBlock):
+            return _describe_tool_use(block, past_tense=past_tense)
+        if isinstance(block, TextBlock):
+            return "Responded" if past_tense else "Responding"
         return None
 
     @computed_field
@@ -750,36 +854,20 @@ class CodingAgentTaskView(TaskView[AgentTaskInputsV2, AgentTaskStateV2]):
     def waiting_detail(self) -> str | None:
         if self.status != TaskStatus.WAITING:
             return None
-        harness = self._resolve_harness()
-        for msg in reversed(self._messages):
-            if isinstance(msg, UserQuestionAnswerMessage):
-                break
-            if isinstance(msg, AskUserQuestionAgentMessage):
-                # The plan-approval AUQ uses a known header — render the short
-                # canonical text instead of the verbose internal question.
-                questions = msg.question_data.questions
-                if questions and questions[0].header == "Plan approval":
-                    return "Waiting for plan approval"
-                if questions:
-                    return questions[0].question
-                return None
-            if isinstance(msg, ResponseBlockAgentMessage):
-                if any(isinstance(b, ToolUseBlock) and harness.is_exit_plan_mode_tool(b.name) for b in msg.content):
-                    return "Waiting for plan approval"
-        return None
+        return self._agent_message_state.waiting_detail
 
     @computed_field
     @property
     def error_detail(self) -> str | None:
         if self.status == TaskStatus.REQUEST_ERROR:
-            for msg in reversed(self._messages):
-                if isinstance(msg, RequestFailureAgentMessage):
-                    if msg.error.args:
-                        first_arg = msg.error.args[0]
-                        if isinstance(first_arg, str):
-                            return first_arg
-                    return msg.error.exception
-            return None
+            failure = self._agent_message_state.latest_request_failure
+            if failure is None:
+                return None
+            if failure.error.args:
+                first_arg = failure.error.args[0]
+                if isinstance(first_arg, str):
+                    return first_arg
+            return failure.error.exception
         if self.status != TaskStatus.ERROR:
             return None
         error = self.task.error
@@ -821,7 +909,9 @@ class TaskUpdate(SerializableModel):
 
     Field Update Patterns:
     - chat_messages: Only new completed messages are sent; frontend appends to existing list
-    - in_progress_chat_message: Sent in full each time it changes; frontend replaces previous value
+    - in_progress_chat_message: Sent in full each time it changes; frontend replaces previous value.
+      Partial text deltas from the agent are applied to it in the backend fold only; they are not
+      forwarded as deltas, so every frame carries the whole in-progress message.
     - queued_chat_messages: Full list sent each time; frontend replaces entire queue
     - updated_artifacts: Lists artifacts that changed; frontend fetches updated content
 
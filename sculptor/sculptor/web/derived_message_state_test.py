@@ -0,0 +1,399 @@
+"""CodingAgentTaskView's per-message state against full scans of its message log.
+
+The computed fields used to rescan `_messages` on every serialization; they now
+read state that `add_message` folds forward one message at a time. The scans
+below are the previous implementations, kept as the oracle: random message logs
+are fed to a view one message at a time and every derived field must match the
+scan of the log so far.
+"""
+
+import datetime
+import random
+
+import pytest
+from pydantic import AnyUrl
+
+from sculptor.config.settings import SculptorSettings
+from sculptor.database.models import AgentTaskInputsV2
+from sculptor.database.models import AgentTaskStateV2
+from sculptor.database.models import Task
+from sculptor.database.models import TaskID
+from sculptor.foundation.serialization import SerializedException
+from sculptor.interfaces.agents.agent import AskUserQuestionAgentMessage
+from sculptor.interfaces.agents.agent import AutoCompactingAgentMessage
+from sculptor.interfaces.agents.agent import AutoCompactingDoneAgentMessage
+from sculptor.interfaces.agents.agent import ClaudeCodeSDKAgentConfig
+from sculptor.interfaces.agents.agent import ContextClearedMessage
+from sculptor.interfaces.agents.agent import EnvironmentAcquiredRunnerMessage
+from sculptor.interfaces.agents.agent import EnvironmentReleasedRunnerMessage
+from sculptor.interfaces.agents.agent import FileAgentArtifact
+from sculptor.interfaces.agents.agent import PersistentRequestCompleteAgentMessage
+from sculptor.interfaces.agents.agent import RequestFailureAgentMessage
+from sculptor.interfaces.agents.agent import RequestStartedAgentMessage
+from sculptor.interfaces.agents.agent import RequestStoppedAgentMessage
+from sculptor.interfaces.agents.agent import RequestSuccessAgentMessage
+from sculptor.interfaces.agents.agent import TerminalAgentConfig
+from sculptor.interfaces.agents.agent import TerminalAgentSignalRunnerMessage
+from sculptor.interfaces.agents.agent import TerminalStatusSignal
+from sculptor.interfaces.agents.agent import UpdatedArtifactAgentMessage
+from sculptor.interfaces.agents.agent import UserQuestionAnswerMessage
+from sculptor.interfaces.agents.agent import is_terminal_agent_config
+from sculptor.interfaces.agents.artifacts import ArtifactType
+from sculptor.interfaces.agents.tasks import TaskState
+from sculptor.primitives.ids import AgentMessageID
+from sculptor.primitives.ids import AssistantMessageID
+from sculptor.primitives.ids import OrganizationReference
+from sculptor.primitives.ids import ProjectID
+from sculptor.primitives.ids import ToolUseID
+from sculptor.primitives.ids import UserReference
+from sculptor.primitives.ids import WorkspaceID
+from sculptor.state.chat_state import AskUserQuestionData
+from sculptor.state.chat_state import QuestionOption
+from sculptor.state.chat_state import TextBlock
+from sculptor.state.chat_state import ToolUseBlock
+from sculptor.state.chat_state import UserQuestion
+from sculptor.state.messages import ChatInputUserMessage
+from sculptor.state.messages import LLMModel
+from sculptor.state.messages import Message
+from sculptor.state.messages import ResponseBlockAgentMessage
+from sculptor.web.derived import CodingAgentTaskView
+from sculptor.web.derived import TaskStatus
+from sculptor.web.derived import _describe_tool_use
+from sculptor.web.derived import _is_content_message
+from sculptor.web.derived import create_initial_task_view
+from sculptor.web.derived import scan_terminal_signal_state
+
+# --- The full-scan oracle: the derivations as they were before they were folded per message. ---
+
+
+def _scan_is_auto_compacting(messages: list[Message]) -> bool:
+    for message in reversed(messages):
+        if isinstance(message, AutoCompactingDoneAgentMessage):
+            return False
+        if isinstance(message, AutoCompactingAgentMessage):
+            return True
+    return False
+
+
+def _scan_updated_at(view: CodingAgentTaskView, messages: list[Message]) -> datetime.datetime:
+    for msg in reversed(messages):
+        if _is_content_message(msg):
+            return msg.approximate_creation_time
+    for msg in messages:
+        if not msg.is_ephemeral:
+            return msg.approximate_creation_time
+    return view.created_at
+
+
+def _scan_ready_or_waiting(view: CodingAgentTaskView, messages: list[Message]) -> TaskStatus:
+    harness = view._resolve_harness()
+    started_request_ids: set[AgentMessageID] = set()
+    for msg in reversed(messages):
+        if isinstance(msg, UserQuestionAnswerMessage):
+            break
+        if isinstance(msg, ContextClearedMessage):
+            break
+        if isinstance(msg, RequestStartedAgentMessage):
+            started_request_ids.add(msg.request_id)
+        if isinstance(msg, ChatInputUserMessage) and msg.message_id in started_request_ids:
+            break
+        if isinstance(msg, PersistentRequestCompleteAgentMessage):
+            if isinstance(msg, RequestStoppedAgentMessage) and not msg.stopped_by_user:
+                continue
+            break
+        if isinstance(msg, AskUserQuestionAgentMessage):
+            return TaskStatus.WAITING
+        if isinstance(msg, ResponseBlockAgentMessage):
+            for b in msg.content:
+                if not isinstance(b, ToolUseBlock):
+                    continue
+                if harness.is_ask_user_question_tool(b.name) and harness.is_valid_ask_user_question_input(
+                    b.name, b.input
+                ):
+                    return TaskStatus.WAITING
+                if harness.is_exit_plan_mode_tool(b.name):
+                    return TaskStatus.WAITING
+    return TaskStatus.READY
+
+
+def _scan_status(view: CodingAgentTaskView, messages: list[Message]) -> TaskStatus:
+    task_from_outcome = view._maybe_get_status_from_outcome()
+    if task_from_outcome is not None:
+        return task_from_outcome
+    if is_terminal_agent_config(view.task_input.agent_config):
+        run_started, latest_signal = scan_terminal_signal_state(messages)
+        if not run_started:
+            return TaskStatus.BUILDING
+        if latest_signal == TerminalStatusSignal.BUSY:
+            return TaskStatus.RUNNING
+        if latest_signal == TerminalStatusSignal.WAITING:
+            return TaskStatus.WAITING
+        return TaskStatus.READY
+    if not any(isinstance(m, EnvironmentAcquiredRunnerMessage) for m in messages):
+        if not any(isinstance(m, ChatInputUserMessage) for m in messages):
+            return TaskStatus.READY
+        return TaskStatus.BUILDING
+    chat_input_messages = [x for x in messages if isinstance(x, (ChatInputUserMessage, UserQuestionAnswerMessage))]
+    request_finished_messages = {
+        x.request_id for x in messages if isinstance(x, PersistentRequestCompleteAgentMessage)
+    }
+    ready_or_waiting = _scan_ready_or_waiting(view, messages)
+    if ready_or_waiting == TaskStatus.WAITING:
+        return TaskStatus.WAITING
+    if all(input_message.message_id in request_finished_messages for input_message in chat_input_messages):
+        for msg in reversed(messages):
+            if isinstance(msg, PersistentRequestCompleteAgentMessage):
+                if isinstance(msg, RequestFailureAgentMessage):
+                    return TaskStatus.REQUEST_ERROR
+                break
+        return ready_or_waiting
+    return TaskStatus.RUNNING
+
+
+def _scan_activity(messages: list[Message], *, past_tense: bool) -> str | None:
+    for msg in reversed(messages):
+        if not isinstance(msg, ResponseBlockAgentMessage):
+            continue
+        for block in reversed(msg.content):
+            if isinstance(block, ToolUseBlock):
+                return _describe_tool_use(block, past_tense=past_tense)
+            if isinstance(block, TextBlock) and block.text.strip():
+                return "Responded" if past_tense else "Responding"
+    return None
+
+
+def _scan_waiting_detail(view: CodingAgentTaskView, messages: list[Message]) -> str | None:
+    if _scan_status(view, messages) != TaskStatus.WAITING:
+        return None
+    harness = view._resolve_harness()
+    for msg in reversed(messages):
+        if isinstance(msg, UserQuestionAnswerMessage):
+            break
+        if isinstance(msg, AskUserQuestionAgentMessage):
+            questions = msg.question_data.questions
+            if questions and questions[0].header == "Plan approval":
+                return "Waiting for plan approval"
+            if questions:
+                return questions[0].question
+            return None
+        if isinstance(msg, ResponseBlockAgentMessage):
+            if any(isinstance(b, ToolUseBlock) and harness.is_exit_plan_mode_tool(b.name) for b in msg.content):
+                return "Waiting for plan approval"
+    return None
+
+
+def _scan_request_error_detail(messages: list[Message]) -> str | None:
+    for msg in reversed(messages):
+        if isinstance(msg, RequestFailureAgentMessage):
+            if msg.error.args:
+                first_arg = msg.error.args[0]
+                if isinstance(first_arg, str):
+                    return first_arg
+            return msg.error.exception
+    return None
+
+
+def _scan_model(view: CodingAgentTaskView, messages: list[Message]) -> LLMModel | None:
+    if is_terminal_agent_config(view.task_input.agent_config):
+        return None
+    for message in reversed(messages):
+        if isinstance(message, ChatInputUserMessage) and message.model_name is not None:
+            return message.model_name
+    return view.task_input.default_model or LLMModel.CLAUDE_4_OPUS
+
+
+def _assert_matches_full_scan(view: CodingAgentTaskView, messages: list[Message]) -> None:
+    assert view.is_auto_compacting == _scan_is_auto_compacting(messages)
+    assert sorted(view.artifact_names) == sorted(
+        {m.artifact.name for m in messages if isinstance(m, UpdatedArtifactAgentMessage)}
+    )
+    assert view.updated_at == _scan_updated_at(view, messages)
+    status = _scan_status(view, messages)
+    assert view.status == status
+    assert view.current_activity == _scan_activity(messages, past_tense=False)
+    assert view.last_activity == _scan_activity(messages, past_tense=True)
+    assert view.waiting_detail == _scan_waiting_detail(view, messages)
+    if status == TaskStatus.REQUEST_ERROR:
+        assert view.error_detail == _scan_request_error_detail(messages)
+    assert view.goal == next((m.text for m in messages if isinstance(m, ChatInputUserMessage)), "")
+    assert view.model == _scan_model(view, messages)
+
+
+# --- Random message logs. ---
+
+
+def _make_task_view(agent_config: ClaudeCodeSDKAgentConfig | TerminalAgentConfig) -> CodingAgentTaskView:
+    task = Task(
+        object_id=TaskID(),
+        user_reference=UserReference("test-user"),
+        organization_reference=OrganizationReference("test-org"),
+        project_id=ProjectID(),
+        input_data=AgentTaskInputsV2(agent_config=agent_config, git_hash="abc123", system_prompt=None),
+        current_state=AgentTaskStateV2(workspace_id=WorkspaceID()),
+        outcome=TaskState.RUNNING,
+    )
+    view = create_initial_task_view(task, SculptorSettings())
+    assert isinstance(view, CodingAgentTaskView)
+    view.update_task(task)
+    return view
+
+
+def _question_data(header: str) -> AskUserQuestionData:
+    return AskUserQuestionData(
+        questions=[
+            UserQuestion(
+                question="Which color?",
+                header=header,
+                options=[QuestionOption(label="Red", description=""), QuestionOption(label="Blue", description="")],
+                multi_select=False,
+            )
+        ],
+        tool_use_id="toolu_question",
+    )
+
+
+def _response(*blocks: TextBlock | ToolUseBlock) -> ResponseBlockAgentMessage:
+    return ResponseBlockAgentMessage.model_construct(
+        role="assistant",
+        assistant_message_id=AssistantMessageID("am_test"),
+        message_id=AgentMessageID(),
+        content=blocks,
+    )
+
+
+_VALID_AUQ_INPUT = {
+    "questions": [
+        {
+            "question": "Pick one",
+            "header": "Color",
+            "options": [{"label": "Red", "description": ""}],
+            "multiSelect": False,
+        }
+    ]
+}
+_MALFORMED_AUQ_INPUT = {
+    "questions": [
+        {
+            "question": "Pick one",
+            "header": "Color",
+            "options": [{"label": "Red", "description": ""}],
+            "multiSelect": "false",
+        }
+    ]
+}
+
+
+def _error() -> SerializedException:
+    return SerializedException.model_construct(exception="ProcessExitedError", args=("exited",), traceback_dict={})
+
+
+def _random_message(rng: random.Random, request_ids: list[AgentMessageID]) -> Message:
+    """One message of a plausible kind; request lifecycle messages refer back to earlier prompts."""
+    request_id = rng.choice(request_ids) if request_ids and rng.random() < 0.9 else AgentMessageID()
+    match rng.randrange(20):
+        case 0 | 1:
+            message_id = AgentMessageID()
+            request_ids.append(message_id)
+            model_name = rng.choice([None, None, LLMModel.CLAUDE_4_SONNET, LLMModel.CLAUDE_4_HAIKU])
+            return ChatInputUserMessage(
+                message_id=message_id, text=f"prompt {len(request_ids)}", model_name=model_name
+            )
+        case 4:
+            return RequestSuccessAgentMessage.model_construct(request_id=request_id)
+        case 5:
+            return RequestFailureAgentMessage.model_construct(request_id=request_id, error=_error())
+        case 6:
+            return RequestStoppedAgentMessage.model_construct(
+                request_id=request_id, error=_error(), stopped_by_user=rng.random() < 0.5
+            )
+        case 7:
+            return EnvironmentAcquiredRunnerMessage.model_construct(message_id=AgentMessageID(), environment=None)
+        case 8:
+            return EnvironmentReleasedRunnerMessage()
+        case 9:
+            return AskUserQuestionAgentMessage(
+                question_data=_question_data(rng.choice(["Color", "Plan approval"])),
+            )
+        case 10:
+            message_id = AgentMessageID()
+            request_ids.append(message_id)
+            return UserQuestionAnswerMessage.model_construct(
+                message_id=message_id,
+                answers={"Which color?": "Red"},
+                question_data=_question_data("Color"),
+                tool_use_id="toolu_question",
+            )
+        case 11:
+            return ContextClearedMessage()
+        case 12:
+            return rng.choice([AutoCompactingAgentMessage(), AutoCompactingDoneAgentMessage()])
+        case 13:
+            return UpdatedArtifactAgentMessage(
+                artifact=FileAgentArtifact(
+                    name=rng.choice([ArtifactType.PLAN, ArtifactType.DIFF]),
+                    url=AnyUrl("file:///nonexistent/artifact.json"),
+                ),
+            )
+        case 14:
+            return TerminalAgentSignalRunnerMessage(signal=rng.choice(list(TerminalStatusSignal)))
+        case 15:
+            return _response(TextBlock(text=rng.choice(["Working on it", "   "])))
+        case 16:
+            tool_name, tool_input = rng.choice(
+                [
+                    ("Read", {"file_path": "/repo/a.py"}),
+                    ("Bash", {"command": "ls"}),
+                    ("mcp__sculptor__exit_plan_mode", {}),
+                    ("mcp__sculptor__ask_user_question", _VALID_AUQ_INPUT),
+                    ("mcp__sculptor__ask_user_question", _MALFORMED_AUQ_INPUT),
+                ]
+            )
+            tool_use = ToolUseBlock(id=ToolUseID("toolu_x"), name=tool_name, input=tool_input)
+            blocks: list[TextBlock | ToolUseBlock] = [tool_use]
+            if rng.random() < 0.5:
+                blocks.insert(0, TextBlock(text="Let me check"))
+            if rng.random() < 0.3:
+                blocks.append(TextBlock(text=rng.choice(["Done", ""])))
+            return _response(*blocks)
+        case _:
+            return RequestStartedAgentMessage(request_id=request_id)
+
+
+@pytest.mark.parametrize("agent_config", [ClaudeCodeSDKAgentConfig(), TerminalAgentConfig()])
+@pytest.mark.parametrize("seed", range(40))
+def test_derived_fields_match_full_scan_after_every_message(
+    agent_config: ClaudeCodeSDKAgentConfig | TerminalAgentConfig, seed: int
+) -> None:
+    rng = random.Random(seed)
+    view = _make_task_view(agent_config)
+    request_ids: list[AgentMessageID] = []
+    messages: list[Message] = []
+    _assert_matches_full_scan(view, messages)
+    for _ in range(rng.randrange(1, 60)):
+        message = _random_message(rng, request_ids)
+        messages.append(message)
+        view.add_message(message)
+        _assert_matches_full_scan(view, messages)
+
+
+def test_duplicate_prompt_after_its_request_started_does_not_supersede_a_question() -> None:
+    """A re-delivered prompt only becomes a barrier once a *later* RequestStarted names it."""
+    view = _make_task_view(ClaudeCodeSDKAgentConfig())
+    prompt = ChatInputUserMessage(text="Pick a color")
+    messages: list[Message] = [
+        prompt,
+        EnvironmentAcquiredRunnerMessage.model_construct(message_id=AgentMessageID(), environment=None),
+        RequestStartedAgentMessage(request_id=prompt.message_id),
+        AskUserQuestionAgentMessage(question_data=_question_data("Color")),
+        prompt,
+    ]
+    for message in messages:
+        view.add_message(message)
+    assert view.status == TaskStatus.WAITING
+    assert view.waiting_detail == "Which color?"
+
+    started_again = RequestStartedAgentMessage(request_id=prompt.message_id)
+    view.add_message(started_again)
+    messages.append(started_again)
+    assert view.status == TaskStatus.RUNNING
+    _assert_matches_full_scan(view, messages)
@@ -16,6 +16,7 @@ from sculptor.interfaces.agents.agent import EnvironmentCrashedRunnerMessage
 from sculptor.interfaces.agents.agent import ErrorMessage
 from sculptor.interfaces.agents.agent import ErrorMessageUnion
 from sculptor.interfaces.agents.agent import PartialResponseBlockAgentMessage
+from sculptor.interfaces.agents.agent import PartialResponseTextDeltaAgentMessage
 from sculptor.interfaces.agents.agent import PlanModeAgentMessage
 from sculptor.interfaces.agents.agent import RemoveQueuedMessageAgentMessage
 from sculptor.interfaces.agents.agent import RequestFailureAgentMessage
@@ -128,6 +129,152 @@ class _StreamingState:
         self.pending_tool_results = []
 
 
+class InProgressChatMessageBuilder:
+    """Mutable, indexed content buffer behind the in-progress ChatMessage.
+
+    `ChatMessage` is immutable, so appending one block used to copy the whole
+    content, rebuild the set of tool-use ids and scan for the ToolUseBlock a
+    result replaces — O(n) per message and O(n^2) for a turn with many tool
+    calls, both live and on history replay. The builder keeps the content as a
+    list plus an id -> position index of its ToolUseBlocks and the set of its
+    FileBlock sources, and only turns it back into a `ChatMessage` in `freeze`.
+
+    The buffer belongs to the message it was loaded from or last froze. While
+    it has edits that are not frozen yet, that message's content is stale:
+    `convert_agent_messages_to_task_update` keeps passing the stale message
+    around (its id, role and parent are still right) and freezes it once, when
+    something reads the message as a whole. `load` of that same message reuses
+    the buffer, anything else (a partial overwrite, a flushed message, a
+    different task) reloads it from the message's content. Callers that convert
+    the same task batch after batch can pass one builder to
+    `convert_agent_messages_to_task_update` to keep the buffer across calls.
+    """
+
+    def __init__(self) -> None:
+        self._message: ChatMessage | None = None
+        self._is_dirty = False
+        self._blocks: list[ContentBlockTypes] = []
+        self._tool_use_position_by_id: dict[str, int] = {}
+        self._file_sources: set[str] = set()
+
+    @property
+    def message(self) -> ChatMessage:
+        """The message the buffer belongs to; its content is stale until `freeze`."""
+        assert self._message is not None
+        return self._message
+
+    def load(self, message: ChatMessage) -> None:
+        if message is self._message:
+            return
+        self._message = message
+        self._is_dirty = False
+        self._blocks = list(message.content)
+        self._reindex()
+
+    def freeze(self) -> ChatMessage:
+        assert self._message is not None
+        if self._is_dirty:
+            self._message = self._message.model_copy(update={"content": tuple(self._blocks)})
+            self._is_dirty = False
+        return self._message
+
+    def freeze_if_holding(self, message: ChatMessage | None) -> ChatMessage | None:
+        """Return `message` with the buffer's pending edits if it is the message the buffer belongs to."""
+        if message is not None and message is self._message:
+            return self.freeze()
+        return message
+
+    def has_tool_use(self, tool_use_id: str) -> bool:
+        return tool_use_id in self._tool_use_position_by_id
+
+    def has_file_source(self, source: str) -> bool:
+        return source in self._file_sources
+
+    def append(self, block: ContentBlockTypes) -> None:
+        if isinstance(block, ToolUseBlock):
+            self._tool_use_position_by_id.setdefault(block.id, len(self._blocks))
+        elif isinstance(block, FileBlock):
+            self._file_sources.add(block.source)
+        self._blocks.append(block)
+        self._is_dirty = True
+
+    def remove_tool_results(self, tool_use_id: str) -> None:
+        blocks = [b for b in self._blocks if not (isinstance(b, ToolResultBlock) and b.tool_use_id == tool_use_id)]
+        if len(blocks) != len(self._blocks):
+            self._blocks = blocks
+            self._reindex()
+            self._is_dirty = True
+
+    def replace_tool_use_with_result(self, result: ToolResultBlock, harness: Harness) -> bool:
+        """Try to replace a tool use block with its result. Returns whether the result was placed."""
+        position = self._tool_use_position_by_id.get(result.tool_use_id)
+        if position is None:
+            return False
+        tool_use = self._blocks[position]
+        assert isinstance(tool_use, ToolUseBlock)
+        # Don't replace AskUserQuestion tool_use blocks with their tool_result.
+        # The ToolUseBlock must remain so the frontend renders the custom
+        # AskUserQuestionToolBlock component (which checks type === "tool_use").
+        if harness.is_ask_user_question_tool(tool_use.name) or harness.is_exit_plan_mode_tool(tool_use.name):
+            return True
+        # Don't replace Agent/Task tool_use blocks. The frontend needs the
+        # ToolUseBlock to render the subagent pill/block. For background
+        # subagents, the tool_result arrives immediately ("Async agent
+        # launched") and would erase the ToolUseBlock before subagent child
+        # messages arrive — breaking the subagent tree. Insert the result
+        # after the tool_use so the frontend can extract metadata from it.
+        if tool_use.name in ("Agent", "Task"):
+            already_has_result = any(
+                isinstance(b, ToolResultBlock) and b.tool_use_id == result.tool_use_id for b in self._blocks
+            )
+            if not already_has_result:
+                self._blocks.insert(position + 1, result)
+                self._reindex()
+                self._is_dirty = True
+            return True
+        self._blocks[position] = result
+        del self._tool_use_position_by_id[result.tool_use_id]
+        self._is_dirty = True
+        return True
+
+    def restore_tool_uses(self, tool_uses: Sequence[ToolUseBlock]) -> None:
+        """Re-insert ToolUseBlocks that a mid-stream tool_result overwrote in place.
+
+        SCU-512: while streaming, `replace_tool_use_with_result` swaps a
+        ToolUseBlock for its ToolResultBlock in place, which drops the tool
+        input. For diff tools that input is the only source of the diff the
+        frontend renders. When the buffered persistence message later
+        re-asserts the ToolUseBlock, this restores it: each tool_use is
+        inserted immediately before its matching ToolResultBlock (paired by
+        `tool_use_id`) so the frontend renders the pair; if no matching result
+        is present it is appended.
+        """
+        for tool_use in tool_uses:
+            insert_at = next(
+                (
+                    i
+                    for i, block in enumerate(self._blocks)
+                    if isinstance(block, ToolResultBlock) and block.tool_use_id == tool_use.id
+                ),
+                None,
+            )
+            if insert_at is None:
+                self._blocks.append(tool_use)
+            else:
+                self._blocks.insert(insert_at, tool_use)
+        self._reindex()
+        self._is_dirty = True
+
+    def _reindex(self) -> None:
+        self._tool_use_position_by_id = {}
+        self._file_sources = set()
+        for position, block in enumerate(self._blocks):
+            if isinstance(block, ToolUseBlock):
+                self._tool_use_position_by_id.setdefault(block.id, position)
+            elif isinstance(block, FileBlock):
+                self._file_sources.add(block.source)
+
+
 def _finalize_request(
     current_request_id: AgentMessageID | None,
     request_id: AgentMessageID,
@@ -209,6 +356,7 @@ def convert_agent_messages_to_task_update(
     completed_message_by_id: dict[AgentMessageID, ChatMessage],
     harness: Harness,
     current_state: TaskUpdate | None = None,
+    in_progress_builder: InProgressChatMessageBuilder | None = None,
 ) -> TaskUpdate:
     """Convert a batch of agent messages to a TaskUpdate.
 
@@ -216,7 +364,12 @@ def convert_agent_messages_to_task_update(
     with pure UI state that can be displayed in the frontend. Manages the state
     transitions of messages from queued -> completed and builds up assistant messages
     incrementally.
+
+    Pass the same `in_progress_builder` on every call for a task to keep the
+    in-progress message's content buffer across batches.
     """
+    if in_progress_builder is None:
+        in_progress_builder = InProgressChatMessageBuilder()
 
     completed_chat_messages = []
     queued_chat_messages = list(current_state.queued_chat_messages) if current_state else []
@@ -288,6 +441,11 @@ def convert_agent_messages_to_task_update(
     recent_plan_file_path: str | None = None
 
     for msg in new_messages:
+        # Response blocks go through the builder and may leave `in_progress_chat_message`
+        # with stale content; freeze it before any other message reads it as a whole.
+        if not isinstance(msg, ResponseBlockAgentMessage):
+            in_progress_chat_message = in_progress_builder.freeze_if_holding(in_progress_chat_message)
+
         if isinstance(msg, ChatInputUserMessage):
             # Build content blocks from text and files
             content_blocks: list[ContentBlockTypes] = [TextBlock(text=msg.text)]
@@ -430,10 +588,26 @@ def convert_agent_messages_to_task_update(
 
             # Re-apply any tool results that arrived during streaming, since the
             # partial just overwrote them with the original ToolUseBlocks.
-            for result in streaming.pending_tool_results:
-                content = list(in_progress_chat_message.content)
-                content, _is_replaced = _replace_tool_use_with_result(content, result, harness)
-                in_progress_chat_message = in_progress_chat_message.model_copy(update={"content": tuple(content)})
+            if streaming.pending_tool_results:
+                in_progress_builder.load(in_progress_chat_message)
+                for result in streaming.pending_tool_results:
+                    in_progress_builder.replace_tool_use_with_result(result, harness)
+                in_progress_chat_message = in_progress_builder.message
+
+        elif isinstance(msg, PartialResponseTextDeltaAgentMessage):
+            # Append-only update to the trailing text of the last partial. Only
+            # applies on top of the segment that partial built; anything else
+            # (a flushed message, a new turn, a shifted block) drops the delta —
+            # the producer re-sends a full snapshot when the block finishes.
+            if (
+                in_progress_chat_message is not None
+                and streaming.is_active
+                and streaming.current_segment_first_response_id == msg.first_response_message_id
+                and in_progress_chat_message.parent_tool_use_id == msg.parent_tool_use_id
+            ):
+                in_progress_chat_message = _apply_partial_text_delta(
+                    in_progress_chat_message, streaming.start_index + msg.block_index, msg.offset, msg.text
+                )
 
         elif isinstance(msg, ResponseBlockAgentMessage):
             if streaming.is_active:
@@ -470,6 +644,7 @@ def convert_agent_messages_to_task_update(
                         msg.message_id,
                         msg.approximate_creation_time,
                         harness,
+                        builder=in_progress_builder,
                     )
                     # Track tool results so they survive subsequent partial
                     # overwrites.  Partials replace content from
@@ -510,6 +685,7 @@ def convert_agent_messages_to_task_update(
                 # A main-agent message (parent_tool_use_id None) arriving while a
                 # different-context message is in progress — flush so the main
                 # content starts in its own ChatMessage.
+                in_progress_chat_message = in_progress_builder.freeze_if_holding(in_progress_chat_message)
                 if in_progress_chat_message is not None:
                     completed_message_by_id[in_progress_chat_message.id] = in_progress_chat_message
                     completed_chat_messages.append(in_progress_chat_message)
@@ -540,16 +716,18 @@ def convert_agent_messages_to_task_update(
                 # only process ToolResultBlocks and FileBlocks to avoid duplicating content.
                 # FileBlocks may already be present from streaming (created by
                 # _finalize_block_from_accumulator), so deduplicate by source path.
-                existing_file_sources: set[str] = set()
                 if in_progress_chat_message is not None:
-                    existing_file_sources = {
-                        block.source for block in in_progress_chat_message.content if isinstance(block, FileBlock)
-                    }
+                    in_progress_builder.load(in_progress_chat_message)
                 non_streamed_blocks = tuple(
                     block
                     for block in msg.content
                     if isinstance(block, ToolResultBlock)
-                    or (isinstance(block, FileBlock) and block.source not in existing_file_sources)
+                    or (
+                        isinstance(block, FileBlock)
+                        and not (
+                            in_progress_chat_message is not None and in_progress_builder.has_file_source(block.source)
+                        )
+                    )
                 )
                 if non_streamed_blocks:
                     in_progress_chat_message = _handle_response_blocks(
@@ -558,30 +736,29 @@ def convert_agent_messages_to_task_update(
                         msg.message_id,
                         msg.approximate_creation_time,
                         harness,
+                        builder=in_progress_builder,
                     )
 
                 # SCU-512: the buffered persistence copy re-asserts the turn's
                 # ToolUseBlocks.  If a tool_result arrived mid-stream it overwrote
-                # its ToolUseBlock in place (``_replace_tool_use_with_result`` does
-                # ``content[i] = result``), discarding the tool input.  For diff
+                # its ToolUseBlock in place (the builder's
+                # ``replace_tool_use_with_result`` swaps the block for the
+                # result), discarding the tool input.  For diff
                 # tools (Edit/Write/MultiEdit) that input carries the old_string/
                 # new_string the frontend needs to render the diff, so a dropped
                 # ToolUseBlock leaves a bare ToolResultBlock that shows as an empty
                 # pill.  Restore any ToolUseBlock the streamed copy no longer holds
                 # (by id) so the pairing — and the input — survive.
                 if in_progress_chat_message is not None:
-                    existing_tool_use_ids = {
-                        block.id for block in in_progress_chat_message.content if isinstance(block, ToolUseBlock)
-                    }
+                    in_progress_builder.load(in_progress_chat_message)
                     restored_tool_uses = tuple(
                         block
                         for block in msg.content
-                        if isinstance(block, ToolUseBlock) and block.id not in existing_tool_use_ids
+                        if isinstance(block, ToolUseBlock) and not in_progress_builder.has_tool_use(block.id)
                     )
                     if restored_tool_uses:
-                        in_progress_chat_message = _restore_overwritten_tool_uses(
-                            in_progress_chat_message, restored_tool_uses
-                        )
+                        in_progress_builder.restore_tool_uses(restored_tool_uses)
+                        in_progress_chat_message = in_progress_builder.message
             else:
                 # Non-streaming (or historical replay) - append content as usual
                 in_progress_chat_message = _handle_response_blocks(
@@ -591,6 +768,7 @@ def convert_agent_messages_to_task_update(
                     msg.approximate_creation_time,
                     harness,
                     parent_tool_use_id=msg_parent,
+                    builder=in_progress_builder,
                 )
 
             # Reconstruct pending_user_question from persisted ToolUseBlock for page reload support.
@@ -635,6 +813,7 @@ def convert_agent_messages_to_task_update(
                 msg.message_id,
                 msg.approximate_creation_time,
                 harness,
+                builder=in_progress_builder,
             )
 
         elif isinstance(msg, ContextSummaryMessage):
@@ -1001,6 +1180,8 @@ def convert_agent_messages_to_task_update(
                 tool_use_id=msg.tool_use_id,
             )
 
+    in_progress_chat_message = in_progress_builder.freeze_if_holding(in_progress_chat_message)
+
     # Build final update
     return TaskUpdate(
         task_id=task_id,
@@ -1097,11 +1278,15 @@ def _handle_response_blocks(
     approximate_creation_time: datetime.datetime,
     harness: Harness,
     parent_tool_use_id: str | None = None,
+    builder: InProgressChatMessageBuilder | None = None,
 ) -> ChatMessage:
     """Process response blocks, returns the updated in-progress chat message.
 
     Handles both text/tool use blocks (append) and tool result blocks
-    (replace matching tool use or append if no match).
+    (replace matching tool use or append if no match). Pass the conversion's
+    `builder` when `in_progress` is the in-progress message, so consecutive
+    calls reuse its content buffer instead of copying the content each time;
+    the returned message is then the builder's unfrozen `message`.
     """
     if not in_progress:
         in_progress = _create_empty_assistant_message(
@@ -1109,10 +1294,10 @@ def _handle_response_blocks(
             approximate_creation_time=approximate_creation_time,
             parent_tool_use_id=parent_tool_use_id,
         )
-
-    content = list(in_progress.content)
-
-    existing_tool_use_ids = {b.id for b in content if isinstance(b, ToolUseBlock)}
+    is_own_builder = builder is None
+    if builder is None:
+        builder = InProgressChatMessageBuilder()
+    builder.load(in_progress)
 
     # Process blocks in two passes to ensure ToolUseBlocks exist before we try to replace them
     # with ToolResultBlocks. This matters when loading persisted messages where all blocks
@@ -1127,25 +1312,23 @@ def _handle_response_blocks(
             # the output_processor, but persisted messages still contain the
             # raw tags which must be extracted here so images survive a
             # restart/replay.
-            content.extend(split_text_and_media(block.text))
+            for segment in split_text_and_media(block.text):
+                builder.append(segment)
         elif isinstance(block, FileBlock):
-            content.append(block)
+            builder.append(block)
         elif isinstance(block, ToolUseBlock):
             # Skip duplicate ToolUseBlocks (e.g. from streaming persistence arriving
             # after StreamingMessageComplete).
-            if block.id not in existing_tool_use_ids:
+            if not builder.has_tool_use(block.id):
                 # For AskUserQuestion, remove any existing ToolResultBlock with matching tool_use_id.
                 # This handles the case where ToolResultBlock arrived in a previous message
                 # before ToolUseBlock (which can happen during streaming or persistence).
                 if harness.classify_tool_ui_role(block.name) is not None:
-                    content = [
-                        b for b in content if not (isinstance(b, ToolResultBlock) and b.tool_use_id == block.id)
-                    ]
+                    builder.remove_tool_results(block.id)
 
                 # Stamp the harness-derived interactive role so the frontend
                 # renders backchannel tools by role rather than by tool name.
-                content.append(_stamp_interactive_role(block, harness))
-                existing_tool_use_ids.add(block.id)
+                builder.append(_stamp_interactive_role(block, harness))
         elif isinstance(block, ToolResultBlock):
             # Defer ToolResultBlocks to second pass
             tool_result_blocks.append(block)
@@ -1156,78 +1339,13 @@ def _handle_response_blocks(
         # the frontend (its tool use lived in an earlier message) is suppressed by
         # role rather than by tool name. Stamped inline (not via
         # `_stamp_interactive_role`) to keep the narrow `ToolResultBlock` type
-        # `_replace_tool_use_with_result` requires.
+        # `replace_tool_use_with_result` requires.
         block = block.model_copy(update={"interactive_role": harness.classify_tool_ui_role(block.tool_name)})
         # Try to replace matching tool use with result
-        content, is_replaced = _replace_tool_use_with_result(content, block, harness)
-
-        if not is_replaced:
-            content.append(block)
-
-    return in_progress.model_copy(update={"content": tuple(content)})
-
-
-def _replace_tool_use_with_result(
-    content: list[ContentBlockTypes], result: ToolResultBlock, harness: Harness
-) -> tuple[list[ContentBlockTypes], bool]:
-    """Try to replace a tool use block with its result.
+        if not builder.replace_tool_use_with_result(block, harness):
+            builder.append(block)
 
-    Returns (updated_content, was_replaced).
-    """
-    for i, block in enumerate(content):
-        if isinstance(block, ToolUseBlock) and block.id == result.tool_use_id:
-            # Don't replace AskUserQuestion tool_use blocks with their tool_result.
-            # The ToolUseBlock must remain so the frontend renders the custom
-            # AskUserQuestionToolBlock component (which checks type === "tool_use").
-            if harness.is_ask_user_question_tool(block.name) or harness.is_exit_plan_mode_tool(block.name):
-                return content, True
-            # Don't replace Agent/Task tool_use blocks. The frontend needs the
-            # ToolUseBlock to render the subagent pill/block. For background
-            # subagents, the tool_result arrives immediately ("Async agent
-            # launched") and would erase the ToolUseBlock before subagent child
-            # messages arrive — breaking the subagent tree. Insert the result
-            # after the tool_use so the frontend can extract metadata from it.
-            if block.name in ("Agent", "Task"):
-                already_has_result = any(
-                    isinstance(b, ToolResultBlock) and b.tool_use_id == result.tool_use_id for b in content
-                )
-                if not already_has_result:
-                    content.insert(i + 1, result)
-                return content, True
-            content[i] = result
-            return content, True
-    return content, False
-
-
-def _restore_overwritten_tool_uses(
-    in_progress: ChatMessage,
-    tool_uses: Sequence[ToolUseBlock],
-) -> ChatMessage:
-    """Re-insert ToolUseBlocks that a mid-stream tool_result overwrote in place.
-
-    SCU-512: while streaming, ``_replace_tool_use_with_result`` swaps a
-    ToolUseBlock for its ToolResultBlock (``content[i] = result``), which drops
-    the tool input.  For diff tools that input is the only source of the diff the
-    frontend renders.  When the buffered persistence message later re-asserts the
-    ToolUseBlock, this restores it: each tool_use is inserted immediately before
-    its matching ToolResultBlock (paired by ``tool_use_id``) so the frontend
-    renders the pair; if no matching result is present it is appended.
-    """
-    content = list(in_progress.content)
-    for tool_use in tool_uses:
-        insert_at = next(
-            (
-                i
-                for i, block in enumerate(content)
-                if isinstance(block, ToolResultBlock) and block.tool_use_id == tool_use.id
-            ),
-            None,
-        )
-        if insert_at is None:
-            content.append(tool_use)
-        else:
-            content.insert(insert_at, tool_use)
-    return in_progress.model_copy(update={"content": tuple(content)})
+    return builder.freeze() if is_own_builder else builder.message
 
 
 def _handle_partial_response(
@@ -1271,6 +1389,22 @@ def _handle_partial_response(
     return in_progress.model_copy(update={"content": new_content})
 
 
+def _apply_partial_text_delta(in_progress: ChatMessage, index: int, offset: int, text: str) -> ChatMessage:
+    """Append `text` to the TextBlock at `index` if that block is exactly `offset` characters long.
+
+    Returns `in_progress` unchanged when the delta does not line up with the
+    current content.
+    """
+    if index >= len(in_progress.content):
+        return in_progress
+    block = in_progress.content[index]
+    if not isinstance(block, TextBlock) or len(block.text) != offset:
+        logger.trace("Dropping partial text delta that does not match the in-progress content at {}", index)
+        return in_progress
+    new_content = in_progress.content[:index] + (TextBlock(text=block.text + text),) + in_progress.content[index + 1 :]
+    return in_progress.model_copy(update={"content": new_content})
+
+
 def _add_context_summary_to_message(
     in_progress: ChatMessage | None,
     message: ContextSummaryMessage,
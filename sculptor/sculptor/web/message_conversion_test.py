@@ -1,5 +1,8 @@
+import datetime
 from collections.abc import Callable
 
+import pytest
+
 from sculptor.agents.default.claude_code_sdk.harness import CLAUDE_CODE_HARNESS
 from sculptor.agents.pi_agent.backchannel import build_ask_user_question_data
 from sculptor.agents.pi_agent.harness import PI_HARNESS
@@ -47,6 +50,7 @@ from sculptor.state.workflow_state import WorkflowPhaseProgress
 from sculptor.state.workflow_state import WorkflowTaskState
 from sculptor.state.workflow_state import WorkflowUsage
 from sculptor.web.derived import TaskUpdate
+from sculptor.web.message_conversion import InProgressChatMessageBuilder
 from sculptor.web.message_conversion import convert_agent_messages_to_task_update
 
 
@@ -7316,3 +7320,180 @@ def test_pi_partial_response_extracts_img_tags_into_file_blocks() -> None:
     assert "Done." in text_content
     # The <img> tag should NOT be present as raw text
     assert "<img" not in text_content
+
+
+def _tool_call_messages(tool_use_id: ToolUseID, tool_name: str) -> list[ResponseBlockAgentMessage]:
+    return [
+        ResponseBlockAgentMessage(
+            role="assistant",
+            assistant_message_id=AssistantMessageID(f"assistant-{tool_use_id}"),
+            message_id=AgentMessageID(),
+            content=(ToolUseBlock(id=tool_use_id, name=tool_name, input={}),),
+        ),
+        ResponseBlockAgentMessage(
+            role="user",
+            assistant_message_id=AssistantMessageID(f"assistant-{tool_use_id}"),
+            message_id=AgentMessageID(),
+            content=(
+                ToolResultBlock(
+                    tool_use_id=tool_use_id,
+                    tool_name=tool_name,
+                    invocation_string=tool_name,
+                    content=GenericToolContent(text=f"{tool_name} done"),
+                ),
+            ),
+        ),
+    ]
+
+
+def test_shared_in_progress_builder_matches_single_batch_conversion() -> None:
+    """Folding batch by batch with one builder yields the same message as one big batch.
+
+    The Agent tool's result is inserted after its tool use rather than replacing
+    it, which shifts every later block — later results must still land on their
+    own tool uses.
+    """
+    user_message = ChatInputUserMessage(text="go")
+    messages: list = [user_message, RequestStartedAgentMessage(request_id=user_message.message_id)]
+    messages += _tool_call_messages(ToolUseID("toolu_1"), "Bash")
+    messages += _tool_call_messages(ToolUseID("toolu_2"), "Agent")
+    messages += _tool_call_messages(ToolUseID("toolu_3"), "Read")
+
+    single_batch = convert_agent_messages_to_task_update(messages, TaskID(), {}, CLAUDE_CODE_HARNESS)
+
+    builder = InProgressChatMessageBuilder()
+    completed_by_id: dict[AgentMessageID, ChatMessage] = {}
+    state: TaskUpdate | None = None
+    for message in messages:
+        state = convert_agent_messages_to_task_update(
+            [message], TaskID(), completed_by_id, CLAUDE_CODE_HARNESS, current_state=state, in_progress_builder=builder
+        )
+
+    assert state is not None and state.in_progress_chat_message is not None
+    assert state.in_progress_chat_message == single_batch.in_progress_chat_message
+    assert [type(block).__name__ for block in state.in_progress_chat_message.content] == [
+        "ToolResultBlock",
+        "ToolUseBlock",
+        "ToolResultBlock",
+        "ToolResultBlock",
+    ]
+
+
+def test_in_progress_builder_reloads_when_the_message_changed_elsewhere() -> None:
+    builder = InProgressChatMessageBuilder()
+    message = ChatMessage(
+        id=AgentMessageID(),
+        role=ChatMessageRole.ASSISTANT,
+        content=(ToolUseBlock(id=ToolUseID("toolu_1"), name="Bash", input={}),),
+        approximate_creation_time=datetime.datetime.now(datetime.timezone.utc),
+    )
+    builder.load(message)
+    builder.append(TextBlock(text="appended"))
+    frozen = builder.freeze()
+    assert builder.freeze() is frozen
+
+    # A message the builder did not freeze (e.g. a partial overwrite) replaces the buffer.
+    overwritten = frozen.model_copy(update={"content": (TextBlock(text="overwritten"),)})
+    builder.load(overwritten)
+    assert not builder.has_tool_use(ToolUseID("toolu_1"))
+    assert builder.freeze() is overwritten
+
+
+def _record_copying_freezes(monkeypatch: pytest.MonkeyPatch) -> list[int]:
+    """Patch the builder to record the block count of every freeze that copies its buffer."""
+    frozen_block_counts: list[int] = []
+    original_freeze = InProgressChatMessageBuilder.freeze
+
+    def _recording_freeze(builder: InProgressChatMessageBuilder) -> ChatMessage:
+        before = builder.message
+        frozen = original_freeze(builder)
+        if frozen is not before:
+            frozen_block_counts.append(len(frozen.content))
+        return frozen
+
+    monkeypatch.setattr(InProgressChatMessageBuilder, "freeze", _recording_freeze)
+    return frozen_block_counts
+
+
+def test_replayed_turn_freezes_the_in_progress_message_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    frozen_block_counts = _record_copying_freezes(monkeypatch)
+    user_message = ChatInputUserMessage(text="go")
+    messages: list = [user_message, RequestStartedAgentMessage(request_id=user_message.message_id)]
+    for index in range(200):
+        messages += _tool_call_messages(ToolUseID(f"toolu_{index}"), "Bash")
+
+    update = convert_agent_messages_to_task_update(messages, TaskID(), {}, CLAUDE_CODE_HARNESS)
+
+    assert update.in_progress_chat_message is not None
+    assert len(update.in_progress_chat_message.content) == 200
+    assert frozen_block_counts == [200]
+
+
+def test_streamed_turn_persistence_copies_restore_tool_uses_without_refreezing(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """The SCU-512 path dedupes FileBlocks and restores overwritten ToolUseBlocks from the builder's indexes.
+
+    One streamed turn with many Edits whose results arrive mid-stream, then one
+    persistence copy per Edit: the in-progress message is frozen when streaming
+    completes and once at the end of the batch, not once per persistence copy.
+    """
+    frozen_block_counts = _record_copying_freezes(monkeypatch)
+    tool_call_count = 100
+    user_message = ChatInputUserMessage(text="go")
+    assistant_message_id = AssistantMessageID("assistant-many-edits")
+    chat_message_id = AgentMessageID()
+    tool_uses = [
+        ToolUseBlock(id=ToolUseID(f"toolu_{index}"), name="Edit", input={"file_path": f"/{index}.py"})
+        for index in range(tool_call_count)
+    ]
+    file_blocks = [FileBlock(source=f"/tmp/{index}.png") for index in range(tool_call_count)]
+    messages: list = [
+        user_message,
+        RequestStartedAgentMessage(request_id=user_message.message_id),
+        PartialResponseBlockAgentMessage(
+            assistant_message_id=assistant_message_id,
+            message_id=AgentMessageID(),
+            first_response_message_id=chat_message_id,
+            content=(*tool_uses, *file_blocks),
+        ),
+    ]
+    messages += [
+        ResponseBlockAgentMessage(
+            role="user",
+            assistant_message_id=assistant_message_id,
+            message_id=AgentMessageID(),
+            content=(
+                ToolResultBlock(
+                    tool_use_id=tool_use.id,
+                    tool_name="Edit",
+                    invocation_string=tool_use.input["file_path"],
+                    content=GenericToolContent(text="updated"),
+                ),
+            ),
+        )
+        for tool_use in tool_uses
+    ]
+    messages.append(StreamingMessageCompleteAgentMessage(message_id=AgentMessageID()))
+    messages += [
+        ResponseBlockAgentMessage(
+            role="assistant",
+            assistant_message_id=assistant_message_id,
+            message_id=chat_message_id,
+            content=(tool_use, file_block),
+        )
+        for tool_use, file_block in zip(tool_uses, file_blocks)
+    ]
+
+    update = convert_agent_messages_to_task_update(messages, TaskID(), {}, CLAUDE_CODE_HARNESS)
+
+    assert update.in_progress_chat_message is not None
+    content = update.in_progress_chat_message.content
+    assert sum(isinstance(block, FileBlock) for block in content) == tool_call_count
+    assert [type(block).__name__ for block in content[:4]] == [
+        "ToolUseBlock",
+        "ToolResultBlock",
+        "ToolUseBlock",
+        "ToolResultBlock",
+    ]
+    assert len(frozen_block_counts) == 2
@@ -40,6 +40,8 @@ from sculptor.web.auth import UserSession
 from sculptor.web.auth import authenticate_anonymous
 from sculptor.web.streams import Scope
 from sculptor.web.streams import ServerStopped
+from sculptor.web.streams import StreamView
+from sculptor.web.streams import parse_stream_view_query_param
 from sculptor.web.streams import resolve_scope
 
 
@@ -145,6 +147,22 @@ def resolve_stream_scope(websocket: WebSocket) -> Scope:
     )
 
 
+def resolve_stream_view(websocket: WebSocket) -> StreamView:
+    """FastAPI Depends-able wrapper around `streams.parse_stream_view_query_param`."""
+    return parse_stream_view_query_param(websocket.query_params.getlist("view"))
+
+
+def resolve_request_scope(request: Request) -> Scope:
+    """Like `resolve_stream_scope`, for plain HTTP routes that take a ``?scope=``."""
+    user_session = get_user_session(request)
+    services = get_services_from_request_or_websocket(request)
+    return resolve_scope(
+        scope_values=request.query_params.getlist("scope"),
+        user_session=user_session,
+        services=services,
+    )
+
+
 def _get_user_session(
     request: Request | WebSocket,
     services: CompleteServiceCollection,
@@ -1,10 +1,15 @@
+import json
 import time
+import weakref
 from collections import defaultdict
+from contextlib import AbstractContextManager
 from contextlib import ExitStack
+from enum import StrEnum
 from functools import partial
 from pathlib import Path
 from queue import Empty
 from queue import Queue
+from threading import Event
 from typing import Callable
 from typing import Generator
 from typing import TypeVar
@@ -30,17 +35,21 @@ from sculptor.foundation.event_utils import CompoundEvent
 from sculptor.foundation.event_utils import ReadOnlyEvent
 from sculptor.foundation.pydantic_serialization import FrozenModel
 from sculptor.foundation.pydantic_serialization import SerializableModel
+from sculptor.interfaces.agents.agent import UpdatedArtifactAgentMessage
+from sculptor.interfaces.agents.artifacts import ArtifactType
 from sculptor.interfaces.environments.base import STATE_DIRECTORY
-from sculptor.primitives.ids import AgentMessageID
 from sculptor.primitives.ids import ProjectID
 from sculptor.primitives.ids import RequestID
 from sculptor.primitives.ids import TypeIDPrefixMismatchError
+from sculptor.primitives.ids import UserReference
 from sculptor.primitives.ids import WorkspaceID
 from sculptor.service_collections.service_collection import CompleteServiceCollection
 from sculptor.services.btw_service.api import BtwService
 from sculptor.services.data_model_service.api import CompletedTransaction
 from sculptor.services.dependency_management_service import DependencyManagementService
 from sculptor.services.task_service.api import TaskMessageContainer
+from sculptor.services.task_service.api import TaskService
+from sculptor.services.task_service.api import TaskUpdateCursor
 from sculptor.services.workspace_service.default_implementation import DefaultWorkspaceService
 from sculptor.services.workspace_service.setup_command_runner import SetupCommandRunner
 from sculptor.services.workspace_service.setup_command_runner import SetupOutputChunk
@@ -67,7 +76,6 @@ from sculptor.web.derived import UserUpdate
 from sculptor.web.derived import WorkspaceBranchInfo
 from sculptor.web.derived import WorkspaceTargetBranchesInfo
 from sculptor.web.derived import create_initial_task_view
-from sculptor.web.message_conversion import convert_agent_messages_to_task_update
 from sculptor.web.pr_polling_service import PrPollingService
 from sculptor.web.ui_actions import add_subscriber as add_ui_action_subscriber
 from sculptor.web.ui_actions import remove_subscriber as remove_ui_action_subscriber
@@ -98,6 +106,7 @@ def _forward_setup_state_changed(queue: Queue[StreamingUpdateSourceTypes], event
             started_at=event.started_at,
             finished_at=event.finished_at,
             log_truncated=event.log_truncated,
+            cache_result=event.cache_result,
         )
     )
 
@@ -147,6 +156,7 @@ def _snapshot_setup_state(
             started_at=state.started_at,
             finished_at=state.finished_at,
             log_truncated=state.log_truncated,
+            cache_result=state.cache_result,
         )
         chunk: WorkspaceSetupOutputChunk | None = None
         if state.status == "running" and state.run_id is not None:
@@ -320,6 +330,30 @@ def resolve_scope(
         assert_never(parsed)
 
 
+class StreamView(StrEnum):
+    """How much of each in-scope task a stream carries (the `?view=` query parameter).
+
+    FULL is everything the app renders. SUMMARY carries only the task views
+    (status, activity, title, progress counts, ...) for the CLI and dashboards:
+    no chat history, setup logs, dependency, branch or PR state, so the server
+    neither reads the message fold nor starts any of the probes behind them.
+    """
+
+    FULL = "full"
+    SUMMARY = "summary"
+
+
+def parse_stream_view_query_param(view_values: list[str]) -> StreamView:
+    if len(view_values) > 1:
+        raise HTTPException(status_code=400, detail="multiple view parameters")
+    if not view_values or view_values[0] == "":
+        return StreamView.FULL
+    try:
+        return StreamView(view_values[0])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"invalid view: '{view_values[0]}'") from e
+
+
 class StreamingUpdate(SerializableModel):
     task_update_by_task_id: dict[TaskID, TaskUpdate] = Field(default_factory=dict)
     task_views_by_task_id: dict[TaskID, CodingAgentTaskView] = Field(default_factory=dict)
@@ -341,6 +375,64 @@ class StreamingUpdate(SerializableModel):
     ui_extension_command_by_workspace_id: dict[WorkspaceID, ExtensionCommandUiAction] = Field(default_factory=dict)
 
 
+# Completed chat messages are immutable and shared by identity between every stream's frames (they come from the
+# task service's shared fold), so each one is encoded once and its JSON is spliced into later frames. Entries are
+# keyed by `id()` and dropped when the message is collected.
+_CHAT_MESSAGE_JSON_BY_OBJECT_ID: dict[int, str] = {}
+
+# The websocket's keepalive frame: a JSON string, as the handler has always sent it.
+KEEPALIVE_FRAME = json.dumps("null")
+
+
+def encode_streaming_update(update: StreamingUpdate) -> str:
+    """Serialize a frame straight to JSON text, equivalent to `update.model_dump(mode="json", by_alias=True)`.
+
+    Completed chat messages are written from cached fragments rather than re-serialized.
+    """
+    if not any(task_update.chat_messages for task_update in update.task_update_by_task_id.values()):
+        return update.model_dump_json(by_alias=True)
+    encoded_task_updates = ",".join(
+        f"{json.dumps(str(task_id))}:{_encode_task_update(task_update)}"
+        for task_id, task_update in update.task_update_by_task_id.items()
+    )
+    return _prepend_json_field(
+        update.model_dump_json(by_alias=True, exclude={"task_update_by_task_id"}),
+        _field_alias(StreamingUpdate, "task_update_by_task_id"),
+        "{" + encoded_task_updates + "}",
+    )
+
+
+def _encode_task_update(task_update: TaskUpdate) -> str:
+    encoded_chat_messages = ",".join(_encode_chat_message(message) for message in task_update.chat_messages)
+    return _prepend_json_field(
+        task_update.model_dump_json(by_alias=True, exclude={"chat_messages"}),
+        _field_alias(TaskUpdate, "chat_messages"),
+        "[" + encoded_chat_messages + "]",
+    )
+
+
+def _encode_chat_message(message: ChatMessage) -> str:
+    object_id = id(message)
+    encoded = _CHAT_MESSAGE_JSON_BY_OBJECT_ID.get(object_id)
+    if encoded is None:
+        encoded = message.model_dump_json(by_alias=True)
+        _CHAT_MESSAGE_JSON_BY_OBJECT_ID[object_id] = encoded
+        weakref.finalize(message, _CHAT_MESSAGE_JSON_BY_OBJECT_ID.pop, object_id, None)
+    return encoded
+
+
+def _field_alias(model: type[SerializableModel], field_name: str) -> str:
+    return model.model_fields[field_name].alias or field_name
+
+
+def _prepend_json_field(encoded_object: str, key: str, encoded_value: str) -> str:
+    """Add `"key": value` to the front of an already-encoded JSON object."""
+    head = "{" + json.dumps(key) + ":" + encoded_value
+    if encoded_object == "{}":
+        return head + "}"
+    return head + "," + encoded_object[1:]
+
+
 _WorkspaceValueT = TypeVar("_WorkspaceValueT")
 
 
@@ -456,6 +548,53 @@ def project_for_scope(
     )
 
 
+def project_for_view(update: StreamingUpdate, view: StreamView) -> StreamingUpdate:
+    """Drop everything but the task views from a SUMMARY stream's frames."""
+    if view == StreamView.FULL:
+        return update
+    return StreamingUpdate(task_views_by_task_id=update.task_views_by_task_id)
+
+
+def _subscribe_to_scope_task_containers(
+    task_service: TaskService, scope: Scope, user_reference: UserReference
+) -> AbstractContextManager[Queue[TaskMessageContainer]]:
+    if isinstance(scope, ScopeAll):
+        return task_service.subscribe_to_all_tasks_for_user(user_reference)
+    if isinstance(scope, ScopeProject):
+        return task_service.subscribe_to_project_task_containers(scope.project_id, user_reference)
+    if isinstance(scope, ScopeWorkspace):
+        return task_service.subscribe_to_workspace_task_containers(scope.workspace_id, user_reference)
+    if isinstance(scope, ScopeAgent):
+        return task_service.subscribe_to_single_task_container(scope.agent_id, user_reference)
+    assert_never(scope)
+
+
+def read_task_summaries(
+    user_session: UserSession, services: CompleteServiceCollection, scope: Scope = ScopeAll()
+) -> tuple[CodingAgentTaskView, ...]:
+    """The task views a SUMMARY stream for `scope` would open with, without keeping a stream open.
+
+    Subscribes just long enough to take the initial task container, so the
+    views are built exactly as the stream builds them.
+    """
+    with _subscribe_to_scope_task_containers(
+        services.task_service, scope, user_session.user_reference
+    ) as updates_queue:
+        initial_data = _empty_update_queue(
+            updates_queue=updates_queue, shutdown_event=Event(), is_blocking_allowed=False
+        )
+    task_views_by_task_id: dict[TaskID, CodingAgentTaskView] = {}
+    for container in initial_data:
+        _process_task_message_container(
+            container=container,
+            changed_task_ids=set(),
+            task_views_by_task_id=task_views_by_task_id,
+            updated_artifacts_by_task_id=defaultdict(set),
+            settings=services.settings,
+        )
+    return tuple(task_views_by_task_id.values())
+
+
 def stream_everything(
     user_session: UserSession,
     shutdown_event: ReadOnlyEvent,
@@ -465,9 +604,11 @@ def stream_everything(
     dependency_management_service: DependencyManagementService | None = None,
     pr_polling_service: PrPollingService | None = None,
     btw_service: BtwService | None = None,
+    view: StreamView = StreamView.FULL,
 ) -> Generator[StreamingUpdate | None, None, None]:
     """Emit unified task/user updates for a user."""
-    logger.debug("stream_everything scope: {}", scope)
+    logger.debug("stream_everything scope: {}, view: {}", scope, view)
+    is_summary = view == StreamView.SUMMARY
     # Shut down if either a global or local shutdown is requested.
     combined_event = CompoundEvent([concurrency_group.shutdown_event, shutdown_event])
     project_workspace_ids: set[WorkspaceID] = set()
@@ -477,12 +618,12 @@ def stream_everything(
         project_workspace_ids = {
             w.object_id for w in workspaces if w.project_id == scope.project_id and not w.is_deleted
         }
-    # Scope-conditional wiring. For each scope variant the elif chain below records:
+    # Scope-conditional wiring. For each scope variant this records:
     #
     # - task_subscription_cm: which TaskService subscription to open
     #   (one of subscribe_to_all_tasks_for_user / project / workspace / single).
     # - polling_enabled: whether to subscribe this connection to the polling
-    #   services (git-state scanner + PR polling). False only for ScopeAgent —
+    #   services (git-state scanner + PR polling). False for ScopeAgent —
     #   project_for_scope drops every workspace- and project-keyed field for that
     #   scope anyway, so a subscription is pure waste. The git-state scanner is a
     #   single process-global loop regardless of how many connections subscribe;
@@ -497,31 +638,16 @@ def stream_everything(
     #   True for ScopeProject and ScopeWorkspace. ScopeAgent gets deletion
     #   signals from its single-task subscription instead, so it leaves this
     #   observer detached entirely.
-    attach_full_user_observers = False
-    polling_enabled = False
-    attach_user_changes_for_close_on_delete = False
-    if isinstance(scope, ScopeAll):
-        task_subscription_cm = services.task_service.subscribe_to_all_tasks_for_user(user_session.user_reference)
-        attach_full_user_observers = True
-        polling_enabled = True
-    elif isinstance(scope, ScopeProject):
-        task_subscription_cm = services.task_service.subscribe_to_project_task_containers(
-            scope.project_id, user_session.user_reference
-        )
-        polling_enabled = True
-        attach_user_changes_for_close_on_delete = True
-    elif isinstance(scope, ScopeWorkspace):
-        task_subscription_cm = services.task_service.subscribe_to_workspace_task_containers(
-            scope.workspace_id, user_session.user_reference
-        )
-        polling_enabled = True
-        attach_user_changes_for_close_on_delete = True
-    elif isinstance(scope, ScopeAgent):
-        task_subscription_cm = services.task_service.subscribe_to_single_task_container(
-            scope.agent_id, user_session.user_reference
-        )
-    else:
-        assert_never(scope)
+    #
+    # A SUMMARY view only carries task views (see project_for_view), so it
+    # leaves polling and the full user observers off for every scope, along
+    # with the setup-runner, btw and UI-action observers below.
+    task_subscription_cm = _subscribe_to_scope_task_containers(
+        services.task_service, scope, user_session.user_reference
+    )
+    polling_enabled = not isinstance(scope, ScopeAgent) and not is_summary
+    attach_full_user_observers = isinstance(scope, ScopeAll) and not is_summary
+    attach_user_changes_for_close_on_delete = isinstance(scope, ScopeProject | ScopeWorkspace)
     pr_polling_service_for_notify = pr_polling_service if polling_enabled else None
     register_dependency_observer = attach_full_user_observers and dependency_management_service is not None
     register_pr_observer = polling_enabled and pr_polling_service is not None
@@ -531,7 +657,7 @@ def stream_everything(
         if register_dependency_observer:
             assert dependency_management_service is not None
             dependency_management_service.add_observer_queue(updates_queue_loosely_typed)
-        setup_runner = _resolve_setup_runner(services)
+        setup_runner = None if is_summary else _resolve_setup_runner(services)
         setup_state_observer = partial(_forward_setup_state_changed, updates_queue_loosely_typed)
         setup_output_observer = partial(_forward_setup_output_chunk, updates_queue_loosely_typed)
         if setup_runner is not None:
@@ -547,9 +673,11 @@ def stream_everything(
         branch_state_service = services.workspace_service if polling_enabled else None
         if branch_state_service is not None:
             branch_state_service.add_observer(updates_queue_loosely_typed)
-        if btw_service is not None:
-            btw_service.add_observer_queue(updates_queue_loosely_typed)
-        add_ui_action_subscriber(updates_queue_loosely_typed.put_nowait)
+        btw_service_for_observer = None if is_summary else btw_service
+        if btw_service_for_observer is not None:
+            btw_service_for_observer.add_observer_queue(updates_queue_loosely_typed)
+        if not is_summary:
+            add_ui_action_subscriber(updates_queue_loosely_typed.put_nowait)
         try:
             with ExitStack() as stack:
                 if attach_full_user_observers or attach_user_changes_for_close_on_delete:
@@ -560,8 +688,10 @@ def stream_everything(
                             queue=updates_queue_loosely_typed,
                         )
                     )
-                # Initialize state tracking
-                completed_message_by_task_id: dict[TaskID, dict[AgentMessageID, ChatMessage]] = {}
+                # Initialize state tracking. The TaskUpdate fold itself is shared by
+                # every connection (see TaskService.read_task_update); this stream
+                # only keeps its read position into each task's folded state.
+                task_update_cursor_by_task_id: dict[TaskID, TaskUpdateCursor] = {}
                 task_views_by_task_id: dict[TaskID, CodingAgentTaskView] = {}
                 task_update_state_by_task_id: dict[TaskID, TaskUpdate] = {}
                 # Workflow snapshot last put on the wire per task, so unchanged
@@ -588,9 +718,10 @@ def stream_everything(
                     shutdown_event=combined_event,
                     is_blocking_allowed=False,
                 )
-                initial_data.append(services.settings)
+                if not is_summary:
+                    initial_data.append(services.settings)
                 if attach_full_user_observers and dependency_management_service is not None:
-                    initial_data.append(dependency_management_service.get_status())
+                    initial_data.append(dependency_management_service.get_cached_status())
                 if setup_runner is not None:
                     for state, snapshot_chunk in _snapshot_setup_state(services, setup_runner):
                         initial_data.append(state)
@@ -602,13 +733,17 @@ def stream_everything(
                         all_data=cast(list[StreamingUpdateSourceTypes | None], initial_data),
                         task_views_by_task_id=task_views_by_task_id,
                         task_update_state_by_task_id=task_update_state_by_task_id,
-                        processed_message_by_task_id=completed_message_by_task_id,
+                        task_update_cursor_by_task_id=task_update_cursor_by_task_id,
                         sent_workflow_states_by_task_id=sent_workflow_states_by_task_id,
                         settings=services.settings,
+                        task_service=services.task_service,
+                        is_summary=is_summary,
                     )
 
                 # We yield the initial state before starting the background watchers to minimize time to first message for the frontend
-                yield project_for_scope(initial_update, scope, frozenset(project_workspace_ids))
+                yield project_for_view(
+                    project_for_scope(initial_update, scope, frozenset(project_workspace_ids)), view
+                )
 
                 _notify_pr_polling_service(
                     pr_polling_service_for_notify, initial_data, pr_poll_last_branch, _pr_poll_workspace_in_scope
@@ -652,16 +787,20 @@ def stream_everything(
                             all_data=loosely_typed_new_data,
                             task_views_by_task_id=task_views_by_task_id,
                             task_update_state_by_task_id=task_update_state_by_task_id,
-                            processed_message_by_task_id=completed_message_by_task_id,
+                            task_update_cursor_by_task_id=task_update_cursor_by_task_id,
                             sent_workflow_states_by_task_id=sent_workflow_states_by_task_id,
                             settings=services.settings,
+                            task_service=services.task_service,
+                            is_summary=is_summary,
                         )
                         # Suppress duplicate dependencies status pushes
                         if incremental_update.dependencies_status == last_yielded_deps_status:
                             incremental_update = incremental_update.model_copy(update={"dependencies_status": None})
                         else:
                             last_yielded_deps_status = incremental_update.dependencies_status
-                        yield project_for_scope(incremental_update, scope, frozenset(project_workspace_ids))
+                        yield project_for_view(
+                            project_for_scope(incremental_update, scope, frozenset(project_workspace_ids)), view
+                        )
 
                     if _scope_subscribed_entity_was_deleted(scope, new_data):
                         yield None
@@ -677,9 +816,10 @@ def stream_everything(
                 pr_polling_service.remove_observer(updates_queue_loosely_typed)
             if branch_state_service is not None:
                 branch_state_service.remove_observer(updates_queue_loosely_typed)
-            if btw_service is not None:
-                btw_service.remove_observer_queue(updates_queue_loosely_typed)
-            remove_ui_action_subscriber(updates_queue_loosely_typed.put_nowait)
+            if btw_service_for_observer is not None:
+                btw_service_for_observer.remove_observer_queue(updates_queue_loosely_typed)
+            if not is_summary:
+                remove_ui_action_subscriber(updates_queue_loosely_typed.put_nowait)
 
 
 def _scope_subscribed_entity_was_deleted(
@@ -782,14 +922,19 @@ def _convert_to_streaming_update(
     all_data: list[StreamingUpdateSourceTypes | None],
     task_views_by_task_id: dict[TaskID, CodingAgentTaskView],
     task_update_state_by_task_id: dict[TaskID, TaskUpdate],
-    processed_message_by_task_id: dict[TaskID, dict[AgentMessageID, ChatMessage]],
+    task_update_cursor_by_task_id: dict[TaskID, TaskUpdateCursor],
     sent_workflow_states_by_task_id: dict[TaskID, dict[str, WorkflowTaskState] | None],
     settings: SculptorSettings,
+    task_service: TaskService,
+    is_summary: bool = False,
 ) -> StreamingUpdate:
     """Converts a list of source updates into a StreamingUpdate.
 
     This function processes new data and returns an incremental update containing only changes from this batch.
-    It maintains internal state in the passed-in dicts for tracking purposes.
+    It maintains internal state in the passed-in dicts for tracking purposes. Task messages are not folded here:
+    each changed task's TaskUpdate is read from the task service's shared fold as a delta against this stream's
+    cursor, so the per-message work does not grow with the number of open streams. A summary stream never reads
+    the fold and so carries no TaskUpdates.
     """
     changed_task_ids: set[TaskID] = set()
     finished_request_ids: list[RequestID] = []
@@ -804,7 +949,7 @@ def _convert_to_streaming_update(
     updated_ui_open_file_by_workspace_id: dict[WorkspaceID, OpenFileUiAction] = {}
     updated_ui_webview_command_by_workspace_id: dict[WorkspaceID, WebviewCommandUiAction] = {}
     updated_ui_extension_command_by_workspace_id: dict[WorkspaceID, ExtensionCommandUiAction] = {}
-    messages_by_task: dict[TaskID, list[Message]] = defaultdict(list)
+    updated_artifacts_by_task_id: dict[TaskID, set[ArtifactType]] = defaultdict(set)
 
     for model in all_data:
         if model is None:
@@ -814,7 +959,7 @@ def _convert_to_streaming_update(
                 container=model,
                 changed_task_ids=changed_task_ids,
                 task_views_by_task_id=task_views_by_task_id,
-                messages_by_task=messages_by_task,
+                updated_artifacts_by_task_id=updated_artifacts_by_task_id,
                 settings=settings,
             )
 
@@ -866,12 +1011,15 @@ def _convert_to_streaming_update(
         else:
             assert_never(model)
 
-    _apply_message_updates_to_task_state(
-        messages_by_task=messages_by_task,
-        task_update_state_by_task_id=task_update_state_by_task_id,
-        processed_message_by_task_id=processed_message_by_task_id,
-        task_views_by_task_id=task_views_by_task_id,
-    )
+    if not is_summary:
+        _read_shared_task_updates(
+            changed_task_ids=changed_task_ids,
+            updated_artifacts_by_task_id=updated_artifacts_by_task_id,
+            task_update_state_by_task_id=task_update_state_by_task_id,
+            task_update_cursor_by_task_id=task_update_cursor_by_task_id,
+            task_views_by_task_id=task_views_by_task_id,
+            task_service=task_service,
+        )
 
     updated_task_views_by_task_id, updated_task_update_by_task_id = _extract_changed_tasks(
         changed_task_ids=changed_task_ids,
@@ -944,7 +1092,7 @@ def _process_task_message_container(
     container: TaskMessageContainer,
     changed_task_ids: set[TaskID],
     task_views_by_task_id: dict[TaskID, CodingAgentTaskView],
-    messages_by_task: dict[TaskID, list[Message]],
+    updated_artifacts_by_task_id: dict[TaskID, set[ArtifactType]],
     settings: SculptorSettings,
 ) -> None:
     for task in container.tasks:
@@ -964,7 +1112,11 @@ def _process_task_message_container(
         changed_task_ids.add(task_id)
         if task_id in task_views_by_task_id and isinstance(message, Message):
             task_views_by_task_id[task_id].add_message(message)
-        messages_by_task[task_id].append(message)
+        # Artifact notifications stay per-connection: a subscription's initial dump
+        # carries synthetic ones for artifacts already on disk that never enter the
+        # shared fold.
+        if isinstance(message, UpdatedArtifactAgentMessage):
+            updated_artifacts_by_task_id[task_id].add(ArtifactType(message.artifact.name))
 
 
 def _process_completed_transaction(
@@ -977,32 +1129,30 @@ def _process_completed_transaction(
     user_update_sources.append(transaction)
 
 
-def _apply_message_updates_to_task_state(
-    messages_by_task: dict[TaskID, list[Message]],
+def _read_shared_task_updates(
+    changed_task_ids: set[TaskID],
+    updated_artifacts_by_task_id: dict[TaskID, set[ArtifactType]],
     task_update_state_by_task_id: dict[TaskID, TaskUpdate],
-    processed_message_by_task_id: dict[TaskID, dict[AgentMessageID, ChatMessage]],
+    task_update_cursor_by_task_id: dict[TaskID, TaskUpdateCursor],
     task_views_by_task_id: dict[TaskID, CodingAgentTaskView],
+    task_service: TaskService,
 ) -> None:
-    for task_id, messages in messages_by_task.items():
-        # `messages_by_task` carries every task's messages (agent and not), but
+    for task_id in changed_task_ids:
+        # `changed_task_ids` carries every task's id (agent and not), but
         # `task_views_by_task_id` only carries AgentTaskInputsV2 tasks. Non-agent
         # tasks have no harness to resolve.
         task_view = task_views_by_task_id.get(task_id)
         if task_view is None:
             continue
-        if task_id not in processed_message_by_task_id:
-            processed_message_by_task_id[task_id] = {}
-
         harness = get_harness_for_config(task_view.task_input.agent_config)
-        current_task_update = task_update_state_by_task_id.get(task_id)
-        new_task_update = convert_agent_messages_to_task_update(
-            new_messages=messages,
-            task_id=task_id,
-            completed_message_by_id=processed_message_by_task_id[task_id],
-            harness=harness,
-            current_state=current_task_update,
-        )
-        task_update_state_by_task_id[task_id] = new_task_update
+        cursor = task_update_cursor_by_task_id.get(task_id, TaskUpdateCursor())
+        task_update, task_update_cursor_by_task_id[task_id] = task_service.read_task_update(task_id, harness, cursor)
+        if task_update is None:
+            continue
+        updated_artifacts = updated_artifacts_by_task_id.get(task_id)
+        if updated_artifacts:
+            task_update = task_update.model_copy(update={"updated_artifacts": tuple(updated_artifacts)})
+        task_update_state_by_task_id[task_id] = task_update
 
 
 def _extract_changed_tasks(
@@ -25,10 +25,13 @@ from sculptor.web.streams import ScopeAgent
 from sculptor.web.streams import ScopeAll
 from sculptor.web.streams import ScopeProject
 from sculptor.web.streams import ScopeWorkspace
+from sculptor.web.streams import StreamView
 from sculptor.web.streams import StreamingUpdate
 from sculptor.web.streams import _scope_subscribed_entity_was_deleted
 from sculptor.web.streams import parse_scope_query_param
+from sculptor.web.streams import parse_stream_view_query_param
 from sculptor.web.streams import project_for_scope
+from sculptor.web.streams import project_for_view
 
 # Tracks every field of StreamingUpdate that the scope-narrowing logic needs to
 # consider. Lives next to the test so an added field forces a deliberate update
@@ -106,6 +109,20 @@ def test_parse_scope_malformed_raises_400(value: str) -> None:
     assert exc_info.value.status_code == 400
 
 
+def test_parse_stream_view_defaults_to_full() -> None:
+    assert parse_stream_view_query_param([]) == StreamView.FULL
+    assert parse_stream_view_query_param([""]) == StreamView.FULL
+    assert parse_stream_view_query_param(["full"]) == StreamView.FULL
+    assert parse_stream_view_query_param(["summary"]) == StreamView.SUMMARY
+
+
+@pytest.mark.parametrize("view_values", [["junk"], ["summary", "full"]])
+def test_parse_stream_view_malformed_raises_400(view_values: list[str]) -> None:
+    with pytest.raises(HTTPException) as exc_info:
+        parse_stream_view_query_param(view_values)
+    assert exc_info.value.status_code == 400
+
+
 def _make_task_update(task_id: TaskID) -> TaskUpdate:
     return TaskUpdate(
         task_id=task_id,
@@ -351,3 +368,14 @@ def test_close_on_delete_fires_for_scope_agent() -> None:
     alive_task = deleted_task.model_copy(update={"is_deleted": False})
     container_alive = TaskMessageContainer(tasks=(alive_task,), messages=())
     assert _scope_subscribed_entity_was_deleted(scope, [container_alive]) is False
+
+
+def test_project_for_view_full_returns_unchanged() -> None:
+    update, *_ = _build_synthetic_update()
+    assert project_for_view(update, StreamView.FULL) == update
+
+
+def test_project_for_view_summary_keeps_only_task_views() -> None:
+    update, *_ = _build_synthetic_update()
+    result = project_for_view(update, StreamView.SUMMARY)
+    assert result == StreamingUpdate(task_views_by_task_id=update.task_views_by_task_id)
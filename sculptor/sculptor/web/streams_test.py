@@ -1,3 +1,6 @@
+import datetime
+import gc
+import json
 from unittest.mock import MagicMock
 
 import pytest
@@ -10,22 +13,29 @@ from sculptor.database.models import TaskID
 from sculptor.database.models import UserSettings
 from sculptor.database.models import Workspace
 from sculptor.database.models import WorkspaceInitializationStrategy
+from sculptor.primitives.ids import AgentMessageID
 from sculptor.primitives.ids import OrganizationReference
 from sculptor.primitives.ids import ProjectID
 from sculptor.primitives.ids import UserReference
 from sculptor.primitives.ids import UserSettingsID
 from sculptor.primitives.ids import WorkspaceID
 from sculptor.services.data_model_service.api import CompletedTransaction
+from sculptor.state.chat_state import ChatMessage
+from sculptor.state.chat_state import ChatMessageRole
+from sculptor.state.chat_state import TextBlock
 from sculptor.state.workflow_state import WorkflowTaskState
 from sculptor.web.data_types import OpenFileUiAction
 from sculptor.web.data_types import StreamingUpdateSourceTypes
 from sculptor.web.data_types import UserUpdateSourceTypes
 from sculptor.web.derived import TaskUpdate
 from sculptor.web.streams import LEGACY_SETUP_PLACEHOLDER_BYTES
+from sculptor.web.streams import StreamingUpdate
+from sculptor.web.streams import _CHAT_MESSAGE_JSON_BY_OBJECT_ID
 from sculptor.web.streams import _convert_to_streaming_update
 from sculptor.web.streams import _convert_to_user_update
 from sculptor.web.streams import _extract_changed_tasks
 from sculptor.web.streams import _snapshot_setup_state
+from sculptor.web.streams import encode_streaming_update
 
 
 def test_convert_to_user_update_collects_models_and_overwrites_duplicates() -> None:
@@ -143,9 +153,10 @@ def test_convert_includes_ui_open_file() -> None:
         all_data=all_data,
         task_views_by_task_id={},
         task_update_state_by_task_id={},
-        processed_message_by_task_id={},
+        task_update_cursor_by_task_id={},
         sent_workflow_states_by_task_id={},
         settings=_empty_settings(),
+        task_service=MagicMock(),
     )
 
     assert update.ui_open_file_by_workspace_id == {workspace_id: action}
@@ -161,9 +172,10 @@ def test_convert_ui_open_file_last_write_wins_for_same_workspace() -> None:
         all_data=all_data,
         task_views_by_task_id={},
         task_update_state_by_task_id={},
-        processed_message_by_task_id={},
+        task_update_cursor_by_task_id={},
         sent_workflow_states_by_task_id={},
         settings=_empty_settings(),
+        task_service=MagicMock(),
     )
 
     assert update.ui_open_file_by_workspace_id == {workspace_id: second}
@@ -180,9 +192,10 @@ def test_convert_ui_open_file_keeps_distinct_workspaces() -> None:
         all_data=all_data,
         task_views_by_task_id={},
         task_update_state_by_task_id={},
-        processed_message_by_task_id={},
+        task_update_cursor_by_task_id={},
         sent_workflow_states_by_task_id={},
         settings=_empty_settings(),
+        task_service=MagicMock(),
     )
 
     assert update.ui_open_file_by_workspace_id == {workspace_a: action_a, workspace_b: action_b}
@@ -257,3 +270,55 @@ def test_extract_changed_tasks_suppresses_empty_map_after_first_send() -> None:
         sent_workflow_states_by_task_id=sent_workflow_states_by_task_id,
     )
     assert second[task_id].workflow_task_states is None
+
+
+def _make_chat_message(text: str, role: ChatMessageRole = ChatMessageRole.ASSISTANT) -> ChatMessage:
+    return ChatMessage(
+        role=role,
+        id=AgentMessageID(),
+        content=(TextBlock(text=text),),
+        approximate_creation_time=datetime.datetime.now(datetime.timezone.utc),
+    )
+
+
+def test_encode_streaming_update_matches_model_dump() -> None:
+    task_with_history, task_without_history = TaskID(), TaskID()
+    workspace_id = WorkspaceID()
+    update = StreamingUpdate(
+        task_update_by_task_id={
+            task_with_history: _make_task_update(task_with_history, {}).model_copy(
+                update={
+                    "chat_messages": (
+                        _make_chat_message("hello", ChatMessageRole.USER),
+                        _make_chat_message('caf\u00e9 "quoted"\n'),
+                    ),
+                    "in_progress_chat_message": _make_chat_message("still typing"),
+                }
+            ),
+            task_without_history: _make_task_update(task_without_history, {}),
+        },
+        ui_open_file_by_workspace_id={
+            workspace_id: OpenFileUiAction(workspace_id=workspace_id, file_path="/tmp/a.txt", mode="auto")
+        },
+    )
+
+    # Twice: once filling the fragment cache and once reading from it.
+    for _ in range(2):
+        assert json.loads(encode_streaming_update(update)) == update.model_dump(mode="json", by_alias=True)
+    assert json.loads(encode_streaming_update(StreamingUpdate())) == StreamingUpdate().model_dump(
+        mode="json", by_alias=True
+    )
+
+
+def test_encoded_chat_messages_are_dropped_from_the_cache_when_collected() -> None:
+    task_id = TaskID()
+    message = _make_chat_message("hello")
+    message_object_id = id(message)
+    task_update = _make_task_update(task_id, {}).model_copy(update={"chat_messages": (message,)})
+    update = StreamingUpdate(task_update_by_task_id={task_id: task_update})
+    encode_streaming_update(update)
+    assert _CHAT_MESSAGE_JSON_BY_OBJECT_ID[message_object_id] == message.model_dump_json(by_alias=True)
+
+    del update, task_update, message
+    gc.collect()
+    assert message_object_id not in _CHAT_MESSAGE_JSON_BY_OBJECT_ID
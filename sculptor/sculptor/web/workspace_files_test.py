@@ -19,6 +19,8 @@ from sculptor.primitives.ids import RequestID
 from sculptor.primitives.ids import WorkspaceID
 from sculptor.service_collections.service_collection import CompleteServiceCollection
 from sculptor.services.data_model_service.data_types import DataModelTransaction
+from sculptor.services.workspace_service import default_implementation
+from sculptor.services.workspace_service.default_implementation import DefaultWorkspaceService
 from sculptor.web.auth import authenticate_anonymous
 
 
@@ -151,6 +153,54 @@ def test_workspace_files_returns_503_when_git_command_fails(
     assert response.headers.get("Retry-After") is not None, "503 response should include Retry-After header"
 
 
+def test_workspace_file_search_ranks_matching_files(
+    client: TestClient,
+    test_services: CompleteServiceCollection,
+    test_project: Project,
+) -> None:
+    """The search endpoint returns matching files best first, with the matched characters."""
+    user_session = authenticate_anonymous(test_services, RequestID())
+    with user_session.open_transaction(test_services) as transaction:
+        workspace = _create_workspace(transaction, test_services, test_project)
+
+    repo_path = test_project.get_local_user_path()
+    nested_dir = repo_path / "src" / "components"
+    nested_dir.mkdir(parents=True, exist_ok=True)
+    (nested_dir / "SearchButton.tsx").write_text("export const SearchButton = () => null;\n")
+    _git_add_and_commit(repo_path, ["src/components/SearchButton.tsx"], "Add searchable file")
+
+    response = client.get(
+        f"/api/v1/workspaces/{workspace.object_id}/files/search", params={"query": "srchbtn", "limit": 5}
+    )
+    assert response.status_code == 200
+    matches = response.json()["matches"]
+    assert matches[0]["path"] == "src/components/SearchButton.tsx"
+    assert len(matches[0]["matchedIndices"]) == len("srchbtn")
+
+    response = client.get(f"/api/v1/workspaces/{workspace.object_id}/files/search", params={"limit": 0})
+    assert response.status_code == 422
+
+
+def test_workspace_file_search_keeps_only_the_most_recently_queried_indexes(
+    client: TestClient,
+    test_services: CompleteServiceCollection,
+    test_project: Project,
+) -> None:
+    """Past the cap, the file index of the least recently queried workspace is dropped."""
+    user_session = authenticate_anonymous(test_services, RequestID())
+    with user_session.open_transaction(test_services) as transaction:
+        workspaces = [_create_workspace(transaction, test_services, test_project) for _ in range(3)]
+
+    with patch.object(default_implementation, "_MAX_FILE_INDEXES", 2):
+        for workspace in (workspaces[0], workspaces[1], workspaces[0], workspaces[2]):
+            response = client.get(f"/api/v1/workspaces/{workspace.object_id}/files/search", params={"query": "a"})
+            assert response.status_code == 200
+
+    workspace_service = test_services.workspace_service
+    assert isinstance(workspace_service, DefaultWorkspaceService)
+    assert list(workspace_service._file_index_by_workspace) == [workspaces[0].object_id, workspaces[2].object_id]
+
+
 def test_open_in_os_returns_400_for_path_traversal(
     client: TestClient,
     test_services: CompleteServiceCollection,
@@ -222,6 +272,23 @@ def test_read_file_at_ref_returns_404_for_nonexistent_file(
     assert response.status_code == 404
 
 
+def test_read_file_at_ref_returns_404_for_a_path_with_a_newline(
+    client: TestClient,
+    test_services: CompleteServiceCollection,
+    test_project: Project,
+) -> None:
+    """A newline cannot be passed to git cat-file, and no file at a ref has one in its path."""
+    user_session = authenticate_anonymous(test_services, RequestID())
+    with user_session.open_transaction(test_services) as transaction:
+        workspace = _create_workspace(transaction, test_services, test_project)
+
+    response = client.post(
+        f"/api/v1/workspaces/{workspace.object_id}/read-file-at-ref",
+        json={"path": "first\nsecond.txt", "gitRef": "HEAD"},
+    )
+    assert response.status_code == 404
+
+
 def test_read_file_at_ref_with_known_committed_file(
     client: TestClient,
     test_services: CompleteServiceCollection,
@@ -0,0 +1,454 @@
+"""Backend microbenchmarks for the streaming, persistence, and workspace-clone hot paths.
+
+Each benchmark times one Python path on synthetic transcripts at several sizes
+and records the result with the `backend_benchmark` fixture, which appends it to
+the perf JSONL next to the Playwright scenarios so `tools/perf/comment.py` flags
+backend regressions on PRs too. No Sculptor instance or browser is started:
+
+    uv run --project sculptor pytest sculptor/tests/perf/backend_benchmarks.py -s -p no:xdist
+"""
+
+import json
+import time
+from collections.abc import Generator
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+from pathlib import Path
+from queue import Queue
+from threading import Event
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import select
+
+from sculptor.agents.default.claude_code_sdk.harness import CLAUDE_CODE_HARNESS
+from sculptor.agents.default.claude_code_sdk.output_processor import ClaudeOutputProcessor
+from sculptor.config.settings import SculptorSettings
+from sculptor.database.models import AgentTaskInputsV2
+from sculptor.database.models import AgentTaskStateV2
+from sculptor.database.models import Project
+from sculptor.database.models import SavedAgentMessage
+from sculptor.database.models import Task
+from sculptor.database.models import TaskID
+from sculptor.foundation.concurrency_group import ConcurrencyGroup
+from sculptor.interfaces.agents.agent import ClaudeCodeSDKAgentConfig
+from sculptor.primitives.ids import AgentMessageID
+from sculptor.primitives.ids import OrganizationReference
+from sculptor.primitives.ids import ProjectID
+from sculptor.primitives.ids import UserReference
+from sculptor.primitives.ids import WorkspaceID
+from sculptor.services.data_model_service.sql_implementation import SAVED_AGENT_MESSAGE_TABLE
+from sculptor.services.data_model_service.sql_implementation import SQLDataModelService
+from sculptor.services.data_model_service.sql_implementation import _row_to_pydantic_model
+from sculptor.services.task_service.api import TaskMessageContainer
+from sculptor.services.task_service.api import TaskService
+from sculptor.services.task_service.task_update_materializer import TaskUpdateMaterializer
+from sculptor.services.workspace_service.environment_manager.environments.clone_strategy import clone_repository
+from sculptor.state.chat_state import ChatMessage
+from sculptor.state.messages import Message
+from sculptor.testing.perf.microbenchmarks import BackendBenchmarkRecorder
+from sculptor.testing.perf.transcripts import make_tool_heavy_claude_cli_transcript
+from sculptor.testing.perf.transcripts import make_tool_heavy_turn
+from sculptor.web.derived import CodingAgentTaskView
+from sculptor.web.derived import TaskUpdate
+from sculptor.web.derived import create_initial_task_view
+from sculptor.web.message_conversion import InProgressChatMessageBuilder
+from sculptor.web.message_conversion import convert_agent_messages_to_task_update
+from sculptor.web.streams import StreamingUpdate
+from sculptor.web.streams import _convert_to_streaming_update
+from sculptor.web.streams import encode_streaming_update
+
+# Tool calls per synthetic turn; each tool call is two persisted messages.
+_TOOL_CALL_COUNTS = (100, 500, 2000)
+
+# How large the websocket encoding benchmark grows its initial frame.
+_INITIAL_DUMP_BYTES = 5 * 1024 * 1024
+
+# How many subprocesses the subprocess wait benchmark runs at once, and how long each of them lives.
+_CONCURRENT_SUBPROCESS_COUNTS = (1, 16, 64)
+_SUBPROCESS_LIFETIME_SECONDS = 0.5
+
+# The large clone source: remotes (several config keys each) × remote-tracking branches per remote.
+_CLONE_SOURCE_REMOTE_COUNT = 16
+_CLONE_SOURCE_BRANCH_COUNT = 200
+
+
+def _variant(tool_call_count: int) -> str:
+    return f"{tool_call_count}-tool-calls"
+
+
+def _make_task(project_id: ProjectID) -> Task:
+    return Task(
+        object_id=TaskID(),
+        user_reference=UserReference("perf-user"),
+        organization_reference=OrganizationReference("perf-org"),
+        project_id=project_id,
+        input_data=AgentTaskInputsV2(agent_config=ClaudeCodeSDKAgentConfig(), git_hash="HEAD", system_prompt=None),
+        current_state=AgentTaskStateV2(workspace_id=WorkspaceID()),
+    )
+
+
+def _make_task_view(task: Task, messages: list[Message]) -> CodingAgentTaskView:
+    task_view = create_initial_task_view(task, SculptorSettings())
+    assert isinstance(task_view, CodingAgentTaskView)
+    task_view.update_task(task)
+    for message in messages:
+        task_view.add_message(message)
+    return task_view
+
+
+def _fold_one_message_at_a_time(messages: list[Message]) -> TaskUpdate:
+    """Live streaming: every message arrives in its own batch, as in TaskUpdateMaterializer."""
+    task_id = TaskID()
+    completed_message_by_id: dict[AgentMessageID, ChatMessage] = {}
+    in_progress_builder = InProgressChatMessageBuilder()
+    state: TaskUpdate | None = None
+    for message in messages:
+        state = convert_agent_messages_to_task_update(
+            [message],
+            task_id,
+            completed_message_by_id,
+            CLAUDE_CODE_HARNESS,
+            current_state=state,
+            in_progress_builder=in_progress_builder,
+        )
+    assert state is not None
+    return state
+
+
+@pytest.mark.parametrize("tool_call_count", _TOOL_CALL_COUNTS)
+def benchmark_convert_agent_messages_to_task_update(
+    backend_benchmark: BackendBenchmarkRecorder, tool_call_count: int
+) -> None:
+    messages = make_tool_heavy_turn(tool_call_count)
+    backend_benchmark.measure(
+        scenario="convert_agent_messages_to_task_update",
+        variant=f"replay-{_variant(tool_call_count)}",
+        setup=lambda: messages,
+        run=lambda batch: convert_agent_messages_to_task_update(batch, TaskID(), {}, CLAUDE_CODE_HARNESS),
+    )
+    backend_benchmark.measure(
+        scenario="convert_agent_messages_to_task_update",
+        variant=f"live-fold-{_variant(tool_call_count)}",
+        setup=lambda: messages,
+        run=_fold_one_message_at_a_time,
+    )
+
+
+@pytest.mark.parametrize("tool_call_count", _TOOL_CALL_COUNTS)
+def benchmark_convert_to_streaming_update(backend_benchmark: BackendBenchmarkRecorder, tool_call_count: int) -> None:
+    """A stream's first batch for a task: builds the task view and reads the shared fold."""
+    task = _make_task(ProjectID())
+    messages = make_tool_heavy_turn(tool_call_count)
+    container = TaskMessageContainer(tasks=(task,), messages=tuple((message, task.object_id) for message in messages))
+    settings = SculptorSettings()
+
+    def _make_task_service() -> TaskService:
+        materializer = TaskUpdateMaterializer()
+        materializer.append_messages(task.object_id, messages)
+        task_service = MagicMock(spec=TaskService)
+        task_service.read_task_update.side_effect = materializer.read
+        return task_service
+
+    def _convert(task_service: TaskService) -> StreamingUpdate:
+        return _convert_to_streaming_update(
+            all_data=[container],
+            task_views_by_task_id={},
+            task_update_state_by_task_id={},
+            task_update_cursor_by_task_id={},
+            sent_workflow_states_by_task_id={},
+            settings=settings,
+            task_service=task_service,
+        )
+
+    update = _convert(_make_task_service())
+    assert len(update.task_update_by_task_id[task.object_id].chat_messages) == 2
+    backend_benchmark.measure(
+        scenario="_convert_to_streaming_update",
+        variant=f"first-batch-{_variant(tool_call_count)}",
+        setup=_make_task_service,
+        run=_convert,
+    )
+
+
+@pytest.mark.parametrize("tool_call_count", _TOOL_CALL_COUNTS)
+def benchmark_streaming_update_model_dump(backend_benchmark: BackendBenchmarkRecorder, tool_call_count: int) -> None:
+    """Serializing a full-history update the way the websocket handler does."""
+    task = _make_task(ProjectID())
+    messages = make_tool_heavy_turn(tool_call_count)
+    update = StreamingUpdate(
+        task_update_by_task_id={
+            task.object_id: convert_agent_messages_to_task_update(messages, task.object_id, {}, CLAUDE_CODE_HARNESS)
+        },
+        task_views_by_task_id={task.object_id: _make_task_view(task, messages)},
+    )
+    backend_benchmark.measure(
+        scenario="StreamingUpdate.model_dump",
+        variant=_variant(tool_call_count),
+        setup=lambda: update,
+        run=lambda streaming_update: streaming_update.model_dump(mode="json", by_alias=True),
+    )
+
+
+def benchmark_websocket_frame_encoding(backend_benchmark: BackendBenchmarkRecorder) -> None:
+    """A stream's ~5 MB initial frame: the old dict round trip against `encode_streaming_update`.
+
+    The cold variant encodes fresh chat messages; the warm one reuses the fragments an earlier stream cached.
+    """
+    task = _make_task(ProjectID())
+    messages: list[Message] = []
+    update = StreamingUpdate()
+    while len(encode_streaming_update(update).encode()) < _INITIAL_DUMP_BYTES:
+        messages.extend(make_tool_heavy_turn(500))
+        task_update = convert_agent_messages_to_task_update(messages, task.object_id, {}, CLAUDE_CODE_HARNESS)
+        update = StreamingUpdate(
+            task_update_by_task_id={task.object_id: task_update},
+            task_views_by_task_id={task.object_id: _make_task_view(task, messages)},
+        )
+    assert json.loads(encode_streaming_update(update)) == update.model_dump(mode="json", by_alias=True)
+
+    backend_benchmark.measure(
+        scenario="websocket frame encoding",
+        variant="dict-round-trip-5mb",
+        setup=lambda: update,
+        # What `WebSocket.send_json` did with the dumped dict.
+        run=lambda streaming_update: json.dumps(
+            streaming_update.model_dump(mode="json", by_alias=True), separators=(",", ":"), ensure_ascii=False
+        ),
+    )
+    backend_benchmark.measure(
+        scenario="websocket frame encoding",
+        variant="encode-cold-5mb",
+        setup=lambda: update.model_copy(deep=True),
+        run=encode_streaming_update,
+    )
+    backend_benchmark.measure(
+        scenario="websocket frame encoding",
+        variant="encode-warm-5mb",
+        setup=lambda: update,
+        run=encode_streaming_update,
+    )
+
+
+@pytest.mark.parametrize("tool_call_count", _TOOL_CALL_COUNTS)
+def benchmark_claude_output_processor(
+    backend_benchmark: BackendBenchmarkRecorder, tool_call_count: int, tmp_path: Path
+) -> None:
+    """Replaying a turn's CLI stdout from a JSONL file through the real `_process_output` loop."""
+    transcript_path = tmp_path / "transcript.jsonl"
+    transcript_path.write_text(
+        "".join(json.dumps(line) + "\n" for line in make_tool_heavy_claude_cli_transcript(tool_call_count))
+    )
+    lines = transcript_path.read_text().splitlines()
+
+    def _make_processor() -> ClaudeOutputProcessor:
+        stdout_queue: Queue[tuple[str, bool]] = Queue()
+        for line in lines:
+            stdout_queue.put((line, True))
+        process = MagicMock()
+        process.get_queue.return_value = stdout_queue
+        # The loop exits once the result line is processed and the queue has drained.
+        process.is_finished.return_value = True
+        return ClaudeOutputProcessor(
+            process=process,
+            source_command="perf",
+            output_message_queue=Queue(),
+            environment=MagicMock(),
+            diff_tracker=None,
+            task_id=TaskID(),
+            session_id_written_event=Event(),
+            harness=CLAUDE_CODE_HARNESS,
+            streaming_enabled=True,
+        )
+
+    def _process(processor: ClaudeOutputProcessor) -> None:
+        processor._process_output()
+        assert processor.found_final_message
+
+    backend_benchmark.measure(
+        scenario="ClaudeOutputProcessor",
+        variant=f"jsonl-replay-{_variant(tool_call_count)}",
+        setup=_make_processor,
+        run=_process,
+    )
+
+
+@pytest.fixture
+def data_model_service(
+    test_settings: SculptorSettings, test_root_concurrency_group: ConcurrencyGroup
+) -> Generator[SQLDataModelService, None, None]:
+    service = SQLDataModelService.build_from_settings(
+        test_settings, test_root_concurrency_group.make_concurrency_group("data_model_service")
+    )
+    with service.run():
+        yield service
+
+
+@pytest.mark.parametrize("tool_call_count", _TOOL_CALL_COUNTS)
+def benchmark_saved_message_reads(
+    backend_benchmark: BackendBenchmarkRecorder, data_model_service: SQLDataModelService, tool_call_count: int
+) -> None:
+    """Loading a task's persisted log, and the per-row model validation inside it on its own."""
+    project = Project(object_id=ProjectID(), name="Perf", organization_reference=OrganizationReference("perf-org"))
+    task = _make_task(project.object_id)
+    with data_model_service.open_task_transaction() as transaction:
+        transaction.upsert_project(project)
+        transaction.upsert_task(task)
+        transaction.insert_messages(
+            [
+                SavedAgentMessage.build(message=message, task_id=task.object_id)
+                for message in make_tool_heavy_turn(tool_call_count)
+            ]
+        )
+
+    def _get_messages(service: SQLDataModelService) -> None:
+        with service.open_task_transaction() as transaction:
+            saved_messages = transaction.get_messages_for_task(task.object_id)
+        assert len(saved_messages) == 2 * tool_call_count + 3
+
+    backend_benchmark.measure(
+        scenario="SQLTransaction.get_messages_for_task",
+        variant=_variant(tool_call_count),
+        setup=lambda: data_model_service,
+        run=_get_messages,
+    )
+
+    with data_model_service.open_task_transaction() as transaction:
+        rows = transaction.connection.execute(
+            select(SAVED_AGENT_MESSAGE_TABLE).where(SAVED_AGENT_MESSAGE_TABLE.c.task_id == str(task.object_id))
+        ).all()
+    backend_benchmark.measure(
+        scenario="_row_to_pydantic_model",
+        variant=f"SavedAgentMessage-{_variant(tool_call_count)}",
+        setup=lambda: rows,
+        run=lambda saved_rows: [_row_to_pydantic_model(row, SavedAgentMessage) for row in saved_rows],
+    )
+
+
+def _git(concurrency_group: ConcurrencyGroup, repo_path: Path, *args: str) -> str:
+    return concurrency_group.run_process_to_completion(
+        command=["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args], cwd=repo_path
+    ).stdout.strip()
+
+
+def _make_clone_source(concurrency_group: ConcurrencyGroup, path: Path, remote_count: int, branch_count: int) -> Path:
+    """A repo with `remote_count` remotes, each tracking `branch_count` branches, plus as many local branches.
+
+    Config and refs are written straight into `.git` so that building the source stays cheap next to the clone.
+    """
+    path.mkdir(parents=True)
+    _git(concurrency_group, path, "init", "-q", "-b", "main")
+    (path / "file.txt").write_text("content")
+    _git(concurrency_group, path, "add", "file.txt")
+    _git(concurrency_group, path, "commit", "-q", "-m", "init")
+    head = _git(concurrency_group, path, "rev-parse", "HEAD")
+
+    config_lines: list[str] = []
+    refs: list[str] = [f"refs/heads/local-{i:03d}" for i in range(branch_count)]
+    for remote_index in range(remote_count):
+        remote = f"remote-{remote_index:02d}"
+        config_lines += [
+            f'[remote "{remote}"]',
+            f"\turl = https://example.com/{remote}.git",
+            f"\tpushurl = git@example.com:{remote}.git",
+            f"\tfetch = +refs/heads/*:refs/remotes/{remote}/*",
+            "\ttagOpt = --no-tags",
+        ]
+        refs += [f"refs/remotes/{remote}/branch-{i:03d}" for i in range(branch_count)]
+    with (path / ".git" / "config").open("a") as config_file:
+        config_file.write("\n".join(config_lines) + "\n")
+    (path / ".git" / "packed-refs").write_text("".join(f"{head} {ref}\n" for ref in sorted(refs)))
+    _git(concurrency_group, path, "branch", "-q", "--set-upstream-to=remote-00/branch-000", "main")
+    return path
+
+
+def _record_git_commands(monkeypatch: pytest.MonkeyPatch) -> list[list[str]]:
+    commands: list[list[str]] = []
+    run_process_to_completion = ConcurrencyGroup.run_process_to_completion
+
+    def _recording_run_process_to_completion(self: ConcurrencyGroup, command: Any, *args: Any, **kwargs: Any) -> Any:
+        commands.append(list(command))
+        return run_process_to_completion(self, command, *args, **kwargs)
+
+    monkeypatch.setattr(ConcurrencyGroup, "run_process_to_completion", _recording_run_process_to_completion)
+    return commands
+
+
+@pytest.mark.parametrize("target_branch", (None, "local-000"))
+def benchmark_clone_repository(
+    backend_benchmark: BackendBenchmarkRecorder,
+    test_root_concurrency_group: ConcurrencyGroup,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    target_branch: str | None,
+) -> None:
+    """Cloning a workspace from a source with one remote and branch, and from one with many of each."""
+    sources = {
+        "1-remote-1-branch": _make_clone_source(test_root_concurrency_group, tmp_path / "small", 1, 1),
+        f"{_CLONE_SOURCE_REMOTE_COUNT}-remotes-{_CLONE_SOURCE_BRANCH_COUNT}-branches": _make_clone_source(
+            test_root_concurrency_group, tmp_path / "large", _CLONE_SOURCE_REMOTE_COUNT, _CLONE_SOURCE_BRANCH_COUNT
+        ),
+    }
+    clone_indices = count()
+    git_command_count_by_variant: dict[str, int] = {}
+    for variant, source in sources.items():
+        with monkeypatch.context() as patch:
+            commands = _record_git_commands(patch)
+            clone_repository(
+                source, tmp_path / "counted" / variant, test_root_concurrency_group, target_branch=target_branch
+            )
+        git_command_count_by_variant[variant] = len(commands)
+
+        backend_benchmark.measure(
+            scenario="clone_repository",
+            variant=f"{variant}-target-branch-{target_branch}",
+            setup=lambda: tmp_path / "clones" / str(next(clone_indices)),
+            run=lambda destination, source=source: clone_repository(
+                source, destination, test_root_concurrency_group, target_branch=target_branch
+            ),
+        )
+
+    clone_path = tmp_path / "counted" / list(sources)[-1]
+    if target_branch is not None:
+        assert _git(test_root_concurrency_group, clone_path, "rev-parse", "--abbrev-ref", "HEAD") == target_branch
+    assert len(_git(test_root_concurrency_group, clone_path, "remote").splitlines()) == _CLONE_SOURCE_REMOTE_COUNT
+    assert (
+        len(_git(test_root_concurrency_group, clone_path, "branch", "-r").splitlines())
+        == _CLONE_SOURCE_REMOTE_COUNT * _CLONE_SOURCE_BRANCH_COUNT
+    )
+    # The bootstrap is planned up front: how many git processes a clone spawns does not depend on how many
+    # remotes, config keys, or branches the source has.
+    assert len(set(git_command_count_by_variant.values())) == 1, git_command_count_by_variant
+    assert max(git_command_count_by_variant.values()) <= 5, git_command_count_by_variant
+
+
+@pytest.mark.parametrize("subprocess_count", _CONCURRENT_SUBPROCESS_COUNTS)
+def benchmark_concurrent_subprocess_cpu(
+    backend_benchmark: BackendBenchmarkRecorder, test_root_concurrency_group: ConcurrencyGroup, subprocess_count: int
+) -> None:
+    """The backend's own CPU time per subprocess while waiting on many mostly-idle subprocesses at once.
+
+    Each subprocess only sleeps, so what is measured is spawning it and then waiting for its output and
+    exit: a waiter that polls on a timer shows up here as CPU time that grows with the subprocess's lifetime.
+    """
+    command = ["sleep", str(_SUBPROCESS_LIFETIME_SECONDS)]
+
+    def _run_concurrently(executor: ThreadPoolExecutor) -> None:
+        futures = [
+            executor.submit(test_root_concurrency_group.run_process_to_completion, command, log_command=False)
+            for _ in range(subprocess_count)
+        ]
+        for future in futures:
+            assert future.result().returncode == 0
+
+    with ThreadPoolExecutor(max_workers=subprocess_count) as executor:
+        backend_benchmark.measure(
+            scenario="concurrent_subprocess_cpu_per_subprocess",
+            variant=f"{subprocess_count}-concurrent",
+            setup=lambda: executor,
+            run=_run_concurrently,
+            rounds=3,
+            # Process CPU time (all threads), split evenly across the subprocesses of a round.
+            clock=lambda: time.process_time() / subprocess_count,
+        )
@@ -4,6 +4,9 @@ These tests share the Playwright fixtures with the integration suite but
 live in their own directory because they have a different success
 criterion (record metrics, don't assert thresholds — yet) and a different
 typical invocation (``just test-integration sculptor/tests/perf/``).
+
+``backend_benchmarks.py`` times Python hot paths directly and needs none of
+the Playwright fixtures; its rows land in the same JSONL output.
 """
 
 from collections.abc import Generator
@@ -13,6 +16,7 @@ import pytest
 from sculptor.testing.auto_update_mock import mock_electron_api as mock_electron_api  # noqa: F401
 from sculptor.testing.perf.collector import MeasurementRecorder
 from sculptor.testing.perf.collector import resolve_output_path
+from sculptor.testing.perf.microbenchmarks import BackendBenchmarkRecorder
 from sculptor.testing.playwright_conftest import *  # noqa: F401, F403
 from sculptor.testing.playwright_utils import full_spa_reload
 from sculptor.testing.sculptor_instance import SculptorInstance
@@ -57,3 +61,17 @@ def perf_recorder(
     finally:
         recorder.disable()
         recorder.flush()
+
+
+@pytest.fixture
+def backend_benchmark(request: pytest.FixtureRequest) -> Generator[BackendBenchmarkRecorder, None, None]:
+    """Provide a BackendBenchmarkRecorder for the backend microbenchmarks.
+
+    Needs no Sculptor instance or browser; on teardown it appends its
+    measurements to the same JSONL output file as ``perf_recorder``.
+    """
+    recorder = BackendBenchmarkRecorder(output_path=resolve_output_path(), test_nodeid=request.node.nodeid)
+    try:
+        yield recorder
+    finally:
+        recorder.flush()
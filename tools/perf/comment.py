@@ -18,6 +18,11 @@ Verdict is on **work counts only** — foreground requests, React commits, DOM
 mutations. ``duration_ms`` and background requests ride along for context but
 never colour a cell red (background counts poll inside a wall-time window and
 jitter; duration is wall-clock). See docs/development notes for the rationale.
+
+Rows with ``"kind": "backend"`` come from the backend microbenchmarks
+(``sculptor/tests/perf/backend_benchmarks.py``). They have no work counts, only
+the timings of a Python hot path, so their verdict is on ``median_ms`` with a
+wider floor than the frontend counts get, and they render in their own table.
 """
 
 from __future__ import annotations
@@ -36,6 +41,10 @@ COMMIT_PCT = 15.0
 COMMIT_ABS = 5
 DOM_PCT = 15.0
 DOM_ABS = 30
+# Backend microbenchmarks: the median of several rounds, flagged only when it moves
+# by more than BACKEND_PCT *and* BACKEND_ABS_MS (sub-millisecond paths jitter by %).
+BACKEND_PCT = 25.0
+BACKEND_ABS_MS = 1.0
 
 # Hidden marker so the workflow can find-and-update its own comment.
 MARKER = "<!-- perf-bot:scu-1294 -->"
@@ -102,6 +111,7 @@ class RowReport:
     state: str  # "compared" | "new" | "removed"
     cells: list[Cell] = field(default_factory=list)
     details: list[str] = field(default_factory=list)  # collapsible attribution lines
+    kind: str = "frontend"  # "frontend" (Playwright scenario) | "backend" (microbenchmark)
 
     @property
     def status(self) -> str:
@@ -159,6 +169,21 @@ def _classify_count(base: int, head: int, pct_floor: float, abs_floor: int) -> t
     return (RED if delta > 0 else GREEN), text
 
 
+def _classify_ms(base: float, head: float, pct_floor: float, abs_floor: float) -> tuple[str, str]:
+    """Classify a timing with the same hybrid (Δ% AND Δabs) rule as the counts."""
+    delta = head - base
+    pct = _pct(base, head)
+    pct_txt = "∞" if pct == float("inf") else f"{pct:+.0f}%"
+    text = f"{base:.2f}→{head:.2f}ms ({pct_txt})"
+    if abs(pct) <= pct_floor or abs(delta) < abs_floor:
+        return FLAT, text
+    return (RED if delta > 0 else GREEN), text
+
+
+def _row_kind(row: dict) -> str:
+    return row.get("kind", "frontend")
+
+
 def _classify_fg(base_routes: dict[str, int], head_routes: dict[str, int]) -> tuple[str, str, list[str]]:
     """Per-route foreground-request diff. Any new/increased route is a regression.
 
@@ -223,14 +248,23 @@ def compare(base_idx: dict, head_idx: dict, dupes: tuple[list, list]) -> Report:
     for k in sorted(set(base_idx) | set(head_idx)):
         scenario, variant = k
         b, h = base_idx.get(k), head_idx.get(k)
+        kind = _row_kind(h if h is not None else b)
         if b is None:
-            rows.append(RowReport(scenario, variant, state="new"))
+            rows.append(RowReport(scenario, variant, state="new", kind=kind))
             continue
         if h is None:
-            rows.append(RowReport(scenario, variant, state="removed"))
+            rows.append(RowReport(scenario, variant, state="removed", kind=kind))
             continue
 
-        rr = RowReport(scenario, variant, state="compared")
+        rr = RowReport(scenario, variant, state="compared", kind=kind)
+        if kind == "backend":
+            m_status, m_text = _classify_ms(b["median_ms"], h["median_ms"], BACKEND_PCT, BACKEND_ABS_MS)
+            rr.cells = [
+                Cell("median", b["median_ms"], h["median_ms"], m_status, m_text),
+                Cell("min", b["min_ms"], h["min_ms"], INFO, f"{b['min_ms']:.2f}→{h['min_ms']:.2f}ms"),
+            ]
+            rows.append(rr)
+            continue
         # Verdict-bearing metrics.
         fg_status, fg_text, fg_details = _classify_fg(b["fg_by_route"], h["fg_by_route"])
         c_status, c_text = _classify_count(b["commits"], h["commits"], COMMIT_PCT, COMMIT_ABS)
@@ -290,6 +324,24 @@ def _verdict(report: Report) -> str:
     return "✅ no perf change"
 
 
+def _table_rows(rows: list[RowReport], metrics: tuple[str, ...]) -> list[str]:
+    padding = " |" * (len(metrics) - 1)
+    out: list[str] = []
+    for r in rows:
+        name = f"{r.scenario} / {r.variant}"
+        if r.state == "new":
+            out.append(f"| {name} | 🆕 new (no baseline) |{padding}")
+            continue
+        if r.state == "removed":
+            out.append(f"| {name} | 🗑️ removed (base only) |{padding}")
+            continue
+
+        by = {c.metric: c for c in r.cells}
+        cols = " | ".join(_cell(by[m]) for m in metrics)
+        out.append(f"| {name} | {cols} |")
+    return out
+
+
 def render_markdown(report: Report, base_sha: str | None, observational: bool) -> str:
     c = report.counts()
     out: list[str] = [MARKER, "", f"### {_verdict(report)}"]
@@ -312,21 +364,20 @@ def render_markdown(report: Report, base_sha: str | None, observational: bool) -
             out.append("")
             out.append(f"⚠️ duplicate {k} rows (retries appended twice?): " + ", ".join(f"`{s}/{v}`" for s, v in dupes))
 
-    out.append("")
-    out.append("| scenario / variant | fg req | commits | dom | bg req | duration |")
-    out.append("|---|---|---|---|---|---|")
-    for r in report.rows:
-        name = f"{r.scenario} / {r.variant}"
-        if r.state == "new":
-            out.append(f"| {name} | 🆕 new (no baseline) | | | | |")
-            continue
-        if r.state == "removed":
-            out.append(f"| {name} | 🗑️ removed (base only) | | | | |")
-            continue
-
-        by = {c.metric: c for c in r.cells}
-        cols = " | ".join(_cell(by[m]) for m in ("fg_req", "commits", "dom", "bg_req", "dur"))
-        out.append(f"| {name} | {cols} |")
+    frontend_rows = [r for r in report.rows if r.kind != "backend"]
+    backend_rows = [r for r in report.rows if r.kind == "backend"]
+    if frontend_rows or not backend_rows:
+        out.append("")
+        out.append("| scenario / variant | fg req | commits | dom | bg req | duration |")
+        out.append("|---|---|---|---|---|---|")
+        out.extend(_table_rows(frontend_rows, ("fg_req", "commits", "dom", "bg_req", "dur")))
+    if backend_rows:
+        out.append("")
+        out.append("**Backend hot paths**")
+        out.append("")
+        out.append("| benchmark / variant | median | min |")
+        out.append("|---|---|---|")
+        out.extend(_table_rows(backend_rows, ("median", "min")))
 
     detailed = [r for r in report.rows if r.details]
     if detailed:
@@ -369,13 +420,26 @@ def render_head_only_markdown(head_idx: dict, head_dupes: list[tuple[str, str]])
     if head_dupes:
         out.append("")
         out.append("⚠️ duplicate rows (retries appended twice?): " + ", ".join(f"`{s}/{v}`" for s, v in head_dupes))
-    out.append("")
-    out.append("| scenario / variant | fg req | commits | dom | bg req | duration |")
-    out.append("|---|---|---|---|---|---|")
-    for k in sorted(head_idx):
-        scenario, variant = k
-        fg, commits, dom, bg, dur = _head_cells(head_idx[k])
-        out.append(f"| {scenario} / {variant} | {fg} | {commits} | {dom} | {bg} | {dur} |")
+    frontend_keys = [k for k in sorted(head_idx) if _row_kind(head_idx[k]) != "backend"]
+    backend_keys = [k for k in sorted(head_idx) if _row_kind(head_idx[k]) == "backend"]
+    if frontend_keys or not backend_keys:
+        out.append("")
+        out.append("| scenario / variant | fg req | commits | dom | bg req | duration |")
+        out.append("|---|---|---|---|---|---|")
+        for k in frontend_keys:
+            scenario, variant = k
+            fg, commits, dom, bg, dur = _head_cells(head_idx[k])
+            out.append(f"| {scenario} / {variant} | {fg} | {commits} | {dom} | {bg} | {dur} |")
+    if backend_keys:
+        out.append("")
+        out.append("**Backend hot paths**")
+        out.append("")
+        out.append("| benchmark / variant | median | min | rounds |")
+        out.append("|---|---|---|---|")
+        for k in backend_keys:
+            scenario, variant = k
+            h = head_idx[k]
+            out.append(f"| {scenario} / {variant} | {h['median_ms']:.2f}ms | {h['min_ms']:.2f}ms | {h['rounds']} |")
     out.append("")
     return "\n".join(out)
 
@@ -384,7 +448,11 @@ def render_head_only_term(head_idx: dict) -> str:
     lines = ["perf measurements (no baseline)"]
     for k in sorted(head_idx):
         scenario, variant = k
-        fg, commits, dom, bg, dur = _head_cells(head_idx[k])
+        h = head_idx[k]
+        if _row_kind(h) == "backend":
+            lines.append(f"  {scenario}/{variant}  median={h['median_ms']:.2f}ms min={h['min_ms']:.2f}ms")
+            continue
+        fg, commits, dom, bg, dur = _head_cells(h)
         lines.append(f"  {scenario}/{variant}  fg={fg} commits={commits} dom={dom} bg={bg} dur={dur}")
     return "\n".join(lines)
 
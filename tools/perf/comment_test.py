@@ -42,6 +42,19 @@ def _row(scenario, variant, *, fg=None, commits=0, dom=0, bg=3, dur=400.0, comps
     }
 
 
+def _backend_row(scenario, variant, *, median=10.0, min_ms=None):
+    return {
+        "kind": "backend",
+        "scenario": scenario,
+        "variant": variant,
+        "median_ms": median,
+        "min_ms": median if min_ms is None else min_ms,
+        "max_ms": median,
+        "rounds": 5,
+        "test_nodeid": f"x::{scenario}[{variant}]",
+    }
+
+
 def _one(base_row, head_row):
     bidx, bd = comment._index([base_row])
     hidx, hd = comment._index([head_row])
@@ -166,6 +179,37 @@ def test_main_head_only_when_base_absent() -> None:
             assert "no baseline yet" in buf.getvalue()
 
 
+def test_backend_median_needs_both_pct_and_abs() -> None:
+    # +50% of a sub-millisecond path is below the absolute floor -> flat.
+    r = _one(_backend_row("b", "v", median=0.4), _backend_row("b", "v", median=0.6))
+    assert r.status == "unchanged"
+    # +2ms on 40ms clears the floor but not the percentage -> flat.
+    r = _one(_backend_row("b", "v", median=40.0), _backend_row("b", "v", median=42.0))
+    assert r.status == "unchanged"
+    r = _one(_backend_row("b", "v", median=40.0), _backend_row("b", "v", median=60.0))
+    assert r.status == "regressed"
+    r = _one(_backend_row("b", "v", median=60.0), _backend_row("b", "v", median=40.0))
+    assert r.status == "improved"
+    # The minimum rides along but never colours the row.
+    r = _one(_backend_row("b", "v", min_ms=1.0), _backend_row("b", "v", min_ms=9.0))
+    assert r.status == "unchanged"
+
+
+def test_backend_rows_render_in_their_own_table() -> None:
+    base = [_row("s", "v", commits=10), _backend_row("b", "v", median=40.0)]
+    head = [_row("s", "v", commits=10), _backend_row("b", "v", median=60.0), _backend_row("b", "new")]
+    bidx, bd = comment._index(base)
+    hidx, hd = comment._index(head)
+    md = comment.render_markdown(comment.compare(bidx, hidx, (bd, hd)), None, observational=False)
+    frontend_table, backend_table = md.split("**Backend hot paths**")
+    assert "| s / v |" in frontend_table and "b / v" not in frontend_table
+    assert "| b / v | ❌ 40.00→60.00ms (+50%) |" in backend_table
+    assert "| b / new | 🆕 new (no baseline) | |" in backend_table
+    head_only = comment.render_head_only_markdown(hidx, [])
+    assert "| b / v | 60.00ms | 60.00ms | 5 |" in head_only
+    assert "median=60.00ms" in comment.render_head_only_term(hidx)
+
+
 if __name__ == "__main__":
     fns = [v for k, v in sorted(globals().items()) if k.startswith("test_") and callable(v)]
     for fn in fns:
@@ -704,7 +704,11 @@ def status(
         handle_exit_reason(exit_reason, json_output)
         return
 
-    snapshot = _fetch_snapshot(base_url, agent_id, timeout, json_output)
+    snapshot = _fetch_snapshot(base_url, agent_id, timeout, json_output, is_summary_only=True)
+    if snapshot.status == "WAITING":
+        # A pending question's answer options ride on the task update, which
+        # the summary frame leaves out.
+        snapshot = _fetch_snapshot(base_url, agent_id, timeout, json_output)
 
     if json_output:
         typer.echo(_status_output(snapshot).model_dump_json(indent=2))
@@ -787,12 +791,14 @@ def messages(
             typer.echo()
 
 
-def _fetch_snapshot(base_url: str, agent_id: str, timeout: float, json_output: bool) -> AgentSnapshot:
+def _fetch_snapshot(
+    base_url: str, agent_id: str, timeout: float, json_output: bool, is_summary_only: bool = False
+) -> AgentSnapshot:
     """Fetch an agent snapshot via WebSocket, handling errors."""
     session_token = get_session_token_safe(base_url, json_output)
 
     try:
-        return fetch_agent_state(base_url, session_token, agent_id, timeout)
+        return fetch_agent_state(base_url, session_token, agent_id, timeout, is_summary_only=is_summary_only)
     except ScopeNotFoundError:
         cli_error(f"Agent not found: {agent_id}", json_output=json_output)
     except ScopeForbiddenError:
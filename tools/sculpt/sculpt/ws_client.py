@@ -55,12 +55,13 @@ class AgentSnapshot(pydantic.BaseModel):
     messages: list[dict[str, Any]]
 
 
-def _build_ws_url(base_url: str, session_token: str, scope: str | None = None) -> str:
+def _build_ws_url(base_url: str, session_token: str, scope: str | None = None, view: str | None = None) -> str:
     """Convert an HTTP base URL to a WebSocket URL for the streaming endpoint.
 
     If `scope` is provided, append it as a `scope=` query parameter so the
     server narrows the connection. Pass None to leave the legacy unscoped
-    behavior (server resolves missing scope to ScopeAll).
+    behavior (server resolves missing scope to ScopeAll). `view="summary"`
+    asks for task views only, without chat history or workspace state.
     """
     if base_url.startswith("https://"):
         ws_url = "wss://" + base_url[len("https://") :]
@@ -71,6 +72,8 @@ def _build_ws_url(base_url: str, session_token: str, scope: str | None = None) -
     url = f"{ws_url}/api/v1/stream/ws?x-session-token={urllib.parse.quote(session_token, safe='')}"
     if scope is not None:
         url = f"{url}&scope={urllib.parse.quote(scope, safe=':')}"
+    if view is not None:
+        url = f"{url}&view={urllib.parse.quote(view, safe='')}"
     return url
 
 
@@ -103,6 +106,9 @@ _TERMINAL_TASK_STATUSES = frozenset({"FAILED", "CANCELLED", "DELETED", "SUCCEEDE
 
 _MAX_RECONNECT_DELAY_SECONDS = 30
 
+# The stream's `?view=` for frames that carry task views only.
+_SUMMARY_VIEW = "summary"
+
 
 def _is_terminal_state(snapshot: AgentSnapshot) -> bool:
     return snapshot.status in _TERMINAL_STATUSES or snapshot.task_status in _TERMINAL_TASK_STATUSES
@@ -196,13 +202,19 @@ async def _fetch_agent_state_async(ws_url: str, agent_id: str, timeout: float) -
         raise _wrap_invalid_status(e) from e
 
 
-def fetch_agent_state(base_url: str, session_token: str, agent_id: str, timeout: float = 10.0) -> AgentSnapshot:
+def fetch_agent_state(
+    base_url: str, session_token: str, agent_id: str, timeout: float = 10.0, is_summary_only: bool = False
+) -> AgentSnapshot:
     """Fetch agent state via a one-shot WebSocket connection scoped to the agent.
 
     The connection uses ?scope=agent:<id> so the server only emits this
-    agent's data. Reads exactly one frame and disconnects.
+    agent's data. Reads exactly one frame and disconnects. With
+    `is_summary_only` the frame carries only the task view, so the snapshot
+    has no messages or waiting options but the server skips its chat history.
     """
-    ws_url = _build_ws_url(base_url, session_token, scope=f"agent:{agent_id}")
+    ws_url = _build_ws_url(
+        base_url, session_token, scope=f"agent:{agent_id}", view=_SUMMARY_VIEW if is_summary_only else None
+    )
     return asyncio.run(_fetch_agent_state_async(ws_url, agent_id, timeout))
 
 
@@ -226,12 +238,13 @@ def fetch_all_agents(
     scope: str = "all",
     timeout: float = 10.0,
 ) -> list[AgentSnapshot]:
-    """Fetch all in-scope agent snapshots via a one-shot WebSocket connection.
+    """Fetch all in-scope agent summaries via a one-shot WebSocket connection.
 
     Defaults to scope='all'. Pass 'workspace:<id>' or 'project:<id>' to let
-    the server narrow the dump.
+    the server narrow the dump. The connection asks for the summary view, so
+    the snapshots carry no messages or waiting options.
     """
-    ws_url = _build_ws_url(base_url, session_token, scope=scope)
+    ws_url = _build_ws_url(base_url, session_token, scope=scope, view=_SUMMARY_VIEW)
     return asyncio.run(_fetch_all_agents_async(ws_url, timeout))
 
 
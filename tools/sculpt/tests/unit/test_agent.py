@@ -1067,6 +1067,33 @@ class TestAgentStatus:
         mock_fetch.assert_called_once()
         assert mock_fetch.call_args[0][2] == "tsk_abc"
 
+    @patch("sculpt.commands.agent.fetch_agent_state")
+    @patch("sculpt.commands._follow_helpers.get_session_token", return_value="test-token")
+    def test_status_reads_only_the_summary(self, _mock_token: Any, mock_fetch: Any, runner: CliRunner) -> None:
+        mock_fetch.return_value = _make_snapshot()
+
+        result = runner.invoke(app, ["agent", "status", "tsk_abc123def456"])
+
+        assert result.exit_code == 0
+        mock_fetch.assert_called_once()
+        assert mock_fetch.call_args.kwargs.get("is_summary_only") is True
+
+    @patch("sculpt.commands.agent.fetch_agent_state")
+    @patch("sculpt.commands._follow_helpers.get_session_token", return_value="test-token")
+    def test_status_waiting_refetches_full_state_for_options(
+        self, _mock_token: Any, mock_fetch: Any, runner: CliRunner
+    ) -> None:
+        mock_fetch.side_effect = [
+            _make_snapshot(status="WAITING", waiting_detail="Pick a color"),
+            _make_snapshot(status="WAITING", waiting_detail="Pick a color", waiting_options=["Red", "Blue"]),
+        ]
+
+        result = runner.invoke(app, ["agent", "status", "tsk_abc123def456"])
+
+        assert result.exit_code == 0
+        assert "Red" in result.output
+        assert [call.kwargs.get("is_summary_only") for call in mock_fetch.call_args_list] == [True, False]
+
     @patch("sculpt.commands.agent.fetch_agent_state")
     @patch("sculpt.commands._follow_helpers.get_session_token", return_value="test-token")
     def test_status_agent_not_found(self, _mock_token: Any, mock_fetch: Any, runner: CliRunner) -> None:
@@ -106,6 +106,13 @@ def test_build_ws_url_with_agent_scope() -> None:
     )
 
 
+def test_build_ws_url_with_summary_view() -> None:
+    assert (
+        _build_ws_url("http://x", "tok", scope="all", view="summary")
+        == "ws://x/api/v1/stream/ws?x-session-token=tok&scope=all&view=summary"
+    )
+
+
 def test_build_ws_url_https_to_wss() -> None:
     assert (
         _build_ws_url("https://x", "tok", scope="workspace:ws_1")
@@ -734,6 +741,30 @@ def test_fetch_all_agents_default_all_scope_url() -> None:
         shutdown.set()
 
 
+def test_fetch_all_agents_asks_for_summary_view() -> None:
+    dump = _make_dump(task_views={})
+    url, shutdown, info = _start_ws_server(json.dumps(dump))
+    try:
+        fetch_all_agents(url.replace("ws://", "http://"), "tok")
+        assert "view=summary" in info["last_path"]
+    finally:
+        shutdown.set()
+
+
+def test_fetch_agent_state_summary_only_url() -> None:
+    task_id = "tsk_summary_only"
+    dump = _make_dump(task_views={task_id: _make_task_view(task_id=task_id)})
+    url, shutdown, info = _start_ws_server(json.dumps(dump))
+    try:
+        fetch_agent_state(url.replace("ws://", "http://"), "tok", task_id)
+        assert "view=" not in info["last_path"]
+        snapshot = fetch_agent_state(url.replace("ws://", "http://"), "tok", task_id, is_summary_only=True)
+        assert "view=summary" in info["last_path"]
+        assert snapshot.task_id == task_id
+    finally:
+        shutdown.set()
+
+
 def test_fetch_agent_state_reads_exactly_one_frame() -> None:
     task_id = "tsk_one_frame"
     dump = _make_dump(task_views={task_id: _make_task_view(task_id=task_id)})